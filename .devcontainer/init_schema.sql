@@ -4,11 +4,15 @@ CREATE EXTENSION IF NOT EXISTS pgcrypto;
 CREATE EXTENSION IF NOT EXISTS vector;
 
 -- files_blob (主テーブル - checksum が真の一意性)
+-- 本体は BLOB_STORE_DIR に checksum で置き blob_ref（例: local:<sha256>）だけを持つ。
+-- blob_data は BLOB_STORE_BACKEND=database の場合と移行前の行のみ
 CREATE TABLE files_blob (
     id          UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     checksum    TEXT UNIQUE NOT NULL,
-    blob_data   BYTEA NOT NULL,
-    stored_at   TIMESTAMPTZ DEFAULT NOW()
+    blob_data   BYTEA,
+    blob_ref    TEXT,
+    stored_at   TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT files_blob_has_content CHECK (blob_data IS NOT NULL OR blob_ref IS NOT NULL)
 );
 
 -- files_meta (1:1対応)
@@ -0,0 +1,177 @@
+"""
+スレッドセーフなDB接続プール
+db_simple から使用（接続関数を受け取るため psycopg2 には直接依存しない）
+"""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Tuple
+
+
+class PoolTimeout(TimeoutError):
+    """待ち時間内に空き接続を確保できなかった"""
+
+
+class ConnectionPool:
+    """
+    min_size〜max_size 本の接続を使い回すプール
+
+    - 空きが無く max_size に達している場合は timeout 秒まで返却を待つ
+    - 貸し出し時に切断済みの接続を捨て、health_check_interval 秒以上使っていない接続は
+      `SELECT 1` で生死を確認してから渡す（死んでいれば作り直す）
+    - 返却時は未コミットのトランザクションを破棄してから戻す（idle in transaction を残さない）
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        health_check_interval: float = 30.0
+    ):
+        if max_size < 1:
+            raise ValueError("max_size は1以上にしてください")
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle: Deque[Tuple[Any, float]] = deque()  # (接続, 最終使用時刻)
+        self._in_use: set = set()
+        self._size = 0  # 作成済みの接続数（貸出中＋待機中＋作成中）
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats: Dict[str, int] = {"created": 0, "reused": 0, "discarded": 0, "waits": 0, "timeouts": 0}
+
+        # 最小本数は先に接続しておく（最初の要求で接続待ちが出ないように）
+        for _ in range(self.min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+            self.stats["created"] += 1
+
+    # ──── 内部 ────
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_alive(self, conn, idle_for: float) -> bool:
+        if getattr(conn, "closed", 0):
+            return False
+        if idle_for < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn) -> None:
+        self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self.stats["discarded"] += 1
+            self._cond.notify()
+
+    # ──── 公開API ────
+
+    def getconn(self):
+        """接続を借りる（空きが無ければ timeout 秒まで待ち、それでも無ければ PoolTimeout）"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("接続プールは閉じられています")
+                if self._idle:
+                    conn, last_used = self._idle.pop()  # 直近に使った接続から（温まっている・生きている可能性が高い）
+                elif self._size < self.max_size:
+                    conn = None
+                    self._size += 1  # 作成中の分を先に確保（ロック外で接続するため）
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats["timeouts"] += 1
+                        raise PoolTimeout(f"DB接続の空き待ちがタイムアウトしました（{self.timeout}秒, 上限{self.max_size}本）")
+                    self.stats["waits"] += 1
+                    self._cond.wait(remaining)
+                    continue
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self.stats["created"] += 1
+                    self._in_use.add(id(conn))
+                return conn
+
+            if not self._is_alive(conn, time.monotonic() - last_used):
+                self._discard(conn)
+                continue
+            with self._cond:
+                self.stats["reused"] += 1
+                self._in_use.add(id(conn))
+            return conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """接続を返す（切断済み・ロールバックできない接続・discard=True は捨てる）"""
+        with self._cond:
+            self._in_use.discard(id(conn))
+        if not discard and not getattr(conn, "closed", 0):
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        if discard or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """with で接続を借り、抜けると返す"""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self) -> None:
+        """待機中の接続を閉じ、以降の貸し出しを止める（貸出中の接続は返却時に閉じる）"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def status(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "max_size": self.max_size,
+                **self.stats,
+            }
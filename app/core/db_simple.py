@@ -8,33 +8,139 @@ import psycopg2.extras
 from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 import os
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 from app.config import logger, config
+from app.core.db_pool import ConnectionPool
+from new.services.blob_store import get_blob_store, get_blob_store_for_ref
 
 # データベース接続URL（config.pyから取得）
 DATABASE_URL = config.DATABASE_URL
-logger.info(f"DB接続URL: {DATABASE_URL}")
+
+_pool: Optional[ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+_local = threading.local()  # transaction() 中の接続（スレッドごと）
+
+# 同じチェックサムの「本体の格納→行の挿入」と「参照確認→本体の削除」を直列化するロック（トランザクション終了で解放）
+BLOB_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext(%s))"
+
+def _masked_url(url: str) -> str:
+    """ログ用にパスワードを伏せた接続URL"""
+    parts = urlsplit(url)
+    if parts.password:
+        netloc = parts.netloc.replace(f":{parts.password}@", ":***@", 1)
+        return urlunsplit(parts._replace(netloc=netloc))
+    return url
+
+def _connect():
+    # 文のタイムアウトは接続時に設定（毎回 SET を送らない）
+    return psycopg2.connect(DATABASE_URL, options=f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}")
+
+def get_pool() -> ConnectionPool:
+    """
+    プロセス共通の接続プールを取得（初回に作成）
+    fork 後の子プロセスでは親の接続を共有しないよう作り直す
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ConnectionPool(
+                _connect,
+                min_size=config.DB_POOL_MIN_SIZE,
+                max_size=config.DB_POOL_MAX_SIZE,
+                timeout=config.DB_POOL_TIMEOUT,
+                health_check_interval=config.DB_POOL_HEALTH_CHECK_INTERVAL,
+            )
+            _pool_pid = pid
+            logger.info(
+                f"DB接続プール作成: {_masked_url(DATABASE_URL)} "
+                f"({config.DB_POOL_MIN_SIZE}〜{config.DB_POOL_MAX_SIZE}本, 文タイムアウト {config.DB_STATEMENT_TIMEOUT_MS}ms)"
+            )
+            _ensure_blob_schema(_pool)
+    return _pool
+
+def _ensure_blob_schema(pool: ConnectionPool) -> None:
+    """
+    作成済みのDBに外部BLOB参照の列（files_blob.blob_ref）を追加し、blob_data を NULL 許容にする
+    変更が必要な場合だけ ALTER する（毎回テーブルロックを取らない）
+    """
+    try:
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT column_name, is_nullable FROM information_schema.columns
+                    WHERE table_name = 'files_blob' AND column_name IN ('blob_ref', 'blob_data')
+                """)
+                columns = dict(cur.fetchall())
+                if not columns:
+                    return  # テーブル未作成
+                if "blob_ref" not in columns:
+                    cur.execute("ALTER TABLE files_blob ADD COLUMN IF NOT EXISTS blob_ref TEXT")
+                if columns.get("blob_data") == "NO":
+                    cur.execute("ALTER TABLE files_blob ALTER COLUMN blob_data DROP NOT NULL")
+            conn.commit()
+    except Exception as e:
+        logger.warning(f"files_blob の列確認に失敗: {e}")
+
+def close_pool() -> None:
+    """接続プールを閉じる（アプリ終了時）"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
 
 @contextmanager
 def get_db_connection():
     """
-    シンプルなDB接続コンテキストマネージャー
-    自動的に接続を開いて閉じる
+    DB接続コンテキストマネージャー
+    プールから接続を借り、抜けると返す（未コミットの変更は返却時に破棄）
+    transaction() の中ではそのトランザクションの接続を返す
     """
-    conn = None
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield conn
+        return
+    pool = get_pool()
+    conn = pool.getconn()
     try:
-        # デバッグ用に接続文字列を出力
-        logger.debug(f"接続先DB: {DATABASE_URL}")
-        conn = psycopg2.connect(DATABASE_URL)
         yield conn
     except Exception as e:
-        if conn:
-            conn.rollback()
-        logger.error(f"DB接続エラー: {e}")
-        logger.error(f"接続文字列: {DATABASE_URL}")
+        logger.error(f"DB処理エラー: {e}")
         raise
     finally:
-        if conn:
-            conn.close()
+        pool.putconn(conn)
+
+@contextmanager
+def transaction():
+    """
+    複数の文を1接続・1コミットにまとめるトランザクション
+    ブロック内の fetch_all / fetch_one / execute（およびそれを使う関数）は同じ接続で実行され、
+    正常終了でコミット、例外でロールバックする。入れ子にした場合は外側のトランザクションに合流する。
+
+    例:
+        with transaction():
+            if not insert_file_blob(...) or not insert_file_meta(...):
+                raise RuntimeError("保存に失敗しました")
+    """
+    if getattr(_local, "conn", None) is not None:
+        yield _local.conn
+        return
+    with get_db_connection() as conn:
+        _local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            _local.conn = None
 
 def fetch_all(query: str, params: tuple = None) -> List[Dict[str, Any]]:
     """
@@ -57,11 +163,14 @@ def fetch_one(query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
 def execute(query: str, params: tuple = None) -> int:
     """
     INSERT/UPDATE/DELETE文を実行
+    transaction() の中ではコミットせず、トランザクションの終了時にまとめてコミットする
     """
+    in_transaction = getattr(_local, "conn", None) is not None
     with get_db_connection() as conn:
         with conn.cursor() as cur:
             cur.execute(query, params)
-            conn.commit()
+            if not in_transaction:
+                conn.commit()
             return cur.rowcount
 
 def get_file_list(limit: int = 1000, offset: int = 0) -> Dict[str, Any]:
@@ -136,16 +245,19 @@ def get_file_list(limit: int = 1000, offset: int = 0) -> Dict[str, Any]:
             "offset": offset
         }
 
-def get_file_with_blob(file_id: str) -> Optional[Dict[str, Any]]:
+def get_file_with_blob(file_id: str, include_blob: bool = True) -> Optional[Dict[str, Any]]:
     """
     個別ファイル取得（blob含む）
+    外部格納先の本体は格納先から読む（DBドライバ経由で転送しない）。
+    include_blob=False ならメタ情報だけ（blob_data は None、blob_ref・blob_path で本体を参照できる）
     """
     try:
         query = """
             SELECT 
                 fb.id,
                 fb.checksum,
-                fb.blob_data,
+                CASE WHEN %s AND fb.blob_ref IS NULL THEN fb.blob_data END AS blob_data,
+                fb.blob_ref,
                 fb.stored_at,
                 fm.file_name,
                 fm.mime_type,
@@ -162,15 +274,21 @@ def get_file_with_blob(file_id: str) -> Optional[Dict[str, Any]]:
             WHERE fb.id = %s
         """
         
-        row = fetch_one(query, (file_id,))
+        row = fetch_one(query, (include_blob, file_id))
         
         if not row:
             return None
+        
+        blob_data = row['blob_data']
+        if include_blob and row['blob_ref']:
+            blob_data = _read_blob(row['blob_ref'])
             
         return {
             "file_id": str(row['id']),
             "checksum": row['checksum'],
-            "blob_data": row['blob_data'],
+            "blob_data": blob_data,
+            "blob_ref": row['blob_ref'],
+            "blob_path": get_blob_path(row['blob_ref']),
             "filename": row['file_name'] or "unknown",
             "file_size": row['size'] or 0,
             "content_type": row['mime_type'] or "application/octet-stream",
@@ -186,6 +304,23 @@ def get_file_with_blob(file_id: str) -> Optional[Dict[str, Any]]:
         logger.error(f"ファイル取得エラー（ID: {file_id}）: {e}")
         return None
 
+def get_file_sizes(file_ids: List[str]) -> Dict[str, int]:
+    """
+    複数ファイルのサイズをまとめて取得（blobは読まない）
+    """
+    try:
+        query = """
+            SELECT fb.id, COALESCE(fm.size, 0) as size
+            FROM files_blob fb
+            LEFT JOIN files_meta fm ON fb.id = fm.blob_id
+            WHERE fb.id::text = ANY(%s)
+        """
+        rows = fetch_all(query, (list(file_ids),))
+        return {str(row['id']): row['size'] for row in rows}
+    except Exception as e:
+        logger.error(f"ファイルサイズ取得エラー: {e}")
+        return {}
+
 def check_file_exists(checksum: str) -> Optional[str]:
     """
     チェックサムでファイルの存在確認
@@ -198,16 +333,53 @@ def check_file_exists(checksum: str) -> Optional[str]:
         logger.error(f"ファイル存在確認エラー: {e}")
         return None
 
-def insert_file_blob(file_id: str, checksum: str, blob_data: bytes) -> bool:
+def blob_store():
+    """設定の格納先（BLOB_STORE_BACKEND=database なら None）"""
+    return get_blob_store(config.BLOB_STORE_BACKEND, config.BLOB_STORE_DIR)
+
+def _read_blob(blob_ref: Optional[str]) -> Optional[bytes]:
+    if not blob_ref:
+        return None
+    return get_blob_store_for_ref(blob_ref, config.BLOB_STORE_DIR).read(blob_ref)
+
+def get_blob_path(blob_ref: Optional[str]) -> Optional[Path]:
+    """参照先がローカルファイルならそのパス（PDF配信・OCRでバイト列を経由せずに開ける）"""
+    if not blob_ref:
+        return None
+    try:
+        return get_blob_store_for_ref(blob_ref, config.BLOB_STORE_DIR).local_path(blob_ref)
+    except Exception as e:
+        logger.warning(f"BLOBパス取得エラー（{blob_ref}）: {e}")
+        return None
+
+def insert_file_blob(file_id: str, checksum: str, blob_data) -> bool:
     """
     ファイルBLOBデータを挿入
+    blob_data はバイト列・ファイルパス・読み出し可能なストリームのいずれか。
+    外部格納先が有効なら本体をそこに置き（checksum と照合）、行には参照だけを保存する。
+    行の挿入が失敗しても本体は残るが、同じ内容の再登録で再利用される（内容アドレスのため）。
     """
     try:
-        query = """
-            INSERT INTO files_blob (id, checksum, blob_data, stored_at)
-            VALUES (%s, %s, %s, NOW())
-        """
-        execute(query, (file_id, checksum, blob_data))
+        store = blob_store()
+        if store is not None:
+            # 同じ内容の削除（行の削除→本体の削除）と交差しないよう、挿入のコミットまでチェックサムをロック
+            with transaction():
+                fetch_one(BLOB_LOCK_SQL, (checksum,))
+                blob_ref = store.put(blob_data, checksum)
+                query = """
+                    INSERT INTO files_blob (id, checksum, blob_ref, stored_at)
+                    VALUES (%s, %s, %s, NOW())
+                """
+                execute(query, (file_id, checksum, blob_ref))
+        else:
+            if not isinstance(blob_data, (bytes, bytearray, memoryview)):
+                with (open(blob_data, "rb") if isinstance(blob_data, (str, os.PathLike)) else blob_data) as f:
+                    blob_data = f.read()
+            query = """
+                INSERT INTO files_blob (id, checksum, blob_data, stored_at)
+                VALUES (%s, %s, %s, NOW())
+            """
+            execute(query, (file_id, checksum, blob_data))
         return True
     except Exception as e:
         logger.error(f"ファイルBLOB挿入エラー: {e}")
@@ -252,13 +424,35 @@ def delete_file(file_id: str) -> bool:
     ファイル削除（CASCADE削除でFiles4兄弟すべて削除）
     """
     try:
-        query = "DELETE FROM files_blob WHERE id = %s"
-        rows_affected = execute(query, (file_id,))
-        return rows_affected > 0
+        in_transaction = getattr(_local, "conn", None) is not None
+        with transaction():
+            row = fetch_one("DELETE FROM files_blob WHERE id = %s RETURNING blob_ref", (file_id,))
+        if row is None:
+            return False
+        # 行の削除が確定してから本体を消す。外側のトランザクション中はロールバックされ得るため本体は残す
+        if row['blob_ref'] and not in_transaction:
+            _delete_unreferenced_blob(row['blob_ref'])
+        return True
     except Exception as e:
         logger.error(f"ファイル削除エラー: {e}")
         return False
 
+def _delete_unreferenced_blob(blob_ref: str) -> None:
+    """
+    どの行からも参照されていない本体を消す
+    行の削除と本体の削除の間に同じ内容が再登録されると、その行が消える本体を参照してしまうため、
+    insert_file_blob と同じチェックサムのロックを取ってから参照の有無を確かめる。
+    """
+    try:
+        store = get_blob_store_for_ref(blob_ref, config.BLOB_STORE_DIR)
+        checksum = store.key(blob_ref)
+        with transaction():
+            fetch_one(BLOB_LOCK_SQL, (checksum,))
+            if fetch_one("SELECT 1 FROM files_blob WHERE checksum = %s LIMIT 1", (checksum,)) is None:
+                store.delete(blob_ref)
+    except Exception as e:
+        logger.warning(f"BLOB本体の削除に失敗（{blob_ref}）: {e}")
+
 def get_files_for_export(user_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     エクスポート用のファイルリスト取得（blobは除く）
@@ -283,18 +283,16 @@ class LargePDFPreviewV3(ft.Container):
 
     async def _fetch_blob_data(self, file_info: Dict[str, Any]) -> bytes:
         """DBからblob_data取得"""
-        from app.core.db_simple import fetch_one
+        from app.core.db_simple import get_file_with_blob
         
         blob_id = file_info.get('blob_id', file_info.get('id'))
         if not blob_id:
             raise ValueError("blob_idが見つかりません")
         
-        result = fetch_one(
-            "SELECT blob_data FROM files_blob WHERE id = %s",
-            (blob_id,)
-        )
+        # blob_ref があれば格納先から読む
+        result = get_file_with_blob(blob_id)
         
-        if not result or 'blob_data' not in result:
+        if not result or not result.get('blob_data'):
             raise ValueError(f"PDFデータが見つかりません: blob_id={blob_id}")
         
         return result['blob_data']
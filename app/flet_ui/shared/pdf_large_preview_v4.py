@@ -50,7 +50,7 @@ from typing import Dict, Any, Optional, List, Literal
 from enum import Enum
 import time
 
-from .pdf_stream_server_v4 import PDFStreamManagerV4, serve_pdf_from_bytes_v4
+from .pdf_stream_server_v4 import PDFStreamManagerV4, serve_pdf_from_bytes_v4, serve_pdf_from_path_v4
 
 logger = logging.getLogger(__name__)
 
@@ -436,8 +436,8 @@ class PDFImagePreviewV4(ft.Container):
         except Exception as e:
             logger.error(f"[V4-UI] UI update error: {e}")
 
-    async def load_pdf(self, file_info: Dict[str, Any], blob_data: bytes):
-        """PDF読み込み・表示開始"""
+    async def load_pdf(self, file_info: Dict[str, Any], blob_data: Optional[bytes] = None):
+        """PDF読み込み・表示開始（file_info に blob_path があれば格納先のファイルをコピーせずに配信）"""
         try:
             self._set_state(PreviewState.LOADING)
             
@@ -445,11 +445,17 @@ class PDFImagePreviewV4(ft.Container):
             file_id = file_info.get("id", str(uuid.uuid4()))
             self._file_id = file_id
             
-            pdf_url, server = await serve_pdf_from_bytes_v4(blob_data, file_id)
+            blob_path = file_info.get("blob_path")
+            if blob_path:
+                pdf_url, server = await serve_pdf_from_path_v4(blob_path, file_id)
+                logger.info(f"[V4-UI] PDF registered: {file_id} ({blob_path})")
+            elif blob_data is not None:
+                pdf_url, server = await serve_pdf_from_bytes_v4(blob_data, file_id)
+                logger.info(f"[V4-UI] PDF registered: {file_id} ({len(blob_data)} bytes)")
+            else:
+                raise ValueError("PDFデータがありません（blob_path または blob_data が必要です）")
             self._server = server
             
-            logger.info(f"[V4-UI] PDF registered: {file_id} ({len(blob_data)} bytes)")
-            
             # PDF情報取得
             self._set_state(PreviewState.ANALYZING)
             
@@ -446,6 +446,40 @@ class PDFStreamServerV4:
         future = asyncio.run_coroutine_threadsafe(_register(), self._loop)
         return future.result(timeout=10)
 
+    async def register_pdf_path_async(self, file_id: str, source_path: str) -> str:
+        """既存のPDFファイルを登録（非同期版・コピーせずに配信、BLOB格納先のファイル用）"""
+        if self.actual_port is None or self._loop is None:
+            raise RuntimeError("Server not started")
+
+        async def _register():
+            # temp_dir 内に拡張子付きのリンクを張る（解除・終了時に消えるのはリンクだけ）
+            link_path = os.path.join(self.temp_dir, f"{file_id}.pdf")
+            try:
+                if os.path.lexists(link_path):
+                    os.remove(link_path)
+                os.symlink(os.path.abspath(source_path), link_path)
+                path = link_path
+            except OSError:
+                path = os.path.abspath(source_path)
+            self.pdf_files[file_id] = path
+            
+            pdf_url = f"http://{self.public_host}:{self.actual_port}/pdf/{file_id}"
+            logger.info(f"[V4-Server] PDF registered: {file_id} -> {pdf_url} ({source_path})")
+            return pdf_url
+
+        if self._loop == asyncio.get_running_loop():
+            return await _register()
+        else:
+            return await asyncio.run_coroutine_threadsafe(_register(), self._loop).result(timeout=10)
+
+    def register_pdf_path_sync(self, file_id: str, source_path: str) -> str:
+        """既存のPDFファイルを登録（同期版）"""
+        if self.actual_port is None or self._loop is None:
+            raise RuntimeError("Server not started")
+
+        future = asyncio.run_coroutine_threadsafe(self.register_pdf_path_async(file_id, source_path), self._loop)
+        return future.result(timeout=10)
+
     def _write_temp_file(self, path: str, data: bytes):
         """一時ファイル書き込み（同期処理）"""
         with open(path, "wb") as f:
@@ -458,7 +492,10 @@ class PDFStreamServerV4:
 
         async def _unregister():
             temp_path = self.pdf_files.pop(file_id, None)
-            if temp_path and os.path.exists(temp_path):
+            # temp_dir 外（リンクを張れずに直接登録したファイル）は削除しない
+            if temp_path and os.path.dirname(temp_path) != self.temp_dir:
+                return
+            if temp_path and os.path.lexists(temp_path):
                 try:
                     os.remove(temp_path)
                     logger.info(f"[V4-Server] PDF unregistered: {file_id}")
@@ -631,6 +668,18 @@ async def serve_pdf_from_bytes_v4(pdf_data: bytes, file_id: Optional[str] = None
     
     return pdf_url, server
 
+async def serve_pdf_from_path_v4(pdf_path: str, file_id: Optional[str] = None) -> Tuple[str, PDFStreamServerV4]:
+    """PDFファイルから配信URL作成 (V4版・コピーなし)"""
+    import uuid
+    
+    if file_id is None:
+        file_id = str(uuid.uuid4())
+
+    server = PDFStreamManagerV4.get_instance_sync()
+    pdf_url = server.register_pdf_path_sync(file_id, pdf_path)
+    
+    return pdf_url, server
+
 def create_v4_server(host: str = DEFAULT_BIND_HOST, port: int = DEFAULT_PORT, public_host: Optional[str] = None) -> PDFStreamServerV4:
     """V4サーバー作成（テスト用）"""
     return PDFStreamServerV4(host, port, public_host)
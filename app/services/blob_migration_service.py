@@ -0,0 +1,148 @@
+"""
+BLOB移行サービス - files_blob.blob_data（BYTEA）の本体を外部格納先へ移す
+1行ずつ読み出して格納先に書き、blob_ref を設定して blob_data を NULL にする（稼働中でも実行可能）
+
+    python -m app.services.blob_migration_service            # 残りがなくなるまで移行
+    python -m app.services.blob_migration_service --limit 100
+
+移行で空いた領域は VACUUM（完全に返すには VACUUM FULL files_blob）まで再利用されない。
+"""
+
+import argparse
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.core.db_simple import BLOB_LOCK_SQL, fetch_all, fetch_one, execute, blob_store, transaction
+from app.config import config, logger
+from new.services.blob_store import BlobChecksumError, BlobStore
+
+
+class BlobMigrationService:
+    """BYTEA に残っている本体を batch_size 行ずつ格納先へ移す（バッチ間は interval 秒待って負荷を抑える）"""
+
+    def __init__(self, store: Optional[BlobStore] = None, batch_size: Optional[int] = None,
+                 interval: Optional[float] = None):
+        self.store = store or blob_store()
+        if self.store is None:
+            raise RuntimeError("BLOB_STORE_BACKEND=database のため移行先がありません")
+        self.batch_size = batch_size or config.BLOB_MIGRATION_BATCH_SIZE
+        self.interval = config.BLOB_MIGRATION_INTERVAL if interval is None else interval
+        self.migrated = 0
+        self.migrated_bytes = 0
+        self.failed: List[str] = []  # チェックサム不一致など移せなかった行（再試行しない）
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def remaining(self) -> int:
+        row = fetch_one("SELECT COUNT(*) AS count FROM files_blob WHERE blob_ref IS NULL AND blob_data IS NOT NULL")
+        return row['count'] if row else 0
+
+    def _migrate_one(self, file_id: str) -> bool:
+        # 本体は1行ずつ読む（バッチ全体をメモリに載せない）
+        row = fetch_one(
+            "SELECT checksum, blob_data FROM files_blob WHERE id = %s AND blob_ref IS NULL AND blob_data IS NOT NULL",
+            (file_id,)
+        )
+        if not row:
+            return False  # 他のプロセスが移行済み
+        data = bytes(row['blob_data'])
+        # 同じ内容の本体削除と交差しないよう、参照の切り替えまでチェックサムをロック
+        with transaction():
+            fetch_one(BLOB_LOCK_SQL, (row['checksum'],))
+            try:
+                blob_ref = self.store.put(data, row['checksum'])
+            except BlobChecksumError as e:
+                logger.error(f"BLOB移行スキップ（{file_id}）: {e}")
+                self.failed.append(file_id)
+                return False
+
+            # 移行中に別の処理が書き換えていなければ参照に切り替える
+            updated = execute(
+                "UPDATE files_blob SET blob_ref = %s, blob_data = NULL WHERE id = %s AND blob_ref IS NULL",
+                (blob_ref, file_id)
+            )
+        if updated:
+            self.migrated += 1
+            self.migrated_bytes += len(data)
+        return bool(updated)
+
+    def migrate_batch(self) -> int:
+        """1バッチ分を移行して処理した行数を返す（0 なら残りなし）"""
+        rows = fetch_all(
+            """
+                SELECT id FROM files_blob
+                WHERE blob_ref IS NULL AND blob_data IS NOT NULL AND NOT (id::text = ANY(%s))
+                ORDER BY stored_at
+                LIMIT %s
+            """,
+            (self.failed, self.batch_size)
+        )
+        for row in rows:
+            if self._stop.is_set():
+                break
+            self._migrate_one(str(row['id']))
+        return len(rows)
+
+    def run(self, limit: Optional[int] = None) -> int:
+        """残りがなくなるか stop() されるまで移行して移した行数を返す（limit 行で打ち切り）"""
+        start = self.migrated
+        while not self._stop.is_set():
+            if limit is not None and self.migrated - start >= limit:
+                break
+            if self.migrate_batch() == 0:
+                break
+            logger.info(f"BLOB移行: {self.migrated}件 ({self.migrated_bytes / 1024 / 1024:.1f}MB)")
+            self._stop.wait(self.interval)
+        return self.migrated - start
+
+    def start(self) -> None:
+        """バックグラウンドで移行を開始"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_safely, name="blob-migration", daemon=True)
+        self._thread.start()
+
+    def _run_safely(self) -> None:
+        try:
+            migrated = self.run()
+            logger.info(f"BLOB移行完了: {migrated}件, スキップ {len(self.failed)}件（領域の回収には VACUUM が必要）")
+        except Exception as e:
+            logger.error(f"BLOB移行エラー: {e}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """移行を止める（処理中の1行を終えてから止まる）"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "migrated": self.migrated,
+            "migrated_bytes": self.migrated_bytes,
+            "failed": list(self.failed),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="files_blob.blob_data の本体を外部格納先へ移行")
+    parser.add_argument("--batch-size", type=int, default=None, help="1バッチの行数")
+    parser.add_argument("--interval", type=float, default=None, help="バッチ間の待ち時間（秒）")
+    parser.add_argument("--limit", type=int, default=None, help="移行する最大行数")
+    args = parser.parse_args()
+
+    service = BlobMigrationService(batch_size=args.batch_size, interval=args.interval)
+    print(f"移行対象: {service.remaining()}件 → {config.BLOB_STORE_BACKEND} ({config.BLOB_STORE_DIR})")
+    try:
+        service.run(limit=args.limit)
+    except KeyboardInterrupt:
+        service.stop()
+    print(f"移行: {service.migrated}件 ({service.migrated_bytes / 1024 / 1024:.1f}MB), スキップ: {len(service.failed)}件")
+    if service.migrated:
+        print("空いた領域を回収するには VACUUM files_blob（OSに返すには VACUUM FULL files_blob）を実行してください")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,10 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 from app.config import config, logger
 from app.services.embedding.searcher import search_similar_chunks
+from app.services.llm.llm_utils import estimate_tokens
 from app.services.llm.prompt_loader import get_chat_prompt
+from new.utils.context_packer import ContextChunk, pack_context
+from new.services.llm.scheduler import INTERACTIVE, get_llm_scheduler
 
 class ChatService:
     """チャット・検索サービス"""
@@ -28,6 +31,7 @@ class ChatService:
         self.embedding_options = config.EMBEDDING_OPTIONS
         self.default_embedding = config.DEFAULT_EMBEDDING_OPTION
         self.chat_history: List[Dict[str, Any]] = []
+        self.last_context_stats: Optional[Dict[str, Any]] = None
     
     async def search_documents(
         self,
@@ -139,13 +143,14 @@ class ChatService:
             if not system_prompt:
                 system_prompt = get_chat_prompt()
             
-            # コンテキスト構築
+            # コンテキスト構築（重複を除いてトークン予算内に詰める）
             context = ""
+            self.last_context_stats = None
             if search_results:
-                context = "\n\n関連文書:\n"
-                for idx, result in enumerate(search_results[:5], 1):  # 上位5件まで
-                    context += f"\n[文書{idx}] {result.get('filename', 'Unknown')}\n"
-                    context += f"{result.get('content', '')[:500]}...\n"
+                packed = self.build_context(search_results)
+                self.last_context_stats = packed.to_dict()
+                if packed.text:
+                    context = f"\n\n関連文書:\n\n{packed.text}"
             
             # プロンプト構築
             full_prompt = system_prompt
@@ -165,25 +170,63 @@ class ChatService:
                 HumanMessage(content=message)
             ]
             
-            # ストリーミング応答生成
+            # ストリーミング応答生成（共有スケジューラの対話枠で、取り込み中のバッチ整形より先に実行）
             full_response = ""
-            async for chunk in llm.astream(messages):
-                content = chunk.content
-                if content:
-                    full_response += content
-                    yield content
+            async with get_llm_scheduler().slot(config.OLLAMA_MODEL, INTERACTIVE):
+                async for chunk in llm.astream(messages):
+                    content = chunk.content
+                    if content:
+                        full_response += content
+                        yield content
             
             # チャット履歴に応答を追加
             self.chat_history.append({
                 "role": "assistant",
                 "content": full_response,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.utcnow().isoformat(),
+                "context": self.last_context_stats
             })
             
         except Exception as e:
             logger.error(f"チャット応答エラー: {e}")
             yield f"エラーが発生しました: {str(e)}"
     
+    def build_context(
+        self,
+        search_results: List[Dict[str, Any]],
+        budget_tokens: int = None
+    ):
+        """
+        検索結果からRAGコンテキストを構築
+        
+        同一ファイルの隣接・重なりチャンクを結合し、ほぼ同一の文章を除いて
+        estimate_tokens で数えたトークン数が予算以内になるまでスコア順に詰める。
+        
+        Args:
+            search_results: 検索結果
+            budget_tokens: 最大トークン数（省略時は RAG_CONTEXT_TOKENS）
+            
+        Returns:
+            PackedContext（text と節約トークン数等の統計）
+        """
+        chunks = [
+            ContextChunk(
+                text=result.get("content") or result.get("chunk_text") or "",
+                score=result.get("score", 0.0),
+                label=result.get("filename", "Unknown"),
+                file_id=result.get("file_id"),
+                chunk_index=result.get("chunk_index")
+            )
+            for result in search_results
+        ]
+        packed = pack_context(chunks, budget_tokens or config.RAG_CONTEXT_TOKENS, count_tokens=estimate_tokens)
+        logger.info(
+            f"RAGコンテキスト: {len(packed.passages)}文章 {packed.tokens}/{packed.budget}トークン "
+            f"(検索結果{len(chunks)}件 {packed.input_tokens}トークン, 節約{packed.saved_tokens}トークン, "
+            f"結合{packed.merged}件, 重複除外{packed.duplicates}件)"
+        )
+        return packed
+    
     async def get_chat_response(
         self,
         message: str,
@@ -205,7 +248,7 @@ class ChatService:
         
         if use_rag:
             # RAG検索実行
-            search_results = await self.search_documents(message)
+            search_results = await self.search_documents(message, limit=config.RAG_CONTEXT_CANDIDATES)
         
         # 応答生成
         response_parts = []
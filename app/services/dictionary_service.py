@@ -8,6 +8,9 @@ import os
 from typing import List, Dict, Optional
 from pathlib import Path
 
+from app.config import logger
+from new.utils.dictionary_artifact import KNOWN_WORD_FILES, MISTAKES_FILE, compile_dictionary_artifact
+
 
 class DictionaryService:
     """辞書ファイルの操作を管理するサービス"""
@@ -74,6 +77,14 @@ class DictionaryService:
                 f.write(content)
         except Exception as e:
             raise Exception(f"辞書ファイル保存エラー: {e}")
+        
+        # 補正用辞書はコンパイル済みアーティファクトを再生成（各プロセスは更新を検知して読み直す）
+        # 生成に失敗しても保存は有効（古いアーティファクトは使われず、各プロセスはCSVを直接解析する）
+        if self.dict_files[dict_type] in (*KNOWN_WORD_FILES, MISTAKES_FILE):
+            try:
+                compile_dictionary_artifact(self.dict_base_path)
+            except Exception as e:
+                logger.warning(f"辞書アーティファクト生成エラー（CSVは保存済み）: {e}")
     
     def get_dictionary_title(self, dict_type: str) -> str:
         """
@@ -17,7 +17,8 @@ from app.core.db_simple import (
     insert_file_meta,
     insert_file_text,
     delete_file,
-    get_files_for_export
+    get_files_for_export,
+    transaction
 )
 from app.services.upload_log_service import upload_log_service
 
@@ -95,7 +96,7 @@ class FileService:
             existing_id = check_file_exists(checksum)
             if existing_id:
                 # 既存ファイル情報を取得して詳細を付与
-                existing_info = get_file_with_blob(existing_id)
+                existing_info = get_file_with_blob(existing_id, include_blob=False)
                 # ログ更新（重複）
                 if log_id:
                     upload_log_service.update_log(
@@ -119,33 +120,24 @@ class FileService:
             # 新規ファイルとして保存
             file_id = str(uuid.uuid4())
             
-            # DB保存
-            if not insert_file_blob(file_id, checksum, file_content):
-                if log_id:
-                    upload_log_service.update_log(
-                        log_id,
-                        status="failed",
-                        progress=0,
-                        message="ファイルBLOBの保存に失敗しました"
-                    )
-                return {
-                    "status": "error",
-                    "message": "ファイルBLOBの保存に失敗しました"
-                }
-            
-            if not insert_file_meta(file_id, filename, content_type or "application/octet-stream", file_size):
-                # ロールバック的な処理
-                delete_file(file_id)
+            # DB保存（BLOBとメタデータは1トランザクションで、どちらかが失敗すれば両方取り消す）
+            try:
+                with transaction():
+                    if not insert_file_blob(file_id, checksum, file_content):
+                        raise RuntimeError("ファイルBLOBの保存に失敗しました")
+                    if not insert_file_meta(file_id, filename, content_type or "application/octet-stream", file_size):
+                        raise RuntimeError("ファイルメタデータの保存に失敗しました")
+            except Exception as e:
                 if log_id:
                     upload_log_service.update_log(
                         log_id,
                         status="failed",
                         progress=0,
-                        message="ファイルメタデータの保存に失敗しました"
+                        message=str(e)
                     )
                 return {
                     "status": "error",
-                    "message": "ファイルメタデータの保存に失敗しました"
+                    "message": str(e)
                 }
             
             logger.info(f"ファイルアップロード成功: {filename} (ID: {file_id})")
@@ -9,7 +9,9 @@ from .chunker import TextChunker, get_text_chunker
 from .scorer import TextScorer, get_text_scorer
 from .llm_utils import (
     detect_language,
+    detect_languages,
     estimate_tokens,
+    estimate_tokens_batch,
     truncate_text,
     normalize_whitespace,
     extract_keywords
@@ -33,7 +35,9 @@ __all__ = [
     'get_text_scorer',
     # ユーティリティ関数
     'detect_language',
+    'detect_languages',
     'estimate_tokens',
+    'estimate_tokens_batch',
     'truncate_text',
     'normalize_whitespace',
     'extract_keywords'
@@ -7,6 +7,7 @@ import textwrap
 from typing import List, Optional, Dict, Any
 
 from app.config import config, logger
+from new.utils.text_normalizer import normalize_newlines
 
 class TextChunker:
     """テキストチャンク分割サービス"""
@@ -26,7 +27,7 @@ class TextChunker:
     
     def _normalize(self, text: str) -> str:
         """前後の空白を削除し、改行を \n に統一"""
-        return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+        return normalize_newlines(text)
     
     def split_into_chunks(
         self,
@@ -7,6 +7,8 @@ import re
 from typing import Optional
 
 from app.config import logger
+from new.utils.char_stats import CharStats, char_stats, char_stats_batch
+from new.utils.text_normalizer import normalize_whitespace as _normalize_whitespace
 
 def detect_language(text: str, force_lang: Optional[str] = None) -> str:
     """
@@ -25,19 +27,13 @@ def detect_language(text: str, force_lang: Optional[str] = None) -> str:
     if not text:
         return "ja"  # デフォルト
     
-    # 日本語文字のパターン
-    japanese_pattern = re.compile(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]')
-    # 英字のパターン
-    english_pattern = re.compile(r'[a-zA-Z]')
-    
-    # 各言語の文字数をカウント
-    ja_count = len(japanese_pattern.findall(text))
-    en_count = len(english_pattern.findall(text))
-    
+    return _detect_language(char_stats(text))
+
+def _detect_language(stats: CharStats) -> str:
+    """集計済みの文字種から言語を判定"""
     # テキスト全体に対する割合で判定
-    text_len = len(text)
-    ja_ratio = ja_count / text_len if text_len > 0 else 0
-    en_ratio = en_count / text_len if text_len > 0 else 0
+    ja_ratio = stats.japanese / stats.length
+    en_ratio = stats.latin / stats.length
     
     # 日本語が10%以上含まれていれば日本語と判定
     if ja_ratio > 0.1:
@@ -70,20 +66,57 @@ def estimate_tokens(text: str, lang: Optional[str] = None) -> int:
     if not text:
         return 0
     
+    stats = char_stats(text)
     if lang is None:
-        lang = detect_language(text)
-    
+        lang = _detect_language(stats)
+    return _estimate_tokens(stats, lang)
+
+def _estimate_tokens(stats: CharStats, lang: str) -> int:
+    """集計済みの文字種からトークン数を推定"""
     # 言語別の推定係数
     if lang == "ja":
         # 日本語: 1文字 ≈ 1.6トークン
-        return int(len(text) * 1.6)
+        return int(stats.length * 1.6)
     elif lang == "en":
         # 英語: 1単語 ≈ 1.3トークン
-        words = text.split()
-        return int(len(words) * 1.3)
+        return int(stats.words * 1.3)
     else:
         # その他: 文字数ベース
-        return int(len(text) * 1.5)
+        return int(stats.length * 1.5)
+
+def detect_languages(texts: list[str], force_lang: Optional[str] = None) -> list[str]:
+    """
+    複数テキストの言語を一括判定
+    
+    Args:
+        texts: 判定対象テキストのリスト
+        force_lang: 強制言語指定
+        
+    Returns:
+        言語コードのリスト（texts と同順）
+    """
+    if force_lang:
+        return [force_lang] * len(texts)
+    return [
+        _detect_language(stats) if stats.length else "ja"
+        for stats in char_stats_batch(texts)
+    ]
+
+def estimate_tokens_batch(texts: list[str], lang: Optional[str] = None) -> list[int]:
+    """
+    複数テキストのトークン数を一括推定
+    
+    Args:
+        texts: 対象テキストのリスト
+        lang: 言語コード（省略時はテキストごとに自動判定）
+        
+    Returns:
+        推定トークン数のリスト（texts と同順）
+    """
+    return [
+        _estimate_tokens(stats, lang or _detect_language(stats)) if stats.length else 0
+        for stats in char_stats_batch(texts)
+    ]
 
 def truncate_text(
     text: str,
@@ -121,24 +154,8 @@ def normalize_whitespace(text: str) -> str:
     Returns:
         正規化されたテキスト
     """
-    # 全角スペースを半角に統一
-    text = text.replace('　', ' ')
-    
-    # タブを空白に変換
-    text = text.replace('\t', ' ')
-    
-    # 連続する空白を1つに圧縮
-    text = re.sub(r' {2,}', ' ', text)
-    
-    # 連続する改行を最大2つに圧縮
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    
-    # 行頭行末の空白を削除
-    lines = text.split('\n')
-    lines = [line.strip() for line in lines]
-    text = '\n'.join(lines)
-    
-    return text.strip()
+    # 全角スペース・タブ→半角、連続空白を1つに、連続改行を最大2つに、行頭行末の空白を削除
+    return _normalize_whitespace(text)
 
 def extract_keywords(
     text: str,
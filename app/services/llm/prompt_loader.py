@@ -5,10 +5,69 @@
 
 import os
 import re
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 
 from app.config import config, logger
+from new.services.llm.prompt_registry import CompiledPrompt, get_prompt_registry
+
+_CHAT_SECTION = re.compile(r'<(\w+)>(.*?)</\1>', re.DOTALL)
+
+
+def _extract_lang_section(content: str, lang: str) -> Optional[str]:
+    """
+    "#lang=lang" セクションを抽出し、次の "#lang=" またはファイル末尾までの範囲を返却する
+    （コメント行・ラベル行を除き、連続空行は1行に圧縮）
+    """
+    marker = f"#lang={lang}"
+    start = content.find(marker)
+    if start < 0:
+        return None
+    
+    # マーカー直後から次の #lang= までを抜き出し
+    sub = content[start + len(marker):]
+    end = sub.find("#lang=")
+    section = sub if end < 0 else sub[:end]
+    
+    # 行ごとにフィルタリング
+    cleaned = []
+    for ln in section.splitlines():
+        # 空行はそのまま１行だけ残す
+        if not ln.strip():
+            if not cleaned or cleaned[-1].strip():
+                cleaned.append("")
+            continue
+        # # で始まるコメント行はスキップ
+        if ln.lstrip().startswith("#"):
+            continue
+        # "ja:" や "en:" ラベルだけの行はスキップ
+        if ln.strip().lower() == f"{lang}:":
+            continue
+        cleaned.append(ln)
+    
+    # 重複する先頭空行を削除
+    while cleaned and not cleaned[0].strip():
+        cleaned.pop(0)
+    # 重複する末尾空行を削除
+    while cleaned and not cleaned[-1].strip():
+        cleaned.pop()
+    
+    return "\n".join(cleaned)
+
+
+def parse_refine_prompts(content: str) -> Dict[str, str]:
+    """refine_prompt_multi.txt の全 "#lang=" セクション"""
+    keys = [line[len("#lang="):].strip() for line in content.splitlines() if line.startswith("#lang=")]
+    return {key: _extract_lang_section(content, key) for key in dict.fromkeys(keys)}
+
+
+def parse_chat_prompts(content: str) -> Dict[str, str]:
+    """chat_prompts.txt の全 <section>...</section>（同名は最初のもの）"""
+    sections: Dict[str, str] = {}
+    for name, body in _CHAT_SECTION.findall(content):
+        sections.setdefault(name, body.strip())
+    return sections
+
 
 class PromptLoader:
     """プロンプト管理サービス"""
@@ -27,9 +86,9 @@ class PromptLoader:
         self.refine_prompt_file = self.prompt_dir / "refine_prompt_multi.txt"
         self.chat_prompt_file = self.prompt_dir / "chat_prompts.txt"
         
-        # キャッシュ
-        self._prompt_cache = {}
-        self._chat_prompt_cache = {}
+        # 解析済みテンプレート（プロセス共通・ファイル更新時に再読み込み）
+        self.registry = get_prompt_registry()
+        self._missing = set()  # 警告済みの言語
     
     def get_prompt_by_lang(self, lang: str = "ja") -> str:
         """
@@ -42,88 +101,38 @@ class PromptLoader:
         Returns:
             プロンプトテンプレート文字列
         """
-        # キャッシュチェック
-        cache_key = f"refine_{lang}"
-        if cache_key in self._prompt_cache:
-            return self._prompt_cache[cache_key]
-        
-        if not self.refine_prompt_file.exists():
-            logger.warning(
-                f"プロンプトファイルが見つかりません: {self.refine_prompt_file}"
-            )
-            return self._get_default_prompt(lang)
-        
-        try:
-            content = self.refine_prompt_file.read_text(encoding="utf-8")
-            marker = f"#lang={lang}"
-            start = content.find(marker)
-            
-            if start < 0:
+        template = self.get_refine_template(lang)
+        return template.source if template is not None else self._get_default_prompt(lang)
+    
+    def get_refine_template(self, lang: str = "ja") -> Optional[CompiledPrompt]:
+        """整形プロンプトのコンパイル済みテンプレート（ファイル・言語セクションが無ければ None）"""
+        template = self.registry.get(self.refine_prompt_file, parse_refine_prompts, lang)
+        if template is None and lang not in self._missing:
+            self._missing.add(lang)
+            if not self.refine_prompt_file.exists():
+                logger.warning(
+                    f"プロンプトファイルが見つかりません: {self.refine_prompt_file}"
+                )
+            else:
                 logger.warning(
                     f"{lang} 用プロンプトが見つかりません: "
                     f"{self.refine_prompt_file}"
                 )
-                return self._get_default_prompt(lang)
-            
-            # マーカー直後から次の #lang= までを抜き出し
-            sub = content[start + len(marker):]
-            end = sub.find("#lang=")
-            section = sub if end < 0 else sub[:end]
-            
-            # 行ごとにフィルタリング
-            lines = section.splitlines()
-            cleaned = []
-            
-            for ln in lines:
-                # 空行はそのまま１行だけ残す
-                if not ln.strip():
-                    if not cleaned or cleaned[-1].strip():
-                        cleaned.append("")
-                    continue
-                # # で始まるコメント行はスキップ
-                if ln.lstrip().startswith("#"):
-                    continue
-                # "ja:" や "en:" ラベルだけの行はスキップ
-                if ln.strip().lower() == f"{lang}:":
-                    continue
-                cleaned.append(ln)
-            
-            # 重複する先頭空行を削除
-            while cleaned and not cleaned[0].strip():
-                cleaned.pop(0)
-            # 重複する末尾空行を削除
-            while cleaned and not cleaned[-1].strip():
-                cleaned.pop()
-            
-            prompt = "\n".join(cleaned)
-            
-            # キャッシュに保存
-            self._prompt_cache[cache_key] = prompt
-            
-            return prompt
-            
-        except Exception as e:
-            logger.error(f"プロンプトファイル読み込みエラー: {e}")
-            return self._get_default_prompt(lang)
+        return template
+    
+    def render_prompt(self, lang: str, text: str) -> str:
+        """整形プロンプトの {TEXT} にテキストを差し込む"""
+        template = self.get_refine_template(lang)
+        if template is None:
+            return self._get_default_prompt(lang).replace("{TEXT}", text)
+        return template.render(TEXT=text)
     
     def list_prompt_keys(self) -> List[str]:
         """
         refine_prompt_multi.txt 内の "#lang=キー" を抽出して
         利用可能な言語キー一覧を返却する
         """
-        if not self.refine_prompt_file.exists():
-            return []
-        
-        keys: List[str] = []
-        try:
-            with open(self.refine_prompt_file, encoding="utf-8") as f:
-                for line in f:
-                    if line.startswith("#lang="):
-                        keys.append(line[len("#lang="):].strip())
-            return keys
-        except Exception as e:
-            logger.error(f"プロンプトキー取得エラー: {e}")
-            return []
+        return list(self.registry.sections(self.refine_prompt_file, parse_refine_prompts))
     
     def get_chat_prompt(self, section: str) -> str:
         """
@@ -136,57 +145,24 @@ class PromptLoader:
         Returns:
             プロンプト文字列
         """
-        # キャッシュチェック
-        cache_key = f"chat_{section}"
-        if cache_key in self._chat_prompt_cache:
-            return self._chat_prompt_cache[cache_key]
+        template = self.registry.get(self.chat_prompt_file, parse_chat_prompts, section)
+        if template is not None:
+            return template.source
         
         if not self.chat_prompt_file.exists():
             logger.warning(
                 f"チャットプロンプトファイルが見つかりません: "
                 f"{self.chat_prompt_file}"
             )
-            return ""
-        
-        try:
-            with open(self.chat_prompt_file, encoding="utf-8") as f:
-                content = f.read()
-            
-            # <section>...</section> 形式のセクションを抽出
-            pattern = f"<{section}>(.*?)</{section}>"
-            match = re.search(pattern, content, re.DOTALL)
-            
-            if match:
-                prompt = match.group(1).strip()
-                # キャッシュに保存
-                self._chat_prompt_cache[cache_key] = prompt
-                return prompt
-            else:
-                logger.warning(f"セクション '{section}' が見つかりません")
-                return ""
-                
-        except Exception as e:
-            logger.error(f"チャットプロンプト読み込みエラー: {e}")
-            return ""
+        else:
+            logger.warning(f"セクション '{section}' が見つかりません")
+        return ""
     
     def list_chat_prompt_keys(self) -> List[str]:
         """
         chat_prompts.txt 内の利用可能なセクション名一覧を返却する
         """
-        if not self.chat_prompt_file.exists():
-            return []
-        
-        try:
-            with open(self.chat_prompt_file, encoding="utf-8") as f:
-                content = f.read()
-            
-            # <section_name> タグを抽出
-            sections = re.findall(r'<(\w+)>', content)
-            return list(set(sections))  # 重複を除去
-            
-        except Exception as e:
-            logger.error(f"チャットプロンプトキー取得エラー: {e}")
-            return []
+        return list(self.registry.sections(self.chat_prompt_file, parse_chat_prompts))
     
     def _get_default_prompt(self, lang: str) -> str:
         """デフォルトプロンプトを返す"""
@@ -272,9 +248,16 @@ Text:
             logger.info(f"デフォルトチャットプロンプトを作成: {self.chat_prompt_file}")
 
 # サービスインスタンス作成ヘルパー
+_default_loader: Optional[PromptLoader] = None
+
 def get_prompt_loader(prompt_dir: Optional[str] = None) -> PromptLoader:
-    """プロンプトローダーインスタンス取得"""
-    return PromptLoader(prompt_dir)
+    """プロンプトローダーインスタンス取得（省略時は共有インスタンス）"""
+    global _default_loader
+    if prompt_dir is not None:
+        return PromptLoader(prompt_dir)
+    if _default_loader is None:
+        _default_loader = PromptLoader()
+    return _default_loader
 
 def get_prompt_by_lang(lang: str = "ja") -> str:
     """
@@ -287,9 +270,9 @@ def get_prompt_by_lang(lang: str = "ja") -> str:
         プロンプトテキスト
     """
     loader = get_prompt_loader()
-    return loader.load_prompt_by_lang(lang)
+    return loader.get_prompt_by_lang(lang)
 
-def get_chat_prompt(section: str = "chat_general") -> str:
+def get_chat_prompt(section: str = "system") -> str:
     """
     チャットプロンプト取得（簡易版）
     
@@ -300,4 +283,4 @@ def get_chat_prompt(section: str = "chat_general") -> str:
         チャットプロンプトテキスト
     """
     loader = get_prompt_loader()
-    return loader.load_chat_prompt(section)
\ No newline at end of file
+    return loader.get_chat_prompt(section)
\ No newline at end of file
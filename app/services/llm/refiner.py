@@ -5,7 +5,9 @@ LangChain + Ollamaを使用したテキスト整形・精緻化
 
 import re
 import time
-from typing import Tuple, Optional, Dict, Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, Dict, Any, Callable, AsyncIterator
 
 from langchain_core.output_parsers import StrOutputParser
 from langchain.prompts import PromptTemplate
@@ -14,8 +16,12 @@ from langchain_community.llms.ollama import OllamaEndpointNotFoundError
 
 from app.config import config, logger
 from app.services.ocr import get_spell_checker
-from .prompt_loader import PromptLoader
-from .llm_utils import detect_language
+from new.utils.text_normalizer import normalize_empty_lines
+from new.utils.text_segmenter import split_segments, stitch_segments
+from new.services.llm.response_cache import CacheStats, cache_key, get_llm_response_cache, is_deterministic
+from new.services.llm.scheduler import BATCH, get_llm_scheduler
+from .prompt_loader import get_prompt_loader
+from .llm_utils import detect_language, estimate_tokens
 from .scorer import TextScorer
 
 class TextRefiner:
@@ -25,8 +31,14 @@ class TextRefiner:
         self.ollama_base = config.OLLAMA_BASE_URL
         self.default_model = config.OLLAMA_MODEL
         self.spell_checker = get_spell_checker()
-        self.prompt_loader = PromptLoader()
+        self.prompt_loader = get_prompt_loader()
         self.text_scorer = TextScorer()
+        self.last_segments: list[Dict[str, Any]] = []  # 直近の区間整形の区間ごとの結果
+        # LLM応答キャッシュ（決定的な生成設定のみ対象）
+        self.cache = get_llm_response_cache(
+            config.LLM_CACHE_DIR, config.LLM_CACHE_MAX_MB * 1024 * 1024
+        ) if config.LLM_CACHE_ENABLED else None
+        self.cache_stats = CacheStats()
     
     def normalize_empty_lines(self, text: str) -> str:
         """
@@ -38,10 +50,8 @@ class TextRefiner:
         Returns:
             正規化されたテキスト
         """
-        # 空白のみの行を削除（全角スペース含む）
-        text = re.sub(r'^[\s\u3000]+$', '', text, flags=re.MULTILINE)
-        # 連続する3つ以上の改行を2つに圧縮
-        return re.sub(r'\n{3,}', '\n\n', text)
+        # 空白のみの行を削除（全角スペース含む）・連続する3つ以上の改行を2つに圧縮
+        return normalize_empty_lines(text)
     
     def build_prompt(self, raw_text: str, lang: str = "ja") -> str:
         """
@@ -54,16 +64,215 @@ class TextRefiner:
         Returns:
             組み立てられたプロンプト
         """
-        # プロンプトテンプレート取得
-        template = self.prompt_loader.get_prompt_by_lang(lang)
-        
         # OCR誤字補正と空行正規化
         cleaned = self.normalize_empty_lines(
             self.spell_checker.correct_text(raw_text)
         )
+        return self._format_prompt(cleaned, lang)
+    
+    def _format_prompt(self, cleaned: str, lang: str) -> str:
+        """補正済みテキストをプロンプトテンプレートの{TEXT}に埋め込む"""
+        return self.prompt_loader.render_prompt(lang, cleaned)
+    
+    @staticmethod
+    def _with_seed(gen_kw: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM_SEED が設定されていれば生成パラメータに加える"""
+        if config.LLM_SEED is not None:
+            return {"seed": config.LLM_SEED, **gen_kw}
+        return gen_kw
+    
+    def _lookup_cache(
+        self,
+        prompt_text: str,
+        model: str,
+        gen_kw: Dict[str, Any]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """(キャッシュキー, キャッシュ済み応答) を返す（キャッシュ対象外はキーが None）"""
+        if self.cache is None:
+            return None, None
+        if not is_deterministic(gen_kw):
+            self.cache_stats.record_bypass()
+            return None, None
+        key = cache_key(model, prompt_text, gen_kw)
+        cached = self.cache.get(key)
+        if cached is None:
+            self.cache_stats.record_miss()
+            return key, None
+        refined, elapsed = cached
+        self.cache_stats.record_hit(elapsed)
+        logger.info(f"💾 LLMキャッシュヒット（推論{elapsed:.1f}秒を省略）")
+        return key, refined
+    
+    def _invoke_llm(
+        self,
+        prompt_text: str,
+        model: str,
+        gen_kw: Dict[str, Any],
+        abort_flag: Optional[Dict[str, bool]] = None
+    ) -> str:
+        """
+        LangChain チェーンで1回推論（空応答は "[EMPTY]"）
+        
+        temperature=0 またはシード固定（LLM_SEED）の場合は応答キャッシュを参照・保存する。
+        実行枠の待機中に abort_flag が立つと InterruptedError を送出する。
+        """
+        gen_kw = self._with_seed(gen_kw)
+        key, cached = self._lookup_cache(prompt_text, model, gen_kw)
+        if cached is not None:
+            return cached
+        
+        # PromptTemplate 用にエスケープ
+        safe_prompt = prompt_text.replace("{", "{{").replace("}", "}}")
+        
+        llm = ChatOllama(
+            model=model,
+            base_url=self.ollama_base,
+            **gen_kw
+        )
+        chain = (
+            PromptTemplate.from_template(safe_prompt) |
+            llm |
+            StrOutputParser()
+        )
+        
+        logger.debug(
+            f"[DEBUG] LLM呼び出し: model={model}, "
+            f"prompt_len={len(prompt_text)}"
+        )
+        logger.debug(
+            f"[DEBUG] プロンプトプレビュー:\n---\n"
+            f"{prompt_text[:300]}...\n---"
+        )
         
-        # テンプレート内の{TEXT}を置換
-        return template.replace("{TEXT}", cleaned)
+        # チャットを優先させるため、共有スケジューラのバッチ枠を取得してから推論
+        with get_llm_scheduler().slot_sync(model, BATCH, abort_flag):
+            start_time = time.time()
+            try:
+                refined = chain.invoke({})
+            except OllamaEndpointNotFoundError as e:
+                # モデル未ロード時の明示的エラー
+                raise RuntimeError(
+                    f"Ollama モデル '{model}' が見つかりません。"
+                    f"`ollama pull {model}` を実行してください。"
+                ) from e
+            elapsed = time.time() - start_time
+        
+        logger.debug(f"[DEBUG] LLM推論時間: {elapsed:.2f}秒")
+        
+        if not refined.strip():
+            logger.warning("[WARNING] LLMが空の応答を返しました")
+            return "[EMPTY]"
+        if key is not None:
+            self.cache.put(key, model, refined, elapsed)
+        return refined
+    
+    def _refine_segments(
+        self,
+        corrected: str,
+        lang: str,
+        model: str,
+        temperature: float,
+        max_new_tokens: int,
+        check_abort: Callable[[], None],
+        max_concurrency: Optional[int] = None,
+        abort_flag: Optional[Dict[str, bool]] = None
+    ) -> Tuple[str, str, float, str]:
+        """
+        区間に分割して並列整形し、重なりを除去して結合
+        
+        品質スコアは区間ごとに算出し、文字数で加重平均する（詳細は self.last_segments）。
+        """
+        segments, prompts = self._split_for_refine(corrected, lang)
+        limit = max(1, min(max_concurrency or config.LLM_MAX_CONCURRENCY, len(segments)))
+        logger.info(f"✂️ 区間整形: {len(segments)}区間, 同時実行数={limit}")
+        
+        def refine_segment(index: int) -> Tuple[str, float]:
+            check_abort()
+            gen_kw = self._segment_gen_kw(segments[index], temperature, max_new_tokens)
+            start_time = time.time()
+            refined = self._invoke_llm(prompts[index], model, gen_kw, abort_flag)
+            return refined, time.time() - start_time
+        
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="llm-segment")
+        try:
+            results = list(executor.map(refine_segment, range(len(segments))))
+        finally:
+            # 中断・エラー時は未着手の区間を投入しない
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        check_abort()
+        scores = self.text_scorer.score_text_quality_batch(
+            [(segment.text, refined) for segment, (refined, _) in zip(segments, results)], lang
+        )
+        return self._stitch_results(segments, prompts, results, scores, lang, start_time)
+    
+    def _split_for_refine(self, corrected: str, lang: str) -> Tuple[list, list]:
+        """整形用の区間分割（区間, 区間ごとのプロンプト）"""
+        segments = split_segments(
+            corrected,
+            config.LLM_SEGMENT_TOKENS,
+            config.LLM_SEGMENT_OVERLAP_TOKENS,
+            count_tokens=lambda text: estimate_tokens(text, lang)
+        )
+        return segments, [self._format_prompt(segment.text, lang) for segment in segments]
+    
+    @staticmethod
+    def _segment_gen_kw(segment, temperature: float, max_new_tokens: int) -> Dict[str, Any]:
+        return {
+            "max_new_tokens": max(max_new_tokens, segment.tokens),
+            "min_length": max(1, int(len(segment.text) * 0.8)),
+            "temperature": temperature,
+        }
+    
+    def _stitch_results(
+        self,
+        segments: list,
+        prompts: list,
+        results: list,
+        scores: list,
+        lang: str,
+        start_time: float
+    ) -> Tuple[str, str, float, str]:
+        """区間ごとの (整形結果, 秒数) を結合し、スコアを文字数で加重平均"""
+        total_chars = sum(len(segment.text) for segment in segments)
+        score = sum(s * len(segment.text) for s, segment in zip(scores, segments)) / max(total_chars, 1)
+        
+        self.last_segments = [
+            {
+                "index": segment.index,
+                "chars": len(segment.text),
+                "tokens": segment.tokens,
+                "score": seg_score,
+                "elapsed": elapsed,
+            }
+            for segment, seg_score, (_, elapsed) in zip(segments, scores, results)
+        ]
+        
+        refined = stitch_segments(segments, [output for output, _ in results])
+        logger.info(
+            f"✅ LLM区間整形完了（{len(segments)}区間, {time.time() - start_time:.1f}秒, "
+            f"品質スコア: {score:.2f}, 区間最低: {min(scores):.2f}）"
+        )
+        return refined, lang, score, prompts[0]
+    
+    def _prepare_text(self, raw_text: str, force_lang: Optional[str]) -> Tuple[str, str, int]:
+        """OCR誤字補正・空行圧縮・言語判定（補正済みテキスト, 言語, 推定トークン数）"""
+        corrected = self.normalize_empty_lines(
+            self.spell_checker.correct_text(raw_text)
+        )
+        lang = detect_language(corrected, force_lang) or "ja"
+        if force_lang == "ja":
+            lang = "ja"
+        
+        # デバッグ出力
+        token_estimate = estimate_tokens(corrected, lang)
+        logger.info(
+            f"🧠 LLM整形を開始（文字数: {len(corrected)}, "
+            f"推定トークン: {token_estimate}）"
+        )
+        logger.info(f"🔤 整形言語: {lang}")
+        return corrected, lang, token_estimate
     
     def refine_text_with_llm(
         self,
@@ -72,18 +281,25 @@ class TextRefiner:
         force_lang: Optional[str] = None,
         abort_flag: Optional[Dict[str, bool]] = None,
         temperature: float = 0.7,
-        max_new_tokens: int = 1024
+        max_new_tokens: int = 1024,
+        segmented: Optional[bool] = None,
+        max_concurrency: Optional[int] = None
     ) -> Tuple[str, str, float, str]:
         """
         LangChain + Ollama で raw_text を整形
         
+        推定トークン数が LLM_SEGMENT_TOKENS を超える長文は、ページ・段落境界で
+        区間に分割して最大 max_concurrency 件ずつ並列に整形し、重なりを除去して結合する。
+        
         Args:
             raw_text: 生テキスト
             model: 使用モデル（省略時はデフォルト）
             force_lang: 強制言語指定
             abort_flag: 中断フラグ
             temperature: 生成温度
-            max_new_tokens: 最大生成トークン数
+            max_new_tokens: 最大生成トークン数（区間整形では区間ごと）
+            segmented: 区間整形の強制指定（None は推定トークン数で自動判定）
+            max_concurrency: 区間整形の同時リクエスト数（省略時は LLM_MAX_CONCURRENCY）
             
         Returns:
             (refined_text, lang, quality_score, prompt_used)のタプル
@@ -97,85 +313,33 @@ class TextRefiner:
                 raise InterruptedError("処理が中断されました")
         
         try:
-            # 1) OCR 誤字補正＋空行圧縮
-            check_abort()
-            corrected = self.normalize_empty_lines(
-                self.spell_checker.correct_text(raw_text)
-            )
-            
-            # 2) 言語判定
+            # 1) OCR 誤字補正＋空行圧縮・2) 言語判定
             check_abort()
-            lang = detect_language(corrected, force_lang) or "ja"
-            if force_lang == "ja":
-                lang = "ja"
+            corrected, lang, token_estimate = self._prepare_text(raw_text, force_lang)
             
-            # デバッグ出力
-            text_len = len(corrected)
-            token_estimate = int(text_len * 1.6)  # 日本語の場合の推定
-            logger.info(
-                f"🧠 LLM整形を開始（文字数: {text_len}, "
-                f"推定トークン: {token_estimate}）"
-            )
-            logger.info(f"🔤 整形言語: {lang}")
+            # 3) 長文はセグメント分割して並列整形
+            if segmented is None:
+                segmented = token_estimate > config.LLM_SEGMENT_TOKENS
+            if segmented:
+                return self._refine_segments(
+                    corrected, lang, model, temperature, max_new_tokens,
+                    check_abort, max_concurrency, abort_flag
+                )
             
-            # 3) プロンプト組み立て
+            # 4) プロンプト組み立て
             check_abort()
-            prompt_text = self.build_prompt(raw_text, lang)
-            
-            # PromptTemplate 用にエスケープ
-            safe_prompt = prompt_text.replace("{", "{{").replace("}", "}}")
+            prompt_text = self._format_prompt(corrected, lang)
             
-            # 4) 生成パラメータ
+            # 5) 推論実行
             gen_kw = {
                 "max_new_tokens": max_new_tokens,
                 "min_length": max(1, int(len(corrected) * 0.8)),
                 "temperature": temperature,
             }
-            
-            # 5) LLM インスタンス生成
             check_abort()
-            llm = ChatOllama(
-                model=model,
-                base_url=self.ollama_base,
-                **gen_kw
-            )
+            refined = self._invoke_llm(prompt_text, model, gen_kw, abort_flag)
             
-            # 6) LangChain チェーン構築
-            chain = (
-                PromptTemplate.from_template(safe_prompt) |
-                llm |
-                StrOutputParser()
-            )
-            
-            # 7) 推論実行
-            check_abort()
-            logger.debug(
-                f"[DEBUG] LLM呼び出し: model={model}, "
-                f"prompt_len={len(prompt_text)}"
-            )
-            logger.debug(
-                f"[DEBUG] プロンプトプレビュー:\n---\n"
-                f"{prompt_text[:300]}...\n---"
-            )
-            
-            start_time = time.time()
-            try:
-                refined = chain.invoke({})
-            except OllamaEndpointNotFoundError as e:
-                # モデル未ロード時の明示的エラー
-                raise RuntimeError(
-                    f"Ollama モデル '{model}' が見つかりません。"
-                    f"`ollama pull {model}` を実行してください。"
-                ) from e
-            
-            elapsed = time.time() - start_time
-            logger.debug(f"[DEBUG] LLM推論時間: {elapsed:.2f}秒")
-            
-            if not refined.strip():
-                logger.warning("[WARNING] LLMが空の応答を返しました")
-                refined = "[EMPTY]"
-            
-            # 8) 品質スコア算出
+            # 6) 品質スコア算出
             check_abort()
             score = self.text_scorer.score_text_quality(
                 corrected, refined, lang
@@ -191,6 +355,190 @@ class TextRefiner:
             logger.error(f"LLM整形エラー: {e}")
             raise
     
+    async def _invoke_llm_async(
+        self,
+        client,
+        prompt_text: str,
+        gen_kw: Dict[str, Any],
+        abort_flag: Optional[Dict[str, bool]]
+    ) -> str:
+        """_invoke_llm の非同期版（共有クライアントでストリームを受け取り、応答キャッシュも共通）"""
+        gen_kw = self._with_seed(gen_kw)
+        key, cached = self._lookup_cache(prompt_text, client.model, gen_kw)
+        if cached is not None:
+            return cached
+        
+        start_time = time.time()
+        # 実行枠はクライアントのレーン（BATCH）で共有スケジューラから取得される
+        async with client.stream_generate(prompt_text, abort_flag, gen_kw) as stream:
+            pieces = [piece async for piece in stream]
+        elapsed = time.time() - start_time
+        refined = "".join(pieces)
+        logger.debug(f"[DEBUG] LLM推論時間: {elapsed:.2f}秒")
+        
+        if not refined.strip():
+            logger.warning("[WARNING] LLMが空の応答を返しました")
+            return "[EMPTY]"
+        if key is not None:
+            self.cache.put(key, client.model, refined, elapsed)
+        return refined
+    
+    async def _refine_segments_async(
+        self,
+        client,
+        cpu: ThreadPoolExecutor,
+        corrected: str,
+        lang: str,
+        temperature: float,
+        max_new_tokens: int,
+        abort_flag: Optional[Dict[str, bool]],
+        max_concurrency: Optional[int] = None
+    ) -> Tuple[str, str, float, str]:
+        """
+        _refine_segments の非同期版
+        
+        区間も共有クライアント（スケジューラのバッチ枠）で生成し、1区間でも失敗・中断するか
+        呼び出し側のタスクが取り消されたら残りの区間を取り消す。
+        """
+        loop = asyncio.get_running_loop()
+        segments, prompts = self._split_for_refine(corrected, lang)
+        limit = max(1, min(max_concurrency or config.LLM_MAX_CONCURRENCY, len(segments)))
+        semaphore = asyncio.Semaphore(limit)
+        logger.info(f"✂️ 区間整形: {len(segments)}区間, 同時実行数={limit}")
+        
+        async def refine_segment(index: int) -> Tuple[str, float]:
+            async with semaphore:
+                if abort_flag and abort_flag.get("flag"):
+                    raise InterruptedError("処理が中断されました")
+                gen_kw = self._segment_gen_kw(segments[index], temperature, max_new_tokens)
+                start_time = time.time()
+                refined = await self._invoke_llm_async(client, prompts[index], gen_kw, abort_flag)
+                return refined, time.time() - start_time
+        
+        start_time = time.time()
+        tasks = [asyncio.ensure_future(refine_segment(index)) for index in range(len(segments))]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        if abort_flag and abort_flag.get("flag"):
+            raise InterruptedError("処理が中断されました")
+        scores = await loop.run_in_executor(
+            cpu, self.text_scorer.score_text_quality_batch,
+            [(segment.text, refined) for segment, (refined, _) in zip(segments, results)], lang
+        )
+        return self._stitch_results(segments, prompts, results, scores, lang, start_time)
+    
+    async def _refine_text_async(
+        self,
+        client,
+        cpu: ThreadPoolExecutor,
+        raw_text: str,
+        force_lang: Optional[str],
+        abort_flag: Optional[Dict[str, bool]],
+        temperature: float,
+        max_new_tokens: int
+    ) -> Tuple[str, str, float, str]:
+        """1テキストを非同期に整形（前処理・品質スコアは cpu で実行し、イベントループを塞がない）"""
+        loop = asyncio.get_running_loop()
+        
+        def check_abort():
+            if abort_flag and abort_flag.get("flag"):
+                raise InterruptedError("処理が中断されました")
+        
+        check_abort()
+        corrected, lang, token_estimate = await loop.run_in_executor(
+            cpu, self._prepare_text, raw_text, force_lang
+        )
+        
+        if token_estimate > config.LLM_SEGMENT_TOKENS:
+            return await self._refine_segments_async(
+                client, cpu, corrected, lang, temperature, max_new_tokens, abort_flag
+            )
+        
+        prompt_text = self._format_prompt(corrected, lang)
+        gen_kw = {
+            "max_new_tokens": max_new_tokens,
+            "min_length": max(1, int(len(corrected) * 0.8)),
+            "temperature": temperature,
+        }
+        check_abort()
+        refined = await self._invoke_llm_async(client, prompt_text, gen_kw, abort_flag)
+        
+        check_abort()
+        score = await loop.run_in_executor(
+            cpu, self.text_scorer.score_text_quality, corrected, refined, lang
+        )
+        return refined, lang, score, prompt_text
+    
+    async def refine_texts_async(
+        self,
+        texts: list[str],
+        model: Optional[str] = None,
+        force_lang: Optional[str] = None,
+        abort_flag: Optional[Dict[str, bool]] = None,
+        max_concurrency: Optional[int] = None,
+        temperature: float = 0.7,
+        max_new_tokens: int = 1024
+    ) -> AsyncIterator[Tuple[int, Tuple[str, str, float, str]]]:
+        """
+        複数テキストを並列に整形し、完了した順に (元の添字, 結果) を返す
+        
+        最大 max_concurrency 件を同時に処理し、Ollamaへの要求はバッチ全体で1つの
+        OllamaClient（共有セッション・スケジューラのバッチ枠）を使う。
+        失敗したテキストは元のテキストをスコア 0 で返し、残りの処理は続ける。
+        abort_flag が立つと実行中の生成を切断して InterruptedError を送出する。
+        呼び出し側が途中で反復をやめた場合（break・タスクのキャンセル）も未完了分は取り消す。
+        
+        Args:
+            texts: テキストのリスト
+            model: 使用モデル（省略時はデフォルト）
+            force_lang: 強制言語指定
+            abort_flag: バッチ全体の中断フラグ
+            max_concurrency: 同時に整形するテキスト数（省略時は LLM_MAX_CONCURRENCY）
+            temperature: 生成温度
+            max_new_tokens: 最大生成トークン数
+            
+        Yields:
+            (texts 内の添字, (refined_text, lang, score, prompt))
+        """
+        from new.services.llm.ollama_client import OllamaClient
+        
+        client = OllamaClient(base_url=self.ollama_base, model=model or self.default_model, lane=BATCH)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or config.LLM_MAX_CONCURRENCY))
+        # スペルチェック・スコア算出は1スレッドで順に実行（GILの取り合いを避ける）
+        cpu = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-batch-cpu")
+        
+        async def refine(index: int, text: str) -> Tuple[int, Tuple[str, str, float, str]]:
+            async with semaphore:
+                try:
+                    result = await self._refine_text_async(
+                        client, cpu, text, force_lang, abort_flag, temperature, max_new_tokens
+                    )
+                except InterruptedError:
+                    raise
+                except Exception as e:
+                    logger.error(f"バッチ処理エラー (テキスト {index+1}): {e}")
+                    # エラー時は元のテキストを返す
+                    result = (text, "ja", 0.0, "")
+                return index, result
+        
+        tasks = [asyncio.ensure_future(refine(i, text)) for i, text in enumerate(texts)]
+        try:
+            for completed, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                index, result = await next_done
+                logger.info(f"バッチ処理: {completed}/{len(texts)} (テキスト {index+1})")
+                yield index, result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            cpu.shutdown(wait=False, cancel_futures=True)
+    
     def batch_refine_texts(
         self,
         texts: list[str],
@@ -199,34 +547,49 @@ class TextRefiner:
         **kwargs
     ) -> list[Tuple[str, str, float, str]]:
         """
-        複数テキストのバッチ整形
+        複数テキストのバッチ整形（refine_texts_async の同期版）
+        
+        実行中のイベントループから呼ばれた場合は asyncio.run できないため、
+        従来どおり refine_text_with_llm で1件ずつ整形する。
         
         Args:
             texts: テキストのリスト
             model: 使用モデル
             force_lang: 強制言語指定
-            **kwargs: その他のパラメータ
+            **kwargs: refine_texts_async のその他のパラメータ
             
         Returns:
-            各テキストの(refined_text, lang, score, prompt)のリスト
+            各テキストの(refined_text, lang, score, prompt)のリスト（texts と同順）
         """
-        results = []
+        from new.services.llm.ollama_client import close_ollama_sessions
         
+        async def collect():
+            results = [None] * len(texts)
+            try:
+                async for index, result in self.refine_texts_async(texts, model, force_lang, **kwargs):
+                    results[index] = result
+            finally:
+                # このイベントループで作った共有セッションを閉じる
+                await close_ollama_sessions()
+            return results
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(collect())
+        
+        logger.warning("イベントループ内からのバッチ整形のため1件ずつ同期で整形します（refine_texts_async を推奨）")
+        results = []
         for i, text in enumerate(texts):
             logger.info(f"バッチ処理: {i+1}/{len(texts)}")
             try:
-                result = self.refine_text_with_llm(
-                    text,
-                    model=model,
-                    force_lang=force_lang,
-                    **kwargs
-                )
-                results.append(result)
+                results.append(self.refine_text_with_llm(text, model=model, force_lang=force_lang, **kwargs))
+            except InterruptedError:
+                raise
             except Exception as e:
                 logger.error(f"バッチ処理エラー (テキスト {i+1}): {e}")
                 # エラー時は元のテキストを返す
                 results.append((text, "ja", 0.0, ""))
-        
         return results
 
 # サービスインスタンス作成ヘルパー
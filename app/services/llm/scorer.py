@@ -3,21 +3,18 @@
 OCR前後のテキスト品質を評価
 """
 
-import re
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 
 from app.config import logger
+from new.utils.char_stats import CharStats, char_stats, char_stats_batch
 
 class TextScorer:
-    """テキスト品質スコアリングサービス"""
+    """
+    テキスト品質スコアリングサービス
     
-    def __init__(self):
-        # 日本語文字パターン
-        self.japanese_pattern = re.compile(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]')
-        # 英数字パターン
-        self.alphanumeric_pattern = re.compile(r'[a-zA-Z0-9]')
-        # 記号・特殊文字パターン
-        self.special_char_pattern = re.compile(r'[^\w\s\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FAF]')
+    文字種（日本語・英数字・記号・連続空白）は new.utils.char_stats で
+    テキストごとに1回だけ集計し、言語判定・トークン推定と共有する。
+    """
     
     def score_text_quality(
         self,
@@ -39,10 +36,35 @@ class TextScorer:
         if not original_text or not refined_text:
             return 0.0
         
+        return self._score(char_stats(original_text), char_stats(refined_text), lang)
+    
+    def score_text_quality_batch(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        lang: str = "ja"
+    ) -> List[float]:
+        """
+        複数テキストの品質スコアを一括算出（同一テキストの集計は1回のみ）
+        
+        Args:
+            pairs: (元のテキスト, 整形後のテキスト) のリスト
+            lang: 言語コード
+            
+        Returns:
+            品質スコアのリスト（pairs と同順）
+        """
+        stats = char_stats_batch([text for pair in pairs for text in pair])
+        return [
+            self._score(stats[2 * i], stats[2 * i + 1], lang) if original and refined else 0.0
+            for i, (original, refined) in enumerate(pairs)
+        ]
+    
+    def _score(self, original: CharStats, refined: CharStats, lang: str) -> float:
+        """集計済みの文字種からスコアを算出"""
         scores = []
         
         # 1. 文字数の変化率（大幅な削除・追加はペナルティ）
-        len_ratio = len(refined_text) / len(original_text)
+        len_ratio = refined.length / original.length
         if 0.8 <= len_ratio <= 1.2:
             len_score = 1.0
         elif 0.5 <= len_ratio <= 1.5:
@@ -54,30 +76,23 @@ class TextScorer:
         # 2. 言語の一貫性
         if lang == "ja":
             # 日本語の含有率
-            ja_chars_orig = len(self.japanese_pattern.findall(original_text))
-            ja_chars_refined = len(self.japanese_pattern.findall(refined_text))
-            
-            if ja_chars_refined > 0:
-                ja_ratio = ja_chars_refined / len(refined_text)
+            if refined.japanese > 0:
+                ja_ratio = refined.japanese / refined.length
                 lang_score = min(ja_ratio * 1.5, 1.0)  # 日本語が多いほど高スコア
             else:
                 lang_score = 0.3
         else:
             # 英語の場合は英数字の含有率
-            alnum_chars = len(self.alphanumeric_pattern.findall(refined_text))
-            if alnum_chars > 0:
-                alnum_ratio = alnum_chars / len(refined_text)
+            if refined.alphanumeric > 0:
+                alnum_ratio = refined.alphanumeric / refined.length
                 lang_score = min(alnum_ratio * 1.5, 1.0)
             else:
                 lang_score = 0.3
         scores.append(lang_score)
         
         # 3. 特殊文字・記号の削減率
-        special_orig = len(self.special_char_pattern.findall(original_text))
-        special_refined = len(self.special_char_pattern.findall(refined_text))
-        
-        if special_orig > 0:
-            reduction_rate = 1 - (special_refined / special_orig)
+        if original.special > 0:
+            reduction_rate = 1 - (refined.special / original.special)
             special_score = min(reduction_rate * 1.2, 1.0)
         else:
             special_score = 0.8
@@ -85,11 +100,8 @@ class TextScorer:
         
         # 4. 改行・空白の正規化
         # 連続する空白・改行の削減
-        whitespace_orig = len(re.findall(r'\s{2,}', original_text))
-        whitespace_refined = len(re.findall(r'\s{2,}', refined_text))
-        
-        if whitespace_orig > 0:
-            whitespace_reduction = 1 - (whitespace_refined / whitespace_orig)
+        if original.space_runs > 0:
+            whitespace_reduction = 1 - (refined.space_runs / original.space_runs)
             whitespace_score = min(whitespace_reduction * 1.5, 1.0)
         else:
             whitespace_score = 0.9
@@ -98,18 +110,18 @@ class TextScorer:
         # 5. 文の完全性（句読点の存在）
         if lang == "ja":
             # 日本語の句読点
-            punctuation_count = refined_text.count('。') + refined_text.count('、')
+            punctuation_count = refined.ja_punctuation
             if punctuation_count > 0:
                 # 100文字あたりの句読点数で評価
-                punct_ratio = punctuation_count / (len(refined_text) / 100)
+                punct_ratio = punctuation_count / (refined.length / 100)
                 punct_score = min(punct_ratio / 10, 1.0)  # 10個/100文字で満点
             else:
                 punct_score = 0.3
         else:
             # 英語のピリオド・カンマ
-            punctuation_count = refined_text.count('.') + refined_text.count(',')
+            punctuation_count = refined.en_punctuation
             if punctuation_count > 0:
-                punct_ratio = punctuation_count / (len(refined_text) / 100)
+                punct_ratio = punctuation_count / (refined.length / 100)
                 punct_score = min(punct_ratio / 5, 1.0)  # 5個/100文字で満点
             else:
                 punct_score = 0.3
@@ -153,11 +165,11 @@ class TextScorer:
                 "issues": ["テキストが空です"]
             }
         
+        stats = char_stats(text)
+        
         # 言語自動判定
         if lang is None:
-            ja_chars = len(self.japanese_pattern.findall(text))
-            en_chars = len(self.alphanumeric_pattern.findall(text))
-            lang = "ja" if ja_chars > en_chars else "en"
+            lang = "ja" if stats.japanese > stats.alphanumeric else "en"
         
         issues = []
         
@@ -166,19 +178,18 @@ class TextScorer:
             issues.append("テキストが短すぎます")
         
         # 特殊文字の割合チェック
-        special_chars = len(self.special_char_pattern.findall(text))
-        special_ratio = special_chars / len(text)
+        special_ratio = stats.special / stats.length
         if special_ratio > 0.3:
             issues.append(f"特殊文字が多すぎます（{special_ratio:.1%}）")
         
         # 連続空白・改行チェック
-        whitespace_issues = len(re.findall(r'\s{5,}', text))
+        whitespace_issues = stats.long_space_runs
         if whitespace_issues > 0:
             issues.append(f"過剰な空白・改行が{whitespace_issues}箇所あります")
         
         # 言語の一貫性チェック
         if lang == "ja":
-            ja_ratio = len(self.japanese_pattern.findall(text)) / len(text)
+            ja_ratio = stats.japanese / stats.length
             if ja_ratio < 0.3:
                 issues.append("日本語の含有率が低いです")
         
@@ -16,6 +16,16 @@ except ImportError:
             pass
         def correct_text(self, text, **kwargs):
             return text
+        def correct_text_with_edits(self, text, **kwargs):
+            return text, []
+        def tokenize(self, text):
+            return text.split()
+        def tokenize_batch(self, texts, max_workers=1):
+            return [text.split() for text in texts]
+        def unknown_word_spans(self, text):
+            return []
+        def unknown_word_spans_batch(self, texts, max_workers=1):
+            return [[] for _ in texts]
         def load_known_words(self, csv_paths):
             return set()
         def load_kanji_mistakes(self, csv_path):
@@ -45,14 +55,19 @@ try:
 except ImportError:
     # フォールバック：ダミー実装
     class BertCorrector:
-        def __init__(self, model_key="tohoku"):
+        def __init__(self, model_key="tohoku", use_suspicion_filter=True):
             pass
         def correct_text(self, text, **kwargs):
             return text
+        def batch_correct_texts(self, texts, **kwargs):
+            return list(texts)
     
     def get_bert_corrector(model_key="tohoku"):
         return BertCorrector(model_key)
 
+# BERT補正候補の事前選別
+from .suspicion_filter import SuspicionFilter, get_suspicion_filter
+
 __all__ = [
     # OCRメイン処理
     'OCRProcessor',
@@ -65,5 +80,7 @@ __all__ = [
     'get_spell_checker',
     # BERT補正
     'BertCorrector',
-    'get_bert_corrector'
+    'get_bert_corrector',
+    'SuspicionFilter',
+    'get_suspicion_filter'
 ]
\ No newline at end of file
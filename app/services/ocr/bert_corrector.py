@@ -3,9 +3,10 @@ BERT補正サービス - Prototype統合版
 日本語BERTモデルを使用したテキスト誤り修正
 """
 
+import time
 import torch
 from transformers import AutoTokenizer, BertForMaskedLM
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 
 from app.config import config, logger
 
@@ -20,15 +21,19 @@ AVAILABLE_MODELS = {
 class BertCorrector:
     """BERT補正サービス"""
     
-    def __init__(self, model_key: str = "tohoku"):
+    def __init__(self, model_key: str = "tohoku", use_suspicion_filter: bool = True):
         """
         Args:
             model_key: 使用するモデルのキー
+            use_suspicion_filter: 疑わしいトークンだけをマスクするか（False で全トークンを評価）
         """
         self.model_key = model_key
         self.tokenizer = None
         self.model = None
         self._loaded_model_key = None
+        self.use_suspicion_filter = use_suspicion_filter
+        self._suspicion_filter = None
+        self.last_stats: Dict[str, float] = {}
     
     def load_model(self, model_key: Optional[str] = None) -> tuple:
         """
@@ -62,6 +67,9 @@ class BertCorrector:
             if config.CUDA_AVAILABLE and torch.cuda.is_available():
                 self.model = self.model.cuda()
                 logger.info("BERTモデルをGPUに移動しました")
+            elif config.BERT_NUM_THREADS > 0:
+                # CPU推論のスレッド数（0はtorchの既定＝物理コア数）
+                torch.set_num_threads(config.BERT_NUM_THREADS)
             
             self.model.eval()
             self._loaded_model_key = model_key
@@ -74,12 +82,138 @@ class BertCorrector:
         
         return self.tokenizer, self.model
     
+    def _predict_masked(
+        self,
+        tokenizer,
+        model,
+        sequences: List[List[int]],
+        jobs: List[Tuple[int, int]],
+        top_k: int = 1,
+        batch_size: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        マスク位置ごとの予測をバッチで実行
+        
+        1トークンずつマスクしたコピーを batch_size 件ずつ積み重ねて1回のforwardで推論する。
+        MLMヘッドはマスク位置の隠れ状態にのみ適用するため、語彙×系列長のlogitsは作らない。
+        モデルの最大長を超える系列はマスク位置を中心とした窓で推論する。
+        
+        Args:
+            sequences: トークンID列のリスト
+            jobs: (系列番号, マスク位置) のリスト
+            top_k: 予測候補の上位k個
+            batch_size: 1回のforwardに積むマスク数（省略時は設定値）
+            
+        Returns:
+            jobsと同順の (予測トークンID, 信頼度) のリスト
+        """
+        if batch_size is None:
+            batch_size = config.BERT_MAX_BATCH_SIZE
+        batch_size = max(1, batch_size)
+        max_length = model.config.max_position_embeddings
+        device = next(model.parameters()).device
+        
+        # (系列番号, 窓開始, 窓終了, マスク位置) を長さ順に並べてパディングを抑える
+        windows = []
+        for job_index, (seq_index, position) in enumerate(jobs):
+            length = len(sequences[seq_index])
+            window_start = 0
+            if length > max_length:
+                window_start = min(max(0, position - max_length // 2), length - max_length)
+            window_end = min(length, window_start + max_length)
+            windows.append((window_end - window_start, job_index, seq_index, window_start, window_end, position))
+        windows.sort(key=lambda w: w[0])
+        
+        results: List[Tuple[int, float]] = [(0, 0.0)] * len(jobs)
+        with torch.inference_mode():
+            for batch_start in range(0, len(windows), batch_size):
+                batch = windows[batch_start:batch_start + batch_size]
+                width = batch[-1][0]
+                
+                input_ids = torch.full((len(batch), width), tokenizer.pad_token_id or 0, dtype=torch.long)
+                attention_mask = torch.zeros((len(batch), width), dtype=torch.long)
+                positions = []
+                for row, (length, _, seq_index, window_start, window_end, position) in enumerate(batch):
+                    input_ids[row, :length] = torch.tensor(sequences[seq_index][window_start:window_end])
+                    attention_mask[row, :length] = 1
+                    input_ids[row, position - window_start] = tokenizer.mask_token_id
+                    positions.append(position - window_start)
+                
+                hidden = model.bert(
+                    input_ids=input_ids.to(device),
+                    attention_mask=attention_mask.to(device)
+                ).last_hidden_state
+                masked_hidden = hidden[torch.arange(len(batch), device=device), torch.tensor(positions, device=device)]
+                logits = model.cls(masked_hidden)
+                
+                top_preds = torch.topk(logits, top_k, dim=-1)
+                top_probs = torch.softmax(top_preds.values, dim=-1)
+                top_ids = top_preds.indices[:, 0].tolist()
+                confidences = top_probs[:, 0].tolist()
+                for row, window in enumerate(batch):
+                    results[window[1]] = (top_ids[row], confidences[row])
+        
+        return results
+    
+    def _apply_predictions(
+        self,
+        tokenizer,
+        tokens: List[str],
+        predictions: List[Tuple[int, Tuple[int, float]]],
+        confidence_threshold: float
+    ) -> str:
+        """予測結果から補正後テキストを組み立て"""
+        corrected_tokens = tokens.copy()
+        correction_count = 0
+        
+        for i, (token_id, confidence) in predictions:
+            predicted_token = tokenizer.convert_ids_to_tokens([token_id])[0]
+            
+            # 元のトークンと異なり、信頼度が閾値を超える場合のみ置換
+            if predicted_token != tokens[i] and confidence > confidence_threshold:
+                logger.debug(
+                    f"🔁 BERT補正: {tokens[i]} → {predicted_token} "
+                    f"(信頼度: {confidence:.3f})"
+                )
+                corrected_tokens[i] = predicted_token
+                correction_count += 1
+        
+        if correction_count > 0:
+            logger.info(f"✅ BERT補正で{correction_count}箇所を修正しました")
+        
+        # トークンをテキストに戻す
+        return tokenizer.convert_tokens_to_string(corrected_tokens)
+    
+    def _resolve_suspicion_filter(self, suspicion_filter, use_suspicion_filter: Optional[bool]):
+        """使用する事前選別（明示指定 > 既定の SuspicionFilter、無効時は None）"""
+        if suspicion_filter is not None:
+            return suspicion_filter
+        enabled = self.use_suspicion_filter if use_suspicion_filter is None else use_suspicion_filter
+        if not enabled:
+            return None
+        if self._suspicion_filter is None:
+            from .suspicion_filter import get_suspicion_filter
+            self._suspicion_filter = get_suspicion_filter()
+        return self._suspicion_filter
+    
+    @staticmethod
+    def _mask_positions(tokens: List[str]) -> List[int]:
+        """マスク対象のトークン位置（特殊トークンは除外）"""
+        return [
+            i for i, token in enumerate(tokens)
+            if not (token.startswith("[") and token.endswith("]"))
+        ]
+    
     def correct_text(
         self,
         text: str,
         model_key: Optional[str] = None,
         top_k: int = 1,
-        confidence_threshold: float = 0.0
+        confidence_threshold: float = 0.0,
+        batch_size: Optional[int] = None,
+        suspicion_filter=None,
+        line_confidences: Optional[List[Tuple[str, float]]] = None,
+        use_suspicion_filter: Optional[bool] = None
     ) -> str:
         """
         テキストの誤りを修正
@@ -89,11 +223,26 @@ class BertCorrector:
             model_key: モデルキー（省略時は初期化時の値を使用）
             top_k: 予測候補の上位k個を考慮
             confidence_threshold: 置換を行う最小信頼度
+            batch_size: 1回のforwardに積むマスク数（省略時は BERT_MAX_BATCH_SIZE）
+            suspicion_filter: 候補の事前選別（省略時は get_suspicion_filter() の既定インスタンス）
+            line_confidences: OCRエンジンが返した (行テキスト, 信頼度) のリスト
+            use_suspicion_filter: False で事前選別せず全トークンを評価（省略時は初期化時の値）
             
         Returns:
-            修正後テキスト
+            修正後テキスト（選別率等は last_stats に記録）
         """
+        start_time = time.perf_counter()
+        self.last_stats = {"tokens": 0, "candidates": 0, "selectivity": 0.0, "processing_time": 0.0}
         try:
+            # 事前選別：疑わしい箇所が無ければモデルを使わずに終了
+            spans = None
+            suspicion_filter = self._resolve_suspicion_filter(suspicion_filter, use_suspicion_filter)
+            if suspicion_filter is not None:
+                spans = suspicion_filter.find_spans(text, line_confidences)
+                if not spans:
+                    self.last_stats["processing_time"] = time.perf_counter() - start_time
+                    return text
+            
             # モデルロード
             tokenizer, model = self.load_model(model_key)
             
@@ -102,56 +251,34 @@ class BertCorrector:
             if not tokens:
                 return text
             
-            corrected_tokens = tokens.copy()
-            correction_count = 0
-            
-            # 各トークンを順番にマスクして予測
-            for i in range(len(tokens)):
-                # 特殊トークンはスキップ
-                if tokens[i].startswith("[") and tokens[i].endswith("]"):
-                    continue
-                
-                # マスクトークンで置換
-                masked_tokens = tokens.copy()
-                masked_tokens[i] = "[MASK]"
-                
-                # 入力IDに変換
-                input_ids = tokenizer.convert_tokens_to_ids(masked_tokens)
-                input_tensor = torch.tensor([input_ids])
-                
-                # GPU使用可能な場合は移動
-                if config.CUDA_AVAILABLE and torch.cuda.is_available():
-                    input_tensor = input_tensor.cuda()
-                
-                # 予測実行
-                with torch.no_grad():
-                    predictions = model(input_tensor).logits
-                
-                # 上位k個の予測を取得
-                masked_index = i
-                top_preds = torch.topk(predictions[0, masked_index], top_k)
-                top_indices = top_preds.indices.tolist()
-                top_probs = torch.softmax(top_preds.values, dim=0).tolist()
-                
-                # 最も確率の高い予測トークンを取得
-                predicted_token = tokenizer.convert_ids_to_tokens([top_indices[0]])[0]
-                confidence = top_probs[0]
-                
-                # 元のトークンと異なり、信頼度が閾値を超える場合のみ置換
-                if predicted_token != tokens[i] and confidence > confidence_threshold:
-                    logger.debug(
-                        f"🔁 BERT補正: {tokens[i]} → {predicted_token} "
-                        f"(信頼度: {confidence:.3f})"
-                    )
-                    corrected_tokens[i] = predicted_token
-                    correction_count += 1
-            
-            # トークンをテキストに戻す
-            corrected_text = tokenizer.convert_tokens_to_string(corrected_tokens)
+            # 各トークンをマスクして予測（バッチ推論）
+            positions = self._mask_positions(tokens)
+            token_count = len(positions)
+            if spans is not None:
+                selected = suspicion_filter.select_tokens(tokens, text, spans)
+                positions = [i for i in positions if i in selected]
+            self.last_stats.update({
+                "tokens": token_count,
+                "candidates": len(positions),
+                "selectivity": len(positions) / token_count if token_count else 0.0
+            })
+            if not positions:
+                return text
             
-            if correction_count > 0:
-                logger.info(f"✅ BERT補正で{correction_count}箇所を修正しました")
+            sequences = [tokenizer.convert_tokens_to_ids(tokens)]
+            predictions = self._predict_masked(
+                tokenizer, model, sequences, [(0, i) for i in positions], top_k, batch_size
+            )
             
+            corrected_text = self._apply_predictions(
+                tokenizer, tokens, list(zip(positions, predictions)), confidence_threshold
+            )
+            self.last_stats["processing_time"] = time.perf_counter() - start_time
+            if spans is not None:
+                logger.info(
+                    f"BERT補正候補: {len(positions)}/{token_count}トークン "
+                    f"(選別率 {self.last_stats['selectivity']:.1%}, {self.last_stats['processing_time']:.2f}s)"
+                )
             return corrected_text
             
         except Exception as e:
@@ -164,34 +291,69 @@ class BertCorrector:
         texts: List[str],
         model_key: Optional[str] = None,
         top_k: int = 1,
-        confidence_threshold: float = 0.0
+        confidence_threshold: float = 0.0,
+        batch_size: Optional[int] = None,
+        suspicion_filter=None,
+        line_confidences_list: Optional[List[Optional[List[Tuple[str, float]]]]] = None,
+        use_suspicion_filter: Optional[bool] = None
     ) -> List[str]:
         """
         複数テキストのバッチ補正
         
+        全テキストのマスク位置をまとめてバッチ推論する（短いテキストも1回のforwardに相乗りする）。
+        
         Args:
             texts: 入力テキストのリスト
             model_key: モデルキー
             top_k: 予測候補の上位k個
             confidence_threshold: 置換を行う最小信頼度
+            batch_size: 1回のforwardに積むマスク数（省略時は BERT_MAX_BATCH_SIZE）
+            suspicion_filter: 候補の事前選別（省略時は get_suspicion_filter() の既定インスタンス）
+            line_confidences_list: テキストごとの (行テキスト, 信頼度) のリスト
+            use_suspicion_filter: False で事前選別せず全トークンを評価（省略時は初期化時の値）
             
         Returns:
             修正後テキストのリスト
         """
-        # モデルを一度だけロード
-        self.load_model(model_key)
-        
-        corrected_texts = []
-        for text in texts:
-            corrected = self.correct_text(
-                text,
-                model_key=model_key,
-                top_k=top_k,
-                confidence_threshold=confidence_threshold
-            )
-            corrected_texts.append(corrected)
-        
-        return corrected_texts
+        try:
+            # 事前選別：どのテキストにも疑わしい箇所が無ければモデルを使わずに終了
+            suspicion_filter = self._resolve_suspicion_filter(suspicion_filter, use_suspicion_filter)
+            spans_list = None
+            if suspicion_filter is not None:
+                spans_list = suspicion_filter.find_spans_batch(texts, line_confidences_list)
+                if not any(spans_list):
+                    return list(texts)
+            
+            # モデルを一度だけロード
+            tokenizer, model = self.load_model(model_key)
+            
+            token_lists = [tokenizer.tokenize(text) for text in texts]
+            sequences = [tokenizer.convert_tokens_to_ids(tokens) for tokens in token_lists]
+            jobs = []
+            for seq_index, (text, tokens) in enumerate(zip(texts, token_lists)):
+                positions = self._mask_positions(tokens)
+                if spans_list is not None:
+                    spans = spans_list[seq_index]
+                    selected = suspicion_filter.select_tokens(tokens, text, spans) if spans else set()
+                    positions = [i for i in positions if i in selected]
+                jobs.extend((seq_index, i) for i in positions)
+            predictions = self._predict_masked(tokenizer, model, sequences, jobs, top_k, batch_size)
+            
+            # テキストごとに予測を振り分け
+            per_text: List[List[Tuple[int, Tuple[int, float]]]] = [[] for _ in texts]
+            for (seq_index, i), prediction in zip(jobs, predictions):
+                per_text[seq_index].append((i, prediction))
+            
+            return [
+                self._apply_predictions(tokenizer, tokens, per_text[index], confidence_threshold)
+                if tokens and (suspicion_filter is None or per_text[index]) else text
+                for index, (text, tokens) in enumerate(zip(texts, token_lists))
+            ]
+            
+        except Exception as e:
+            logger.error(f"BERTバッチ補正エラー: {e}")
+            # エラー時は元のテキストを返す
+            return list(texts)
     
     def get_available_models(self) -> Dict[str, str]:
         """利用可能なモデル一覧を取得"""
@@ -4,17 +4,20 @@ OCRエンジン統合ファクトリ - 調整・本番両用設計
 """
 
 import os
+import time
 import tempfile
 import subprocess
 import fitz  # PyMuPDF
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple, Union
 from datetime import datetime
 
 from app.config import config, logger
 from .spellcheck import get_spell_checker
 from .bert_corrector import get_bert_corrector
+from new.services.ocr.resolution import AdaptiveResolutionPlanner, ResolutionPlan
+from new.services.ocr.engines.easyocr import readtext_batched
 
 # OCRエンジンの抽象基底クラス
 class OCREngine(ABC):
@@ -59,19 +62,64 @@ class OCREngine(ABC):
         if self.spell_checker is None:
             self.spell_checker = get_spell_checker()
         
-        corrected_text = self.spell_checker.correct_text(text)
+        corrected_text, edits = self.spell_checker.correct_text_with_edits(text)
         
-        # 修正箇所を検出して記録（簡易版）
-        if corrected_text != text:
+        # 修正箇所を記録（位置は元テキスト基準）
+        for edit in edits:
             corrections.append({
                 "type": "dictionary",
-                "original": text,
-                "corrected": corrected_text,
-                "changes": "辞書ベース修正"
+                "original": edit["wrong"],
+                "corrected": edit["correct"],
+                "position": edit["start"],
+                "end": edit["end"]
             })
         
         return corrected_text, corrections
     
+    def apply_bert_correction(
+        self,
+        text: str,
+        line_confidences: Optional[List[Tuple[str, float]]] = None
+    ) -> Tuple[str, Dict[str, float]]:
+        """
+        BERT補正適用（疑わしいトークンだけを評価）
+        
+        Args:
+            text: 元テキスト
+            line_confidences: OCRエンジンが返した (行テキスト, 信頼度) のリスト
+            
+        Returns:
+            (修正後テキスト, 選別率等の統計)
+        """
+        if self.bert_corrector is None:
+            self.bert_corrector = get_bert_corrector()
+        corrected_text = self.bert_corrector.correct_text(text, line_confidences=line_confidences)
+        return corrected_text, dict(getattr(self.bert_corrector, "last_stats", {}))
+    
+    def plan_resolution(self, doc, parameters: Dict[str, Any], base_dpi: int) -> Optional[ResolutionPlan]:
+        """
+        適応解像度の計画作成（無効時はNone）
+        
+        Args:
+            doc: PyMuPDFドキュメント
+            parameters: エンジン固有パラメータ（adaptive_resolution, target_x_height）
+            base_dpi: 基準DPI
+            
+        Returns:
+            ページごとのDPI計画
+        """
+        if not parameters.get("adaptive_resolution", config.OCR_ADAPTIVE_DPI):
+            return None
+        
+        planner = AdaptiveResolutionPlanner(
+            target_x_height=parameters.get("target_x_height", config.OCR_TARGET_X_HEIGHT),
+            min_dpi=config.OCR_MIN_DPI,
+            max_dpi=config.OCR_MAX_DPI
+        )
+        plan = planner.plan_document(doc, base_dpi)
+        logger.info(f"{self.engine_name} 適応解像度: {plan.summary()['page_dpis']} (基準 {base_dpi}dpi)")
+        return plan
+    
     def get_page_count(self, pdf_path: str) -> int:
         """PDFページ数を取得"""
         try:
@@ -103,28 +151,58 @@ class EasyOCREngine(OCREngine):
             # EasyOCR Reader 初期化
             reader = easyocr.Reader(languages, gpu=gpu)
             
+            # ページ横断バッチ認識（複数ページの検出領域をまとめて認識）
+            batched = parameters.get("batched_recognition", False)
+            batch_size = parameters.get("recognition_batch_size", 32)
+            page_batch = max(1, parameters.get("page_batch", 8))
+            
             # PDF → 画像変換してOCR実行
             doc = fitz.open(pdf_path)
+            plan = self.plan_resolution(doc, parameters, 300)
+            ocr_start = time.perf_counter()
             all_text = []
+            line_confidences = []  # (行テキスト, 信頼度)：BERT補正候補の選別に使用
+            pending_images = []
             
             for page_num in range(len(doc)):
                 page = doc.load_page(page_num)
                 
-                # 画像化（DPI=300で高品質）
-                zoom = 300 / 72
+                # 画像化（DPI=300で高品質、適応解像度時はページごとのDPI）
+                zoom = (plan.dpi_for(page_num) if plan else 300) / 72
                 mat = fitz.Matrix(zoom, zoom)
                 pix = page.get_pixmap(matrix=mat)
                 img_data = pix.tobytes("png")
                 
+                if batched:
+                    pending_images.append(img_data)
+                    if len(pending_images) < page_batch and page_num < len(doc) - 1:
+                        continue
+                    
+                    # 蓄積したページをまとめて認識し、ページ順に戻す
+                    pages = readtext_batched(
+                        reader,
+                        pending_images,
+                        batch_size=batch_size,
+                        width_ths=width_ths,
+                        height_ths=height_ths
+                    )
+                    first_page = page_num - len(pending_images) + 1
+                    for offset, page_results in enumerate(pages):
+                        page_text = "\n".join(text for _, text, _ in page_results)
+                        line_confidences.extend((text, conf) for _, text, conf in page_results)
+                        all_text.append(f"=== ページ {first_page + offset + 1} ===\n{page_text}")
+                    pending_images = []
+                    continue
+                
                 # EasyOCR実行
                 results = reader.readtext(
                     img_data,
                     width_ths=width_ths,
-                    height_ths=height_ths,
-                    detail=0  # テキストのみ取得
+                    height_ths=height_ths
                 )
                 
-                page_text = "\n".join(results)
+                page_text = "\n".join(text for _, text, _ in results)
+                line_confidences.extend((text, conf) for _, text, conf in results)
                 all_text.append(f"=== ページ {page_num + 1} ===\n{page_text}")
             
             doc.close()
@@ -135,7 +213,9 @@ class EasyOCREngine(OCREngine):
                 "text": combined_text,
                 "engine": self.engine_name,
                 "page_count": len(all_text),
-                "parameters": parameters
+                "parameters": parameters,
+                "resolution": plan.summary(time.perf_counter() - ocr_start) if plan else None,
+                "line_confidences": line_confidences
             }
             
         except Exception as e:
@@ -165,18 +245,18 @@ class TesseractEngine(OCREngine):
             psm = parameters.get("psm", 3)
             oem = parameters.get("oem", 3)
             
-            # Tesseract設定
-            config_str = f"--dpi {dpi} --psm {psm} --oem {oem}"
-            
             # PDF → 画像変換してOCR実行
             doc = fitz.open(pdf_path)
+            plan = self.plan_resolution(doc, parameters, dpi)
+            ocr_start = time.perf_counter()
             all_text = []
             
             for page_num in range(len(doc)):
                 page = doc.load_page(page_num)
                 
-                # 画像化
-                zoom = dpi / 72
+                # 画像化（適応解像度時はページごとのDPI）
+                page_dpi = plan.dpi_for(page_num) if plan else dpi
+                zoom = page_dpi / 72
                 mat = fitz.Matrix(zoom, zoom)
                 pix = page.get_pixmap(matrix=mat)
                 img_data = pix.tobytes("png")
@@ -188,7 +268,7 @@ class TesseractEngine(OCREngine):
                 text = pytesseract.image_to_string(
                     image,
                     lang=lang,
-                    config=config_str
+                    config=f"--dpi {page_dpi} --psm {psm} --oem {oem}"
                 )
                 
                 all_text.append(f"=== ページ {page_num + 1} ===\n{text.strip()}")
@@ -201,7 +281,8 @@ class TesseractEngine(OCREngine):
                 "text": combined_text,
                 "engine": self.engine_name,
                 "page_count": len(all_text),
-                "parameters": parameters
+                "parameters": parameters,
+                "resolution": plan.summary(time.perf_counter() - ocr_start) if plan else None
             }
             
         except Exception as e:
@@ -244,13 +325,15 @@ class PaddleOCREngine(OCREngine):
             
             # PDF → 画像変換してOCR実行
             doc = fitz.open(pdf_path)
+            plan = self.plan_resolution(doc, parameters, 300)
+            ocr_start = time.perf_counter()
             all_text = []
             
             for page_num in range(len(doc)):
                 page = doc.load_page(page_num)
                 
-                # 画像化
-                zoom = 300 / 72
+                # 画像化（適応解像度時はページごとのDPI）
+                zoom = (plan.dpi_for(page_num) if plan else 300) / 72
                 mat = fitz.Matrix(zoom, zoom)
                 pix = page.get_pixmap(matrix=mat)
                 img_data = pix.tobytes("png")
@@ -280,7 +363,8 @@ class PaddleOCREngine(OCREngine):
                 "text": combined_text,
                 "engine": self.engine_name,
                 "page_count": len(all_text),
-                "parameters": parameters
+                "parameters": parameters,
+                "resolution": plan.summary(time.perf_counter() - ocr_start) if plan else None
             }
             
         except Exception as e:
@@ -416,7 +500,8 @@ class OCRService:
         engine_name: str,
         parameters: Dict[str, Any],
         enable_spell_correction: bool = True,
-        page_range: Optional[str] = None
+        page_range: Optional[str] = None,
+        enable_bert_correction: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         PDFのOCR処理を実行
@@ -427,6 +512,7 @@ class OCRService:
             parameters: エンジン固有パラメータ
             enable_spell_correction: 誤字修正フラグ
             page_range: 処理ページ範囲（"1-3" or "all"）
+            enable_bert_correction: BERT補正フラグ（省略時は BERT_CORRECTION_ENABLED）
             
         Returns:
             処理結果辞書
@@ -454,6 +540,13 @@ class OCRService:
                 original_text, enable_spell_correction
             )
             
+            # BERT補正（エンジンの行信頼度で低信頼度行を候補に含める）
+            bert_stats = None
+            if config.BERT_CORRECTION_ENABLED if enable_bert_correction is None else enable_bert_correction:
+                corrected_text, bert_stats = engine.apply_bert_correction(
+                    corrected_text, ocr_result.get("line_confidences")
+                )
+            
             # 結果をまとめる
             return {
                 "status": "success",
@@ -463,6 +556,9 @@ class OCRService:
                 "corrections": corrections,
                 "page_count": ocr_result.get("page_count", 1),
                 "parameters": parameters,
+                "resolution": ocr_result.get("resolution"),
+                "line_confidences": ocr_result.get("line_confidences"),
+                "bert_stats": bert_stats,
                 "timestamp": datetime.now().isoformat()
             }
             
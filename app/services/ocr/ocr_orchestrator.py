@@ -4,14 +4,73 @@ OCRオーケストレーター - OCR調整とRAGデータ作成の両用サー
 UI層とRAGプロセスから共通して利用される汎用OCRサービス
 """
 
+import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Callable, List
 from datetime import datetime
 
+from app.config import config, logger
+from app.core.db_simple import get_file_sizes
 from app.services.ocr.ocr_simple import get_unified_ocr_service
 from app.services.ocr.file_handler import get_ocr_file_handler
 
 
+class RenderMemoryBudget:
+    """
+    同時実行ファイル間で共有する画像化メモリの予算（重み付きセマフォ）
+    
+    予約量が上限を超える場合は解放を待つ。単独で上限を超えるファイルは
+    他に実行中のファイルがなければ通す（デッドロック回避）。
+    """
+    
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.in_use = 0
+        self._condition = asyncio.Condition()
+    
+    async def acquire(self, nbytes: int) -> None:
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self.in_use == 0 or self.in_use + nbytes <= self.limit_bytes
+            )
+            self.in_use += nbytes
+    
+    async def release(self, nbytes: int) -> None:
+        async with self._condition:
+            self.in_use -= nbytes
+            self._condition.notify_all()
+
+
+def estimate_render_bytes(blob_data: Any, dpi: int, pages_in_flight: int = 1) -> int:
+    """
+    OCR中に同時に保持される画像化ページのメモリ量を推定
+    
+    Args:
+        blob_data: PDFバイナリデータ
+        dpi: 画像化DPI
+        pages_in_flight: 1ファイル内で同時に保持するページ数
+        
+    Returns:
+        推定バイト数（最大ページのRGB画像 × 同時保持ページ数）
+    """
+    try:
+        import fitz
+        
+        if isinstance(blob_data, memoryview):
+            blob_data = blob_data.tobytes()
+        
+        doc = fitz.open(stream=blob_data, filetype="pdf")
+        max_area = max((page.rect.width * page.rect.height for page in doc), default=0)
+        doc.close()
+    except Exception as e:
+        logger.warning(f"画像化メモリ推定エラー（A4として扱う）: {e}")
+        max_area = 595 * 842
+    
+    zoom = dpi / 72
+    return int(max_area * zoom * zoom * 3) * max(1, pages_in_flight)
+
+
 class OCROrchestrator:
     """OCR処理統合管理サービス（OCR調整・RAGデータ作成両用）"""
     
@@ -161,7 +220,10 @@ class OCROrchestrator:
                                  file_ids: List[str],
                                  engine_name: str = "OCRMyPDF",
                                  enable_spell_correction: bool = True,
-                                 progress_callback: Optional[Callable[[str], None]] = None) -> List[Dict[str, Any]]:
+                                 progress_callback: Optional[Callable[[str], None]] = None,
+                                 max_concurrency: Optional[int] = None,
+                                 memory_limit_mb: Optional[int] = None,
+                                 file_progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
         """
         複数ファイルの一括OCR処理（RAGデータ作成用）
         
@@ -170,10 +232,27 @@ class OCROrchestrator:
             engine_name: OCRエンジン名
             enable_spell_correction: 誤字修正有効フラグ
             progress_callback: 進捗通知コールバック
+            max_concurrency: 同時処理ファイル数（省略時は設定値、1なら逐次処理）
+            memory_limit_mb: 同時処理中の画像化メモリ上限（省略時は設定値）
+            file_progress_callback: ファイル単位の構造化進捗コールバック（並行処理時）
             
         Returns:
-            OCR結果リスト
+            OCR結果リスト（file_idsと同じ順序）
         """
+        if max_concurrency is None:
+            max_concurrency = config.OCR_BATCH_CONCURRENCY
+        
+        if max_concurrency > 1 and len(file_ids) > 1:
+            return await self._batch_process_files_concurrent(
+                file_ids,
+                engine_name=engine_name,
+                enable_spell_correction=enable_spell_correction,
+                max_concurrency=max_concurrency,
+                memory_limit_mb=memory_limit_mb or config.OCR_RENDER_MEMORY_LIMIT_MB,
+                progress_callback=progress_callback,
+                file_progress_callback=file_progress_callback
+            )
+        
         results = []
         total_files = len(file_ids)
         
@@ -192,6 +271,138 @@ class OCROrchestrator:
         return results
 
 
+    def _run_ocr_sync(self,
+                      file_id: str,
+                      file_data: Dict[str, Any],
+                      engine_name: str,
+                      engine_params: Dict[str, Any],
+                      enable_spell_correction: bool) -> Dict[str, Any]:
+        """準備済みファイルデータでOCRを実行（ワーカースレッド用）"""
+        result = self.ocr_service.process_pdf(
+            blob_data=file_data["blob_data"],
+            engine_name=engine_name,
+            parameters=engine_params,
+            enable_spell_correction=enable_spell_correction
+        )
+        
+        if result["status"] == "success":
+            result.update({
+                "file_id": file_id,
+                "filename": file_data.get("filename", "unknown"),
+                "page_count": file_data.get("page_count", 1),
+                "blob_id": file_data.get("blob_id", ""),
+                "processing_timestamp": datetime.now().isoformat()
+            })
+        
+        return result
+    
+    async def _batch_process_files_concurrent(self,
+                                              file_ids: List[str],
+                                              engine_name: str,
+                                              enable_spell_correction: bool,
+                                              max_concurrency: int,
+                                              memory_limit_mb: int,
+                                              progress_callback: Optional[Callable[[str], None]] = None,
+                                              file_progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        複数ファイルの並行OCR処理
+        
+        大きいファイルから順に投入し（最長処理時間優先で全体の完了時刻を短縮）、
+        同時実行数と画像化メモリの合計を上限内に抑える。
+        """
+        total_files = len(file_ids)
+        engine_params = self.get_engine_parameters(engine_name)
+        dpi = engine_params.get("dpi", config.OCR_DPI)
+        pages_in_flight = engine_params.get("page_batch", 1) if engine_params.get("batched_recognition") else 1
+        
+        # 大きいファイルから処理（サイズ不明は末尾）
+        sizes = get_file_sizes(file_ids)
+        order = sorted(range(total_files), key=lambda i: sizes.get(str(file_ids[i]), 0), reverse=True)
+        
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(max_concurrency)
+        budget = RenderMemoryBudget(memory_limit_mb * 1024 * 1024)
+        results: List[Optional[Dict[str, Any]]] = [None] * total_files
+        completed = 0
+        batch_start = time.perf_counter()
+        
+        def emit(index: int, status: str, **details):
+            if file_progress_callback:
+                file_progress_callback({
+                    "file_id": file_ids[index],
+                    "index": index,
+                    "total": total_files,
+                    "completed": completed,
+                    "status": status,
+                    "file_size": sizes.get(str(file_ids[index]), 0),
+                    "timestamp": datetime.now().isoformat(),
+                    **details
+                })
+        
+        async def process_one(index: int, executor: ThreadPoolExecutor):
+            nonlocal completed
+            file_id = file_ids[index]
+            queued_at = time.perf_counter()
+            
+            async with slots:
+                started_at = time.perf_counter()
+                emit(index, "running", queue_wait=round(started_at - queued_at, 3))
+                reserved = 0
+                memory_wait = 0.0
+                try:
+                    file_data = await loop.run_in_executor(executor, self.file_handler.prepare_ocr_data, file_id)
+                    if file_data["status"] != "success":
+                        result = {"status": "error", "error": f"ファイル準備エラー: {file_data['error']}"}
+                    else:
+                        estimate = estimate_render_bytes(file_data["blob_data"], dpi, pages_in_flight)
+                        wait_start = time.perf_counter()
+                        await budget.acquire(estimate)
+                        # 確保できてから記録（待機中にキャンセルされたら解放しない）
+                        reserved = estimate
+                        memory_wait = time.perf_counter() - wait_start
+                        result = await loop.run_in_executor(
+                            executor, self._run_ocr_sync,
+                            file_id, file_data, engine_name, engine_params, enable_spell_correction
+                        )
+                except Exception as e:
+                    result = {"status": "error", "error": f"予期しないエラー: {str(e)}"}
+                finally:
+                    if reserved:
+                        await budget.release(reserved)
+                
+                elapsed = time.perf_counter() - started_at
+                result.setdefault("file_id", file_id)
+                # 処理時間はメモリ予算の待ち時間を除く（待ち時間は別に記録）
+                result.setdefault("processing_time", round(elapsed - memory_wait, 3))
+                result["memory_wait"] = round(memory_wait, 3)
+                results[index] = result
+                completed += 1
+                
+                emit(
+                    index,
+                    "done" if result.get("status") == "success" else "error",
+                    elapsed=round(elapsed, 3),
+                    memory_wait=round(memory_wait, 3),
+                    page_count=result.get("page_count"),
+                    render_memory_bytes=reserved,
+                    error=result.get("error")
+                )
+                if progress_callback:
+                    progress_callback(f"処理完了 {completed}/{total_files}: {file_id}")
+        
+        for index in order:
+            emit(index, "queued")
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ocr-batch") as executor:
+            await asyncio.gather(*(process_one(index, executor) for index in order))
+        
+        logger.info(
+            f"一括OCR完了: {total_files}件 / 同時{max_concurrency}件 / "
+            f"{time.perf_counter() - batch_start:.1f}秒"
+        )
+        return results
+
+
 # オーケストレーターインスタンス取得
 _orchestrator_instance = None
 
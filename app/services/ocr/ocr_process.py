@@ -6,11 +6,13 @@ PDFからのテキスト抽出・構造化処理
 import os
 import subprocess
 import fitz  # PyMuPDF
-from collections import defaultdict
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 from app.config import config, logger
+from new.services.ocr.layout import (
+    LayoutEngine, assign_columns, column_intervals, group_rows, label_value_pairs
+)
 
 class OCRProcessor:
     """OCR処理サービス"""
@@ -19,6 +21,7 @@ class OCRProcessor:
         self.ocr_language = config.OCR_LANGUAGE
         self.ocr_dpi = config.OCR_DPI
         self.ocr_optimize = config.OCR_OPTIMIZE
+        self.layout_engine = LayoutEngine()
     
     def has_embedded_text(self, pdf_path: str) -> bool:
         """PDF内にテキストが埋め込まれているか確認"""
@@ -89,64 +92,32 @@ class OCRProcessor:
                 
         return text_blocks
     
-    def cluster_columns(self, blocks: List[Dict], x_threshold: int = 100) -> List[List[Dict]]:
-        """X座標で段組み（左本文／右表など）を分ける"""
-        columns = defaultdict(list)
-        
-        for block in blocks:
-            x0 = block['bbox'][0]
-            col_key = int(x0 // x_threshold)
-            columns[col_key].append(block)
-            
-        return [columns[k] for k in sorted(columns)]
+    def cluster_columns(
+        self,
+        blocks: List[Dict],
+        x_gap: float = 12.0,
+        page_width: Optional[float] = None
+    ) -> List[List[Dict]]:
+        """X方向の区間の重なり・近接で段組み（左本文／右表など）を分ける"""
+        intervals = column_intervals(blocks, x_gap, page_width)
+        return assign_columns(blocks, intervals)
     
     def group_rows_by_y(self, blocks: List[Dict], y_threshold: int = 15) -> List[List[Dict]]:
         """Y座標で行グループ化"""
-        rows = []
-        
-        for block in sorted(blocks, key=lambda b: b["bbox"][1]):
-            added = False
-            
-            for row in rows:
-                if abs(row[0]["bbox"][1] - block["bbox"][1]) < y_threshold:
-                    row.append(block)
-                    added = True
-                    break
-                    
-            if not added:
-                rows.append([block])
-                
-        return rows
+        return group_rows(blocks, y_threshold)
     
     def extract_label_value_pairs_from_rows(self, rows: List[List[Dict]]) -> List[str]:
         """ラベルと値のペアを抽出"""
-        structured = []
-        
-        for i in range(len(rows) - 1):
-            label_row = sorted(rows[i], key=lambda b: b["bbox"][0])
-            value_row = sorted(rows[i + 1], key=lambda b: b["bbox"][0])
-            
-            for j in range(min(len(label_row), len(value_row))):
-                label = label_row[j]["text"]
-                value = value_row[j]["text"]
-                structured.append(f"{label.strip()}: {value.strip()}")
-                
-        return structured
+        return label_value_pairs(rows)
     
     def extract_and_structure_text(self, doc) -> List[str]:
-        """PDFドキュメントからテキストを抽出し、構造化された形式に変換"""
-        structured_text = []
+        """
+        PDFドキュメントからテキストを抽出し、構造化された形式に変換
         
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            blocks = self.extract_text_blocks(page)
-            columns = self.cluster_columns(blocks)
-            
-            for col_blocks in columns:
-                rows = self.group_rows_by_y(col_blocks)
-                structured_text.extend(self.extract_label_value_pairs_from_rows(rows))
-                
-        return structured_text
+        各ページの rawdict を1回だけ取得し、文字座標からセルを切り出して
+        段組み → 行 → ラベル・値ペアの順に構造化する。
+        """
+        return self.layout_engine.structure_document(doc)
     
     def process_pdf(self, input_path: str, output_dir: str = None) -> Dict[str, Any]:
         """
@@ -5,11 +5,99 @@ MeCabと誤字辞書を使用した日本語テキスト補正
 
 import os
 import csv
+import hashlib
+import threading
 import MeCab
-from typing import List, Dict, Set, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, List, Dict, Mapping, Optional, Tuple, NamedTuple
 from pathlib import Path
 
 from app.config import config, logger
+from new.utils.pattern_matcher import MultiPatternMatcher, PatternMatcher
+from new.utils.dictionary_artifact import (
+    KNOWN_WORD_FILES, MISTAKES_FILE, DictionaryArtifact, get_dictionary_artifact
+)
+
+class TextAnalysis(NamedTuple):
+    """MeCab解析結果（キャッシュ単位）"""
+    surfaces: Tuple[str, ...]
+    unknown_spans: Tuple[Tuple[int, int], ...]
+
+
+class TokenizationCache:
+    """テキストハッシュをキーとした解析結果のLRUキャッシュ（スレッドセーフ）"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, TextAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: bytes) -> Optional[TextAnalysis]:
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return analysis
+    
+    def put(self, key: bytes, analysis: TextAnalysis) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _text_key(text: str) -> bytes:
+    """キャッシュキー（テキスト全体は保持しない）"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+# プロセス内で共有する解析キャッシュとスレッドごとのタガー
+_analysis_cache = TokenizationCache(config.MECAB_CACHE_SIZE)
+_thread_local = threading.local()
+
+
+def get_thread_tagger() -> Optional["MeCab.Tagger"]:
+    """
+    呼び出しスレッド専用のMeCabタガーを取得（初回のみ生成）
+    
+    MeCab.Taggerはスレッドセーフではないため、スレッドプールの各ワーカーが自分のタガーを持つ。
+    
+    Returns:
+        タガー（生成失敗時はNone、失敗はスレッドごとに1回だけ記録）
+    """
+    if hasattr(_thread_local, "tagger"):
+        return _thread_local.tagger
+    
+    tagger = None
+    try:
+        # システムのMeCab辞書を使用
+        tagger = MeCab.Tagger("-Owakati")
+        logger.info(f"MeCab初期化成功 ({threading.current_thread().name})")
+    except Exception as e:
+        logger.warning(f"MeCab初期化失敗（デフォルト設定）: {e}")
+        try:
+            # 代替パスを試行
+            tagger = MeCab.Tagger("-d /usr/lib/x86_64-linux-gnu/mecab/dic/mecab-ipadic-neologd -Owakati")
+            logger.info("MeCab初期化成功（NEologd辞書）")
+        except Exception as e2:
+            logger.error(f"MeCab初期化に失敗しました: {e2}")
+    
+    _thread_local.tagger = tagger
+    return tagger
+
 
 class SpellChecker:
     """OCR誤字補正サービス"""
@@ -24,31 +112,24 @@ class SpellChecker:
         else:
             self.dict_dir = Path(dict_dir)
         
-        # MeCab初期化
-        self.mecab = None
+        # MeCab初期化（タガーはスレッドごとに生成）
         self._init_mecab()
         
         # 辞書キャッシュ
         self._known_words_cache = None
         self._kanji_mistakes_cache = None
+        self._matcher_cache: Dict[Tuple, MultiPatternMatcher] = {}
     
     def _init_mecab(self):
-        """MeCab初期化"""
-        try:
-            # システムのMeCab辞書を使用
-            self.mecab = MeCab.Tagger("-Owakati")
-            logger.info("MeCab初期化成功")
-        except Exception as e:
-            logger.warning(f"MeCab初期化失敗（デフォルト設定）: {e}")
-            try:
-                # 代替パスを試行
-                self.mecab = MeCab.Tagger("-d /usr/lib/x86_64-linux-gnu/mecab/dic/mecab-ipadic-neologd -Owakati")
-                logger.info("MeCab初期化成功（NEologd辞書）")
-            except Exception as e2:
-                logger.error(f"MeCab初期化に失敗しました: {e2}")
-                self.mecab = None
+        """MeCab初期化（呼び出しスレッドのタガーを生成して利用可否を確認）"""
+        get_thread_tagger()
+    
+    @property
+    def mecab(self) -> Optional["MeCab.Tagger"]:
+        """呼び出しスレッド専用のMeCabタガー（スレッド間で共有しない）"""
+        return get_thread_tagger()
     
-    def load_known_words(self, csv_paths: List[str]) -> Set[str]:
+    def load_known_words(self, csv_paths: List[str]) -> AbstractSet[str]:
         """
         既知単語を複数CSVから読み込み
         
@@ -58,6 +139,12 @@ class SpellChecker:
         Returns:
             既知単語のセット
         """
+        # 既定の辞書はコンパイル済みアーティファクトを使用（更新時は自動で読み直し）
+        if tuple(csv_paths) == KNOWN_WORD_FILES:
+            artifact = self._get_artifact()
+            if artifact is not None:
+                return artifact.known_words
+        
         if self._known_words_cache is not None:
             return self._known_words_cache
             
@@ -83,7 +170,7 @@ class SpellChecker:
         self._known_words_cache = words
         return words
     
-    def load_kanji_mistakes(self, csv_path: str) -> Dict[str, str]:
+    def load_kanji_mistakes(self, csv_path: str) -> Mapping[str, str]:
         """
         誤字辞書をCSVから読み込み
         
@@ -93,6 +180,11 @@ class SpellChecker:
         Returns:
             誤字→正字の辞書
         """
+        if csv_path == MISTAKES_FILE:
+            artifact = self._get_artifact()
+            if artifact is not None:
+                return artifact.mistakes
+        
         if self._kanji_mistakes_cache is not None:
             return self._kanji_mistakes_cache
             
@@ -122,6 +214,67 @@ class SpellChecker:
         self._kanji_mistakes_cache = mapping
         return mapping
     
+    def _analyze(self, text: str) -> Optional[TextAnalysis]:
+        """
+        MeCab解析（表層形と未知語範囲、テキストハッシュでキャッシュ）
+        
+        Returns:
+            解析結果（MeCab未初期化・解析エラー時はNone）
+        """
+        key = _text_key(text)
+        analysis = _analysis_cache.get(key)
+        if analysis is not None:
+            return analysis
+        
+        tagger = self.mecab
+        if tagger is None:
+            return None
+        
+        surfaces = []
+        unknown_spans = []
+        cursor = 0
+        try:
+            node = tagger.parseToNode(text)
+            while node:
+                surface = node.surface
+                if surface:
+                    surfaces.append(surface)
+                    position = text.find(surface, cursor)
+                    if position >= 0:
+                        cursor = position + len(surface)
+                        if node.stat == MeCab.MECAB_UNK_NODE:
+                            unknown_spans.append((position, cursor))
+                node = node.next
+        except Exception as e:
+            logger.error(f"MeCab解析エラー: {e}")
+            return None
+        
+        analysis = TextAnalysis(tuple(surfaces), tuple(unknown_spans))
+        _analysis_cache.put(key, analysis)
+        return analysis
+    
+    def analyze_batch(self, texts: List[str], max_workers: int = 1) -> List[Optional[TextAnalysis]]:
+        """
+        複数テキスト（ページ等）をまとめて解析
+        
+        重複テキストは1回だけ解析し、キャッシュ済みのものは再解析しない。
+        max_workers > 1 の場合はスレッドごとのタガーで並列に解析する。
+        
+        Args:
+            texts: 入力テキストのリスト
+            max_workers: 並列スレッド数
+            
+        Returns:
+            textsと同順の解析結果
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        if max_workers > 1 and len(unique_texts) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = dict(zip(unique_texts, executor.map(self._analyze, unique_texts)))
+        else:
+            results = {text: self._analyze(text) for text in unique_texts}
+        return [results[text] for text in texts]
+    
     def tokenize(self, text: str) -> List[str]:
         """
         MeCab分かち書き
@@ -136,28 +289,56 @@ class SpellChecker:
             logger.warning("MeCabが初期化されていません")
             return text.split()  # フォールバック：空白で分割
         
-        try:
-            return self.mecab.parse(text).strip().split()
-        except Exception as e:
-            logger.error(f"MeCab分かち書きエラー: {e}")
+        analysis = self._analyze(text)
+        if analysis is None:
             return text.split()  # フォールバック
+        return list(analysis.surfaces)
     
-    def correct_text(
+    def tokenize_batch(self, texts: List[str], max_workers: int = 1) -> List[List[str]]:
+        """複数テキストの分かち書き（analyze_batch参照）"""
+        return [
+            list(analysis.surfaces) if analysis is not None else text.split()
+            for text, analysis in zip(texts, self.analyze_batch(texts, max_workers))
+        ]
+
+    def unknown_word_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        MeCab未知語の文字範囲を抽出
+
+        Args:
+            text: 入力テキスト
+
+        Returns:
+            (開始, 終了) のリスト（MeCab未初期化時は空）
+        """
+        analysis = self._analyze(text)
+        return list(analysis.unknown_spans) if analysis is not None else []
+    
+    def unknown_word_spans_batch(self, texts: List[str], max_workers: int = 1) -> List[List[Tuple[int, int]]]:
+        """複数テキストの未知語範囲（analyze_batch参照）"""
+        return [
+            list(analysis.unknown_spans) if analysis is not None else []
+            for analysis in self.analyze_batch(texts, max_workers)
+        ]
+
+    def _get_artifact(self) -> Optional[DictionaryArtifact]:
+        """辞書ディレクトリのコンパイル済みアーティファクト（利用不可ならNone）"""
+        return get_dictionary_artifact(self.dict_dir)
+
+    def get_matcher(
         self,
-        text: str,
         known_word_paths: Optional[List[str]] = None,
         kanji_mistakes_path: Optional[str] = None
-    ) -> str:
+    ) -> PatternMatcher:
         """
-        メイン補正関数
+        誤字辞書と既知単語からコンパイル済みの多パターン照合器を取得
         
         Args:
-            text: 入力テキスト
             known_word_paths: 既知単語辞書パス（省略時はデフォルト）
             kanji_mistakes_path: 誤字辞書パス（省略時はデフォルト）
             
         Returns:
-            補正後テキスト
+            照合器（辞書パスごとにキャッシュ）
         """
         # デフォルト辞書パス
         if known_word_paths is None:
@@ -168,25 +349,68 @@ class SpellChecker:
         if kanji_mistakes_path is None:
             kanji_mistakes_path = "ocr_word_mistakes.csv"
         
-        # 辞書読み込み
-        known_words = self.load_known_words(known_word_paths)
-        kanji_mistakes = self.load_kanji_mistakes(kanji_mistakes_path)
+        # 既定の辞書はアーティファクトのコンパイル済み照合器をそのまま使う
+        if tuple(known_word_paths) == KNOWN_WORD_FILES and kanji_mistakes_path == MISTAKES_FILE:
+            artifact = self._get_artifact()
+            if artifact is not None:
+                return artifact.matcher
         
-        # 誤字補正
-        corrected_text = text
-        correction_count = 0
+        cache_key = (tuple(known_word_paths), kanji_mistakes_path)
+        matcher = self._matcher_cache.get(cache_key)
+        if matcher is None:
+            known_words = self.load_known_words(known_word_paths)
+            kanji_mistakes = self.load_kanji_mistakes(kanji_mistakes_path)
+            # 既知単語は誤字パターンから除外し、テキスト中の出現箇所も置換から保護する
+            matcher = MultiPatternMatcher(kanji_mistakes, protected=known_words)
+            self._matcher_cache[cache_key] = matcher
+        return matcher
+    
+    def correct_text_with_edits(
+        self,
+        text: str,
+        known_word_paths: Optional[List[str]] = None,
+        kanji_mistakes_path: Optional[str] = None
+    ) -> Tuple[str, List[Dict]]:
+        """
+        誤字補正（置換箇所付き）
         
-        for wrong, correct in kanji_mistakes.items():
-            if wrong not in known_words:
-                # 置換実行
-                if wrong in corrected_text:
-                    corrected_text = corrected_text.replace(wrong, correct)
-                    correction_count += 1
-                    logger.debug(f"誤字補正: {wrong} → {correct}")
+        全辞書パターンをテキスト1回の走査で検出し、最左最長一致で置換する。
         
-        if correction_count > 0:
-            logger.info(f"✅ {correction_count}箇所の誤字を補正しました")
+        Args:
+            text: 入力テキスト
+            known_word_paths: 既知単語辞書パス（省略時はデフォルト）
+            kanji_mistakes_path: 誤字辞書パス（省略時はデフォルト）
+            
+        Returns:
+            (補正後テキスト, 置換箇所リスト)
+            置換箇所は {"start", "end", "wrong", "correct"}（位置は元テキスト基準）
+        """
+        matcher = self.get_matcher(known_word_paths, kanji_mistakes_path)
+        corrected_text, edits = matcher.replace(text)
+        
+        if edits:
+            logger.info(f"✅ {len(edits)}箇所の誤字を補正しました")
         
+        return corrected_text, edits
+    
+    def correct_text(
+        self,
+        text: str,
+        known_word_paths: Optional[List[str]] = None,
+        kanji_mistakes_path: Optional[str] = None
+    ) -> str:
+        """
+        メイン補正関数
+        
+        Args:
+            text: 入力テキスト
+            known_word_paths: 既知単語辞書パス（省略時はデフォルト）
+            kanji_mistakes_path: 誤字辞書パス（省略時はデフォルト）
+            
+        Returns:
+            補正後テキスト
+        """
+        corrected_text, _ = self.correct_text_with_edits(text, known_word_paths, kanji_mistakes_path)
         return corrected_text
     
     def create_default_dictionaries(self):
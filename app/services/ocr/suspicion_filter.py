@@ -0,0 +1,187 @@
+"""
+BERT補正候補の事前選別
+MeCab未知語・OCR誤認識しやすい文字・OCR低信頼度行から疑わしい箇所だけを抽出する
+"""
+
+import re
+import unicodedata
+from typing import List, Optional, Set, Tuple
+
+from app.config import logger
+
+Span = Tuple[int, int]
+
+
+def align_tokens(tokens: List[str], text: str) -> List[Optional[Span]]:
+    """
+    サブワードトークンを元テキストの文字範囲に対応付け
+
+    トークナイザーのNFKC正規化を考慮し、正規化後テキスト上で前方探索する。
+    対応付けできないトークン（[UNK]等）はNone。
+    """
+    # 正規化後の各文字 → 元テキスト位置
+    normalized_chars = []
+    origin = []
+    for index, char in enumerate(text):
+        for normalized in unicodedata.normalize("NFKC", char):
+            normalized_chars.append(normalized)
+            origin.append(index)
+    normalized_text = "".join(normalized_chars)
+
+    spans: List[Optional[Span]] = []
+    cursor = 0
+    for token in tokens:
+        surface = token[2:] if token.startswith("##") else token
+        position = normalized_text.find(surface, cursor) if surface else -1
+        if position < 0 and surface:
+            # 大文字小文字の正規化にも対応（lower() は文字数が変わり得るため、テキストはそのままで探索）
+            match = re.compile(re.escape(surface), re.IGNORECASE).search(normalized_text, cursor)
+            position = match.start() if match else -1
+            if match:
+                surface = match.group()
+        if position < 0:
+            spans.append(None)
+            continue
+        end = position + len(surface)
+        spans.append((origin[position], origin[end - 1] + 1))
+        cursor = end
+    return spans
+
+
+class SuspicionFilter:
+    """BERT補正候補の事前選別"""
+
+    def __init__(
+        self,
+        spell_checker=None,
+        confusion_chars: Optional[Set[str]] = None,
+        min_confidence: float = 0.6,
+        use_unknown_words: bool = True
+    ):
+        """
+        Args:
+            spell_checker: MeCab未知語判定・誤字辞書読み込みに使うSpellChecker
+            confusion_chars: 誤認識しやすい文字（省略時は誤字辞書から生成）
+            min_confidence: これ未満のOCR信頼度の行を疑わしいとみなす
+            use_unknown_words: MeCab未知語を候補に含めるか
+        """
+        self.spell_checker = spell_checker
+        self.min_confidence = min_confidence
+        self.use_unknown_words = use_unknown_words and spell_checker is not None
+        if confusion_chars is None:
+            confusion_chars = set()
+            if spell_checker is not None:
+                confusion_chars = self.confusion_chars_from_mistakes(
+                    spell_checker.load_kanji_mistakes("ocr_word_mistakes.csv")
+                )
+        self.confusion_chars = confusion_chars
+
+    @staticmethod
+    def confusion_chars_from_mistakes(mistakes) -> Set[str]:
+        """誤字辞書から取り違えの起きる文字を抽出（同じ長さの対は異なる位置の文字のみ）"""
+        chars: Set[str] = set()
+        for wrong, correct in mistakes.items():
+            if len(wrong) == len(correct):
+                for a, b in zip(wrong, correct):
+                    if a != b:
+                        chars.update((a, b))
+            else:
+                chars.update(wrong)
+        return chars
+
+    def find_spans(
+        self,
+        text: str,
+        line_confidences: Optional[List[Tuple[str, float]]] = None
+    ) -> List[Span]:
+        """
+        疑わしい文字範囲を抽出
+
+        Args:
+            text: 入力テキスト
+            line_confidences: OCRエンジンが返した (行テキスト, 信頼度) のリスト
+
+        Returns:
+            重なりを統合した (開始, 終了) のリスト（位置順）
+        """
+        unknown_spans = self.spell_checker.unknown_word_spans(text) if self.use_unknown_words else []
+        return self._collect_spans(text, unknown_spans, line_confidences)
+
+    def find_spans_batch(
+        self,
+        texts: List[str],
+        line_confidences_list: Optional[List[Optional[List[Tuple[str, float]]]]] = None
+    ) -> List[List[Span]]:
+        """複数テキスト（ページ等）の疑わしい範囲をまとめて抽出（MeCab解析は一括）"""
+        if self.use_unknown_words:
+            unknown_spans_list = self.spell_checker.unknown_word_spans_batch(texts)
+        else:
+            unknown_spans_list = [[] for _ in texts]
+        if line_confidences_list is None:
+            line_confidences_list = [None] * len(texts)
+        return [
+            self._collect_spans(text, unknown_spans, line_confidences)
+            for text, unknown_spans, line_confidences in zip(texts, unknown_spans_list, line_confidences_list)
+        ]
+
+    def _collect_spans(
+        self,
+        text: str,
+        unknown_spans: List[Span],
+        line_confidences: Optional[List[Tuple[str, float]]]
+    ) -> List[Span]:
+        """各シグナルの範囲を集めて統合"""
+        # MeCab未知語
+        spans: List[Span] = list(unknown_spans)
+
+        # 誤認識しやすい文字
+        if self.confusion_chars:
+            spans.extend((i, i + 1) for i, char in enumerate(text) if char in self.confusion_chars)
+
+        # OCR低信頼度行
+        if line_confidences:
+            cursor = 0
+            for line, confidence in line_confidences:
+                if not line:
+                    continue
+                position = text.find(line, cursor)
+                if position < 0:
+                    continue
+                cursor = position + len(line)
+                if confidence < self.min_confidence:
+                    spans.append((position, cursor))
+
+        # 統合
+        merged: List[Span] = []
+        for start, end in sorted(spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def select_tokens(tokens: List[str], text: str, spans: List[Span]) -> Set[int]:
+        """疑わしい範囲に重なるトークン番号（対応付けできないトークンも含める）"""
+        selected = set()
+        span_index = 0
+        for index, token_span in enumerate(align_tokens(tokens, text)):
+            if token_span is None:
+                selected.add(index)
+                continue
+            start, end = token_span
+            while span_index < len(spans) and spans[span_index][1] <= start:
+                span_index += 1
+            if span_index < len(spans) and spans[span_index][0] < end:
+                selected.add(index)
+        return selected
+
+
+def get_suspicion_filter(min_confidence: float = 0.6) -> SuspicionFilter:
+    """既定のスペルチェッカーを使う事前選別インスタンス取得"""
+    from . import get_spell_checker  # MeCab未導入時はダミー実装
+
+    spell_checker = get_spell_checker()
+    suspicion_filter = SuspicionFilter(spell_checker, min_confidence=min_confidence)
+    logger.info(f"BERT補正候補選別: 誤認識文字 {len(suspicion_filter.confusion_chars)}種")
+    return suspicion_filter
@@ -49,6 +49,31 @@ fastapi_app.middleware("http")(add_security_headers)
 from app.api import upload_logs
 fastapi_app.include_router(upload_logs.router, prefix="/api/upload", tags=["upload"])
 
+# BLOB移行（BLOB_MIGRATION_ON_STARTUP=true の場合のみ、起動後にバックグラウンドで実行）
+blob_migration = None
+
+def start_blob_migration():
+    """BYTEA に残っているファイル本体の外部格納先への移行を開始"""
+    global blob_migration
+    from app.config import config
+    if not config.BLOB_MIGRATION_ON_STARTUP or config.BLOB_STORE_BACKEND == "database":
+        return
+    try:
+        from app.services.blob_migration_service import BlobMigrationService
+        blob_migration = BlobMigrationService()
+        blob_migration.start()
+        logger.info("BLOB移行をバックグラウンドで開始しました")
+    except Exception as e:
+        logger.error(f"BLOB移行の開始に失敗: {e}")
+
+def stop_blob_migration():
+    """処理中の1行を終えてから移行を止める"""
+    if blob_migration is not None:
+        blob_migration.stop()
+
+nicegui_app.on_startup(start_blob_migration)
+nicegui_app.on_shutdown(stop_blob_migration)
+
 # グローバルCSS設定（UI設計ポリシー準拠・1箇所のみ定義）
 ui.add_head_html('''
 <style>
@@ -4,9 +4,10 @@
 # ── 標準ライブラリ ──
 import os
 import json
+import time
 import asyncio
 import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from io import BytesIO
 
 # ── サードパーティ ──
@@ -14,9 +15,12 @@ from fastapi import APIRouter, Form, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 
 # ── プロジェクト内 ──
-from new.config import LOGGER
+from new.config import LOGGER, settings
 from new.schemas import SuccessResponse, ErrorResponse
 from new.auth_functions import require_authentication
+from new.database.connection import SessionLocal
+from new.services.chat_service import ChatService
+from new.services.llm.ollama_client import OllamaClient
 
 # ──────────────────────────────────────────────────────────
 # ルーター設定
@@ -213,6 +217,157 @@ async def handle_search_query(
             "results": []
         }
 
+def _sse(event: Dict) -> str:
+    """SSEの1イベント（ingest のストリームと同じく type を含むJSON）"""
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+def _snippet(text: str, limit: int = 200) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= limit else text[:limit] + "…"
+
+def _format_results(mode: str, search_results: List[Dict], file_names: Dict[str, str], search_limit: int) -> List[Dict]:
+    """
+    検索結果を画面表示用に整形
+    
+    チャンク統合モードはチャンクごと（snippet）、ファイル別モードはファイルごとに最高一致度のチャンクを summary にする
+    """
+    if mode == "チャンク統合":
+        return [
+            {
+                "file_id": r["file_id"],
+                "file_name": file_names.get(r["file_id"], r["file_id"]),
+                "snippet": _snippet(r["content"]),
+                "score": r["similarity"],
+            }
+            for r in search_results[:search_limit]
+        ]
+    
+    by_file: Dict[str, Dict] = {}
+    for r in search_results:
+        best = by_file.get(r["file_id"])
+        if best is None or r["similarity"] > best["score"]:
+            text = r["content"] if r["type"] == "text" else (r.get("llm_description") or r.get("ocr_text") or r["content"])
+            by_file[r["file_id"]] = {
+                "file_id": r["file_id"],
+                "file_name": file_names.get(r["file_id"], r["file_id"]),
+                "summary": _snippet(text, 400),
+                "score": r["similarity"],
+            }
+    return sorted(by_file.values(), key=lambda item: item["score"], reverse=True)[:search_limit]
+
+async def stream_search_query(
+    request: Request,
+    query: str,
+    model_key: str,
+    mode: str = "チャンク統合",
+    search_limit: int = 10,
+    min_score: float = 0.0
+) -> AsyncIterator[str]:
+    """
+    検索クエリを処理し、SSEイベントを順に返す
+    
+    1. retrieval: 検索が終わった時点で検索結果・参照ファイル・コンテキスト統計を送る
+    2. token: チャンク統合モードでは LLM の生成断片を届いた順に送る
+    3. done: 回答全文と計測値（検索時間・最初のトークンまで・生成時間・全体）を送る
+    
+    クライアント切断・/stop_search で生成を中断する（Ollamaへの接続も切る）。
+    """
+    global _search_cancelled
+    _search_cancelled = False
+    abort_flag = {"flag": False}
+    chat_service = ChatService()
+    start_time = time.perf_counter()
+    timing = {"retrieval": None, "ttft": None, "first_token": None, "generation": None, "total": None}
+    answer_parts: List[str] = []
+    sources: List[Dict] = []
+    results: List[Dict] = []
+    
+    async def watch_abort():
+        # 切断・停止要求を生成の中断フラグに反映
+        while not abort_flag["flag"]:
+            if _search_cancelled or await request.is_disconnected():
+                abort_flag["flag"] = True
+                break
+            await asyncio.sleep(0.2)
+    
+    def retrieve():
+        # 生成中にDB接続を握り続けないよう、検索だけのセッションを使う
+        db = SessionLocal()
+        try:
+            top_k = max(search_limit, settings.RAG_CONTEXT_CANDIDATES)
+            search_results, packed = chat_service.retrieve_context(db, query, top_k, min_score)
+            file_names = chat_service.get_file_names(db, list({r["file_id"] for r in search_results}))
+            return search_results, packed, file_names
+        finally:
+            db.close()
+    
+    watcher = asyncio.create_task(watch_abort())
+    try:
+        search_results, packed, file_names = await asyncio.to_thread(retrieve)
+        timing["retrieval"] = round(time.perf_counter() - start_time, 3)
+        
+        results = _format_results(mode, search_results, file_names, search_limit)
+        if packed is not None:
+            sources = [{"file_id": fid, "file_name": file_names.get(fid, fid)} for fid in packed.file_ids]
+        yield _sse({
+            "type": "retrieval",
+            "mode": mode,
+            "results": results,
+            "sources": sources,
+            "context": packed.to_dict() if packed is not None else None,
+            "retrieval_time": timing["retrieval"],
+        })
+        
+        generation_stats = None
+        if mode == "チャンク統合" and not abort_flag["flag"]:
+            if packed is None or not packed.passages:
+                answer_parts.append(f"「{query}」に関する情報が見つかりませんでした。別のキーワードで検索してみてください。")
+                yield _sse({"type": "token", "text": answer_parts[-1]})
+            else:
+                client = OllamaClient()
+                generation_start = time.perf_counter()
+                # 切断で途中終了しても async with を抜けた時点で接続と実行枠を返す
+                stream = client.stream_chat(chat_service.build_chat_messages(query, packed), abort_flag)
+                try:
+                    async with stream:
+                        async for piece in stream:
+                            if timing["ttft"] is None:
+                                timing["ttft"] = round(time.perf_counter() - generation_start, 3)
+                                timing["first_token"] = round(time.perf_counter() - start_time, 3)
+                            answer_parts.append(piece)
+                            yield _sse({"type": "token", "text": piece})
+                except InterruptedError:
+                    pass
+                timing["generation"] = round(time.perf_counter() - generation_start, 3)
+                generation_stats = stream.stats
+        
+        timing["total"] = round(time.perf_counter() - start_time, 3)
+        answer = "".join(answer_parts)
+        aborted = abort_flag["flag"]
+        LOGGER.info(
+            f"チャット検索: 検索 {timing['retrieval']}秒, 最初のトークンまで {timing['first_token']}秒, "
+            f"生成 {timing['generation']}秒, 全体 {timing['total']}秒"
+            + (" (中断)" if aborted else "")
+        )
+        yield _sse({
+            "type": "done",
+            "answer": answer,
+            "aborted": aborted,
+            "timing": timing,
+            "generation": generation_stats.to_dict() if generation_stats is not None else None,
+        })
+        
+        if not aborted:
+            result = {"mode": mode, "answer": answer, "sources": sources, "results": results, "timing": timing}
+            await save_search_history(query, model_key, mode, result, timing["total"])
+    
+    except Exception as e:
+        LOGGER.exception(f"ストリーミング検索エラー: {e}")
+        yield _sse({"type": "error", "message": f"検索処理でエラーが発生しました: {str(e)}"})
+    finally:
+        watcher.cancel()
+        _search_cancelled = False
+
 # ──────────────────────────────────────────────────────────
 # ファイル生成関数群
 # ──────────────────────────────────────────────────────────
@@ -379,6 +534,34 @@ async def search_query_endpoint(
         _current_search_task = None
         _search_cancelled = False
 
+@router.post("/query/stream")
+async def search_query_stream_endpoint(
+    request: Request,
+    query: str = Form(...),
+    model_key: str = Form(...),
+    mode: str = Form("チャンク統合"),
+    search_limit: int = Form(10),
+    min_score: float = Form(0.0),
+    current_user = Depends(require_authentication)
+) -> StreamingResponse:
+    """検索クエリ実行（検索結果を先に送り、回答はトークン単位でSSE配信）"""
+    # ガードクローズ: 入力検証
+    if not query.strip():
+        raise HTTPException(400, "検索クエリが空です")
+    
+    if search_limit < 1 or search_limit > 50:
+        raise HTTPException(400, "検索件数は1-50の範囲で指定してください")
+    
+    return StreamingResponse(
+        stream_search_query(request, query, model_key, mode, search_limit, min_score),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # リバースプロキシでのバッファリングを無効化
+        }
+    )
+
 @router.get("/history")
 async def get_search_history_endpoint(
     request: Request,
@@ -10,6 +10,7 @@ from sqlalchemy.engine import Connection
 from new.database.connection import get_db_connection
 from new.database.models import files_meta, files_blob, files_text, FILE_STATUS
 from new.config import LOGGER
+from new.services.blob_store import BLOB_LOCK_SQL, BLOB_REFERENCED_SQL, get_blob_store_for_ref
 from new.schemas import FileListResponse, FileResponse, FileStatusUpdate
 
 router = APIRouter(prefix="/files", tags=["files"])
@@ -248,10 +249,23 @@ def delete_file(
             raise HTTPException(status_code=404, detail="ファイルが見つかりません")
         
         # ファイル削除（CASCADE制約により関連テーブルも削除される）
-        delete_query = "DELETE FROM files_blob WHERE id = :file_id"
-        connection.execute(text(delete_query), {"file_id": file_id})
+        delete_query = "DELETE FROM files_blob WHERE id = :file_id RETURNING blob_ref"
+        deleted = connection.execute(text(delete_query), {"file_id": file_id}).fetchone()
         connection.commit()
         
+        # 行の削除が確定してから、同じ内容が再登録されていなければ格納先の本体を消す
+        if deleted and deleted.blob_ref:
+            try:
+                store = get_blob_store_for_ref(deleted.blob_ref)
+                checksum = store.key(deleted.blob_ref)
+                connection.execute(text(BLOB_LOCK_SQL), {"checksum": checksum})
+                if connection.execute(text(BLOB_REFERENCED_SQL), {"checksum": checksum}).first() is None:
+                    store.delete(deleted.blob_ref)
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                LOGGER.warning(f"BLOB本体の削除に失敗（{deleted.blob_ref}）: {e}")
+        
         return JSONResponse({
             "status": "success",
             "message": f"ファイル '{file_info[0]}' を削除しました",
@@ -33,9 +33,11 @@ def _cleanup_temp_files(files: List[Dict]):
         if file_info.get('temp_file') and file_info.get('file_path'):  # より安全なチェック
             temp_path = file_info['file_path']
             try:
-                if os.path.exists(temp_path):
+                if os.path.lexists(temp_path):
                     os.unlink(temp_path)
                     LOGGER.debug(f"一時ファイル削除: {temp_path}")
+                if file_info.get('temp_dir'):
+                    os.rmdir(file_info['temp_dir'])
             except Exception as e:
                 LOGGER.error(f"一時ファイル削除エラー [{temp_path}]: {e}")
 cancel_event: Optional[asyncio.Event] = None
@@ -146,7 +148,8 @@ async def start_processing(
                 fb.id as file_id,
                 fm.file_name,
                 fm.size as file_size,
-                fb.blob_data
+                fb.blob_ref,
+                CASE WHEN fb.blob_ref IS NULL THEN fb.blob_data END AS blob_data
             FROM files_blob fb
             JOIN files_meta fm ON fb.id = fm.blob_id
             WHERE fb.id IN ({placeholders})
@@ -156,40 +159,55 @@ async def start_processing(
         files_raw = connection.execute(query, params).fetchall()
         # DB取得ファイル数ログを削除（うざいため）
         
-        # DB blobから一時ファイルを作成
+        # DB blob・格納先から一時ファイルを作成
         files = []
         import tempfile
         import os
         from pathlib import Path
+        from new.services.blob_store import get_blob_store_for_ref
         
         for file_row in files_raw:
-            # 一時ファイル作成
             file_ext = Path(file_row.file_name).suffix
-            temp_fd, temp_path = tempfile.mkstemp(suffix=file_ext, prefix=f"ingest_{file_row.file_id}_")
+            store = get_blob_store_for_ref(file_row.blob_ref) if file_row.blob_ref else None
+            local_path = store.local_path(file_row.blob_ref) if store else None
+            temp_path = temp_dir = None
             
             try:
-                # blobデータを一時ファイルに書き込み
-                with os.fdopen(temp_fd, 'wb') as temp_file:
-                    temp_file.write(file_row.blob_data)
+                if local_path is not None:
+                    # 格納先のファイルを拡張子付きのシンボリックリンクで渡す（OCRエンジンは拡張子で形式を判定、コピーしない）
+                    temp_dir = tempfile.mkdtemp(prefix=f"ingest_{file_row.file_id}_")
+                    temp_path = os.path.join(temp_dir, f"source{file_ext}")
+                    try:
+                        os.symlink(local_path, temp_path)
+                    except OSError:
+                        os.rmdir(temp_dir)
+                        temp_path = temp_dir = None
+                
+                if temp_path is None:
+                    # 一時ファイル作成
+                    temp_fd, temp_path = tempfile.mkstemp(suffix=file_ext, prefix=f"ingest_{file_row.file_id}_")
+                    with os.fdopen(temp_fd, 'wb') as temp_file:
+                        if store is not None:
+                            # 格納先からチャンク単位で書き出す（全体をメモリに載せない）
+                            for chunk in store.iter_chunks(file_row.blob_ref):
+                                temp_file.write(chunk)
+                        else:
+                            temp_file.write(file_row.blob_data)
                 
                 files.append({
                     'file_id': file_row.file_id,
                     'file_name': file_row.file_name,
                     'file_path': temp_path,
                     'file_size': file_row.file_size,
-                    'temp_file': True  # 一時ファイルマーク
+                    'temp_file': True,  # 一時ファイルマーク（リンクの場合はリンクだけを削除）
+                    'temp_dir': temp_dir
                 })
                 
-                # 一時ファイル作成（ログ削除）
-                
             except Exception as e:
-                # エラー時はファイルを閉じる
-                try:
-                    os.close(temp_fd)
-                except:
-                    pass
-                if os.path.exists(temp_path):
+                if temp_path and os.path.lexists(temp_path):
                     os.unlink(temp_path)
+                if temp_dir:
+                    os.rmdir(temp_dir)
                 raise e
         
         if not files:
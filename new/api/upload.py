@@ -15,6 +15,7 @@ from new.database.connection import get_db_connection
 from new.database.models import FILE_STATUS
 from new.config import SUPPORTED_EXTENSIONS, MAX_FILE_SIZE, UPLOAD_TEMP_DIR, LOGGER
 from new.schemas import UploadResponse, BatchUploadResponse
+from new.services.blob_store import BLOB_LOCK_SQL, get_blob_store
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
@@ -104,23 +105,27 @@ def _store_file_to_db(
                 detail=f"同じファイルが既に存在します: {file.filename}"
             )
         
-        # バイナリデータ読み込み
-        with open(temp_path, "rb") as f:
-            blob_data = f.read()
-        
         # ファイルID生成
         file_id = str(uuid4())
         
-        # files_blobテーブルに挿入
-        blob_insert = """
-            INSERT INTO files_blob (id, checksum, blob_data)
-            VALUES (:id, :checksum, :blob_data)
-        """
-        connection.execute(text(blob_insert), {
-            "id": file_id,
-            "checksum": checksum,
-            "blob_data": blob_data
-        })
+        store = get_blob_store()
+        if store is not None:
+            # 本体は格納先へ（一時ファイルから読みながら書くので全体をメモリに載せない）
+            # 同じ内容の削除と交差しないよう、挿入のコミットまでチェックサムをロック
+            connection.execute(text(BLOB_LOCK_SQL), {"checksum": checksum})
+            blob_ref = store.put(temp_path, checksum)
+            connection.execute(text("""
+                INSERT INTO files_blob (id, checksum, blob_ref)
+                VALUES (:id, :checksum, :blob_ref)
+            """), {"id": file_id, "checksum": checksum, "blob_ref": blob_ref})
+        else:
+            # 従来どおり BYTEA に格納
+            with open(temp_path, "rb") as f:
+                blob_data = f.read()
+            connection.execute(text("""
+                INSERT INTO files_blob (id, checksum, blob_data)
+                VALUES (:id, :checksum, :blob_data)
+            """), {"id": file_id, "checksum": checksum, "blob_data": blob_data})
         
         # files_metaテーブルに挿入
         meta_insert = """
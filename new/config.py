@@ -36,6 +36,29 @@ class Settings(BaseSettings):
         default_factory=lambda: os.getenv("OLLAMA_BASE_URL", "http://ollama:11434"),
         description="Ollama API URL"
     )
+    OLLAMA_MAX_CONNECTIONS: int = Field(8, description="Ollama共有セッションの最大同時接続数")
+    OLLAMA_HEALTH_TTL: float = Field(30.0, description="Ollama死活・モデル一覧の確認結果の有効期間（秒）")
+    OLLAMA_HEALTH_INTERVAL: float = Field(15.0, description="Ollama死活のバックグラウンド確認間隔（秒）")
+    LLM_SEGMENT_TOKENS: int = Field(2048, description="長文整形で1区間に入れる最大推定トークン数")
+    LLM_SEGMENT_OVERLAP_TOKENS: int = Field(64, description="区間の先頭に文脈として重ねる前区間末尾のトークン数")
+    LLM_MAX_CONCURRENCY: int = Field(2, description="区間整形の最大同時リクエスト数")
+    LLM_SCHEDULER_CONCURRENCY: int = Field(3, description="モデルごとのLLM同時実行数（チャット・整形の合計）")
+    LLM_SCHEDULER_MODEL_CONCURRENCY: Dict[str, int] = Field({}, description="モデル別のLLM同時実行数（未指定のモデルは LLM_SCHEDULER_CONCURRENCY）")
+    LLM_SCHEDULER_INTERACTIVE_RESERVE: int = Field(1, description="バッチ処理に使わせずチャット用に残す実行枠の数")
+    LLM_SEED: Optional[int] = Field(None, description="整形の生成シード（固定すると応答が再現可能になりキャッシュ対象）")
+    LLM_CACHE_ENABLED: bool = Field(True, description="LLM応答の永続キャッシュを使用")
+    LLM_CACHE_DIR: Path = Field(
+        default_factory=lambda: Path(__file__).parent / "ignored/llm_cache",
+        description="LLM応答キャッシュの保存ディレクトリ"
+    )
+    LLM_CACHE_MAX_MB: int = Field(256, description="LLM応答キャッシュの容量上限（MB、超過分は最終参照が古い順に削除）")
+    RAG_CONTEXT_TOKENS: int = Field(3072, description="チャットのRAGコンテキストに使う最大推定トークン数")
+    RAG_CONTEXT_CANDIDATES: int = Field(20, description="RAGコンテキストの詰め込み候補として検索するチャンク数")
+    BLOB_STORE_BACKEND: str = Field("local", description="ファイル本体の格納先（local: チェックサムで分けたディレクトリ, database: files_blob.blob_data）")
+    BLOB_STORE_DIR: Path = Field(
+        default_factory=lambda: Path(__file__).parent.parent / "data/blobs",
+        description="ファイル本体の格納ディレクトリ（app 側の BLOB_STORE_DIR と同じ場所）"
+    )
     
     # ──── ファイル・OCR設定 ────
     DEFAULT_OCR_ENGINE: str = Field("ocrmypdf", description="デフォルトOCRエンジン")
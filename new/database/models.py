@@ -26,7 +26,8 @@ files_blob = Table(
     metadata,
     Column("id", String(36), primary_key=True, default=lambda: str(uuid.uuid4())),
     Column("checksum", String(64), nullable=False, unique=True, index=True),
-    Column("blob_data", LargeBinary, nullable=False),
+    Column("blob_data", LargeBinary, nullable=True),   # BLOB_STORE_BACKEND=database・移行前の行のみ
+    Column("blob_ref", Text, nullable=True),           # 外部格納先の参照（例: local:<sha256>）
     Column("stored_at", TIMESTAMP(timezone=True), server_default=func.now()),
     
     # インデックス追加でパフォーマンス向上
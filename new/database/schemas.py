@@ -26,6 +26,9 @@ def init_schema(engine: Engine = DB_ENGINE) -> bool:
         # テーブル作成（存在しない場合のみ）
         metadata.create_all(engine)
         
+        # 既存DBに外部BLOB参照の列を追加
+        _ensure_blob_ref_column(engine)
+        
         if DEBUG_MODE:
             print("[database] Schema initialized successfully")
         
@@ -70,6 +73,20 @@ def _ensure_pgvector_extension(engine: Engine) -> None:
             print(f"[database] Warning: Could not check pgvector extension: {e}")
 
 
+def _ensure_blob_ref_column(engine: Engine) -> None:
+    """
+    files_blob に blob_ref 列を追加し、blob_data を NULL 許容にする（作成済みのDB向け、何度実行してもよい）
+    
+    Args:
+        engine: SQLAlchemyエンジン
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE files_blob ADD COLUMN IF NOT EXISTS blob_ref TEXT"))
+        conn.execute(text("ALTER TABLE files_blob ALTER COLUMN blob_data DROP NOT NULL"))
+
+
 def drop_all_tables(engine: Engine = DB_ENGINE, confirm: bool = False) -> bool:
     """
     全テーブルを削除する（開発用）
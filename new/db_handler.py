@@ -13,6 +13,7 @@ from uuid import UUID
 
 from .database import engine
 from .config import DEVELOPMENT_MODE
+from .services.blob_store import BLOB_LOCK_SQL, BLOB_REFERENCED_SQL, get_blob_store, get_blob_store_for_ref
 
 # ──────────────────────────────────────────────────────────
 # 内部ユーティリティ
@@ -26,6 +27,30 @@ DEFAULT_MIME = "application/octet-stream"
 def _normalize_tags(tags: Optional[Sequence[str]]) -> list[str]:
     return list(dict.fromkeys([t.strip() for t in (tags or []) if t.strip()]))
 
+def _insert_blob(db, file_hash: str, file_data: bytes):
+    """files_blob に1行追加して id を返す（格納先があれば本体はそちらへ、DBには参照のみ）"""
+    store = get_blob_store()
+    if store is None:
+        return db.execute(
+            sql_text("""
+                INSERT INTO files_blob (checksum, blob_data)
+                VALUES (:checksum, :data)
+                RETURNING id
+            """),
+            {"checksum": file_hash, "data": file_data}
+        ).scalar_one()
+    # 同じ内容の削除と交差しないよう、挿入のコミットまでチェックサムをロック
+    db.execute(sql_text(BLOB_LOCK_SQL), {"checksum": file_hash})
+    blob_ref = store.put(file_data, file_hash)
+    return db.execute(
+        sql_text("""
+            INSERT INTO files_blob (checksum, blob_ref)
+            VALUES (:checksum, :ref)
+            RETURNING id
+        """),
+        {"checksum": file_hash, "ref": blob_ref}
+    ).scalar_one()
+
 # ──────────────────────────────────────────────────────────
 # 開発モード専用 DB 初期化
 # ──────────────────────────────────────────────────────────
@@ -99,14 +124,7 @@ def insert_file_blob_with_details(
             print(f"[handler] Using existing blob: {blob_id}")
         else:
             # 新規blob作成
-            blob_id = db.execute(
-                sql_text("""
-                    INSERT INTO files_blob (checksum, blob_data)
-                    VALUES (:checksum, :data)
-                    RETURNING id
-                """),
-                {"checksum": file_hash, "data": file_data}
-            ).scalar_one()
+            blob_id = _insert_blob(db, file_hash, file_data)
             print(f"[handler] Created new blob: {blob_id}")
 
         # 2. files_meta INSERT/UPDATE
@@ -199,14 +217,7 @@ def insert_file_full(
             print(f"[handler] Using existing blob: {blob_id}")
         else:
             # 新規blob作成
-            blob_id = db.execute(
-                sql_text("""
-                    INSERT INTO files_blob (checksum, blob_data)
-                    VALUES (:checksum, :data)
-                    RETURNING id
-                """),
-                {"checksum": file_hash, "data": file_data}
-            ).scalar_one()
+            blob_id = _insert_blob(db, file_hash, file_data)
             print(f"[handler] Created new blob: {blob_id}")
 
         # 2. files_meta INSERT/UPDATE
@@ -260,10 +271,25 @@ def get_file_blob(blob_id: str) -> Optional[bytes]:
     """files_blob からバイナリを取得"""
     with engine.connect() as db:
         row = db.execute(
-            sql_text("SELECT blob_data FROM files_blob WHERE id = :blob_id"),
-            {"blob_id": blob_id}
+            sql_text("""
+                SELECT blob_ref, CASE WHEN blob_ref IS NULL THEN blob_data END AS blob_data
+                  FROM files_blob
+                 WHERE id = :blob_id
+            """), {"blob_id": blob_id}
         ).first()
-    return row[0] if row else None
+    if not row:
+        return None
+    if row.blob_ref:
+        return get_blob_store_for_ref(row.blob_ref).read(row.blob_ref)
+    return row.blob_data
+
+def get_file_blob_ref(blob_id: str) -> Optional[str]:
+    """files_blob の外部格納先の参照を取得（BYTEA に格納されている行は None）"""
+    with engine.connect() as db:
+        return db.execute(
+            sql_text("SELECT blob_ref FROM files_blob WHERE id = :blob_id"),
+            {"blob_id": blob_id}
+        ).scalar()
 
 def get_file_text(blob_id: str) -> Optional[dict]:
     """files_text から (raw_text, refined_text, quality_score, tags) を取得"""
@@ -354,11 +380,24 @@ def update_file_text(
 def delete_file(blob_id: str) -> bool:
     """ファイルを削除（CASCADE削除）"""
     with engine.begin() as db:
-        result = db.execute(
-            sql_text("DELETE FROM files_blob WHERE id = :blob_id"),
+        row = db.execute(
+            sql_text("DELETE FROM files_blob WHERE id = :blob_id RETURNING blob_ref"),
             {"blob_id": blob_id}
-        )
-        return result.rowcount > 0
+        ).first()
+    if row is None:
+        return False
+    # 行の削除が確定してから、同じ内容が再登録されていなければ本体を消す
+    if row.blob_ref:
+        try:
+            store = get_blob_store_for_ref(row.blob_ref)
+            checksum = store.key(row.blob_ref)
+            with engine.begin() as db:
+                db.execute(sql_text(BLOB_LOCK_SQL), {"checksum": checksum})
+                if db.execute(sql_text(BLOB_REFERENCED_SQL), {"checksum": checksum}).first() is None:
+                    store.delete(row.blob_ref)
+        except Exception as e:
+            print(f"[handler] BLOB本体の削除に失敗（{row.blob_ref}）: {e}")
+    return True
 
 def drop_trial_tables() -> None:
     """trialで始まるテーブルを削除"""
@@ -48,6 +48,12 @@ async def startup_event():
         INPUT_DIR.mkdir(parents=True, exist_ok=True)
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         
+        # Ollama死活のバックグラウンド監視（ファイルごとの接続確認を省略）
+        from new.services.llm.ollama_client import AIOHTTP_AVAILABLE
+        if AIOHTTP_AVAILABLE:
+            from new.services.llm import get_health_monitor
+            get_health_monitor().start()
+        
     except Exception as e:
         LOGGER.error(f"起動エラー: {e}")
         raise
@@ -56,8 +62,10 @@ async def startup_event():
 async def shutdown_event():
     """アプリケーション終了時の処理"""
     try:
-        # クリーンアップ処理
-        pass
+        # Ollama死活監視の停止・共有HTTPセッションのクローズ
+        from new.services.llm import close_ollama_sessions, stop_health_monitors
+        await stop_health_monitors()
+        await close_ollama_sessions()
     except Exception as e:
         LOGGER.error(f"終了エラー: {e}")
 
@@ -13,6 +13,7 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from new.auth import require_admin
 from new.config import LOGGER
 from new.services.queue_service import QueueService
+from new.services.llm.scheduler import get_llm_scheduler
 from new.services.search_service import SearchService
 from new.main import templates
 
@@ -168,7 +169,8 @@ async def get_system_status(
         app_stats = {
             "pending_queue": queue_service.get_pending_count(),
             "error_count": log_manager.error_count,
-            "warning_count": log_manager.warning_count
+            "warning_count": log_manager.warning_count,
+            "llm_scheduler": get_llm_scheduler().snapshot()
         }
         
         return {
@@ -187,7 +189,8 @@ async def get_system_status(
             "application": {
                 "pending_queue": 0,
                 "error_count": log_manager.error_count,
-                "warning_count": log_manager.warning_count
+                "warning_count": log_manager.warning_count,
+                "llm_scheduler": get_llm_scheduler().snapshot()
             },
             "timestamp": datetime.now().isoformat()
         }
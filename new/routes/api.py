@@ -9,7 +9,7 @@ from typing import List, Optional
 import uuid
 from pathlib import Path
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, Form, Request
-from fastapi.responses import JSONResponse, FileResponse, Response
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from urllib.parse import quote
 from sqlalchemy.orm import Session
 from typing import Dict, Any                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                    
@@ -22,8 +22,9 @@ from new.services.chat_service import ChatService
 from new.services.search_service import SearchService
 from new.db_handler import (
     insert_file_blob_only, insert_file_blob_with_details, get_all_files, get_file_blob, 
-    get_file_meta, get_file_text, delete_file, get_file_path
+    get_file_meta, get_file_text, delete_file, get_file_path, get_file_blob_ref
 )
+from new.services.blob_store import get_blob_store_for_ref, parse_range_header
 from new.services.queue_service import QueueService
 from new.debug import debug_print, debug_error, debug_function, debug_return, debug_js_error
 from new.auth_functions import validate_credentials, create_user_session, require_authentication, require_admin_role
@@ -306,9 +307,37 @@ async def upload_folder(
         LOGGER.error(f"フォルダアップロードエラー: {e}")
         raise HTTPException(status_code=500, detail="フォルダアップロードに失敗しました")
 
+def _stream_blob(blob_ref: str, file_name: str, range_header: Optional[str]):
+    """格納先のPDFを Range 対応で返す（本体全体をメモリに載せない）"""
+    store = get_blob_store_for_ref(blob_ref)
+    size = store.size(blob_ref)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(file_name)}",
+        "X-Content-Type-Options": "nosniff"
+    }
+    try:
+        byte_range = parse_range_header(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        (start, end), status_code = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(max(0, end - start + 1))
+    return StreamingResponse(
+        store.iter_chunks(blob_ref, start, end),
+        status_code=status_code,
+        media_type="application/pdf",
+        headers=headers
+    )
+
 @router.get("/files/{file_id}/preview")
 async def preview_file(
     file_id: str,
+    request: Request,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """ファイルプレビュー（PDF用）- 新DB設計対応"""
@@ -319,6 +348,11 @@ async def preview_file(
         if not file_meta:
             raise HTTPException(status_code=404, detail="ファイルが見つかりません")
 
+        blob_ref = get_file_blob_ref(file_id)
+        if blob_ref and file_meta["mime_type"] == "application/pdf":
+            # 格納先から Range 指定の範囲だけをチャンク単位で返す（PDFビューアの分割読み込み用）
+            return _stream_blob(blob_ref, file_meta["file_name"], request.headers.get("range"))
+
         file_blob = get_file_blob(file_id)
         if not file_blob:
             raise HTTPException(status_code=404, detail="ファイルデータが見つかりません")
@@ -332,7 +366,7 @@ async def preview_file(
                 content=file_blob,
                 media_type="application/pdf",
                 headers={
-                    "Content-Disposition": f"inline; file_name*=UTF-8''{quoted}",
+                    "Content-Disposition": f"inline; filename*=UTF-8''{quoted}",
                     "X-Content-Type-Options": "nosniff"
                     # X-Frame-Optionsを削除してiframe表示を可能にする
                 }
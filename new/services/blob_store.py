@@ -0,0 +1,291 @@
+# new/services/blob_store.py
+# ファイル本体の格納先（DBの files_blob には参照だけを持たせ、本体はコンテンツアドレスで外部に置く）
+
+import os
+import re
+import mmap
+import hashlib
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Tuple, Union
+
+LOGGER = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+DATABASE_BACKEND = "database"   # 従来どおり files_blob.blob_data（BYTEA）に格納
+
+_CHECKSUM = re.compile(r"^[0-9a-f]{64}$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+BlobSource = Union[bytes, bytearray, memoryview, BinaryIO, str, os.PathLike]
+
+# 同じチェックサムの「本体の格納→行の挿入」と「参照確認→本体の削除」を直列化する
+# PostgreSQL のトランザクション単位アドバイザリロック（SQLAlchemy の text() 用、コミット・ロールバックで解放）
+BLOB_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext(:checksum))"
+BLOB_REFERENCED_SQL = "SELECT 1 FROM files_blob WHERE checksum = :checksum LIMIT 1"
+
+
+class BlobNotFoundError(FileNotFoundError):
+    """参照先の本体が格納先に無い"""
+
+
+class BlobChecksumError(ValueError):
+    """書き込んだ内容のSHA-256が指定のチェックサムと一致しない"""
+
+
+def parse_range_header(value: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    HTTP Range ヘッダー（単一範囲のみ）を (開始, 終了) のバイト位置（終了を含む）に変換
+
+    ヘッダーが無い・複数範囲など解釈できない場合は None（全体を返す）。
+    範囲が満たせない場合は ValueError（416 を返す）。
+    """
+    if not value:
+        return None
+    match = _RANGE.match(value.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # 末尾から last バイト
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(f"満たせない範囲です: {value}")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"満たせない範囲です: {value}")
+    return start, end
+
+
+class BlobStore(ABC):
+    """
+    ファイル本体の格納先の共通インターフェース
+
+    参照（ref）は "<backend>:<sha256>" 形式で、DBの files_blob.blob_ref に保存する。
+    読み出しは open() を基本に、全体・範囲・チャンク単位・mmap を提供する（mmap は既定で全体読み込み）。
+    """
+
+    name: str = ""
+
+    # ──── 各格納先で実装 ────
+
+    @abstractmethod
+    def put(self, source: BlobSource, checksum: Optional[str] = None) -> str:
+        """本体を格納して参照を返す（checksum を指定すると内容と照合、同じ内容は1つだけ保持）"""
+
+    @abstractmethod
+    def open(self, ref: str) -> BinaryIO:
+        """読み出し用のファイルオブジェクト（seek 可能）"""
+
+    @abstractmethod
+    def size(self, ref: str) -> int:
+        """本体のバイト数"""
+
+    @abstractmethod
+    def exists(self, ref: str) -> bool:
+        """本体が格納されているか"""
+
+    @abstractmethod
+    def delete(self, ref: str) -> bool:
+        """本体を削除（無ければ False）"""
+
+    def local_path(self, ref: str) -> Optional[Path]:
+        """本体がローカルファイルならそのパス（FileResponse や fitz.open に直接渡せる）"""
+        return None
+
+    # ──── 共通の読み出し ────
+
+    def key(self, ref: str) -> str:
+        """参照からチェックサム部分を取り出す（他の格納先の参照は ValueError）"""
+        backend, _, checksum = ref.partition(":")
+        if backend != self.name or not _CHECKSUM.match(checksum):
+            raise ValueError(f"この格納先（{self.name}）の参照ではありません: {ref}")
+        return checksum
+
+    def read(self, ref: str) -> bytes:
+        with self.open(ref) as f:
+            return f.read()
+
+    def read_range(self, ref: str, start: int, end: int) -> bytes:
+        """start〜end バイト（end を含む）を読む"""
+        with self.open(ref) as f:
+            f.seek(start)
+            return f.read(max(0, end - start + 1))
+
+    def iter_chunks(self, ref: str, start: int = 0, end: Optional[int] = None,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """start〜end バイト（end を含む、省略時は末尾まで）を chunk_size ずつ返す（全体をメモリに載せない）"""
+        with self.open(ref) as f:
+            f.seek(start)
+            remaining = None if end is None else max(0, end - start + 1)
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    @contextmanager
+    def mmap(self, ref: str) -> Iterator[Union[mmap.mmap, bytes]]:
+        """読み取り専用のメモリマップ（with を抜けると解放）"""
+        yield self.read(ref)
+
+
+class LocalBlobStore(BlobStore):
+    """
+    ローカルディレクトリの格納先（チェックサムでシャーディング: <root>/ab/cd/abcd…）
+
+    書き込みは同じディレクトリの一時ファイルに書いてからリネームするため、読み手が書きかけを見ることはない。
+    同じ内容は同じパスになるので、重複アップロードや移行の再実行でも本体は1つ。
+    """
+
+    name = "local"
+
+    def __init__(self, root: Union[str, os.PathLike]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, checksum: str) -> Path:
+        return self.root / checksum[:2] / checksum[2:4] / checksum
+
+    def _path(self, ref: str) -> Path:
+        return self.path_for(self.key(ref))
+
+    def put(self, source: BlobSource, checksum: Optional[str] = None) -> str:
+        if checksum is not None:
+            checksum = checksum.lower()
+            if not _CHECKSUM.match(checksum):
+                raise ValueError(f"SHA-256 チェックサムではありません: {checksum}")
+            if self.path_for(checksum).exists():
+                return f"{self.name}:{checksum}"
+
+        # 一時ファイルに書きながらハッシュを計算（ファイル・ストリームは全体をメモリに載せない）
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".incoming-", dir=self.root)
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in _iter_source(source):
+                    digest.update(chunk)
+                    out.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            actual = digest.hexdigest()
+            if checksum is not None and actual != checksum:
+                raise BlobChecksumError(f"チェックサム不一致: 期待 {checksum}, 実際 {actual}")
+
+            path = self.path_for(actual)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.chmod(temp_path, 0o444)
+            os.replace(temp_path, path)
+            return f"{self.name}:{actual}"
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def open(self, ref: str) -> BinaryIO:
+        try:
+            return open(self._path(ref), "rb")
+        except FileNotFoundError:
+            raise BlobNotFoundError(f"本体が見つかりません: {ref}") from None
+
+    def size(self, ref: str) -> int:
+        try:
+            return self._path(ref).stat().st_size
+        except FileNotFoundError:
+            raise BlobNotFoundError(f"本体が見つかりません: {ref}") from None
+
+    def exists(self, ref: str) -> bool:
+        return self._path(ref).is_file()
+
+    def delete(self, ref: str) -> bool:
+        try:
+            self._path(ref).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def local_path(self, ref: str) -> Optional[Path]:
+        path = self._path(ref)
+        return path if path.is_file() else None
+
+    def read_range(self, ref: str, start: int, end: int) -> bytes:
+        # 1回の pread で読む（ファイル位置を共有しないのでスレッド間で安全）
+        with self.open(ref) as f:
+            return os.pread(f.fileno(), max(0, end - start + 1), start)
+
+    @contextmanager
+    def mmap(self, ref: str) -> Iterator[Union[mmap.mmap, bytes]]:
+        with self.open(ref) as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""  # 空ファイルはマップできない
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mapped
+            finally:
+                mapped.close()
+
+
+def _iter_source(source: BlobSource) -> Iterator[bytes]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from iter(lambda: f.read(CHUNK_SIZE), b"")
+    else:
+        yield from iter(lambda: source.read(CHUNK_SIZE), b"")
+
+
+# ──────────────────────────────────────────────────────────
+# 格納先の登録・取得
+# ──────────────────────────────────────────────────────────
+_backends: Dict[str, Callable[[Path], BlobStore]] = {"local": LocalBlobStore}
+_stores: Dict[Tuple[str, Path], BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def register_blob_store(name: str, factory: Callable[[Path], BlobStore]) -> None:
+    """格納先を追加（factory は格納ディレクトリ／設定のルートを受け取る）"""
+    _backends[name] = factory
+
+
+def get_blob_store(backend: Optional[str] = None, root=None) -> Optional[BlobStore]:
+    """
+    プロセス内で共有する格納先（BLOB_STORE_BACKEND が "database" なら None = 従来どおりDBに格納）
+
+    backend・root 省略時は new.config の BLOB_STORE_BACKEND・BLOB_STORE_DIR を使う。
+    """
+    if backend is None or root is None:
+        from new.config import settings
+        backend = backend or settings.BLOB_STORE_BACKEND
+        root = root or settings.BLOB_STORE_DIR
+    if backend == DATABASE_BACKEND:
+        return None
+    if backend not in _backends:
+        raise ValueError(f"不明なBLOB格納先です: {backend}（{', '.join(sorted(_backends))}）")
+    path = Path(root)
+    with _stores_lock:
+        store = _stores.get((backend, path))
+        if store is None:
+            store = _stores[(backend, path)] = _backends[backend](path)
+            LOGGER.info(f"BLOB格納先: {backend} ({path})")
+        return store
+
+
+def get_blob_store_for_ref(ref: str, root=None) -> BlobStore:
+    """参照の接頭辞に対応する格納先（設定の格納先を切り替えた後も既存の参照を読める）"""
+    backend = ref.partition(":")[0]
+    store = get_blob_store(backend, root)
+    if store is None:
+        raise ValueError(f"BLOB参照ではありません: {ref}")
+    return store
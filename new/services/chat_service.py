@@ -5,14 +5,22 @@
 import logging
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from ..models import ChatSession, ChatMessage, File, Embedding, FileImage
-from ..config import LOGGER
+from ..config import LOGGER, settings
+from ..utils.context_packer import ContextChunk, PackedContext, pack_context
+from ..utils.text_segmenter import default_token_counter
 from .search_service import SearchService
 
+# RAG回答生成のシステムプロンプト（検索文章は user メッセージ側に入れる）
+RAG_SYSTEM_PROMPT = (
+    "あなたは社内文書検索アシスタントです。与えられた参考文書の内容だけに基づいて、日本語で簡潔に回答してください。"
+    "参考文書に答えが無い場合は、推測せずに「参考文書には該当する情報がありません」と答えてください。"
+)
+
 class ChatService:
     """チャットサービス"""
     
@@ -127,7 +135,8 @@ class ChatService:
             return {
                 "message": assistant_response["content"],
                 "search_results": search_results,
-                "referenced_files": assistant_response["referenced_files"]
+                "referenced_files": assistant_response["referenced_files"],
+                "context": assistant_response.get("context")
             }
             
         except Exception as e:
@@ -135,11 +144,54 @@ class ChatService:
             db.rollback()
             raise
     
-    def _perform_rag_search(self, db: Session, query: str) -> List[Dict[str, Any]]:
+    def retrieve_context(
+        self,
+        db: Session,
+        query: str,
+        top_k: Optional[int] = None,
+        min_score: float = 0.0
+    ) -> Tuple[List[Dict[str, Any]], Optional[PackedContext]]:
+        """
+        RAG検索とコンテキスト詰め込み（ストリーミング回答の前段）
+        
+        同期処理のため、非同期エンドポイントからはスレッドで呼ぶ。
+        
+        Returns:
+            (一致度 min_score 以上の検索結果, 詰め込み済みコンテキスト（結果が無ければ None）)
+        """
+        search_results = [
+            result for result in self._perform_rag_search(db, query, top_k)
+            if result["similarity"] >= min_score
+        ]
+        packed = self._pack_context(search_results) if search_results else None
+        return search_results, packed
+    
+    def get_file_names(self, db: Session, file_ids: List[str]) -> Dict[str, str]:
+        """検索結果の file_id → ファイル名"""
+        if not file_ids:
+            return {}
+        try:
+            rows = db.query(File.id, File.file_name).filter(File.id.in_(list(file_ids))).all()
+            return {str(file_id): file_name for file_id, file_name in rows}
+        except Exception as e:
+            LOGGER.error(f"ファイル名取得エラー: {e}")
+            return {}
+    
+    def build_chat_messages(self, query: str, packed: PackedContext) -> List[Dict[str, str]]:
+        """詰め込み済みコンテキストから /api/chat に渡すメッセージを構築"""
+        return [
+            {"role": "system", "content": RAG_SYSTEM_PROMPT},
+            {"role": "user", "content": f"# 参考文書\n{packed.text}\n\n# 質問\n{query}"},
+        ]
+    
+    def _perform_rag_search(self, db: Session, query: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """RAG検索を実行"""
         try:
             # ハイブリッド検索を実行
-            search_results = self.search_service.hybrid_search(db, query, top_k=5)
+            # コンテキストは詰め込み時に予算で絞るため、候補は多めに取る
+            search_results = self.search_service.hybrid_search(
+                db, query, top_k=top_k or settings.RAG_CONTEXT_CANDIDATES
+            )
             
             # 検索結果を整形
             formatted_results = []
@@ -150,7 +202,8 @@ class ChatService:
                         "content": result["text_chunk"],
                         "similarity": result["similarity"],
                         "file_id": result["file_id"],
-                        "chunk_id": result["chunk_id"]
+                        "chunk_id": result["chunk_id"],
+                        "chunk_index": result.get("chunk_index")
                     })
                 elif result["type"] == "image":
                     formatted_results.append({
@@ -180,29 +233,13 @@ class ChatService:
                     "referenced_files": []
                 }
             
-            # 検索結果を整理
-            text_results = [r for r in search_results if r["type"] == "text"]
-            image_results = [r for r in search_results if r["type"] == "image"]
+            # 検索結果を重複除去してトークン予算内に詰める
+            packed = self._pack_context(search_results)
             
             # 応答を構築
-            response_parts = []
-            referenced_files = []
-            
-            if text_results:
-                response_parts.append("テキスト検索結果:")
-                for i, result in enumerate(text_results[:3], 1):
-                    response_parts.append(f"{i}. {result['content'][:200]}...")
-                    if result["file_id"] not in referenced_files:
-                        referenced_files.append(result["file_id"])
-            
-            if image_results:
-                response_parts.append("\n画像検索結果:")
-                for i, result in enumerate(image_results[:2], 1):
-                    response_parts.append(f"{i}. {result['content']}")
-                    if result.get("ocr_text"):
-                        response_parts.append(f"   OCRテキスト: {result['ocr_text'][:100]}...")
-                    if result["file_id"] not in referenced_files:
-                        referenced_files.append(result["file_id"])
+            response_parts = ["検索結果:"]
+            for i, passage in enumerate(packed.passages, 1):
+                response_parts.append(f"{i}. {passage.label}{passage.text}")
             
             response_parts.append(f"\nこれらの情報に基づいて、'{user_message}'について回答いたします。")
             
@@ -210,8 +247,9 @@ class ChatService:
             
             return {
                 "content": response_content,
-                "tokens_used": len(response_content.split()),
-                "referenced_files": referenced_files
+                "tokens_used": default_token_counter(response_content),
+                "referenced_files": packed.file_ids,
+                "context": packed.to_dict()
             }
             
         except Exception as e:
@@ -222,6 +260,26 @@ class ChatService:
                 "referenced_files": []
             }
     
+    def _pack_context(self, search_results: List[Dict[str, Any]]):
+        """検索結果（テキスト・画像）をRAGコンテキストに詰める"""
+        chunks = []
+        for result in search_results:
+            if result["type"] == "image":
+                # 画像はOCRテキストと説明文を本文にする
+                text = "\n".join(t for t in (result.get("llm_description"), result.get("ocr_text")) if t)
+                chunks.append(ContextChunk(text, result["similarity"], f"{result['content']}\n", result["file_id"]))
+            else:
+                chunks.append(ContextChunk(
+                    result["content"], result["similarity"], "",
+                    result["file_id"], result.get("chunk_index")
+                ))
+        packed = pack_context(chunks, settings.RAG_CONTEXT_TOKENS, header="{label}")
+        LOGGER.info(
+            f"RAGコンテキスト: {len(packed.passages)}文章 {packed.tokens}/{packed.budget}トークン "
+            f"(節約{packed.saved_tokens}トークン, 結合{packed.merged}件, 重複除外{packed.duplicates}件)"
+        )
+        return packed
+    
     def delete_session(self, db: Session, session_id: str, user_id: int) -> bool:
         """チャットセッションを削除"""
         try:
@@ -1,6 +1,16 @@
 # new/services/llm/__init__.py
 # LLMサービスパッケージ初期化
 
-from .ollama_client import OllamaClient, OllamaRefiner
+from .ollama_client import (
+    OllamaClient, OllamaRefiner, GenerationStats, GenerationStream, OllamaModelNotFoundError,
+    close_ollama_sessions
+)
+from .health import OllamaHealthMonitor, get_health_monitor, stop_health_monitors
+from .scheduler import BATCH, INTERACTIVE, LLMScheduler, get_llm_scheduler
+from .response_cache import CacheStats, LLMResponseCache, get_llm_response_cache
 
-__all__ = ['OllamaClient', 'OllamaRefiner']
\ No newline at end of file
+__all__ = ['OllamaClient', 'OllamaRefiner', 'GenerationStats', 'GenerationStream', 'OllamaModelNotFoundError',
+           'close_ollama_sessions',
+           'OllamaHealthMonitor', 'get_health_monitor', 'stop_health_monitors',
+           'BATCH', 'INTERACTIVE', 'LLMScheduler', 'get_llm_scheduler',
+           'CacheStats', 'LLMResponseCache', 'get_llm_response_cache']
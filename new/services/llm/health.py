@@ -0,0 +1,171 @@
+# new/services/llm/health.py
+# Ollama死活・モデル一覧の共有監視（バックグラウンドで定期確認・結果をTTL付きで保持・実リクエストの失敗で即時に状態を切り替え）
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# 停止を検知した状態の有効期間（秒）：この間は確認せず即座に利用不可と答え、過ぎたら再確認する
+FAILURE_TTL = 5.0
+PROBE_TIMEOUT = 5.0
+
+
+@dataclass
+class HealthState:
+    """直近の確認結果"""
+    healthy: bool = False
+    models: FrozenSet[str] = frozenset()
+    version: Optional[str] = None
+    checked_at: float = 0.0           # time.monotonic()（0 は未確認）
+    last_error: Optional[str] = None
+    consecutive_failures: int = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "healthy": self.healthy,
+            "models": sorted(self.models),
+            "version": self.version,
+            "age": round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class OllamaHealthMonitor:
+    """
+    接続先1つの死活監視
+
+    is_available は保持している確認結果から即座に答え、期限切れのときだけ確認する
+    （同時に呼ばれても確認リクエストは1回にまとめる）。
+    生成リクエストの接続失敗を record_failure で受け取ると、次の確認まで利用不可と答える。
+    """
+
+    def __init__(self, base_url: str, ttl: float = 30.0, interval: float = 15.0):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.interval = interval
+        self.state = HealthState()
+        self._probe_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def _fresh(self) -> bool:
+        if not self.state.checked_at:
+            return False
+        ttl = self.ttl if self.state.healthy else min(self.ttl, FAILURE_TTL)
+        return time.monotonic() - self.state.checked_at < ttl
+
+    @staticmethod
+    def _has_model(models: FrozenSet[str], model: str) -> bool:
+        return model in models or f"{model}:latest" in models
+
+    async def is_available(self, model: Optional[str] = None) -> bool:
+        """接続先が応答し、model（指定時）が取得済みか"""
+        if not self._fresh():
+            await self.probe()
+        state = self.state
+        if not state.healthy:
+            return False
+        if model is None or self._has_model(state.models, model):
+            return True
+        LOGGER.warning(f"モデル '{model}' が見つかりません。利用可能: {sorted(state.models)}")
+        return False
+
+    async def probe(self) -> HealthState:
+        """確認を実行（実行中の確認があればその完了を待つ）"""
+        task = self._probe_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._probe_task = asyncio.ensure_future(self._probe())
+        return await asyncio.shield(task)
+
+    async def _probe(self) -> HealthState:
+        import aiohttp
+        from .ollama_client import get_ollama_session
+
+        session = get_ollama_session(self.base_url)
+        timeout = aiohttp.ClientTimeout(total=PROBE_TIMEOUT)
+        try:
+            async with session.get(f"{self.base_url}/api/version", timeout=timeout) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}")
+                version = (await response.json()).get("version")
+            async with session.get(f"{self.base_url}/api/tags", timeout=timeout) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"モデル一覧取得失敗: HTTP {response.status}")
+                models = frozenset(model["name"] for model in (await response.json()).get("models", []))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            message = f"タイムアウト ({PROBE_TIMEOUT:.0f}秒)" if isinstance(e, asyncio.TimeoutError) else str(e)
+            self.record_failure(message)
+            return self.state
+
+        if not self.state.healthy:
+            LOGGER.info(f"Ollama接続確認: {self.base_url} (version: {version}, モデル{len(models)}件)")
+        self.state = HealthState(healthy=True, models=models, version=version, checked_at=time.monotonic())
+        return self.state
+
+    def record_failure(self, error: str):
+        """接続失敗を記録（確認・生成リクエストのどちらからも呼ぶ）"""
+        state = self.state
+        if state.healthy:
+            LOGGER.warning(f"Ollama利用不可に切り替え: {self.base_url} ({error})")
+        self.state = HealthState(
+            healthy=False,
+            models=state.models,
+            version=state.version,
+            checked_at=time.monotonic(),
+            last_error=error,
+            consecutive_failures=state.consecutive_failures + 1
+        )
+
+    def record_success(self):
+        """生成リクエストの成功を記録（停止中と判定していれば次の呼び出しで再確認させる）"""
+        if not self.state.healthy:
+            self.state.checked_at = 0.0
+
+    def record_missing_model(self, model: str):
+        """モデルが存在しなかった（HTTP 404）ことを記録"""
+        self.state.models = frozenset(m for m in self.state.models if m not in (model, f"{model}:latest"))
+
+    def start(self):
+        """現在のイベントループで定期確認を開始（起動済みなら何もしない）"""
+        if self._loop_task is not None and not self._loop_task.done():
+            return
+        self._loop_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        task, self._loop_task = self._loop_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval if self.state.healthy else min(self.interval, FAILURE_TTL))
+
+
+_monitors: Dict[str, OllamaHealthMonitor] = {}
+
+
+def get_health_monitor(base_url: Optional[str] = None) -> OllamaHealthMonitor:
+    """接続先ごとに共有する監視インスタンス"""
+    from new.config import settings
+
+    base_url = (base_url or settings.OLLAMA_BASE_URL).rstrip("/")
+    monitor = _monitors.get(base_url)
+    if monitor is None:
+        monitor = _monitors[base_url] = OllamaHealthMonitor(
+            base_url, ttl=settings.OLLAMA_HEALTH_TTL, interval=settings.OLLAMA_HEALTH_INTERVAL
+        )
+    return monitor
+
+
+async def stop_health_monitors():
+    """全監視の定期確認を停止（アプリ終了時）"""
+    for monitor in list(_monitors.values()):
+        await monitor.stop()
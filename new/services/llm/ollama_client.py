@@ -5,108 +5,332 @@ Ollama LLMクライアント実装
 """
 
 import re
+import json
 import time
 import asyncio
-from typing import Optional, Dict, Tuple, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple, Any, AsyncIterator, List
 from pathlib import Path
 
-# LangChain + Ollama
 try:
-    from langchain_core.output_parsers import StrOutputParser
-    from langchain.prompts import PromptTemplate
-    from langchain_community.chat_models import ChatOllama
-    from langchain_community.llms.ollama import OllamaEndpointNotFoundError
-    LANGCHAIN_AVAILABLE = True
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
 except ImportError:
-    LANGCHAIN_AVAILABLE = False
-    ChatOllama = None
-    OllamaEndpointNotFoundError = Exception
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
 
 from new.config import settings, LOGGER
+from new.utils.text_normalizer import normalize_empty_lines_strip
+from new.utils.text_segmenter import TextSegment, split_segments, stitch_segments
+from .health import get_health_monitor
+from .prompt_loader import get_prompt_loader
+from .scheduler import BATCH, INTERACTIVE, get_llm_scheduler
+from .response_cache import CacheStats, LLMResponseCache, cache_key, get_llm_response_cache, is_deterministic
+
+# 中断フラグの確認間隔（秒）：トークン待ちの間もこの間隔で確認する
+ABORT_POLL_INTERVAL = 0.2
+
+# LangChain(ChatOllama)互換の生成パラメータ名 → Ollama options
+_OPTION_ALIASES = {
+    "max_new_tokens": "num_predict",
+    "max_tokens": "num_predict",
+}
+_OLLAMA_OPTIONS = {
+    "num_predict", "temperature", "top_k", "top_p", "min_p", "repeat_penalty", "repeat_last_n",
+    "presence_penalty", "frequency_penalty", "seed", "stop", "num_ctx", "num_batch", "num_thread",
+    "num_gpu", "mirostat", "mirostat_eta", "mirostat_tau", "tfs_z", "typical_p",
+}
+
+
+class OllamaModelNotFoundError(RuntimeError):
+    """指定モデルがOllamaに存在しない（HTTP 404）"""
+
+
+@dataclass
+class GenerationStats:
+    """1回の生成の計測値"""
+    model: str
+    ttft: Optional[float] = None        # 最初のトークンまでの秒数
+    total_time: float = 0.0
+    tokens: int = 0                     # 生成トークン数（サーバ報告値、無ければ受信チャンク数）
+    prompt_tokens: int = 0
+    tokens_per_sec: float = 0.0         # デコード速度（サーバ報告の eval_duration 基準）
+    done_reason: Optional[str] = None
+    aborted: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "ttft": self.ttft,
+            "total_time": self.total_time,
+            "tokens": self.tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "tokens_per_sec": self.tokens_per_sec,
+            "done_reason": self.done_reason,
+            "aborted": self.aborted,
+        }
+
+
+class GenerationStream:
+    """
+    1回の生成のトークンストリーム（async for で断片を受け取り、計測値は stats に入る）
+    
+    実行枠と接続は受信し終えるか閉じるまで保持されるため、途中で読むのをやめ得る場合は
+    async with で使う（抜けた時点で応答を閉じて実行枠を返す）。
+    """
+    
+    def __init__(self, stats: GenerationStats, iterator: AsyncIterator[str]):
+        self.stats = stats
+        self._iterator = iterator
+    
+    def __aiter__(self) -> "GenerationStream":
+        return self
+    
+    async def __anext__(self) -> str:
+        return await self._iterator.__anext__()
+    
+    async def aclose(self) -> None:
+        await self._iterator.aclose()
+    
+    async def __aenter__(self) -> "GenerationStream":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+
+# ──────────────────────────────────────────────────────────
+# 共有HTTPセッション（イベントループ・接続先ごとにkeep-alive接続をプール）
+# ──────────────────────────────────────────────────────────
+_sessions: Dict[Tuple[int, str], "aiohttp.ClientSession"] = {}
+
+
+def get_ollama_session(base_url: str) -> "aiohttp.ClientSession":
+    """接続先ごとの長寿命セッションを取得（aiohttpのセッションはイベントループに紐付くためループ単位）"""
+    loop = asyncio.get_running_loop()
+    key = (id(loop), base_url)
+    session = _sessions.get(key)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit_per_host=settings.OLLAMA_MAX_CONNECTIONS,
+            keepalive_timeout=60
+        )
+        # 生成は数分かかり得るため全体タイムアウトは設けず、無応答時間で打ち切る
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=settings.LLM_TIMEOUT)
+        session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        _sessions[key] = session
+    return session
+
+
+async def close_ollama_sessions() -> None:
+    """現在のイベントループの共有セッションを閉じる（アプリ終了時）"""
+    loop_id = id(asyncio.get_running_loop())
+    for key in [key for key in _sessions if key[0] == loop_id]:
+        session = _sessions.pop(key)
+        if not session.closed:
+            await session.close()
+
+
+def build_options(generation_params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """生成パラメータをOllamaの options に変換（対応しないキーは無視）"""
+    options = {}
+    for key, value in (generation_params or {}).items():
+        if value is None:
+            continue
+        key = _OPTION_ALIASES.get(key, key)
+        if key in _OLLAMA_OPTIONS:
+            options[key] = value
+        else:
+            LOGGER.debug(f"Ollama未対応の生成パラメータを無視: {key}")
+    return options
 
 
 class OllamaClient:
-    """Ollama接続クライアント"""
+    """Ollama接続クライアント（/api/generate・/api/chat を共有セッションで直接呼び出し）"""
     
-    def __init__(self, base_url: str = None, model: str = None):
-        self.base_url = base_url or settings.OLLAMA_BASE_URL
+    def __init__(self, base_url: str = None, model: str = None, lane: str = INTERACTIVE):
+        self.base_url = (base_url or settings.OLLAMA_BASE_URL).rstrip("/")
         self.model = model or settings.OLLAMA_MODEL
+        self.lane = lane  # 実行枠のレーン（呼び出しごとに上書き可）
         self.logger = LOGGER
         
-        if not LANGCHAIN_AVAILABLE:
-            raise ImportError("LangChain関連パッケージが見つかりません。`pip install langchain langchain-community langchain-ollama` を実行してください。")
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp が見つかりません。`pip install aiohttp` を実行してください。")
+    
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        return get_ollama_session(self.base_url)
+    
+    @property
+    def health(self):
+        return get_health_monitor(self.base_url)
     
     async def is_available(self) -> bool:
-        """Ollama接続確認（軽量API使用）"""
-        try:
-            import aiohttp
-            import asyncio
-            
-            # 軽量なAPI確認（バージョン情報取得）
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5.0)) as session:
-                async with session.get(f"{self.base_url}/api/version") as response:
-                    if response.status == 200:
-                        version_data = await response.json()
-                        self.logger.debug(f"Ollama接続成功: {self.base_url} (version: {version_data.get('version', 'unknown')})")
-                        
-                        # モデル存在確認も実行
-                        async with session.get(f"{self.base_url}/api/tags") as tags_response:
-                            if tags_response.status == 200:
-                                tags_data = await tags_response.json()
-                                models = [model['name'] for model in tags_data.get('models', [])]
-                                
-                                if self.model in models or f"{self.model}:latest" in models:
-                                    self.logger.debug(f"モデル確認成功: {self.model}")
-                                    return True
-                                else:
-                                    self.logger.warning(f"モデル '{self.model}' が見つかりません。利用可能: {models}")
-                                    return False
-                            else:
-                                self.logger.warning(f"モデル一覧取得失敗: HTTP {tags_response.status}")
-                                return False
-                    else:
-                        self.logger.warning(f"Ollama API応答エラー: HTTP {response.status}")
-                        return False
-                        
-        except asyncio.TimeoutError:
-            self.logger.warning(f"Ollama接続タイムアウト: {self.base_url} (5秒)")
-            return False
-        except ImportError:
-            self.logger.warning("aiohttp未インストール: フォールバック接続確認を使用")
-            return await self._fallback_availability_check()
-        except Exception as e:
-            self.logger.warning(f"Ollama接続失敗 ({self.base_url}, {self.model}): {e}")
-            return False
+        """
+        Ollama接続・モデル存在確認
+        
+        共有の死活監視が保持する結果から即座に答える（期限切れ時のみ /api/version・/api/tags を確認）。
+        """
+        return await self.health.is_available(self.model)
     
-    async def _fallback_availability_check(self) -> bool:
-        """フォールバック接続確認（重い処理）"""
-        try:
-            # 実際のLLM処理（CPUでは時間がかかる）
-            llm = ChatOllama(model=self.model, base_url=self.base_url, max_new_tokens=5)
-            result = await asyncio.wait_for(
-                asyncio.to_thread(llm.invoke, "Hi"), 
-                timeout=30.0  # CPU環境を考慮して長めに設定
-            )
-            return True
-        except asyncio.TimeoutError:
-            self.logger.warning(f"Ollama処理タイムアウト（CPU環境では正常）: {self.base_url}")
-            return False
-        except Exception as e:
-            self.logger.warning(f"Ollama処理失敗: {e}")
-            return False
+    async def _stream(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        abort_flag: Optional[Dict],
+        lane: Optional[str],
+        stats: GenerationStats
+    ) -> AsyncIterator[str]:
+        """
+        NDJSONストリームを読み、生成テキストの断片を順に返す（呼び出しごとの計測値を stats に記録）
+        
+        共有スケジューラの実行枠（lane 省略時は self.lane）を取得してから要求し、受信し終えるまで保持する。
+        中断フラグが立つと応答を閉じて接続を切る（Ollamaは切断を検知して生成を止める）。
+        """
+        if abort_flag and abort_flag.get('flag', False):
+            raise InterruptedError("処理が中断されました")
+        
+        async with get_llm_scheduler().slot(self.model, lane or self.lane, abort_flag):
+            key = "message" if endpoint == "/api/chat" else "response"
+            start_time = time.perf_counter()
+            chunks = 0
+            watcher = None
+        
+            try:
+                async with self.session.post(f"{self.base_url}{endpoint}", json=payload) as response:
+                    if response.status == 404:
+                        self.health.record_missing_model(self.model)
+                        raise OllamaModelNotFoundError(
+                            f"Ollamaモデル '{self.model}' が見つかりません。`ollama pull {self.model}` を実行してください。"
+                        )
+                    if response.status != 200:
+                        body = await response.text()
+                        raise RuntimeError(f"Ollama API応答エラー: HTTP {response.status} {body[:200]}")
+                
+                    if abort_flag is not None:
+                        watcher = asyncio.create_task(self._watch_abort(abort_flag, response))
+                
+                    async for line in response.content:
+                        if not line.strip():
+                            continue
+                        data = json.loads(line)
+                        if data.get("error"):
+                            raise RuntimeError(f"Ollama生成エラー: {data['error']}")
+                    
+                        piece = data.get(key) or ""
+                        if key == "message":
+                            piece = piece.get("content", "") if piece else ""
+                        if piece:
+                            if stats.ttft is None:
+                                stats.ttft = time.perf_counter() - start_time
+                            chunks += 1
+                            yield piece
+                    
+                        if data.get("done"):
+                            self.health.record_success()
+                            stats.done_reason = data.get("done_reason")
+                            stats.tokens = data.get("eval_count", chunks)
+                            stats.prompt_tokens = data.get("prompt_eval_count", 0)
+                            eval_duration = data.get("eval_duration", 0) / 1e9
+                            if eval_duration > 0:
+                                stats.tokens_per_sec = stats.tokens / eval_duration
+                            break
+                    
+                        if abort_flag and abort_flag.get('flag', False):
+                            response.close()
+                            break
+        
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                # 中断による切断以外は死活監視に伝えて（後続のファイルを即座に失敗させる）送出
+                if not (abort_flag and abort_flag.get('flag', False)):
+                    self.health.record_failure(f"{type(e).__name__}: {e}")
+                    raise
+            finally:
+                if watcher is not None:
+                    watcher.cancel()
+                stats.total_time = time.perf_counter() - start_time
+                if not stats.tokens:
+                    stats.tokens = chunks
+                if not stats.tokens_per_sec and stats.ttft is not None and stats.total_time > stats.ttft:
+                    stats.tokens_per_sec = stats.tokens / (stats.total_time - stats.ttft)
+        
+            if abort_flag and abort_flag.get('flag', False):
+                stats.aborted = True
+                self.logger.info(f"Ollama生成を中断 ({self.model}): {chunks}チャンク受信後")
+                raise InterruptedError("処理が中断されました")
+    
+    def _open_stream(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        abort_flag: Optional[Dict],
+        lane: Optional[str]
+    ) -> GenerationStream:
+        stats = GenerationStats(model=self.model)
+        return GenerationStream(stats, self._stream(endpoint, payload, abort_flag, lane, stats))
+    
+    @staticmethod
+    async def _watch_abort(abort_flag: Dict, response) -> None:
+        """中断フラグを監視し、立ったら応答を閉じて読み込み待ちを解除"""
+        while not abort_flag.get('flag', False):
+            await asyncio.sleep(ABORT_POLL_INTERVAL)
+        response.close()
+    
+    def stream_generate(
+        self,
+        prompt: str,
+        abort_flag: Optional[Dict] = None,
+        generation_params: Optional[Dict] = None,
+        system: Optional[str] = None,
+        lane: Optional[str] = None
+    ) -> GenerationStream:
+        """/api/generate のトークンストリーム（async with で開き、async for で断片を受け取る）"""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "options": build_options(generation_params),
+        }
+        if system:
+            payload["system"] = system
+        return self._open_stream("/api/generate", payload, abort_flag, lane)
+    
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        abort_flag: Optional[Dict] = None,
+        generation_params: Optional[Dict] = None,
+        lane: Optional[str] = None
+    ) -> GenerationStream:
+        """/api/chat のトークンストリーム（messages は role/content の辞書リスト）"""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            "options": build_options(generation_params),
+        }
+        return self._open_stream("/api/chat", payload, abort_flag, lane)
     
     async def generate_text(
         self, 
         prompt: str, 
         abort_flag: Optional[Dict] = None,
-        generation_params: Optional[Dict] = None
+        generation_params: Optional[Dict] = None,
+        lane: Optional[str] = None
     ) -> str:
-        """テキスト生成"""
+        """テキスト生成（ストリームを受け取り終えた全文を返す）"""
+        text_result, _ = await self.generate_text_with_stats(prompt, abort_flag, generation_params, lane)
+        return text_result
+    
+    async def generate_text_with_stats(
+        self,
+        prompt: str,
+        abort_flag: Optional[Dict] = None,
+        generation_params: Optional[Dict] = None,
+        lane: Optional[str] = None
+    ) -> Tuple[str, GenerationStats]:
+        """テキスト生成（全文とこの呼び出しの計測値を返す）"""
         try:
-            # 中断チェック
-            if abort_flag and abort_flag.get('flag', False):
-                raise InterruptedError("処理が中断されました")
-            
             # デフォルト生成パラメータ
             default_params = {
                 "max_new_tokens": 1024,
@@ -114,39 +338,27 @@ class OllamaClient:
             }
             params = {**default_params, **(generation_params or {})}
             
-            # LLMインスタンス生成
-            llm = ChatOllama(
-                model=self.model, 
-                base_url=self.base_url,
-                **params
-            )
-            
-            # 非同期生成実行
-            start_time = time.perf_counter()
-            result = await asyncio.to_thread(llm.invoke, prompt)
-            elapsed = time.perf_counter() - start_time
+            async with self.stream_generate(prompt, abort_flag, params, lane=lane) as stream:
+                text_result = "".join([piece async for piece in stream])
             
-            self.logger.info(f"Ollama生成完了 ({self.model}): {elapsed:.2f}秒")
-            
-            # AIMessageオブジェクトからテキスト抽出
-            if hasattr(result, 'content'):
-                text_result = result.content
-            elif hasattr(result, 'text'):
-                text_result = result.text
-            else:
-                text_result = str(result)
+            stats = stream.stats
+            self.logger.info(
+                f"Ollama生成完了 ({self.model}): {stats.total_time:.2f}秒 "
+                f"(TTFT {stats.ttft or 0:.2f}秒, {stats.tokens}トークン, {stats.tokens_per_sec:.1f}トークン/秒)"
+            )
             
             # 空応答チェック
             if not text_result.strip():
                 self.logger.warning("Ollamaが空の応答を返しました")
-                return "[EMPTY_RESPONSE]"
+                return "[EMPTY_RESPONSE]", stats
             
-            return text_result.strip()
+            return text_result.strip(), stats
             
-        except OllamaEndpointNotFoundError as e:
-            error_msg = f"Ollamaモデル '{self.model}' が見つかりません。`ollama pull {self.model}` を実行してください。"
-            self.logger.error(error_msg)
-            raise RuntimeError(error_msg) from e
+        except OllamaModelNotFoundError as e:
+            self.logger.error(str(e))
+            raise
+        except InterruptedError:
+            raise
         except Exception as e:
             self.logger.error(f"Ollama生成エラー: {e}")
             raise
@@ -155,43 +367,26 @@ class OllamaClient:
 class OllamaRefiner:
     """Ollamaによるテキスト整形処理"""
     
-    def __init__(self, client: Optional[OllamaClient] = None):
+    def __init__(self, client: Optional[OllamaClient] = None, cache: Optional[LLMResponseCache] = None):
         self.client = client or OllamaClient()
         self.logger = LOGGER
+        self.cache = cache if cache is not None else get_llm_response_cache()
+        self.cache_stats = CacheStats()  # このリファイナーでのキャッシュ利用状況
+        self.last_segments: List[Dict[str, Any]] = []  # 直近の区間整形の区間ごとの結果
+        self.generated_tokens = 0  # このリファイナーで生成したトークン数（キャッシュヒット分は含まない）
     
     def normalize_text(self, text: str) -> str:
-        """テキスト正規化（空行圧縮など）"""
-        # 空白のみの行を削除
-        text = re.sub(r'^[\s\u3000]+$', '', text, flags=re.MULTILINE)
-        # 連続空行を最大1行に圧縮
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        return text.strip()
+        """テキスト正規化（空白のみの行を削除・連続空行を最大1行に圧縮）"""
+        return normalize_empty_lines_strip(text)
     
     def build_refinement_prompt(self, raw_text: str, language: str = "ja") -> str:
         """整形用プロンプト構築（高品質プロンプト使用）"""
         try:
-            # 絶対importパスでプロンプトローダーを取得
-            import sys
-            import os
-            
-            # ワークスペースルートをパスに追加
-            workspace_root = '/workspace'
-            if workspace_root not in sys.path:
-                sys.path.insert(0, workspace_root)
+            # 高品質プロンプト（コンパイル済みテンプレートに差し込み、ファイル更新時のみ再読み込み）
+            template = get_prompt_loader().get_template("refine_prompt_advanced", language)
+            prompt = template.render(TEXT=self.normalize_text(raw_text))
             
-            from new.services.llm.prompt_loader import get_prompt_loader
-            
-            # 高品質プロンプトローダーから取得
-            prompt_loader = get_prompt_loader()
-            prompt_template = prompt_loader.load_prompt("refine_prompt_advanced", language)
-            
-            # テキスト正規化
-            normalized_text = self.normalize_text(raw_text)
-            
-            # プロンプトテンプレートをフォーマット
-            prompt = prompt_loader.format_prompt(prompt_template, TEXT=normalized_text)
-            
-            self.logger.info(f"✅ 高品質プロンプト使用成功: {len(prompt_template)}文字, 言語={language}")
+            self.logger.debug(f"✅ 高品質プロンプト使用成功: {len(template)}文字, 言語={language}")
             return prompt
             
         except Exception as e:
@@ -228,11 +423,17 @@ Please organize it in a readable format without changing the content.
         raw_text: str,
         abort_flag: Optional[Dict] = None,
         language: str = "ja",
-        quality_threshold: float = 0.7
+        quality_threshold: float = 0.7,
+        temperature: float = 0.7,
+        seed: Optional[int] = None
     ) -> Tuple[str, str, float]:
         """
         テキスト整形実行
         
+        推定トークン数が LLM_SEGMENT_TOKENS を超える長文はページ・段落境界で区間に分割し、
+        LLM_MAX_CONCURRENCY 件ずつ並列に整形して結合する。
+        temperature=0 またはシード固定（省略時は LLM_SEED）の場合、応答をディスクにキャッシュする。
+        
         Returns:
             Tuple[refined_text, language, quality_score]
         """
@@ -241,19 +442,26 @@ Please organize it in a readable format without changing the content.
             if abort_flag and abort_flag.get('flag', False):
                 raise InterruptedError("処理が中断されました")
             
+            params = {"temperature": temperature, "seed": seed if seed is not None else settings.LLM_SEED}
+            
+            # 長文は区間に分割して並列整形
+            segments = split_segments(
+                self.normalize_text(raw_text),
+                settings.LLM_SEGMENT_TOKENS,
+                settings.LLM_SEGMENT_OVERLAP_TOKENS
+            )
+            if len(segments) > 1:
+                refined_text, quality_score = await self._refine_segments(segments, abort_flag, language, params=params)
+                return refined_text, language, quality_score
+            
             # プロンプト構築
             prompt = self.build_refinement_prompt(raw_text, language)
             
             self.logger.info(f"LLM整形開始 (文字数: {len(raw_text)}, 言語: {language})")
             
             # LLM生成実行
-            refined_text = await self.client.generate_text(
-                prompt=prompt,
-                abort_flag=abort_flag,
-                generation_params={
-                    "min_length": max(1, int(len(raw_text) * 0.8)),
-                    "temperature": 0.7
-                }
+            refined_text = await self._generate(
+                prompt, abort_flag, {**params, "min_length": max(1, int(len(raw_text) * 0.8))}
             )
             
             # 品質スコア算出（簡易版）
@@ -268,6 +476,93 @@ Please organize it in a readable format without changing the content.
             # フォールバック：正規化のみ
             return self.normalize_text(raw_text), language, 0.5
     
+    async def _refine_segments(
+        self,
+        segments: List[TextSegment],
+        abort_flag: Optional[Dict],
+        language: str,
+        max_concurrency: Optional[int] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, float]:
+        """
+        区間ごとに最大 max_concurrency 件ずつ並列整形し、重なりを除去して結合
+        
+        Returns:
+            Tuple[結合後テキスト, 区間スコアの文字数加重平均]（区間ごとの結果は self.last_segments）
+        """
+        limit = max(1, min(max_concurrency or settings.LLM_MAX_CONCURRENCY, len(segments)))
+        semaphore = asyncio.Semaphore(limit)
+        self.logger.info(f"LLM区間整形開始 ({len(segments)}区間, 同時実行数={limit}, 言語: {language})")
+        
+        async def refine_segment(segment: TextSegment) -> Tuple[str, float]:
+            async with semaphore:
+                if abort_flag and abort_flag.get('flag', False):
+                    raise InterruptedError("処理が中断されました")
+                start_time = time.perf_counter()
+                refined = await self._generate(
+                    self.build_refinement_prompt(segment.text, language),
+                    abort_flag,
+                    {"temperature": 0.7, **(params or {}), "min_length": max(1, int(len(segment.text) * 0.8))}
+                )
+                return refined, time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        tasks = [asyncio.ensure_future(refine_segment(segment)) for segment in segments]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # 1区間でも失敗・中断したら残りの区間を取り消す
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        outputs = [refined for refined, _ in results]
+        scores = [self._calculate_quality_score(segment.text, refined) for segment, refined in zip(segments, outputs)]
+        total_chars = sum(len(segment.text) for segment in segments)
+        quality_score = sum(s * len(segment.text) for s, segment in zip(scores, segments)) / max(total_chars, 1)
+        self.last_segments = [
+            {"index": segment.index, "chars": len(segment.text), "score": score, "elapsed": elapsed}
+            for segment, score, (_, elapsed) in zip(segments, scores, results)
+        ]
+        
+        self.logger.info(
+            f"LLM区間整形完了 ({len(segments)}区間, {time.perf_counter() - start_time:.1f}秒, "
+            f"品質スコア: {quality_score:.2f}, 区間最低: {min(scores):.2f})"
+        )
+        return stitch_segments(segments, outputs), quality_score
+    
+    async def _generate(self, prompt: str, abort_flag: Optional[Dict], generation_params: Dict[str, Any]) -> str:
+        """
+        LLM生成（決定的な生成設定ならディスクキャッシュを参照・保存）
+        
+        キャッシュの利用状況は self.cache_stats に集計する。
+        """
+        params = {"max_new_tokens": 1024, **generation_params}
+        key = None
+        if self.cache is not None:
+            options = build_options(params)
+            if is_deterministic(options):
+                key = cache_key(self.client.model, prompt, options)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    response, elapsed = cached
+                    self.cache_stats.record_hit(elapsed)
+                    self.logger.info(f"LLMキャッシュヒット ({self.client.model}): 推論{elapsed:.1f}秒を省略")
+                    return response
+                self.cache_stats.record_miss()
+            else:
+                self.cache_stats.record_bypass()
+        
+        start_time = time.perf_counter()
+        refined, stats = await self.client.generate_text_with_stats(
+            prompt=prompt, abort_flag=abort_flag, generation_params=params, lane=BATCH
+        )
+        self.generated_tokens += stats.tokens
+        if key is not None and refined != "[EMPTY_RESPONSE]":
+            self.cache.put(key, self.client.model, refined, time.perf_counter() - start_time)
+        return refined
+    
     def _calculate_quality_score(self, original: str, refined: str) -> float:
         """品質スコア算出（簡易版）"""
         try:
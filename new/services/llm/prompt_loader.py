@@ -2,12 +2,60 @@
 # プロンプト管理モジュール
 
 import os
+import re
 from pathlib import Path
 from typing import Dict, Optional
 import logging
 
+from .prompt_registry import CompiledPrompt, get_prompt_registry
+
 LOGGER = logging.getLogger(__name__)
 
+# 言語セクションの見出し行（"ja:"・"en:" 等）
+_LANGUAGE_HEADER = re.compile(r'^\s*([a-z]{2}(?:[-_][A-Za-z]+)?):\s*$', re.MULTILINE)
+
+
+def _extract_language_section(content: str, language: str) -> Optional[str]:
+    """プロンプトファイルから指定言語のセクションを抽出"""
+    lines = content.split('\n')
+    in_target_section = False
+    result_lines = []
+    
+    for line in lines:
+        # 言語セクション開始
+        if line.strip() == f"{language}:":
+            in_target_section = True
+            continue
+        
+        # 別の言語セクション開始（終了）
+        if line.strip().endswith(':') and line.strip() != f"{language}:":
+            if in_target_section:
+                break
+            continue
+        
+        # コメント行をスキップ
+        if line.strip().startswith('#'):
+            continue
+        
+        # 対象セクション内の場合は追加
+        if in_target_section:
+            result_lines.append(line)
+    
+    if result_lines:
+        return '\n'.join(result_lines).strip()
+    
+    return None
+
+
+def parse_language_sections(content: str) -> Dict[str, str]:
+    """プロンプトファイル内の全言語セクションを抽出"""
+    sections = {}
+    for language in dict.fromkeys(_LANGUAGE_HEADER.findall(content)):
+        section = _extract_language_section(content, language)
+        if section:
+            sections[language] = section
+    return sections
+
 class PromptLoader:
     """プロンプトファイルローダー"""
     
@@ -18,69 +66,39 @@ class PromptLoader:
             prompts_dir = current_dir / "prompts"
         
         self.prompts_dir = Path(prompts_dir)
-        self._prompt_cache = {}
+        self.registry = get_prompt_registry()
+        self._fallbacks: Dict[str, CompiledPrompt] = {}
+        
+        # 全プロンプトファイルを事前に解析（以降は更新されたファイルだけ再読み込み）
+        for prompt_file in sorted(self.prompts_dir.glob("*.txt")):
+            self.registry.sections(prompt_file, parse_language_sections)
         
         LOGGER.info(f"プロンプトローダー初期化: {self.prompts_dir}")
     
-    def load_prompt(self, prompt_name: str, language: str = "ja") -> str:
-        """プロンプトファイルから指定言語のプロンプトを読み込み"""
-        cache_key = f"{prompt_name}_{language}"
-        
-        if cache_key in self._prompt_cache:
-            return self._prompt_cache[cache_key]
-        
+    def get_template(self, prompt_name: str, language: str = "ja") -> CompiledPrompt:
+        """コンパイル済みテンプレート（ファイル・言語セクションが無ければフォールバック）"""
         prompt_file = self.prompts_dir / f"{prompt_name}.txt"
+        template = self.registry.get(prompt_file, parse_language_sections, language)
+        if template is not None:
+            return template
         
-        if not prompt_file.exists():
-            LOGGER.error(f"プロンプトファイルが見つかりません: {prompt_file}")
-            return self._get_fallback_prompt(prompt_name, language)
-        
-        try:
-            content = prompt_file.read_text(encoding='utf-8')
-            prompt = self._extract_language_section(content, language)
-            
-            if prompt:
-                self._prompt_cache[cache_key] = prompt
-                LOGGER.debug(f"プロンプト読み込み成功: {prompt_name} ({language})")
-                return prompt
+        key = f"{prompt_name}_{language}"
+        fallback = self._fallbacks.get(key)
+        if fallback is None:
+            if not prompt_file.exists():
+                LOGGER.error(f"プロンプトファイルが見つかりません: {prompt_file}")
             else:
                 LOGGER.warning(f"言語セクションが見つかりません: {language} in {prompt_name}")
-                return self._get_fallback_prompt(prompt_name, language)
-                
-        except Exception as e:
-            LOGGER.error(f"プロンプト読み込みエラー [{prompt_file}]: {e}")
-            return self._get_fallback_prompt(prompt_name, language)
+            fallback = self._fallbacks[key] = CompiledPrompt(self._get_fallback_prompt(prompt_name, language))
+        return fallback
     
-    def _extract_language_section(self, content: str, language: str) -> Optional[str]:
-        """プロンプトファイルから指定言語のセクションを抽出"""
-        lines = content.split('\n')
-        in_target_section = False
-        result_lines = []
-        
-        for line in lines:
-            # 言語セクション開始
-            if line.strip() == f"{language}:":
-                in_target_section = True
-                continue
-            
-            # 別の言語セクション開始（終了）
-            if line.strip().endswith(':') and line.strip() != f"{language}:":
-                if in_target_section:
-                    break
-                continue
-            
-            # コメント行をスキップ
-            if line.strip().startswith('#'):
-                continue
-            
-            # 対象セクション内の場合は追加
-            if in_target_section:
-                result_lines.append(line)
-        
-        if result_lines:
-            return '\n'.join(result_lines).strip()
-        
-        return None
+    def load_prompt(self, prompt_name: str, language: str = "ja") -> str:
+        """プロンプトファイルから指定言語のプロンプトを読み込み"""
+        return self.get_template(prompt_name, language).source
+    
+    def render(self, prompt_name: str, language: str = "ja", **values: str) -> str:
+        """テンプレートに値を差し込んだプロンプト（{TEXT} 等）"""
+        return self.get_template(prompt_name, language).render(**values)
     
     def _get_fallback_prompt(self, prompt_name: str, language: str) -> str:
         """フォールバックプロンプト"""
@@ -0,0 +1,129 @@
+# new/services/llm/prompt_registry.py
+# プロンプトテンプレートの共有レジストリ（ファイルを1回だけ読み込み・解析して差し込み位置を事前計算・mtime監視で再読み込み）
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# 差し込み位置（{TEXT}・{CONTEXT}・{QUERY} 等の大文字名のみ、本文中の {} や JSON 例はそのまま残す）
+_PLACEHOLDER = re.compile(r'\{([A-Z][A-Z0-9_]*)\}')
+
+# ファイル内容 → {セクション名: テンプレート文字列}
+SectionParser = Callable[[str], Dict[str, str]]
+
+
+class CompiledPrompt:
+    """
+    解析済みテンプレート
+
+    固定部分と差し込み位置を分割済みのリストとして保持し、render ではそのコピーの
+    差し込み位置だけを置き換えて1回の join で組み立てる（テンプレート本文の走査・置換はしない）。
+    """
+
+    __slots__ = ("source", "fields", "_parts", "_slots")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = _PLACEHOLDER.split(source)
+        # 奇数位置が差し込み名（値が渡されなければ "{NAME}" のまま出力）
+        self._slots: Tuple[Tuple[int, str], ...] = tuple((i, parts[i]) for i in range(1, len(parts), 2))
+        for index, name in self._slots:
+            parts[index] = "{" + name + "}"
+        self._parts = parts
+        self.fields: FrozenSet[str] = frozenset(name for _, name in self._slots)
+
+    def render(self, **values: str) -> str:
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            value = values.get(name)
+            if value is not None:
+                parts[index] = value
+        return "".join(parts)
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+
+@dataclass
+class _PromptFile:
+    path: Path
+    parser: SectionParser
+    version: Tuple[int, int] = (0, 0)       # (mtime_ns, size)（0 は未読み込み・ファイル無し）
+    checked_at: float = 0.0
+    sections: Dict[str, CompiledPrompt] = field(default_factory=dict)
+
+
+class PromptRegistry:
+    """
+    プロンプトファイルの解析結果を共有するレジストリ
+
+    ファイルは初回参照時にすべてのセクションを解析してコンパイルし、以降はメモリ上の結果を返す。
+    mtime・サイズの確認は check_interval 秒に1回だけ行い、変わっていれば再読み込みする。
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        self.check_interval = check_interval
+        self._files: Dict[Tuple[Path, SectionParser], _PromptFile] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, parser: SectionParser, section: str) -> Optional[CompiledPrompt]:
+        """セクションのコンパイル済みテンプレート（ファイル・セクションが無ければ None）"""
+        return self.sections(path, parser).get(section)
+
+    def sections(self, path, parser: SectionParser) -> Dict[str, CompiledPrompt]:
+        """ファイル内の全セクション"""
+        key = (Path(path), parser)
+        entry = self._files.get(key)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            return entry.sections
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is None:
+                entry = self._files[key] = _PromptFile(key[0], parser)
+            if now - entry.checked_at >= self.check_interval or not entry.checked_at:
+                self._refresh(entry)
+                entry.checked_at = now
+        return entry.sections
+
+    def _refresh(self, entry: _PromptFile):
+        try:
+            stat = entry.path.stat()
+        except OSError:
+            if entry.version != (0, 0):
+                LOGGER.warning(f"プロンプトファイルが見つかりません: {entry.path}")
+            entry.version, entry.sections = (0, 0), {}
+            return
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == entry.version:
+            return
+        try:
+            content = entry.path.read_text(encoding="utf-8")
+            sections = {name: CompiledPrompt(text) for name, text in entry.parser(content).items()}
+        except Exception as e:
+            # 読み込みに失敗したら直前の内容を使い続ける（次回の確認で再試行）
+            LOGGER.error(f"プロンプト読み込みエラー [{entry.path}]: {e}")
+            return
+        if entry.version != (0, 0):
+            LOGGER.info(f"プロンプト再読み込み: {entry.path.name} ({len(sections)}セクション)")
+        entry.version, entry.sections = version, sections
+
+    def invalidate(self):
+        """次の参照で全ファイルを確認させる"""
+        with self._lock:
+            for entry in self._files.values():
+                entry.checked_at = 0.0
+
+
+_registry = PromptRegistry()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """プロセス共通のレジストリ"""
+    return _registry
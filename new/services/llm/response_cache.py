@@ -0,0 +1,220 @@
+# new/services/llm/response_cache.py
+# LLM応答の永続キャッシュ（プロンプト・モデル・生成パラメータのハッシュをキーにSQLiteへ保存・容量上限でLRU削除）
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# キー・保存形式を変えたら上げる（古いエントリは参照されずLRUで消える）
+CACHE_FORMAT = 1
+CACHE_FILE_NAME = "llm_responses.sqlite3"
+
+# 生成結果に影響しないため、キーに含めないパラメータ
+_IGNORED_PARAMS = {"min_length"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+
+def is_deterministic(params: Mapping[str, Any]) -> bool:
+    """
+    同じ入力に同じ応答が返る生成設定か（temperature=0 またはシード固定）
+
+    temperature 未指定はOllamaの既定値（0.8）でサンプリングされるため非決定的とみなす。
+    """
+    if params.get("seed") is not None:
+        return True
+    temperature = params.get("temperature")
+    return temperature is not None and float(temperature) == 0.0
+
+
+def cache_key(model: str, prompt: str, params: Mapping[str, Any], template_version: str = "") -> str:
+    """
+    キャッシュキー（SHA-256）
+
+    プロンプトはテンプレートに正規化済みテキストを埋め込んだものなので、
+    テンプレートの変更・入力の変更はどちらもキーを変える。
+    """
+    payload = json.dumps(
+        [CACHE_FORMAT, template_version, model, prompt,
+         sorted((k, v) for k, v in params.items() if k not in _IGNORED_PARAMS and v is not None)],
+        ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """キャッシュ利用状況（ジョブ・リファイナー単位で集計）"""
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0          # 非決定的な生成設定のためキャッシュを使わなかった回数
+    time_saved: float = 0.0    # ヒットで省略できた推論時間の合計（秒）
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_hit(self, saved: float):
+        with self._lock:
+            self.hits += 1
+            self.time_saved += max(0.0, saved)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def merge(self, other: "CacheStats"):
+        with self._lock:
+            self.hits += other.hits
+            self.misses += other.misses
+            self.bypassed += other.bypassed
+            self.time_saved += other.time_saved
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "time_saved": round(self.time_saved, 3),
+        }
+
+
+class LLMResponseCache:
+    """
+    ディスク上のLLM応答キャッシュ
+
+    1ファイルのSQLiteに保存するため、複数プロセス（API・ワーカー）から共有できる。
+    合計サイズが max_bytes を超えたら最終参照が古い順に削除する。
+    キャッシュの読み書きに失敗しても整形処理は止めない（ミス扱い）。
+    """
+
+    def __init__(self, path, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 初回利用時に作成（使わないプロセスではファイルを作らない）
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(応答, 元の推論時間) を返し、最終参照時刻を更新（無ければ None）"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT response, elapsed FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                return row[0], row[1]
+        except sqlite3.Error as e:
+            LOGGER.warning(f"LLMキャッシュ読み込み失敗: {e}")
+            return None
+
+    def put(self, key: str, model: str, response: str, elapsed: float):
+        """応答を保存し、容量上限を超えていれば古いエントリを削除"""
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, model, response, size, elapsed, now, now)
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            LOGGER.warning(f"LLMキャッシュ書き込み失敗: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 上限の9割まで減らす（書き込みのたびに削除が走らないよう余裕を持たせる）
+        excess = total - int(self.max_bytes * 0.9)
+        removed = 0
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            keys.append((key,))
+            removed += size
+            if removed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        LOGGER.info(f"LLMキャッシュ削除: {len(keys)}件 ({removed / 1024:.0f}KB)")
+
+    def stats(self) -> Dict[str, int]:
+        """保存件数と合計サイズ"""
+        try:
+            with self._lock:
+                count, total = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+            return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
+        except sqlite3.Error as e:
+            LOGGER.warning(f"LLMキャッシュ集計失敗: {e}")
+            return {"entries": 0, "bytes": 0, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_caches: Dict[Path, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_response_cache(cache_dir=None, max_bytes: Optional[int] = None) -> Optional[LLMResponseCache]:
+    """
+    プロセス内で共有するキャッシュ（LLM_CACHE_ENABLED が False なら None）
+
+    cache_dir 省略時は new.config の LLM_CACHE_DIR を使う。
+    """
+    if cache_dir is None:
+        from new.config import settings
+        if not settings.LLM_CACHE_ENABLED:
+            return None
+        cache_dir = settings.LLM_CACHE_DIR
+        max_bytes = max_bytes or settings.LLM_CACHE_MAX_MB * 1024 * 1024
+    path = Path(cache_dir) / CACHE_FILE_NAME
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = LLMResponseCache(path, max_bytes or 256 * 1024 * 1024)
+        return cache
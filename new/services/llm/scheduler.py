@@ -0,0 +1,219 @@
+# new/services/llm/scheduler.py
+# プロセス共通のLLM実行枠制御（モデルごとの同時実行数・対話/バッチの優先レーン・待ち行列の計測）
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# レーン（優先度順）
+INTERACTIVE = "interactive"   # チャット等、利用者が応答を待っている要求
+BATCH = "batch"               # 取り込み・整形等のバッチ処理
+LANES = (INTERACTIVE, BATCH)
+
+# 中断フラグの確認間隔（秒）
+ABORT_POLL_INTERVAL = 0.2
+
+
+class _Waiter:
+    """実行枠の待ち1件（スレッドからは Event、イベントループからは Future で通知）"""
+
+    __slots__ = ("lane", "enqueued_at", "granted", "event", "future", "loop")
+
+    def __init__(self, lane: str, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.lane = lane
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def notify(self):
+        if self.loop is None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+@dataclass
+class LaneStats:
+    """レーンごとの累計"""
+    admitted: int = 0
+    deferred: int = 0          # 待機中に対話レーンの要求に追い越された回数
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def to_dict(self, queued: int, running: int) -> Dict[str, Any]:
+        return {
+            "queued": queued,
+            "running": running,
+            "admitted": self.admitted,
+            "deferred": self.deferred,
+            "avg_wait": round(self.total_wait / self.admitted, 3) if self.admitted else 0.0,
+            "max_wait": round(self.max_wait, 3),
+        }
+
+
+@dataclass
+class _ModelSlots:
+    limit: int
+    running: Dict[str, int] = field(default_factory=lambda: {lane: 0 for lane in LANES})
+    queues: Dict[str, Deque[_Waiter]] = field(default_factory=lambda: {lane: deque() for lane in LANES})
+    stats: Dict[str, LaneStats] = field(default_factory=lambda: {lane: LaneStats() for lane in LANES})
+
+
+class LLMScheduler:
+    """
+    LLM要求の実行枠を払い出すスケジューラ
+
+    モデルごとに同時実行数 limit の枠を持ち、空いた枠は対話レーンの待ちを先に割り当てる。
+    バッチレーンは limit - interactive_reserve 件までしか同時実行しないため、
+    取り込み中でもチャットは実行中の長い整形の完了を待たずに開始できる。
+    実行中の生成は途中で止めない（待ち行列の順序だけを入れ替える）。
+
+    スレッド（ThreadPoolExecutor の整形）とイベントループ（チャット・非同期整形）の両方から利用できる。
+    """
+
+    def __init__(
+        self,
+        default_limit: int = 3,
+        model_limits: Optional[Dict[str, int]] = None,
+        interactive_reserve: int = 1
+    ):
+        self.default_limit = max(1, default_limit)
+        self.model_limits = dict(model_limits or {})
+        self.interactive_reserve = max(0, interactive_reserve)
+        self._models: Dict[str, _ModelSlots] = {}
+        self._lock = threading.Lock()
+
+    def _slots(self, model: str) -> _ModelSlots:
+        slots = self._models.get(model)
+        if slots is None:
+            limit = max(1, self.model_limits.get(model, self.default_limit))
+            slots = self._models[model] = _ModelSlots(limit)
+        return slots
+
+    def _batch_limit(self, slots: _ModelSlots) -> int:
+        return max(1, slots.limit - self.interactive_reserve)
+
+    def _dispatch(self, slots: _ModelSlots):
+        """空いている枠を優先度順に割り当てる（ロック保持中に呼ぶ）"""
+        interactive, batch = slots.queues[INTERACTIVE], slots.queues[BATCH]
+        while sum(slots.running.values()) < slots.limit:
+            if interactive:
+                waiter = interactive.popleft()
+                # 先に並んでいたバッチ要求を追い越した
+                for deferred in batch:
+                    if deferred.enqueued_at < waiter.enqueued_at:
+                        slots.stats[BATCH].deferred += 1
+            elif batch and slots.running[BATCH] < self._batch_limit(slots):
+                waiter = batch.popleft()
+            else:
+                break
+            self._grant(slots, waiter)
+
+    @staticmethod
+    def _grant(slots: _ModelSlots, waiter: _Waiter):
+        waiter.granted = True
+        slots.running[waiter.lane] += 1
+        stats = slots.stats[waiter.lane]
+        wait = time.monotonic() - waiter.enqueued_at
+        stats.admitted += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        waiter.notify()
+
+    def _enqueue(self, model: str, waiter: _Waiter) -> _ModelSlots:
+        if waiter.lane not in LANES:
+            raise ValueError(f"不明なレーン: {waiter.lane}")
+        with self._lock:
+            slots = self._slots(model)
+            slots.queues[waiter.lane].append(waiter)
+            self._dispatch(slots)
+        return slots
+
+    def _release(self, slots: _ModelSlots, waiter: _Waiter):
+        """枠を返す（未割り当てで諦めた場合は待ち行列から外す）"""
+        with self._lock:
+            if waiter.granted:
+                slots.running[waiter.lane] -= 1
+            else:
+                try:
+                    slots.queues[waiter.lane].remove(waiter)
+                except ValueError:
+                    pass
+            self._dispatch(slots)
+
+    @asynccontextmanager
+    async def slot(self, model: str, lane: str = INTERACTIVE, abort_flag: Optional[Dict] = None):
+        """イベントループから実行枠を取得（async with の間保持）"""
+        waiter = _Waiter(lane, asyncio.get_running_loop())
+        slots = self._enqueue(model, waiter)
+        try:
+            while not waiter.granted:
+                if abort_flag and abort_flag.get('flag', False):
+                    raise InterruptedError("処理が中断されました")
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), ABORT_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+            yield
+        finally:
+            self._release(slots, waiter)
+
+    @contextmanager
+    def slot_sync(self, model: str, lane: str = BATCH, abort_flag: Optional[Dict] = None):
+        """スレッドから実行枠を取得（with の間保持、取得までブロック）"""
+        waiter = _Waiter(lane)
+        slots = self._enqueue(model, waiter)
+        try:
+            while not waiter.event.wait(ABORT_POLL_INTERVAL):
+                if abort_flag and abort_flag.get('flag', False):
+                    raise InterruptedError("処理が中断されました")
+            yield
+        finally:
+            self._release(slots, waiter)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """モデル・レーンごとの待ち件数・実行中件数・待ち時間"""
+        with self._lock:
+            return {
+                model: {
+                    "limit": slots.limit,
+                    "batch_limit": self._batch_limit(slots),
+                    **{
+                        lane: slots.stats[lane].to_dict(len(slots.queues[lane]), slots.running[lane])
+                        for lane in LANES
+                    }
+                }
+                for model, slots in self._models.items()
+            }
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """プロセス共通のスケジューラ（設定は new.config の LLM_SCHEDULER_*）"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                from new.config import settings
+                _scheduler = LLMScheduler(
+                    default_limit=settings.LLM_SCHEDULER_CONCURRENCY,
+                    model_limits=settings.LLM_SCHEDULER_MODEL_CONCURRENCY,
+                    interactive_reserve=settings.LLM_SCHEDULER_INTERACTIVE_RESERVE
+                )
+    return _scheduler
@@ -2,11 +2,13 @@
 # OCRエンジンの基底クラス
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from dataclasses import dataclass
 from pathlib import Path
 import time
 
+from .resolution import AdaptiveResolutionPlanner, render_page
+
 @dataclass
 class OCRResult:
     """OCR処理結果"""
@@ -16,6 +18,7 @@ class OCRResult:
     confidence: Optional[float] = None
     error: Optional[str] = None
     page_count: Optional[int] = None
+    metadata: Optional[Dict] = None
 
 class OCREngine(ABC):
     """OCRエンジンの抽象基底クラス"""
@@ -54,4 +57,45 @@ class OCREngine(ABC):
             'version': self.version,
             'available': self.is_available(),
             'parameters': self.get_parameters()
-        }
\ No newline at end of file
+        }
+    
+    def process_pdf_pages(
+        self,
+        file_path: str,
+        recognize_page: Callable,
+        base_dpi: int,
+        planner: Optional[AdaptiveResolutionPlanner] = None
+    ) -> Dict:
+        """
+        PDFをページごとに画像化して認識する共通処理
+        
+        Args:
+            file_path: PDFファイルパス
+            recognize_page: (Pixmap, DPI) を受け取りテキストを返す関数
+            base_dpi: 基準DPI
+            planner: 適応解像度プランナー（Noneなら全ページ基準DPI）
+            
+        Returns:
+            text, page_count, resolution（適応解像度時の削減効果）を含む辞書
+        """
+        import fitz  # PyMuPDF
+        
+        doc = fitz.open(file_path)
+        try:
+            plan = planner.plan_document(doc, base_dpi) if planner else None
+            
+            ocr_start = time.perf_counter()
+            page_texts = []
+            for page_index in range(len(doc)):
+                dpi = plan.dpi_for(page_index) if plan else base_dpi
+                pix = render_page(doc.load_page(page_index), dpi)
+                page_texts.append(recognize_page(pix, dpi))
+            ocr_time = time.perf_counter() - ocr_start
+        finally:
+            doc.close()
+        
+        return {
+            'text': '\n\n'.join(page_texts),
+            'page_count': len(page_texts),
+            'resolution': plan.summary(ocr_time) if plan else None
+        }
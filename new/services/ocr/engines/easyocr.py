@@ -1,14 +1,97 @@
 # new/services/ocr/engines/easyocr.py
 # EasyOCRエンジン実装
 
+import math
 import time
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 from pathlib import Path
 from ..base import OCREngine, OCRResult
+from ..resolution import AdaptiveResolutionPlanner, PARAMETER_DEFINITIONS as RESOLUTION_PARAMETERS
 
 LOGGER = logging.getLogger(__name__)
 
+# EasyOCR認識モデルの入力高さ（Reader.recognize と同じ値）
+RECOGNIZER_HEIGHT = 64
+
+# reader.detect に渡せるパラメータ
+DETECT_OPTION_KEYS = (
+    'min_size', 'text_threshold', 'low_text', 'link_threshold', 'canvas_size',
+    'mag_ratio', 'slope_ths', 'ycenter_ths', 'height_ths', 'width_ths', 'add_margin'
+)
+
+
+def readtext_batched(
+    reader,
+    images: Sequence[Any],
+    batch_size: int = 32,
+    decoder: str = 'greedy',
+    beamWidth: int = 5,
+    contrast_ths: float = 0.1,
+    adjust_contrast: float = 0.5,
+    filter_ths: float = 0.003,
+    workers: int = 0,
+    **detect_options
+) -> List[List[Tuple[Any, str, float]]]:
+    """
+    複数ページ画像の検出領域をまとめて認識する（ページ横断バッチ）
+    
+    Reader.readtext はCPU時にボックス1個ずつ認識器を回すため、
+    全ページの検出領域を集めて幅順に並べ、batch_size 単位で1回の推論にまとめる。
+    幅の近い領域同士をまとめることでパディングも最小限になる。
+    
+    Args:
+        reader: 初期化済み easyocr.Reader
+        images: ページ画像（ファイルパス・バイト列・ndarray）のリスト
+        batch_size: 1回の認識推論に載せる領域数
+        decoder, beamWidth, contrast_ths, adjust_contrast, filter_ths, workers:
+            Reader.recognize と同じ認識パラメータ
+        **detect_options: reader.detect に渡す検出パラメータ
+        
+    Returns:
+        ページ順・ページ内の読み順（上から）に並んだ (box, text, confidence) のリスト
+    """
+    from easyocr.utils import reformat_input, get_image_list
+    from easyocr.recognition import get_text
+    
+    # 1. ページごとに検出し、切り出し領域を (ページ, ページ内順) 付きで集約
+    crops = []
+    page_sizes = []
+    for page_index, image in enumerate(images):
+        img, img_cv_grey = reformat_input(image)
+        horizontal_list, free_list = reader.detect(img, **detect_options)
+        image_list, _ = get_image_list(
+            horizontal_list[0], free_list[0], img_cv_grey, model_height=RECOGNIZER_HEIGHT
+        )
+        page_sizes.append(len(image_list))
+        for order, (box, crop) in enumerate(image_list):
+            crops.append((page_index, order, box, crop))
+    
+    # allowlist/blocklist 未指定時の Reader.recognize と同じ除外文字
+    ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+    
+    # 2. 幅順に並べてバッチ認識
+    crops.sort(key=lambda item: item[3].shape[1])
+    page_results: List[List[Optional[Tuple[Any, str, float]]]] = [[None] * size for size in page_sizes]
+    
+    for start in range(0, len(crops), batch_size):
+        chunk = crops[start:start + batch_size]
+        max_ratio = max(max(crop.shape[1] / crop.shape[0], 1.0) for _, _, _, crop in chunk)
+        image_width = int(math.ceil(max_ratio)) * RECOGNIZER_HEIGHT
+        
+        recognized = get_text(
+            reader.character, RECOGNIZER_HEIGHT, image_width, reader.recognizer, reader.converter,
+            [(box, crop) for _, _, box, crop in chunk],
+            ignore_char, decoder, beamWidth, batch_size, contrast_ths, adjust_contrast,
+            filter_ths, workers, reader.device
+        )
+        
+        # 3. 結果を元のページ・ボックス位置に戻す
+        for (page_index, order, _, _), item in zip(chunk, recognized):
+            page_results[page_index][order] = (item[0], item[1], float(item[2]))
+    
+    return [[item for item in page if item is not None] for page in page_results]
+
 class EasyOCREngine(OCREngine):
     """EasyOCRエンジン実装"""
     
@@ -146,7 +229,38 @@ class EasyOCREngine(OCREngine):
                 "step": 0.1,
                 "description": "画像の拡大比率（高精度モード時に使用）",
                 "category": "高精度設定"
-            }
+            },
+            {
+                "name": "batched_recognition",
+                "label": "ページ横断バッチ認識",
+                "type": "boolean",
+                "default": False,
+                "description": "複数ページの検出領域をまとめて認識（PDF入力時、段落モードは無効）",
+                "category": "バッチ設定"
+            },
+            {
+                "name": "recognition_batch_size",
+                "label": "認識バッチサイズ",
+                "type": "number",
+                "default": 32,
+                "min": 1,
+                "max": 256,
+                "step": 1,
+                "description": "1回の認識推論にまとめる領域数（ページ横断バッチ認識時）",
+                "category": "バッチ設定"
+            },
+            {
+                "name": "page_batch",
+                "label": "同時処理ページ数",
+                "type": "number",
+                "default": 8,
+                "min": 1,
+                "max": 64,
+                "step": 1,
+                "description": "検出領域を蓄積するページ数（多いほどメモリ使用量増加）",
+                "category": "バッチ設定"
+            },
+            *RESOLUTION_PARAMETERS
         ]
     
     def _initialize_reader(self, **kwargs):
@@ -175,6 +289,59 @@ class EasyOCREngine(OCREngine):
             LOGGER.error(f"EasyOCR初期化エラー: {e}")
             raise
     
+    def _process_pdf_batched(
+        self,
+        file_path: str,
+        planner: Optional[AdaptiveResolutionPlanner],
+        start_time: float,
+        **kwargs
+    ) -> OCRResult:
+        """PDFを page_batch ページずつ画像化し、ページ横断バッチで認識"""
+        import fitz  # PyMuPDF
+        from ..resolution import render_page
+        
+        base_dpi = int(72 * kwargs.get('zoom_factor', 2.0))
+        page_batch = max(1, int(kwargs.get('page_batch', 8)))
+        detect_options = {key: kwargs[key] for key in DETECT_OPTION_KEYS if key in kwargs}
+        
+        doc = fitz.open(file_path)
+        try:
+            plan = planner.plan_document(doc, base_dpi) if planner else None
+            ocr_start = time.perf_counter()
+            page_texts = []
+            
+            for first_page in range(0, len(doc), page_batch):
+                images = [
+                    render_page(doc.load_page(i), plan.dpi_for(i) if plan else base_dpi).tobytes("png")
+                    for i in range(first_page, min(first_page + page_batch, len(doc)))
+                ]
+                pages = readtext_batched(
+                    self._reader,
+                    images,
+                    batch_size=int(kwargs.get('recognition_batch_size', 32)),
+                    decoder=kwargs.get('decoder', 'greedy'),
+                    beamWidth=kwargs.get('beamWidth', 5),
+                    workers=kwargs.get('workers', 0),
+                    **detect_options
+                )
+                page_texts.extend('\n'.join(text for _, text, _ in page) for page in pages)
+            
+            ocr_time = time.perf_counter() - ocr_start
+        finally:
+            doc.close()
+        
+        return OCRResult(
+            success=True,
+            text='\n\n'.join(page_texts),
+            processing_time=time.perf_counter() - start_time,
+            page_count=len(page_texts),
+            metadata={
+                'batched_recognition': True,
+                'recognition_time': ocr_time,
+                'resolution': plan.summary(ocr_time) if plan else None
+            }
+        )
+    
     def process_file(self, file_path: str, **kwargs) -> OCRResult:
         """EasyOCRでファイルを処理"""
         start_time = time.perf_counter()
@@ -211,6 +378,40 @@ class EasyOCREngine(OCREngine):
             allowlist = kwargs.get('allowlist', '')
             blocklist = kwargs.get('blocklist', '')
             
+            readtext_options = dict(
+                detail=detail,
+                width_ths=width_ths,
+                height_ths=height_ths,
+                decoder=decoder,
+                beamWidth=beamWidth,
+                batch_size=batch_size,
+                workers=workers,
+                allowlist=allowlist if allowlist else None,
+                blocklist=blocklist if blocklist else None
+            )
+            
+            # PDF + ページ横断バッチ認識
+            planner = AdaptiveResolutionPlanner.from_parameters(kwargs)
+            if kwargs.get('batched_recognition', False) and Path(file_path).suffix.lower() == '.pdf':
+                return self._process_pdf_batched(file_path, planner, start_time, **kwargs)
+            
+            # PDF + 適応解像度: ページごとに最小限のDPIで画像化して認識
+            if planner and Path(file_path).suffix.lower() == '.pdf':
+                base_dpi = int(72 * kwargs.get('zoom_factor', 2.0))
+                pages = self.process_pdf_pages(
+                    file_path,
+                    lambda pix, dpi: '\n'.join(self._reader.readtext(pix.tobytes("png"), **readtext_options)),
+                    base_dpi,
+                    planner
+                )
+                return OCRResult(
+                    success=True,
+                    text=pages['text'],
+                    processing_time=time.perf_counter() - start_time,
+                    page_count=pages['page_count'],
+                    metadata={'resolution': pages['resolution']}
+                )
+            
             # OCR実行
             result = self._reader.readtext(
                 file_path,
@@ -6,6 +6,7 @@ import logging
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 from ..base import OCREngine, OCRResult
+from ..resolution import AdaptiveResolutionPlanner, PARAMETER_DEFINITIONS as RESOLUTION_PARAMETERS
 
 LOGGER = logging.getLogger(__name__)
 
@@ -166,7 +167,8 @@ class PaddleOCREngine(OCREngine):
                 "step": 1,
                 "description": "認識バッチサイズ",
                 "category": "認識設定"
-            }
+            },
+            *RESOLUTION_PARAMETERS
         ]
     
     def _initialize_ocr(self, **kwargs):
@@ -192,6 +194,16 @@ class PaddleOCREngine(OCREngine):
             LOGGER.error(f"PaddleOCR初期化エラー: {e}")
             raise
     
+    @staticmethod
+    def _extract_lines(result) -> List[str]:
+        """PaddleOCRの結果から認識テキスト行を取り出す"""
+        text_lines = []
+        if result and result[0]:
+            for line in result[0]:
+                if line and len(line) >= 2:
+                    text_lines.append(line[1][0])
+        return text_lines
+    
     def process_file(self, file_path: str, **kwargs) -> OCRResult:
         """PaddleOCRでファイルを処理"""
         start_time = time.perf_counter()
@@ -217,15 +229,36 @@ class PaddleOCREngine(OCREngine):
                     error=f"ファイルが見つかりません: {file_path}"
                 )
             
+            use_angle_cls = kwargs.get('use_angle_cls', True)
+            
+            # PDF + 適応解像度: ページごとに最小限のDPIで画像化して認識
+            planner = AdaptiveResolutionPlanner.from_parameters(kwargs)
+            if planner and Path(file_path).suffix.lower() == '.pdf':
+                import numpy as np
+                
+                def recognize_page(pix, dpi: int) -> str:
+                    image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+                    return '\n'.join(self._extract_lines(self._ocr.ocr(image, cls=use_angle_cls)))
+                
+                base_dpi = int(72 * kwargs.get('zoom_factor', 2.0))
+                pages = self.process_pdf_pages(file_path, recognize_page, base_dpi, planner)
+                return OCRResult(
+                    success=True,
+                    text=pages['text'],
+                    processing_time=time.perf_counter() - start_time,
+                    page_count=pages['page_count'],
+                    metadata={
+                        "engine": "PaddleOCR",
+                        "lang": kwargs.get('lang', 'japan'),
+                        "resolution": pages['resolution']
+                    }
+                )
+            
             # OCR実行
-            result = self._ocr.ocr(file_path, cls=kwargs.get('use_angle_cls', True))
+            result = self._ocr.ocr(file_path, cls=use_angle_cls)
             
             # 結果をテキストに変換
-            text_lines = []
-            if result and result[0]:
-                for line in result[0]:
-                    if line and len(line) >= 2:
-                        text_lines.append(line[1][0])
+            text_lines = self._extract_lines(result)
             
             extracted_text = '\n'.join(text_lines)
             processing_time = time.perf_counter() - start_time
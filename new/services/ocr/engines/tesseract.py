@@ -2,14 +2,81 @@
 # Tesseractエンジン実装
 
 import subprocess
+import threading
 import time
+import weakref
 import logging
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
 from ..base import OCREngine, OCRResult
+from ..resolution import AdaptiveResolutionPlanner, PARAMETER_DEFINITIONS as RESOLUTION_PARAMETERS
 
 LOGGER = logging.getLogger(__name__)
 
+# tesseract コマンドの利用可否（プロセス起動は初回のみ）
+_CLI_AVAILABLE: Optional[bool] = None
+
+# スレッドごとの初期化済み Tesseract API ハンドル（_thread_local.handles.apis = {(language, oem): PyTessBaseAPI}）
+_thread_local = threading.local()
+
+
+def _end_apis(apis: Dict) -> None:
+    """ハンドルを End() して言語モデルのメモリを解放"""
+    for api in list(apis.values()):
+        try:
+            api.End()
+        except Exception as e:
+            LOGGER.debug(f"Tesseract API終了エラー: {e}")
+    apis.clear()
+
+
+class _ThreadAPIs:
+    """スレッドのハンドル表（スレッド終了で破棄されたとき、またはプロセス終了時に End() する）"""
+    
+    def __init__(self):
+        self.apis: Dict[Tuple[str, int], object] = {}
+        weakref.finalize(self, _end_apis, self.apis)
+
+
+def _tesserocr_available() -> bool:
+    """インプロセスバインディング（tesserocr）が使えるか"""
+    try:
+        import tesserocr  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_thread_api(language: str, oem: int):
+    """
+    現在のスレッド専用の Tesseract API ハンドルを取得
+    
+    PyTessBaseAPI はスレッドセーフではないため、ワーカースレッドごとに
+    (言語, OEM) 単位で1つだけ初期化して使い回す（言語モデルのロードは初回のみ）。
+    ハンドルはスレッドの終了まで保持し、終了時に End() する（即座に解放するには release_thread_apis）。
+    """
+    import tesserocr
+    
+    handles = getattr(_thread_local, 'handles', None)
+    if handles is None:
+        handles = _thread_local.handles = _ThreadAPIs()
+    apis = handles.apis
+    
+    key = (language, int(oem))
+    api = apis.get(key)
+    if api is None:
+        api = tesserocr.PyTessBaseAPI(lang=language, oem=int(oem))
+        apis[key] = api
+        LOGGER.debug(f"Tesseract API初期化: {key} (thread={threading.current_thread().name})")
+    return api
+
+
+def release_thread_apis() -> None:
+    """現在のスレッドのハンドルをすべて End() して破棄"""
+    handles = getattr(_thread_local, 'handles', None)
+    if handles is not None:
+        _end_apis(handles.apis)
+
 class TesseractEngine(OCREngine):
     """Tesseractを使用したOCRエンジン"""
     
@@ -19,17 +86,35 @@ class TesseractEngine(OCREngine):
         self.version = "1.0.0"
     
     def is_available(self) -> bool:
-        """Tesseractが利用可能かチェック"""
-        try:
-            result = subprocess.run(
-                ['tesseract', '--version'], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+        """Tesseractが利用可能かチェック（結果はプロセス内でキャッシュ）"""
+        return _tesserocr_available() or self._cli_available()
+    
+    @staticmethod
+    def _cli_available() -> bool:
+        """tesseract コマンドが利用可能かチェック（初回のみプロセス起動）"""
+        global _CLI_AVAILABLE
+        if _CLI_AVAILABLE is None:
+            try:
+                result = subprocess.run(
+                    ['tesseract', '--version'], 
+                    capture_output=True, 
+                    text=True, 
+                    timeout=10
+                )
+                _CLI_AVAILABLE = result.returncode == 0
+            except (subprocess.TimeoutExpired, FileNotFoundError):
+                _CLI_AVAILABLE = False
+        return _CLI_AVAILABLE
+    
+    def _resolve_backend(self, backend: str) -> str:
+        """backend パラメータ（auto/api/subprocess）を実際のバックエンドに解決"""
+        if backend == 'subprocess':
+            return 'subprocess'
+        if _tesserocr_available():
+            return 'api'
+        if backend == 'api':
+            LOGGER.warning("tesserocrが利用できないためsubprocessにフォールバック")
+        return 'subprocess'
     
     def get_parameters(self) -> list:
         """Tesseract固有のパラメータ定義（UI表示情報含む）"""
@@ -93,7 +178,21 @@ class TesseractEngine(OCREngine):
                 "step": 50,
                 "description": "画像解像度（高いほど精度向上、処理時間増加）",
                 "category": "基本設定"
-            }
+            },
+            {
+                "name": "backend",
+                "label": "実行方式",
+                "type": "select",
+                "default": "auto",
+                "options": [
+                    {"value": "auto", "label": "自動（インプロセス優先）"},
+                    {"value": "api", "label": "インプロセスAPI（tesserocr）"},
+                    {"value": "subprocess", "label": "tesseractコマンド"}
+                ],
+                "description": "インプロセスAPIはページごとのプロセス起動・モデルロードを省略",
+                "category": "基本設定"
+            },
+            *RESOLUTION_PARAMETERS
         ]
     
     def process_file(self, file_path: str, **kwargs) -> OCRResult:
@@ -113,6 +212,23 @@ class TesseractEngine(OCREngine):
         psm = kwargs.get('psm', 6)
         oem = kwargs.get('oem', 3)
         
+        dpi = kwargs.get('dpi', 300)
+        planner = AdaptiveResolutionPlanner.from_parameters(kwargs)
+        is_pdf = Path(file_path).suffix.lower() == '.pdf'
+        
+        # インプロセスAPI: スレッドごとのハンドルに画像バッファを直接渡す（初期化に失敗したらsubprocess）
+        if self._resolve_backend(kwargs.get('backend', 'auto')) == 'api':
+            try:
+                api = get_thread_api(language, oem)
+            except Exception as e:
+                LOGGER.warning(f"Tesseract APIの初期化に失敗したためsubprocessにフォールバック: {e}")
+            else:
+                return self._process_with_api(api, file_path, is_pdf, planner, psm, dpi, start_time)
+        
+        # PDF + 適応解像度: ページごとに最小限のDPIで画像化して認識
+        if planner and is_pdf:
+            return self._process_pdf_adaptive(file_path, planner, language, psm, oem, dpi, start_time)
+        
         try:
             # Tesseractコマンド構築
             cmd = [
@@ -168,6 +284,104 @@ class TesseractEngine(OCREngine):
                 error=f"OCR処理エラー: {str(e)}"
             )
     
+    def _process_with_api(
+        self,
+        api,
+        file_path: str,
+        is_pdf: bool,
+        planner: Optional[AdaptiveResolutionPlanner],
+        psm: int,
+        dpi: int,
+        start_time: float
+    ) -> OCRResult:
+        """tesserocr によるインプロセス認識（PDFはページ画像バッファを直接投入）"""
+        try:
+            api.SetPageSegMode(int(psm))
+            confidences = []
+            
+            def recognize(set_image) -> str:
+                api.Clear()
+                set_image()
+                text = api.GetUTF8Text().strip()
+                confidences.append(api.MeanTextConf())
+                return text
+            
+            if is_pdf:
+                def recognize_page(pix, page_dpi: int) -> str:
+                    def set_image():
+                        api.SetImageBytes(pix.samples, pix.width, pix.height, pix.n, pix.stride)
+                        api.SetSourceResolution(page_dpi)
+                    return recognize(set_image)
+                
+                pages = self.process_pdf_pages(file_path, recognize_page, dpi, planner)
+                text, page_count, resolution = pages['text'], pages['page_count'], pages['resolution']
+            else:
+                text, page_count, resolution = recognize(lambda: api.SetImageFile(file_path)), 1, None
+            
+            return OCRResult(
+                success=True,
+                text=text,
+                processing_time=time.perf_counter() - start_time,
+                confidence=sum(confidences) / len(confidences) / 100 if confidences else None,
+                page_count=page_count,
+                metadata={'backend': 'api', 'resolution': resolution}
+            )
+        except Exception as e:
+            return OCRResult(
+                success=False,
+                text="",
+                processing_time=time.perf_counter() - start_time,
+                error=f"OCR処理エラー: {str(e)}"
+            )
+    
+    def _process_pdf_adaptive(
+        self,
+        file_path: str,
+        planner: AdaptiveResolutionPlanner,
+        language: str,
+        psm: int,
+        oem: int,
+        base_dpi: int,
+        start_time: float
+    ) -> OCRResult:
+        """PDFをページ単位の適応解像度で画像化し、標準入力経由でTesseractに渡す"""
+        
+        def recognize_page(pix, dpi: int) -> str:
+            result = subprocess.run(
+                ['tesseract', 'stdin', 'stdout', '-l', language,
+                 '--psm', str(psm), '--oem', str(oem), '--dpi', str(dpi)],
+                input=pix.tobytes("png"),
+                capture_output=True,
+                timeout=180
+            )
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.decode('utf-8', errors='replace').strip() or "Tesseract処理エラー")
+            return result.stdout.decode('utf-8', errors='replace').strip()
+        
+        try:
+            pages = self.process_pdf_pages(file_path, recognize_page, base_dpi, planner)
+            return OCRResult(
+                success=True,
+                text=pages['text'],
+                processing_time=time.perf_counter() - start_time,
+                page_count=pages['page_count'],
+                metadata={'resolution': pages['resolution']}
+            )
+        except subprocess.TimeoutExpired:
+            return OCRResult(
+                success=False,
+                text="",
+                processing_time=time.perf_counter() - start_time,
+                error="OCR処理がタイムアウトしました"
+            )
+        except Exception as e:
+            return OCRResult(
+                success=False,
+                text="",
+                processing_time=time.perf_counter() - start_time,
+                error=f"OCR処理エラー: {str(e)}"
+            )
+    
     def validate_file(self, file_path: str) -> bool:
         """画像ファイル専用の検証"""
         if not Path(file_path).exists():
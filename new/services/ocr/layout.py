@@ -0,0 +1,202 @@
+# new/services/ocr/layout.py
+# 帳票・表のレイアウト構造化（rawdictの文字座標からセル抽出・スイープラインで行/段組みを判定）
+
+import logging
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+Cell = Dict[str, Any]  # {"text": str, "bbox": (x0, y0, x1, y1)}（OCRProcessor のブロックと同形式）
+
+_SPACE_RUN = re.compile(r'\s+')
+
+
+@dataclass
+class LayoutConfig:
+    """レイアウト判定のしきい値（座標はPDFポイント）"""
+    y_threshold: float = 15.0   # 行の先頭セルとの上端差がこれ未満なら同じ行
+    x_gap: float = 12.0         # 段組み間の最小の空き
+    wide_ratio: float = 0.6     # ページ幅に対してこの割合を超えるセル（見出し・本文行）は段組み判定に使わない
+    cell_gap_em: float = 1.5    # 同じ行内で文字間がこの倍数（フォントサイズ比）を超えたら別セル
+    space_em: float = 0.25      # スパン境界でこの倍数以上空いていれば空白を補う
+
+
+def _span_segments(span: Dict[str, Any], limit: float) -> List[Tuple[str, float, float]]:
+    """
+    スパンを大きな空きのある空白で区切った (テキスト, 左端, 右端) のリスト
+
+    文字ごとの座標は空白の連続の前後だけ参照し、それ以外はスパン単位で扱う。
+    """
+    chars = span.get("chars") or ()
+    text = "".join([ch["c"] for ch in chars])
+    segments = []
+    start = len(text) - len(text.lstrip())
+    end = len(text.rstrip())
+    if start >= end:
+        return segments
+    for match in _SPACE_RUN.finditer(text, start, end):
+        before, after = match.start() - 1, match.end()
+        if chars[after]["bbox"][0] - chars[before]["bbox"][2] > limit:
+            segments.append((text[start:before + 1], chars[start]["bbox"][0], chars[before]["bbox"][2]))
+            start = after
+    segments.append((text[start:end], chars[start]["bbox"][0], chars[end - 1]["bbox"][2]))
+    return segments
+
+
+def cells_from_rawdict(page_dict: Dict[str, Any], config: Optional[LayoutConfig] = None) -> List[Cell]:
+    """
+    page.get_text("rawdict") の結果からセルを抽出
+
+    帳票では「氏名　　　山田」のようにラベルと値が1スパンに入ることが多いため、
+    文字単位の座標で大きな空きを検出してセルを分割する（同じ行の隣接スパンは空きが小さければ連結）。
+    """
+    config = config or LayoutConfig()
+    cells: List[Cell] = []
+
+    for block in page_dict.get("blocks", ()):
+        if block.get("type", 0) != 0:
+            continue
+        for line in block.get("lines", ()):
+            # 縦書き・回転行は分割せず1セル
+            if tuple(line.get("dir", (1, 0))) != (1, 0):
+                text = "".join(ch["c"] for span in line["spans"] for ch in span.get("chars", ())).strip()
+                if text:
+                    cells.append({"text": text, "bbox": tuple(line["bbox"])})
+                continue
+
+            cell = None
+            for span in line["spans"]:
+                size = span.get("size") or 10.0
+                _, y0, _, y1 = span["bbox"]
+                for text, x0, x1 in _span_segments(span, config.cell_gap_em * size):
+                    if cell is not None and x0 - cell["x1"] <= config.cell_gap_em * size:
+                        # 同じセルの続き（スパン境界で空いていれば空白を補う）
+                        if x0 - cell["x1"] >= config.space_em * size:
+                            cell["parts"].append(" ")
+                        cell["parts"].append(text)
+                        cell["x1"] = max(cell["x1"], x1)
+                        cell["y0"] = min(cell["y0"], y0)
+                        cell["y1"] = max(cell["y1"], y1)
+                        continue
+                    if cell is not None:
+                        cells.append(_finish(cell))
+                    cell = {"parts": [text], "x0": x0, "y0": y0, "x1": x1, "y1": y1}
+            if cell is not None:
+                cells.append(_finish(cell))
+
+    return cells
+
+
+def _finish(cell: Dict[str, Any]) -> Cell:
+    return {"text": "".join(cell["parts"]), "bbox": (cell["x0"], cell["y0"], cell["x1"], cell["y1"])}
+
+
+def group_rows(cells: Iterable[Cell], y_threshold: float = 15.0) -> List[List[Cell]]:
+    """
+    Y座標で行グループ化（上端順に1回ソートしてスイープ）
+
+    セルは上端との差が y_threshold 未満の行のうち最も上の行に入る。
+    行の先頭セルの上端は単調増加するため、候補行の位置はポインタを進めるだけで求まる。
+    """
+    rows: List[List[Cell]] = []
+    anchors: List[float] = []
+    candidate = 0
+    for cell in sorted(cells, key=lambda c: c["bbox"][1]):
+        y0 = cell["bbox"][1]
+        # この先のセルも上端は y0 以上のため、離れた行は二度と候補にならない
+        while candidate < len(anchors) and anchors[candidate] <= y0 - y_threshold:
+            candidate += 1
+        if candidate < len(rows):
+            rows[candidate].append(cell)
+        else:
+            rows.append([cell])
+            anchors.append(y0)
+    return rows
+
+
+def column_intervals(
+    cells: Sequence[Cell],
+    x_gap: float = 12.0,
+    page_width: Optional[float] = None,
+    wide_ratio: float = 0.6
+) -> List[Tuple[float, float]]:
+    """
+    セルのX方向の区間を左端順にスイープして重なり・近接するものを併合し、段組みの区間を求める
+
+    ページ幅の大部分を占めるセル（見出し・本文行）は段組みをまたぐため判定から除外する。
+    """
+    limit = page_width * wide_ratio if page_width else None
+    spans = sorted(
+        (cell["bbox"][0], cell["bbox"][2]) for cell in cells
+        if limit is None or cell["bbox"][2] - cell["bbox"][0] <= limit
+    )
+    if not spans and cells:
+        spans = sorted((cell["bbox"][0], cell["bbox"][2]) for cell in cells)
+
+    intervals: List[Tuple[float, float]] = []
+    for x0, x1 in spans:
+        if intervals and x0 <= intervals[-1][1] + x_gap:
+            start, end = intervals[-1]
+            intervals[-1] = (start, max(end, x1))
+        else:
+            intervals.append((x0, x1))
+    return intervals
+
+
+def assign_columns(cells: Iterable[Cell], intervals: Sequence[Tuple[float, float]]) -> List[List[Cell]]:
+    """
+    セルを段組み区間に割り当て（区間は互いに素なので左端の二分探索で求まる）
+
+    区間外・区間をまたぐセルは左端を含む（無ければ左隣の）段組みに入れる。
+    """
+    if not intervals:
+        cells = list(cells)
+        return [cells] if cells else []
+    starts = [start for start, _ in intervals]
+    columns: List[List[Cell]] = [[] for _ in intervals]
+    for cell in cells:
+        index = max(bisect_right(starts, cell["bbox"][0]) - 1, 0)
+        columns[index].append(cell)
+    return [column for column in columns if column]
+
+
+def label_value_pairs(rows: Sequence[List[Cell]]) -> List[str]:
+    """隣接する2行を「ラベル行・値行」として左から順に対応付け"""
+    structured = []
+    for upper, lower in zip(rows, rows[1:]):
+        label_row = sorted(upper, key=lambda c: c["bbox"][0])
+        value_row = sorted(lower, key=lambda c: c["bbox"][0])
+        for label, value in zip(label_row, value_row):
+            structured.append(f"{label['text'].strip()}: {value['text'].strip()}")
+    return structured
+
+
+class LayoutEngine:
+    """文書全体をページごとに1回の rawdict 取得で構造化"""
+
+    def __init__(self, config: Optional[LayoutConfig] = None):
+        self.config = config or LayoutConfig()
+
+    def structure_cells(self, cells: Sequence[Cell], page_width: Optional[float] = None) -> List[str]:
+        """セル群を段組み → 行 → ラベル・値ペアの順に構造化"""
+        config = self.config
+        intervals = column_intervals(cells, config.x_gap, page_width, config.wide_ratio)
+        structured = []
+        for column in assign_columns(cells, intervals):
+            structured.extend(label_value_pairs(group_rows(column, config.y_threshold)))
+        return structured
+
+    def structure_page(self, page) -> List[str]:
+        """PyMuPDFのページを構造化"""
+        page_dict = page.get_text("rawdict")
+        return self.structure_cells(cells_from_rawdict(page_dict, self.config), page_dict.get("width"))
+
+    def structure_document(self, doc) -> List[str]:
+        """PyMuPDFのドキュメント全ページを構造化"""
+        structured = []
+        for page in doc:
+            structured.extend(self.structure_page(page))
+        return structured
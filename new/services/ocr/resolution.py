@@ -0,0 +1,351 @@
+# new/services/ocr/resolution.py
+# ページ単位の適応解像度（DPI）決定
+
+import re
+import time
+import math
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# 二値化後の行から黒画素ランを取り出すための正規表現
+_RUN_PATTERN = re.compile(b"\x01+")
+
+
+@dataclass
+class PageResolution:
+    """1ページ分の解像度決定結果"""
+    page_index: int
+    dpi: int
+    base_dpi: int
+    text_height_px: Optional[float]  # 採用DPIでの推定文字高さ（px）
+    pixels: int
+    base_pixels: int
+
+
+@dataclass
+class ResolutionPlan:
+    """文書全体の解像度計画と削減効果"""
+    base_dpi: int
+    target_x_height: int
+    pages: List[PageResolution] = field(default_factory=list)
+    probe_time: float = 0.0
+
+    def dpi_for(self, page_index: int) -> int:
+        """ページの採用DPIを取得（計画外のページは基準DPI）"""
+        if 0 <= page_index < len(self.pages):
+            return self.pages[page_index].dpi
+        return self.base_dpi
+
+    def summary(self, processing_time: Optional[float] = None) -> Dict:
+        """
+        画素数・処理時間の削減効果を集計
+
+        Args:
+            processing_time: 適応解像度で実際にかかったOCR時間（秒）
+
+        Returns:
+            削減効果の辞書（時間は画素数に比例するとみなした推定値）
+        """
+        pixels = sum(p.pixels for p in self.pages)
+        base_pixels = sum(p.base_pixels for p in self.pages)
+        pixel_ratio = pixels / base_pixels if base_pixels else 1.0
+
+        summary = {
+            "base_dpi": self.base_dpi,
+            "target_x_height": self.target_x_height,
+            "page_dpis": [p.dpi for p in self.pages],
+            "pixels": pixels,
+            "base_pixels": base_pixels,
+            "pixel_savings": round(1.0 - pixel_ratio, 4),
+            "probe_time": round(self.probe_time, 4),
+        }
+
+        if processing_time is not None and pixels:
+            estimated_base_time = processing_time / pixel_ratio
+            summary["processing_time"] = round(processing_time, 4)
+            summary["estimated_base_time"] = round(estimated_base_time, 4)
+            summary["estimated_time_saved"] = round(
+                estimated_base_time - processing_time - self.probe_time, 4
+            )
+
+        return summary
+
+
+class AdaptiveResolutionPlanner:
+    """
+    低解像度プローブ画像の連結成分から文字高さを推定し、
+    目標x-heightに届く最小DPIをページごとに選ぶ
+    """
+
+    def __init__(
+        self,
+        target_x_height: int = 20,
+        probe_dpi: int = 72,
+        min_dpi: int = 150,
+        max_dpi: int = 600,
+        dpi_step: int = 25,
+    ):
+        """
+        Args:
+            target_x_height: OCRに渡す画像での目標文字高さ（px）
+            probe_dpi: 文字高さ推定用の低解像度DPI
+            min_dpi: 採用DPIの下限（基準DPIの方が低ければ基準DPIが下限）
+            max_dpi: 採用DPIの上限
+            dpi_step: DPIの丸め単位
+        """
+        self.target_x_height = target_x_height
+        self.probe_dpi = probe_dpi
+        self.min_dpi = min_dpi
+        self.max_dpi = max_dpi
+        self.dpi_step = dpi_step
+
+    @staticmethod
+    def _otsu_threshold(samples: bytes) -> int:
+        """グレースケール画素列の大津しきい値"""
+        histogram = Counter(samples)
+        total = len(samples)
+        if total == 0:
+            return 128
+
+        sum_all = sum(value * count for value, count in histogram.items())
+        sum_bg = 0
+        weight_bg = 0
+        best_threshold = 128
+        best_variance = -1.0
+
+        for value in range(256):
+            weight_bg += histogram.get(value, 0)
+            if weight_bg == 0:
+                continue
+            weight_fg = total - weight_bg
+            if weight_fg == 0:
+                break
+            sum_bg += value * histogram.get(value, 0)
+            mean_bg = sum_bg / weight_bg
+            mean_fg = (sum_all - sum_bg) / weight_fg
+            variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+            if variance > best_variance:
+                best_variance = variance
+                best_threshold = value
+
+        return best_threshold
+
+    @staticmethod
+    def component_heights(
+        samples: bytes, width: int, height: int, stride: Optional[int] = None, threshold: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        二値化画像の8連結成分の (高さ, 幅) を列挙
+
+        行ごとの黒画素ランをUnion-Findで結合するため、
+        画素単位の走査より大幅に少ない操作数で済む。
+
+        Args:
+            samples: 1チャンネル8bitの画素列
+            width: 画像幅
+            height: 画像高さ
+            stride: 1行のバイト数（省略時は幅と同じ）
+            threshold: 二値化しきい値（省略時は大津法）
+
+        Returns:
+            連結成分ごとの (高さ, 幅) リスト
+        """
+        if stride is None:
+            stride = width
+        if threshold is None:
+            threshold = AdaptiveResolutionPlanner._otsu_threshold(samples)
+
+        # しきい値以下（暗い画素）を1に写像する変換表
+        table = bytes(1 if v <= threshold else 0 for v in range(256))
+
+        parent: List[int] = []
+        # 成分ごとのバウンディングボックス [top, bottom, left, right]
+        boxes: List[List[int]] = []
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(a: int, b: int) -> None:
+            ra, rb = find(a), find(b)
+            if ra == rb:
+                return
+            if ra > rb:
+                ra, rb = rb, ra
+            parent[rb] = ra
+            box_a, box_b = boxes[ra], boxes[rb]
+            box_a[0] = min(box_a[0], box_b[0])
+            box_a[1] = max(box_a[1], box_b[1])
+            box_a[2] = min(box_a[2], box_b[2])
+            box_a[3] = max(box_a[3], box_b[3])
+
+        previous_runs: List[Tuple[int, int, int]] = []
+        for y in range(height):
+            row = samples[y * stride:y * stride + width].translate(table)
+            current_runs = []
+            for match in _RUN_PATTERN.finditer(row):
+                start, end = match.start(), match.end() - 1
+                label = len(parent)
+                parent.append(label)
+                boxes.append([y, y, start, end])
+                current_runs.append((start, end, label))
+
+            # 前行のランと8連結で重なるものを結合（両リストはx順）
+            j = 0
+            for start, end, label in current_runs:
+                while j < len(previous_runs) and previous_runs[j][1] < start - 1:
+                    j += 1
+                k = j
+                while k < len(previous_runs) and previous_runs[k][0] <= end + 1:
+                    union(label, previous_runs[k][2])
+                    k += 1
+
+            previous_runs = current_runs
+
+        return [
+            (box[1] - box[0] + 1, box[3] - box[2] + 1)
+            for i, box in enumerate(boxes)
+            if parent[i] == i
+        ]
+
+    def estimate_text_height(
+        self, samples: bytes, width: int, height: int, stride: Optional[int] = None
+    ) -> Optional[float]:
+        """
+        プローブ画像上の支配的な文字高さ（px）を推定
+
+        ノイズ（極小成分）と罫線・図版（ページに対して大きすぎる成分、
+        極端に細長い成分）を除外した連結成分高さの中央値を用いる。
+
+        Returns:
+            推定文字高さ。文字らしい成分がなければNone
+        """
+        components = self.component_heights(samples, width, height, stride)
+        max_glyph_height = max(height * 0.1, 3)
+
+        glyph_heights = sorted(
+            h for h, w in components
+            if 2 <= h <= max_glyph_height and w <= h * 8 and h <= w * 8
+        )
+        if not glyph_heights:
+            return None
+
+        return float(glyph_heights[len(glyph_heights) // 2])
+
+    def choose_dpi(self, probe_text_height: Optional[float], base_dpi: int) -> int:
+        """
+        目標x-heightに届く最小DPIを選択
+
+        下限は min_dpi と base_dpi の小さい方（基準DPIが低いエンジンで固定解像度より粗くできないのを防ぐ）。
+
+        Args:
+            probe_text_height: プローブDPIでの推定文字高さ（px）
+            base_dpi: 推定できない場合に使う基準DPI
+
+        Returns:
+            採用DPI
+        """
+        if not probe_text_height:
+            return base_dpi
+
+        required = self.target_x_height * self.probe_dpi / probe_text_height
+        dpi = int(math.ceil(required / self.dpi_step) * self.dpi_step)
+        return max(min(self.min_dpi, base_dpi), min(self.max_dpi, dpi))
+
+    def plan_page(self, page, page_index: int, base_dpi: int) -> PageResolution:
+        """PyMuPDFページ1枚の解像度を決定"""
+        import fitz  # PyMuPDF
+
+        zoom = self.probe_dpi / 72
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+        probe_height = self.estimate_text_height(pix.samples, pix.width, pix.height, pix.stride)
+        dpi = self.choose_dpi(probe_height, base_dpi)
+
+        rect = page.rect
+        return PageResolution(
+            page_index=page_index,
+            dpi=dpi,
+            base_dpi=base_dpi,
+            text_height_px=probe_height * dpi / self.probe_dpi if probe_height else None,
+            pixels=_pixel_count(rect.width, rect.height, dpi),
+            base_pixels=_pixel_count(rect.width, rect.height, base_dpi),
+        )
+
+    def plan_document(self, doc, base_dpi: int) -> ResolutionPlan:
+        """PyMuPDFドキュメント全ページの解像度計画を作成"""
+        start_time = time.perf_counter()
+        plan = ResolutionPlan(base_dpi=base_dpi, target_x_height=self.target_x_height)
+
+        for page_index in range(len(doc)):
+            try:
+                plan.pages.append(self.plan_page(doc.load_page(page_index), page_index, base_dpi))
+            except Exception as e:
+                LOGGER.warning(f"ページ {page_index + 1} の解像度推定に失敗（基準DPIを使用）: {e}")
+                rect = doc.load_page(page_index).rect
+                base_pixels = _pixel_count(rect.width, rect.height, base_dpi)
+                plan.pages.append(PageResolution(page_index, base_dpi, base_dpi, None, base_pixels, base_pixels))
+
+        plan.probe_time = time.perf_counter() - start_time
+        LOGGER.debug(f"適応解像度計画: {[p.dpi for p in plan.pages]} (基準 {base_dpi}dpi)")
+        return plan
+
+    @classmethod
+    def from_parameters(cls, parameters: Dict) -> Optional["AdaptiveResolutionPlanner"]:
+        """
+        エンジンパラメータから適応解像度プランナーを生成
+
+        Returns:
+            adaptive_resolution が有効ならプランナー、無効ならNone
+        """
+        if not parameters.get("adaptive_resolution", False):
+            return None
+
+        defaults = cls()
+        return cls(
+            target_x_height=int(parameters.get("target_x_height", defaults.target_x_height)),
+            min_dpi=int(parameters.get("min_dpi", defaults.min_dpi)),
+            max_dpi=int(parameters.get("max_dpi", defaults.max_dpi)),
+        )
+
+
+def _pixel_count(width_pt: float, height_pt: float, dpi: int) -> int:
+    """ポイント単位のページサイズを指定DPIで画像化したときの画素数"""
+    zoom = dpi / 72
+    return int(round(width_pt * zoom)) * int(round(height_pt * zoom))
+
+
+def render_page(page, dpi: int):
+    """PyMuPDFページを指定DPIで画像化（Pixmapを返す）"""
+    import fitz  # PyMuPDF
+
+    zoom = dpi / 72
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+
+
+PARAMETER_DEFINITIONS = [
+    {
+        "name": "adaptive_resolution",
+        "label": "適応解像度",
+        "type": "boolean",
+        "default": False,
+        "description": "ページごとの文字サイズから最小限のDPIを自動選択（PDF入力時）",
+        "category": "解像度設定"
+    },
+    {
+        "name": "target_x_height",
+        "label": "目標文字高さ(px)",
+        "type": "number",
+        "default": 20,
+        "min": 10,
+        "max": 60,
+        "step": 2,
+        "description": "適応解像度で目標とする画像上の文字高さ",
+        "category": "解像度設定"
+    }
+]
@@ -10,13 +10,21 @@ from typing import Dict, List, Tuple
 from pathlib import Path
 
 from new.config import LOGGER
+from new.utils.pattern_matcher import MultiPatternMatcher
+from new.utils.dictionary_artifact import get_dictionary_artifact
 
 class CorrectionService:
     """誤字修正・正規化処理サービス"""
     
+    KATAKANA_DASH = 'ー'
+    
     def __init__(self):
         self.logger = LOGGER
         self._correction_dict = None
+        self._matcher = None
+        self._artifact_version = None
+        self._normalization_keys = set()
+        self._dash_rule = False
         self._fullwidth_map = self._create_fullwidth_map()
     
     def _create_fullwidth_map(self) -> Dict[str, str]:
@@ -51,21 +59,38 @@ class CorrectionService:
             '—': '-'   # em dash
         }
     
+    # 新系用辞書パス（旧系パスも試行）
+    DICT_PATHS = [
+        "new/data/ocr_word_mistakes.csv",
+        "OLD/ocr/dic/ocr_word_mistakes.csv",
+        "data/ocr_word_mistakes.csv"
+    ]
+    
     def load_correction_dict(self) -> Dict[str, str]:
-        """誤字修正辞書を読み込み"""
+        """
+        誤字修正辞書を読み込み
+        
+        辞書ディレクトリのコンパイル済みアーティファクトを優先し、
+        他プロセスで辞書が更新された場合は読み直す（照合器も再構築）。
+        """
+        for dict_path in self.DICT_PATHS:
+            if Path(dict_path).exists():
+                artifact = get_dictionary_artifact(Path(dict_path).parent)
+                if artifact is not None:
+                    if artifact.version != self._artifact_version:
+                        self._correction_dict = artifact.mistakes
+                        self._artifact_version = artifact.version
+                        self._matcher = None
+                        self.logger.info(f"誤字修正辞書読み込み成功: {dict_path} ({len(artifact.mistakes)}件{', コンパイル済み' if artifact.path else ''})")
+                    return self._correction_dict
+                break
+        
         if self._correction_dict is not None:
             return self._correction_dict
         
         correction_dict = {}
         
-        # 新系用辞書パス（旧系パスも試行）
-        dict_paths = [
-            "new/data/ocr_word_mistakes.csv",
-            "OLD/ocr/dic/ocr_word_mistakes.csv",
-            "data/ocr_word_mistakes.csv"
-        ]
-        
-        for dict_path in dict_paths:
+        for dict_path in self.DICT_PATHS:
             if Path(dict_path).exists():
                 try:
                     with open(dict_path, 'r', encoding='utf-8') as f:
@@ -90,140 +115,75 @@ class CorrectionService:
         self._correction_dict = correction_dict
         return correction_dict
     
+    def _get_matcher(self) -> MultiPatternMatcher:
+        """誤字修正辞書・全角変換・長音記号を1つにまとめた照合器を取得（辞書更新時のみ再構築）"""
+        correction_dict = self.load_correction_dict()
+        if self._matcher is not None:
+            return self._matcher
+        
+        # 統合された変換辞書を作成（同じキーは全角→半角変換が優先）
+        combined_dict = dict(correction_dict)
+        combined_dict.update(self._fullwidth_map)
+        self._normalization_keys = set(self._fullwidth_map)
+        
+        # 辞書に「ー」が無ければ文脈判定の対象として登録
+        self._dash_rule = self.KATAKANA_DASH not in combined_dict
+        if self._dash_rule:
+            combined_dict[self.KATAKANA_DASH] = '-'
+            self._normalization_keys.add(self.KATAKANA_DASH)
+        
+        self._matcher = MultiPatternMatcher(combined_dict)
+        return self._matcher
+    
     def apply_corrections(self, text: str) -> Tuple[str, List[Dict]]:
         """
         誤字修正と全角→半角変換を統合実行
         
+        誤字修正辞書・全角→半角変換・長音記号「ー」の文脈判定を
+        テキスト1回の走査で処理する（重なりは最左最長一致を採用）。
+        
         Returns:
-            Tuple[修正後テキスト, 修正情報リスト]
+            Tuple[修正後テキスト, 修正情報リスト（位置順）]
         """
         if not text:
             return text, []
         
-        # 誤字修正辞書を取得
-        correction_dict = self.load_correction_dict()
-        
-        # 統合された変換辞書を作成
-        combined_dict = {}
+        matcher = self._get_matcher()
         
-        # 1. 誤字修正辞書を追加
-        for wrong, correct in correction_dict.items():
-            combined_dict[wrong] = {"correct": correct, "type": "correction"}
-        
-        # 2. 全角→半角変換を追加
-        for fullwidth, halfwidth in self._fullwidth_map.items():
-            combined_dict[fullwidth] = {"correct": halfwidth, "type": "normalization"}
-        
-        # 修正情報を記録するリスト
         corrections = []
-        
-        # 置換位置と内容を記録するリスト
-        replacements = []
-        
-        # 各変換対象について処理
-        for wrong, info in combined_dict.items():
-            correct = info["correct"]
-            correction_type = info["type"]
+        parts = []
+        cursor = 0
+        for start, end, pattern_id in matcher.find_all(text):
+            wrong, correct = matcher.entry(pattern_id)
             
-            start_pos = 0
-            while True:
-                # 変換対象の位置を検索
-                pos = text.find(wrong, start_pos)
-                if pos == -1:
-                    break
-                
-                # 既に変換予定の範囲と重複していないか確認
-                overlap = False
-                for repl in replacements:
-                    repl_start, repl_end = repl['start'], repl['end']
-                    if not (pos >= repl_end or pos + len(wrong) <= repl_start):
-                        overlap = True
-                        break
-                
-                if not overlap:
-                    # 変換情報を記録
-                    replacements.append({
-                        'start': pos,
-                        'end': pos + len(wrong),
-                        'wrong': wrong,
-                        'correct': correct,
-                        'type': correction_type
-                    })
-                    corrections.append({
-                        "wrong": wrong,
-                        "correct": correct,
-                        "position": pos,
-                        "type": correction_type
-                    })
-                
-                start_pos = pos + 1
-        
-        # カタカナ長音記号「ー」の文脈判定処理
-        katakana_dash_replacements = self._process_katakana_dash(text, replacements)
-        replacements.extend(katakana_dash_replacements)
-        corrections.extend([{
-            "wrong": 'ー',
-            "correct": '-',
-            "position": repl['start'],
-            "type": 'normalization'
-        } for repl in katakana_dash_replacements])
-        
-        # 変換位置でソート（後ろから処理することで位置のずれを防ぐ）
-        replacements.sort(key=lambda x: x['start'], reverse=True)
+            # カタカナ長音記号「ー」は前後の文字で変換要否を判定
+            if self._dash_rule and wrong == self.KATAKANA_DASH:
+                prev_char = text[start - 1] if start > 0 else ''
+                next_char = text[end] if end < len(text) else ''
+                if not self._should_convert_dash(prev_char, next_char):
+                    continue
+            
+            parts.append(text[cursor:start])
+            parts.append(correct)
+            corrections.append({
+                "wrong": wrong,
+                "correct": correct,
+                "position": start,
+                "type": "normalization" if wrong in self._normalization_keys else "correction"
+            })
+            cursor = end
         
-        # 変換を実行
-        result_text = text
-        for repl in replacements:
-            start, end = repl['start'], repl['end']
-            correct = repl['correct']
-            result_text = result_text[:start] + correct + result_text[end:]
+        if not corrections:
+            return text, corrections
         
-        return result_text, corrections
+        parts.append(text[cursor:])
+        return ''.join(parts), corrections
     
-    def _process_katakana_dash(self, text: str, existing_replacements: List[Dict]) -> List[Dict]:
-        """カタカナ長音記号「ー」の文脈判定処理"""
-        katakana_dash_replacements = []
-        start_pos = 0
-        
-        while True:
-            pos = text.find('ー', start_pos)
-            if pos == -1:
-                break
-            
-            # 前後の文字をチェック
-            prev_char = text[pos - 1] if pos > 0 else ''
-            next_char = text[pos + 1] if pos < len(text) - 1 else ''
-            
-            # 前後の文字の種類を判定
-            prev_is_alphanumeric = self._is_alphanumeric(prev_char)
-            next_is_alphanumeric = self._is_alphanumeric(next_char)
-            prev_is_japanese = self._is_japanese(prev_char)
-            next_is_japanese = self._is_japanese(next_char)
-            
-            # 変換条件：前後のどちらかが英数字で、かつ両方が日本語文字ではない場合のみ変換
-            should_convert = ((prev_is_alphanumeric or next_is_alphanumeric) and 
-                             not (prev_is_japanese and next_is_japanese))
-            
-            if should_convert:
-                # 既存の置換と重複していないかチェック
-                overlap = False
-                for repl in existing_replacements:
-                    if not (pos >= repl['end'] or pos + 1 <= repl['start']):
-                        overlap = True
-                        break
-                
-                if not overlap:
-                    katakana_dash_replacements.append({
-                        'start': pos,
-                        'end': pos + 1,
-                        'wrong': 'ー',
-                        'correct': '-',
-                        'type': 'normalization'
-                    })
-            
-            start_pos = pos + 1
-        
-        return katakana_dash_replacements
+    def _should_convert_dash(self, prev_char: str, next_char: str) -> bool:
+        """カタカナ長音記号「ー」の文脈判定"""
+        # 変換条件：前後のどちらかが英数字で、かつ両方が日本語文字ではない場合のみ変換
+        return ((self._is_alphanumeric(prev_char) or self._is_alphanumeric(next_char)) and
+                not (self._is_japanese(prev_char) and self._is_japanese(next_char)))
     
     def _is_alphanumeric(self, char: str) -> bool:
         """英数字かどうかを判定"""
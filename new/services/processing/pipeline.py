@@ -145,8 +145,14 @@ class ProcessingPipeline:
                 
                 successful_files = len([r for r in results if r.get('success', False)])
                 failed_files = len([r for r in results if not r.get('success', False)])
+                llm_cache = self._summarize_llm_cache(results)
                 
                 completion_message = f"全{total_files}ファイル処理完了 (成功: {successful_files}, 失敗: {failed_files}) - グランドトータル: {total_pipeline_time:.1f}秒"
+                if llm_cache['hits'] or llm_cache['misses']:
+                    completion_message += (
+                        f" / LLMキャッシュ: ヒット{llm_cache['hits']}件・ミス{llm_cache['misses']}件"
+                        f" (推論{llm_cache['time_saved']:.1f}秒を省略)"
+                    )
                 
                 complete_event = {
                     'type': 'complete',
@@ -156,6 +162,7 @@ class ProcessingPipeline:
                         'failed_files': failed_files,
                         'total_pipeline_time': total_pipeline_time,
                         'average_time_per_file': total_pipeline_time / total_files if total_files > 0 else 0,
+                        'llm_cache': llm_cache,
                         'message': completion_message
                     }
                 }
@@ -169,6 +176,19 @@ class ProcessingPipeline:
                 'message': f'処理エラー: {str(e)}'
             }
     
+    @staticmethod
+    def _summarize_llm_cache(results: List[Dict]) -> Dict:
+        """ファイルごとのLLM応答キャッシュ利用状況をジョブ全体で集計"""
+        summary = {'hits': 0, 'misses': 0, 'bypassed': 0, 'time_saved': 0.0}
+        for result in results:
+            cache = result.get('steps', {}).get('llm', {}).get('cache') or {}
+            for key in summary:
+                summary[key] += cache.get(key, 0)
+        lookups = summary['hits'] + summary['misses']
+        summary['hit_rate'] = round(summary['hits'] / lookups, 4) if lookups else 0.0
+        summary['time_saved'] = round(summary['time_saved'], 3)
+        return summary
+    
     def cancel_processing(self):
         """処理をキャンセル"""
         if self.abort_flag:
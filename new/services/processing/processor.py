@@ -4,7 +4,6 @@
 import asyncio
 import time
 import logging
-import unicodedata
 from pathlib import Path
 from typing import Dict, List, Optional, AsyncGenerator
 import uuid
@@ -12,6 +11,7 @@ import uuid
 from new.services.ocr.factory import OCREngineFactory
 from new.database.connection import get_db_connection
 from new.config import LOGGER, DB_ENGINE
+from new.utils.text_normalizer import normalize_lines
 
 class FileProcessor:
     """新系ファイル処理プロセッサ"""
@@ -141,7 +141,8 @@ class FileProcessor:
             
             # 実際のLLM処理実行
             llm_start_time = time.perf_counter()
-            refined_text = await self._process_llm_refinement(normalized_text, settings, abort_flag)
+            llm_cache: Dict = {}
+            refined_text = await self._process_llm_refinement(normalized_text, settings, abort_flag, llm_cache)
             llm_processing_time = time.perf_counter() - llm_start_time
             
             if not refined_text:
@@ -170,7 +171,8 @@ class FileProcessor:
             
             result['steps']['llm'] = {
                 'success': bool(refined_text),
-                'refined_length': len(refined_text) if refined_text else 0
+                'refined_length': len(refined_text) if refined_text else 0,
+                'cache': llm_cache
             }
             
             # 中断チェック
@@ -396,24 +398,21 @@ class FileProcessor:
             }
     
     def _normalize_text(self, text: str) -> str:
-        """テキスト正規化"""
-        if not text:
-            return ""
-        
-        # Unicode正規化
-        normalized = unicodedata.normalize("NFKC", text)
-        
-        # 改行・空白の正規化
-        lines = []
-        for line in normalized.split('\n'):
-            line = line.strip()
-            if line:
-                lines.append(line)
-        
-        return '\n'.join(lines)
+        """テキスト正規化（NFKC・各行の前後空白除去・空行削除）"""
+        return normalize_lines(text)
     
-    async def _process_llm_refinement(self, text: str, settings: Dict, abort_flag: Optional[Dict]) -> str:
-        """LLM整形処理（Ollama統合版）"""
+    async def _process_llm_refinement(
+        self,
+        text: str,
+        settings: Dict,
+        abort_flag: Optional[Dict],
+        cache_stats: Optional[Dict] = None
+    ) -> str:
+        """
+        LLM整形処理（Ollama統合版）
+        
+        cache_stats を渡すと、応答キャッシュのヒット・ミス・省略時間を書き込む。
+        """
         try:
             # Ollamaクライアント初期化
             from new.services.llm import OllamaRefiner, OllamaClient
@@ -422,18 +421,21 @@ class FileProcessor:
             llm_model = settings.get('llm_model', 'phi4-mini')
             language = settings.get('language', 'ja')
             quality_threshold = settings.get('quality_threshold', 0.7)
+            temperature = settings.get('llm_temperature', 0.7)
+            seed = settings.get('llm_seed')
             
             # 無効なモデル名チェック（フォールバック判定）
             if 'invalid' in llm_model.lower():
                 self.logger.info(f"無効なモデル指定検出: {llm_model} → フォールバック処理")
                 return self._fallback_text_refinement(text)
             
-            # Ollama接続確認
+            # Ollama接続確認（共有の死活監視の結果を参照、停止検知後は即座に失敗）
             client = OllamaClient(model=llm_model)
             is_available = await client.is_available()
             
             if not is_available:
-                error_msg = f"❌ Ollama接続失敗: {client.base_url} (model: {llm_model})"
+                last_error = client.health.state.last_error
+                error_msg = f"❌ Ollama接続失敗: {client.base_url} (model: {llm_model})" + (f" - {last_error}" if last_error else "")
                 self.logger.error(error_msg)
                 raise RuntimeError(f"LLM処理エラー - Ollamaサービスに接続できません: {client.base_url}")
             
@@ -447,11 +449,21 @@ class FileProcessor:
                 raw_text=text,
                 abort_flag=abort_flag,
                 language=language,
-                quality_threshold=quality_threshold
+                quality_threshold=quality_threshold,
+                temperature=temperature,
+                seed=seed
             )
             ollama_processing_time = time.perf_counter() - ollama_start_time
             
-            self.logger.info(f"LLM整形完了: 品質スコア={quality_score:.2f}, 言語={detected_lang}, 処理時間={ollama_processing_time:.1f}秒")
+            cache_summary = refiner.cache_stats.to_dict()
+            if cache_stats is not None:
+                cache_stats.update(cache_summary)
+            
+            self.logger.info(
+                f"LLM整形完了: 品質スコア={quality_score:.2f}, 言語={detected_lang}, 処理時間={ollama_processing_time:.1f}秒, "
+                f"キャッシュ ヒット={cache_summary['hits']} ミス={cache_summary['misses']} "
+                f"対象外={cache_summary['bypassed']} 省略={cache_summary['time_saved']:.1f}秒"
+            )
             
             return refined_text
                 
@@ -467,27 +479,15 @@ class FileProcessor:
     def _create_llm_prompt(self, text: str, settings: Dict) -> str:
         """LLMプロンプト作成（高品質プロンプト使用）"""
         try:
-            # 絶対importパスでプロンプトローダーを取得
-            import sys
-            import os
-            
-            # ワークスペースルートをパスに追加
-            workspace_root = '/workspace'
-            if workspace_root not in sys.path:
-                sys.path.insert(0, workspace_root)
-            
             from new.services.llm.prompt_loader import get_prompt_loader
             
             language = settings.get('language', 'ja')
             
-            # 高品質プロンプトローダーから取得
-            prompt_loader = get_prompt_loader()
-            prompt_template = prompt_loader.load_prompt("refine_prompt_advanced", language)
-            
-            # プロンプトテンプレートをフォーマット
-            prompt = prompt_loader.format_prompt(prompt_template, TEXT=text)
+            # 高品質プロンプト（コンパイル済みテンプレートに差し込み）
+            template = get_prompt_loader().get_template("refine_prompt_advanced", language)
+            prompt = template.render(TEXT=text)
             
-            self.logger.info(f"✅ 高品質プロンプト使用成功: {len(prompt_template)}文字, 言語={language}")
+            self.logger.info(f"✅ 高品質プロンプト使用成功: {len(template)}文字, 言語={language}")
             return prompt
             
         except Exception as e:
@@ -48,6 +48,7 @@ class SearchService:
                         "file_id": str(embedding.file_id),
                         "chunk_id": embedding.chunk_id,
                         "text_chunk": embedding.text_chunk,
+                        "chunk_index": embedding.chunk_index,
                         "similarity": similarity,
                         "embedding_model": embedding.embedding_model
                     })
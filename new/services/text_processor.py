@@ -10,6 +10,7 @@ import json
 import hashlib
 
 from ..config import LOGGER
+from ..utils.text_normalizer import collapse_whitespace
 
 class TextProcessor:
     """テキスト処理クラス"""
@@ -23,12 +24,8 @@ class TextProcessor:
         if not text:
             return ""
         
-        # 基本的なクリーニング
-        text = re.sub(r'\s+', ' ', text)  # 複数の空白を単一に
-        text = re.sub(r'\n\s*\n', '\n', text)  # 空行の削除
-        text = text.strip()
-        
-        return text
+        # 複数の空白（改行含む）を単一に・前後の空白を除去
+        return collapse_whitespace(text)
     
     def detect_language(self, text: str) -> str:
         """言語検出（簡易版）"""
@@ -116,8 +116,8 @@ class ChatSearch {
         console.log('🧪 テスト用ダミーデータを使用します');
       }
       
-      // 結果表示
-      this.renderResults(results);
+      // 結果表示（ストリームで表示済みの場合はそのまま）
+      if (!results.streamed) this.renderResults(results);
 
     } catch (error) {
       console.error('❌ 検索エラー:', error);
@@ -163,16 +163,20 @@ class ChatSearch {
     
     console.log('🕐 タイムアウト設定:', timeoutSeconds, '秒 →', timeoutMs, 'ms');
     
+    // 回答はストリームで届くため、タイムアウトは「無応答の時間」として扱う（イベント受信ごとに延長）
     let timeoutId = null;
-    if (timeoutMs > 0) {
-      timeoutId = setTimeout(() => {
-        this.controller.abort();
-      }, timeoutMs);
-    }
+    const armTimeout = () => {
+      if (timeoutId) clearTimeout(timeoutId);
+      if (timeoutMs > 0) {
+        timeoutId = setTimeout(() => {
+          this.controller.abort();
+        }, timeoutMs);
+      }
+    };
+    armTimeout();
 
     try {
-      const res = await fetch("/query", { method: "POST", body: form, signal });
-      clearTimeout(timeoutId);
+      const res = await fetch("/api/chat/query/stream", { method: "POST", body: form, signal });
       
       console.log("📡 サーバー応答受信:", res.status, res.statusText);
       
@@ -180,14 +184,19 @@ class ChatSearch {
         throw new Error(`サーバーエラー: ${res.status} ${res.statusText}`);
       }
       
-      const json = await res.json();
-      console.log("★ fetch /query →", json);
+      const stream = { result: null, completed: false };
+      await this.readEventStream(res, (event) => {
+        armTimeout();
+        this.handleStreamEvent(event, stream);
+      });
+      clearTimeout(timeoutId);
+      console.log("★ fetch /api/chat/query/stream →", stream.result);
 
-      if (json.error) {
-        throw new Error(json.error);
+      if (!stream.completed) {
+        throw new Error('検索応答が途中で切断されました');
       }
 
-      return json;
+      return stream.result;
     } catch (error) {
       if (timeoutId) clearTimeout(timeoutId);
       if (error.name === 'AbortError') {
@@ -200,6 +209,86 @@ class ChatSearch {
     }
   }
 
+  // SSE（text/event-stream）を読み、data 行のJSONを1イベントずつ渡す
+  // EventSource は POST を送れないため fetch のストリームを自前で区切る
+  async readEventStream(res, onEvent) {
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let sep;
+      while ((sep = buffer.indexOf('\n\n')) !== -1) {
+        const block = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+        const data = block.split('\n')
+          .filter(line => line.startsWith('data:'))
+          .map(line => line.slice(5).trimStart())
+          .join('\n');
+        if (data) onEvent(JSON.parse(data));
+      }
+    }
+  }
+
+  handleStreamEvent(event, stream) {
+    switch (event.type) {
+      case 'retrieval':
+        // 検索が終わった時点で結果を表示し、回答は届いた順に追記する
+        console.log(`🔎 検索完了: ${event.retrieval_time}秒`, event.context);
+        this.hideSearchOverlay();
+        stream.result = {
+          mode: event.mode,
+          answer: '',
+          sources: event.sources || [],
+          results: event.results || [],
+          streamed: true
+        };
+        this.renderResults(stream.result);
+        if (event.mode === 'チャンク統合') this.showAnswer('');
+        break;
+      case 'token':
+        if (stream.result) stream.result.answer += event.text;
+        this.appendAnswer(event.text);
+        break;
+      case 'done':
+        console.log('⏱️ 計測:', event.timing, event.generation);
+        if (stream.result) {
+          stream.result.answer = event.answer;
+          stream.result.timing = event.timing;
+        }
+        stream.completed = true;
+        this.showTiming(event.timing, event.aborted);
+        break;
+      case 'error':
+        throw new Error(event.message);
+    }
+  }
+
+  showAnswer(text) {
+    if (!this.answerDiv) return;
+    this.answerDiv.innerHTML = '<h2>統合回答</h2>';
+    this.answerPre = document.createElement('pre');
+    this.answerPre.textContent = text;
+    this.answerDiv.appendChild(this.answerPre);
+    this.answerDiv.style.display = 'block';
+  }
+
+  appendAnswer(text) {
+    if (this.answerPre) this.answerPre.textContent += text;
+  }
+
+  showTiming(timing, aborted) {
+    if (!this.answerDiv || !timing || this.answerDiv.style.display === 'none') return;
+    const p = document.createElement('p');
+    p.style.cssText = 'color: #666; font-size: 0.85em; margin: 4px 0 0;';
+    const sec = (value) => value === null || value === undefined ? '-' : `${value.toFixed(2)}秒`;
+    p.textContent = `検索 ${sec(timing.retrieval)} / 最初の回答まで ${sec(timing.first_token)} / ` +
+      `生成 ${sec(timing.generation)} / 合計 ${sec(timing.total)}` + (aborted ? '（中断）' : '');
+    this.answerDiv.appendChild(p);
+  }
+
   renderResults(json) {
     console.log('🎯 renderResults開始:', json);
     console.log('🎯 resultsDiv:', this.resultsDiv);
@@ -424,6 +513,7 @@ class ChatSearch {
   clearResults() {
     if (this.resultsDiv) this.resultsDiv.innerHTML = '';
     if (this.answerDiv) this.answerDiv.style.display = 'none';
+    this.answerPre = null;
   }
 
   showSearchMessage(message) {
@@ -513,7 +603,7 @@ class ChatSearch {
       // 2. サーバー側の処理停止を要求
       console.log('🔄 サーバー側の処理停止を要求中...');
       try {
-        const stopResponse = await fetch('/stop_search', {
+        const stopResponse = await fetch('/api/chat/stop_search', {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json'
@@ -0,0 +1,200 @@
+# new/utils/char_stats.py
+# 文字種ヒストグラム（1パスで文字種別の出現数・空白連続数を集計し、品質スコア・言語判定・トークン推定で共有）
+
+import re
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy が無い環境では Counter による集計のみ
+    np = None
+
+# 文字種フラグ（1文字が複数に該当し得る：英字は英数字かつラテン文字）
+JAPANESE = 1       # [぀-ゟ゠-ヿ一-龯]
+ALPHANUMERIC = 2   # [a-zA-Z0-9]
+LATIN = 4          # [a-zA-Z]
+SPECIAL = 8        # [^\w\s぀-ゟ゠-ヿ一-龯]
+SPACE = 16         # \s
+JA_PUNCT = 32      # 。、
+EN_PUNCT = 64      # . ,
+_FLAG_COMBINATIONS = 128
+
+_JAPANESE_RANGES = ((0x3040, 0x309F), (0x30A0, 0x30FF), (0x4E00, 0x9FAF))
+_WORD_OR_SPACE = re.compile(r'[\w\s]')
+_SPACE_RUN = re.compile(r'\s{2,}')
+LONG_SPACE_RUN = 5
+
+# この文字数以上は numpy（UTF-32バッファ上のテーブル参照）で集計
+NUMPY_MIN_LENGTH = 2048
+
+# char_stats のキャッシュ件数（キーはテキストのダイジェストのため本文は保持しない）
+CACHE_SIZE = 128
+
+
+class CharStats(NamedTuple):
+    """テキスト1件の文字種集計"""
+    length: int
+    japanese: int
+    alphanumeric: int
+    latin: int
+    special: int
+    ja_punctuation: int    # 。、
+    en_punctuation: int    # . ,
+    space_runs: int        # 2文字以上の空白連続（\s{2,} の出現数）
+    long_space_runs: int   # LONG_SPACE_RUN 文字以上の空白連続（\s{5,} の出現数）
+    words: int             # 空白区切りの語数（len(text.split())）
+
+
+EMPTY_STATS = CharStats(0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+def _classify(ch: str) -> int:
+    code = ord(ch)
+    flags = 0
+    if any(lo <= code <= hi for lo, hi in _JAPANESE_RANGES):
+        flags |= JAPANESE
+    if ch.isascii() and ch.isalnum():
+        flags |= ALPHANUMERIC
+        if ch.isalpha():
+            flags |= LATIN
+    if ch.isspace():
+        flags |= SPACE
+    if not flags & JAPANESE and not _WORD_OR_SPACE.match(ch):
+        flags |= SPECIAL
+    if ch in '。、':
+        flags |= JA_PUNCT
+    elif ch in '.,':
+        flags |= EN_PUNCT
+    return flags
+
+
+# コードポイント → 文字種フラグ（出現した文字だけを遅延登録）
+_char_classes: Dict[str, int] = {}
+
+# BMP全体のフラグ表（numpy 使用時に初回だけ構築）
+_bmp_table = None
+_table_lock = threading.Lock()
+
+
+def _get_bmp_table():
+    global _bmp_table
+    if _bmp_table is None:
+        with _table_lock:
+            if _bmp_table is None:
+                _bmp_table = np.array([_classify(chr(code)) for code in range(0x10000)], dtype=np.uint8)
+    return _bmp_table
+
+
+def _stats_from_flags(length: int, by_flags, space_runs: int, long_space_runs: int, words: int) -> CharStats:
+    def total(flag: int) -> int:
+        return int(sum(count for flags, count in enumerate(by_flags) if flags & flag))
+
+    return CharStats(
+        length=length,
+        japanese=total(JAPANESE),
+        alphanumeric=total(ALPHANUMERIC),
+        latin=total(LATIN),
+        special=total(SPECIAL),
+        ja_punctuation=total(JA_PUNCT),
+        en_punctuation=total(EN_PUNCT),
+        space_runs=space_runs,
+        long_space_runs=long_space_runs,
+        words=words
+    )
+
+
+def _compute_counter(text: str) -> CharStats:
+    # 1パスでコードポイント別の出現数を数え、異なり文字ごとにフラグで振り分ける
+    by_flags = [0] * _FLAG_COMBINATIONS
+    classes = _char_classes
+    for ch, count in Counter(text).items():
+        flags = classes.get(ch)
+        if flags is None:
+            flags = classes[ch] = _classify(ch)
+        by_flags[flags] += count
+
+    # 空白の連続は出現順に依存するため別途（マッチは連続の数だけ）
+    runs = _SPACE_RUN.findall(text)
+    return _stats_from_flags(
+        len(text), by_flags,
+        space_runs=len(runs),
+        long_space_runs=sum(1 for run in runs if len(run) >= LONG_SPACE_RUN),
+        words=len(text.split())
+    )
+
+
+def _compute_numpy(text: str) -> CharStats:
+    # 孤立サロゲート（壊れたPDFの抽出結果等）もそのままコードポイントとして扱う
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    astral = codes > 0xFFFF
+    if astral.any():
+        flags = _get_bmp_table()[np.where(astral, 0, codes)]
+        for index in np.flatnonzero(astral):
+            flags[index] = _classify(text[index])
+    else:
+        flags = _get_bmp_table()[codes]
+    by_flags = np.bincount(flags, minlength=_FLAG_COMBINATIONS)
+
+    # 空白の連続：空白フラグの立ち上がり・立ち下がり位置から連続長を求める
+    space = np.zeros(len(codes) + 2, dtype=np.int8)
+    space[1:-1] = (flags & SPACE) != 0
+    edges = np.diff(space)
+    run_lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    # 語数 = 非空白の連続数（空白→非空白の切り替わり＋先頭が非空白なら1）
+    words = int(np.count_nonzero(edges[1:-1] == -1)) + int(not space[1])
+
+    return _stats_from_flags(
+        len(text), by_flags,
+        space_runs=int(np.count_nonzero(run_lengths >= 2)),
+        long_space_runs=int(np.count_nonzero(run_lengths >= LONG_SPACE_RUN)),
+        words=words
+    )
+
+
+def _compute(text: str) -> CharStats:
+    if not text:
+        return EMPTY_STATS
+    if np is not None and len(text) >= NUMPY_MIN_LENGTH:
+        return _compute_numpy(text)
+    return _compute_counter(text)
+
+
+_cache: "OrderedDict[bytes, CharStats]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def char_stats(text: str) -> CharStats:
+    """
+    テキストの文字種集計
+
+    判定→整形→スコアリングで同じ文字列を何度も集計しないよう、直近 CACHE_SIZE 件の結果をキャッシュする。
+    キーはテキストのダイジェストのため、長い文書を集計してもキャッシュが本文を抱え込まない。
+    """
+    if not text:
+        return EMPTY_STATS
+    key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    with _cache_lock:
+        stats = _cache.get(key)
+        if stats is not None:
+            _cache.move_to_end(key)
+            return stats
+
+    stats = _compute(text)
+    with _cache_lock:
+        _cache[key] = stats
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return stats
+
+
+def char_stats_batch(texts: Iterable[str]) -> List[CharStats]:
+    """複数テキストの文字種集計（同一テキストは1回だけ集計）"""
+    texts = list(texts)
+    results: Dict[str, CharStats] = {}
+    for text in texts:
+        if text not in results:
+            results[text] = _compute(text)
+    return [results[text] for text in texts]
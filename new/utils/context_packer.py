@@ -0,0 +1,244 @@
+# new/utils/context_packer.py
+# RAGコンテキストの詰め込み（同一ファイルの隣接・重複チャンクを結合・ほぼ同一の文章を除外・トークン予算内に収める）
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence
+
+from .text_segmenter import default_token_counter
+
+# チャンク同士の重なりとみなす最小文字数（偶然の一致で結合しないため）
+MIN_OVERLAP_CHARS = 16
+# 予算の残りがこれ未満なら、次の文章を切り詰めて入れずに打ち切る
+MIN_FRAGMENT_TOKENS = 32
+
+PASSAGE_SEPARATOR = "\n\n"
+DEFAULT_HEADER = "[文書{index}] {label}\n"
+TRUNCATION_MARK = "…"
+
+_NON_WORD = re.compile(r'[\W_]+')
+_SENTENCE_END = re.compile(r'[。．！？!?\n]|\.\s')
+
+
+@dataclass
+class ContextChunk:
+    """検索結果1件（file_id・chunk_index があれば同一ファイル内の隣接チャンクを結合）"""
+    text: str
+    score: float = 0.0
+    label: str = ""
+    file_id: Optional[str] = None
+    chunk_index: Optional[int] = None
+
+
+@dataclass
+class ContextPassage:
+    """コンテキストに入れる1文章（結合済み）"""
+    text: str
+    score: float
+    label: str
+    file_id: Optional[str] = None
+    chunk_indices: List[int] = field(default_factory=list)
+    truncated: bool = False
+
+
+@dataclass
+class PackedContext:
+    """詰め込み結果と節約量"""
+    text: str
+    passages: List[ContextPassage]
+    budget: int
+    tokens: int                 # text の実トークン数（予算以下）
+    input_tokens: int           # 検索結果をそのまま並べた場合のトークン数
+    merged: int = 0             # 隣接・重なりで前のチャンクに結合した件数
+    duplicates: int = 0         # ほぼ同一の文章として除外した件数
+    omitted: int = 0            # 予算に入らず除外した文章数
+    truncated: int = 0          # 末尾を切り詰めた文章数
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(0, self.input_tokens - self.tokens)
+
+    @property
+    def file_ids(self) -> List[str]:
+        """参照したファイル（出現順・重複なし）"""
+        return list(dict.fromkeys(p.file_id for p in self.passages if p.file_id is not None))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "tokens": self.tokens,
+            "input_tokens": self.input_tokens,
+            "saved_tokens": self.saved_tokens,
+            "passages": len(self.passages),
+            "merged": self.merged,
+            "duplicates": self.duplicates,
+            "omitted": self.omitted,
+            "truncated": self.truncated,
+        }
+
+
+def _overlap_length(previous: str, text: str) -> int:
+    """previous の末尾と text の先頭が一致する最大文字数（MIN_OVERLAP_CHARS 未満は 0）"""
+    if len(previous) < MIN_OVERLAP_CHARS or len(text) < MIN_OVERLAP_CHARS:
+        return 0
+    probe = text[:MIN_OVERLAP_CHARS]
+    start = previous.find(probe)
+    while start != -1:
+        # 先に見つかるほど重なりが長い
+        length = len(previous) - start
+        if text.startswith(previous[start:]) or previous[start:].startswith(text):
+            return min(length, len(text))
+        start = previous.find(probe, start + 1)
+    return 0
+
+
+def merge_adjacent(chunks: Sequence[ContextChunk]) -> List[ContextPassage]:
+    """
+    同一ファイルのチャンクを chunk_index 順に並べ、連続番号または本文が重なるものを1文章に結合
+
+    重なり（TextChunker が前チャンク末尾を複製した部分）は1回だけ残す。
+    前の文章に丸ごと含まれるチャンクは結合扱いで捨てる。スコアは結合元の最大値。
+    """
+    passages: List[ContextPassage] = []
+    by_file: Dict[Any, List[ContextChunk]] = {}
+    for chunk in chunks:
+        if not chunk.text.strip():
+            continue
+        if chunk.file_id is None or chunk.chunk_index is None:
+            passages.append(ContextPassage(chunk.text, chunk.score, chunk.label, chunk.file_id,
+                                           [] if chunk.chunk_index is None else [chunk.chunk_index]))
+            continue
+        by_file.setdefault(chunk.file_id, []).append(chunk)
+
+    for file_chunks in by_file.values():
+        current: Optional[ContextPassage] = None
+        for chunk in sorted(file_chunks, key=lambda c: c.chunk_index):
+            if current is not None:
+                if chunk.chunk_index == current.chunk_indices[-1] or chunk.text in current.text:
+                    current.score = max(current.score, chunk.score)
+                    current.chunk_indices.append(chunk.chunk_index)
+                    continue
+                overlap = _overlap_length(current.text, chunk.text)
+                if overlap or chunk.chunk_index == current.chunk_indices[-1] + 1:
+                    current.text += chunk.text[overlap:]
+                    current.score = max(current.score, chunk.score)
+                    current.chunk_indices.append(chunk.chunk_index)
+                    continue
+            current = ContextPassage(chunk.text, chunk.score, chunk.label, chunk.file_id, [chunk.chunk_index])
+            passages.append(current)
+    return passages
+
+
+def _shingles(text: str, size: int = 3) -> FrozenSet[str]:
+    normalized = _NON_WORD.sub("", unicodedata.normalize("NFKC", text)).lower()
+    if len(normalized) <= size:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + size] for i in range(len(normalized) - size + 1))
+
+
+def drop_near_duplicates(passages: Sequence[ContextPassage], threshold: float = 0.9) -> List[ContextPassage]:
+    """
+    スコア順に見て、既に残した文章にほぼ含まれる文章（文字3-gramの包含率 ≥ threshold）を除外
+
+    別ファイルに同じ段落が入っている場合（版違いの文書・定型文）も1回だけ残す。
+    """
+    kept: List[ContextPassage] = []
+    kept_shingles: List[FrozenSet[str]] = []
+    for passage in sorted(passages, key=lambda p: p.score, reverse=True):
+        shingles = _shingles(passage.text)
+        if not shingles:
+            continue
+        if any(len(shingles & other) >= threshold * len(shingles) for other in kept_shingles):
+            continue
+        kept.append(passage)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def _truncate_to_fit(prefix: str, header: str, text: str, budget: int, count: Callable[[str], int]) -> str:
+    """prefix + header + text[:n] + TRUNCATION_MARK が予算に収まる最大の n で切り、文末があればそこまで戻す"""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count(prefix + header + text[:middle] + TRUNCATION_MARK) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    cut = text[:low]
+    # 後半に文末があれば文の途中で切らない
+    ends = [m.end() for m in _SENTENCE_END.finditer(cut)]
+    if ends and ends[-1] >= len(cut) // 2:
+        cut = cut[:ends[-1]]
+    return cut.rstrip()
+
+
+def pack_context(
+    chunks: Sequence[ContextChunk],
+    budget_tokens: int,
+    count_tokens: Optional[Callable[[str], int]] = None,
+    header: str = DEFAULT_HEADER,
+    duplicate_threshold: float = 0.9
+) -> PackedContext:
+    """
+    検索結果をトークン予算内のコンテキスト文字列にまとめる
+
+    1. 同一ファイルの隣接・重なりチャンクを結合（merge_adjacent）
+    2. ほぼ同一の文章を除外（drop_near_duplicates）
+    3. スコア順に、見出しを含めた連結後のトークン数が budget_tokens 以下の間だけ追加
+       （入らない文章は残り予算が MIN_FRAGMENT_TOKENS 以上なら文末で切り詰めて入れる）
+
+    予算の判定は連結後の文字列全体を count_tokens で数えるため、結果の tokens は必ず予算以下。
+
+    Args:
+        chunks: 検索結果（スコアの高い順である必要はない）
+        budget_tokens: コンテキストに使う最大トークン数
+        count_tokens: トークン数の見積もり関数（実トークナイザーも可）
+        header: 各文章の見出し（{index}・{label} を置換）
+        duplicate_threshold: ほぼ同一とみなす包含率
+
+    Returns:
+        PackedContext（text はスコア順の文章を PASSAGE_SEPARATOR で連結したもの）
+    """
+    count = count_tokens or default_token_counter
+    texts = [chunk.text for chunk in chunks if chunk.text.strip()]
+    input_tokens = count(PASSAGE_SEPARATOR.join(texts)) if texts else 0
+
+    merged = merge_adjacent(chunks)
+    candidates = drop_near_duplicates(merged, duplicate_threshold)
+
+    packed = ""
+    tokens = 0
+    selected: List[ContextPassage] = []
+    omitted = truncated = 0
+    for passage in candidates:
+        prefix = packed + PASSAGE_SEPARATOR if packed else ""
+        block_header = header.format(index=len(selected) + 1, label=passage.label)
+        candidate = prefix + block_header + passage.text
+        candidate_tokens = count(candidate)
+        if candidate_tokens <= budget_tokens:
+            packed, tokens = candidate, candidate_tokens
+            selected.append(passage)
+            continue
+        if budget_tokens - tokens >= MIN_FRAGMENT_TOKENS:
+            cut = _truncate_to_fit(prefix, block_header, passage.text, budget_tokens, count)
+            candidate = prefix + block_header + cut + TRUNCATION_MARK
+            if cut and count(candidate) <= budget_tokens:
+                packed, tokens = candidate, count(candidate)
+                passage.text, passage.truncated = cut + TRUNCATION_MARK, True
+                selected.append(passage)
+                truncated += 1
+                continue
+        omitted += 1
+
+    return PackedContext(
+        text=packed,
+        passages=selected,
+        budget=budget_tokens,
+        tokens=tokens,
+        input_tokens=input_tokens,
+        merged=sum(1 for chunk in chunks if chunk.text.strip()) - len(merged),
+        duplicates=len(merged) - len(candidates),
+        omitted=omitted,
+        truncated=truncated,
+    )
@@ -0,0 +1,349 @@
+# new/utils/dictionary_artifact.py
+# 誤字修正辞書のコンパイル済みアーティファクト（構築済みオートマトン＋既知単語を平坦な配列で保存し、mmap したまま照合・更新検知）
+
+import csv
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from collections.abc import Mapping as MappingABC, Set as SetABC
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AbstractSet, Dict, Iterator, Mapping, Optional, Sequence, Tuple
+
+from new.utils.pattern_matcher import MappedPatternMatcher, MultiPatternMatcher, PatternMatcher, TABLE_NAMES, TABLE_TYPES
+
+LOGGER = logging.getLogger(__name__)
+
+ARTIFACT_NAME = "ocr_dictionary.artifact"
+ARTIFACT_MAGIC = b"OCRDICT\x00"
+ARTIFACT_FORMAT = 3
+_HEADER = struct.Struct("<8sIQ32s")  # マジック・形式バージョン・ビルド時刻(ns)・本体のSHA-256
+_SECTION = struct.Struct("<QQ")  # セクションの開始位置・長さ（ファイル先頭から）
+_ALIGN = 8
+
+# 本体のセクション（この順に並ぶ）。配列はネイティブのバイト順（生成したホストで読む前提）
+_STRING_TABLES = ("patterns", "targets", "known_words", "mistake_keys", "mistake_values")
+_SECTIONS = (
+    "meta",  # JSON: 元CSVのmtime・保護語の数
+    *TABLE_NAMES,
+    *(f"{name}_{part}" for name in _STRING_TABLES for part in ("offsets", "text")),
+)
+
+KNOWN_WORD_FILES = ("known_words_common.csv", "known_words_custom.csv")
+MISTAKES_FILE = "ocr_word_mistakes.csv"
+
+
+class _StringTable:
+    """オフセット配列＋UTF-8本体の文字列表（コピーせず mmap 上のまま参照）"""
+
+    def __init__(self, offsets: Sequence[int], text: memoryview):
+        self._offsets = offsets
+        self._text = text
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def raw(self, index: int) -> bytes:
+        return bytes(self._text[self._offsets[index]:self._offsets[index + 1]])
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.raw(index).decode("utf-8", "surrogatepass")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[index] for index in range(len(self)))
+
+    def find(self, word: str) -> int:
+        """昇順の表を二分探索（UTF-8のバイト順は文字コード順と一致）、無ければ -1"""
+        key = word.encode("utf-8", "surrogatepass")
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.raw(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self) and self.raw(low) == key else -1
+
+
+class MappedWordSet(SetABC):
+    """既知単語の読み取り専用セット（昇順の文字列表を二分探索）"""
+
+    def __init__(self, table: _StringTable):
+        self._table = table
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and self._table.find(word) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+class MappedMistakes(MappingABC):
+    """誤字→正字の読み取り専用マッピング（誤字の昇順で並べた2つの文字列表）"""
+
+    def __init__(self, keys: _StringTable, values: _StringTable):
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, wrong: str) -> str:
+        index = self._keys.find(wrong) if isinstance(wrong, str) else -1
+        if index < 0:
+            raise KeyError(wrong)
+        return self._values[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+@dataclass
+class DictionaryArtifact:
+    """コンパイル済み辞書（プロセス内で共有する読み取り専用ビュー）"""
+    mistakes: Mapping[str, str]
+    known_words: AbstractSet[str]
+    matcher: PatternMatcher  # 誤字パターン（既知単語は保護語）
+    sources: Dict[str, int] = field(default_factory=dict)  # 元CSV名 → mtime(ns)
+    built_at: int = 0
+    path: Optional[Path] = None  # 読み込んだアーティファクト（CSVから直接読んだ場合は None）
+
+    @property
+    def version(self) -> Tuple[Tuple[str, int], ...]:
+        """内容の識別子（元CSVのmtimeが同じなら同じ内容）"""
+        return tuple(sorted(self.sources.items()))
+
+
+def _source_mtimes(dict_dir: Path, names: Sequence[str]) -> Dict[str, int]:
+    """元CSVのmtime（存在しないファイルは0）"""
+    mtimes = {}
+    for name in names:
+        try:
+            mtimes[name] = (dict_dir / name).stat().st_mtime_ns
+        except OSError:
+            mtimes[name] = 0
+    return mtimes
+
+
+def _read_known_words(path: Path) -> set:
+    words = set()
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if row and row[0].strip():
+                    words.add(row[0].strip())
+    return words
+
+
+def _read_mistakes(path: Path) -> Dict[str, str]:
+    mapping = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # ヘッダースキップ
+            for row in reader:
+                if len(row) >= 2:
+                    wrong, correct = row[0].strip(), row[1].strip()
+                    if wrong and correct:
+                        mapping[wrong] = correct
+    return mapping
+
+
+def _read_sources(
+    dict_dir: Path,
+    known_word_files: Sequence[str] = KNOWN_WORD_FILES,
+    mistakes_file: str = MISTAKES_FILE
+) -> Tuple[Dict[str, str], set]:
+    known_words = set()
+    for name in known_word_files:
+        known_words |= _read_known_words(dict_dir / name)
+    return _read_mistakes(dict_dir / mistakes_file), known_words
+
+
+def _string_sections(name: str, strings: Sequence[str]) -> Dict[str, bytes]:
+    """文字列表をオフセット配列＋UTF-8本体のセクションにする"""
+    offsets = array("I", [0])
+    text = bytearray()
+    for string in strings:
+        text += string.encode("utf-8", "surrogatepass")
+        offsets.append(len(text))
+    return {f"{name}_offsets": offsets.tobytes(), f"{name}_text": bytes(text)}
+
+
+def compile_dictionary_artifact(
+    dict_dir,
+    known_word_files: Sequence[str] = KNOWN_WORD_FILES,
+    mistakes_file: str = MISTAKES_FILE,
+    output: Optional[Path] = None
+) -> Path:
+    """
+    辞書CSVからオートマトンを構築してアーティファクトに書き出す（辞書保存時に呼ぶ）
+
+    本体は遷移表・失敗リンク・出力・辞書接尾リンク、パターン・既知単語・誤字表の文字列表を
+    平坦な配列で並べたもの（コードを含まない）で、SHA-256をヘッダーに持つ。
+    一時ファイルに書いてから置き換えるため、mmap して読み込み中の他プロセスには影響しない。
+
+    Returns:
+        アーティファクトのパス
+    """
+    dict_dir = Path(dict_dir)
+    output = Path(output) if output else dict_dir / ARTIFACT_NAME
+    sources = _source_mtimes(dict_dir, [*known_word_files, mistakes_file])
+    mistakes, known_words = _read_sources(dict_dir, known_word_files, mistakes_file)
+    known_sorted = sorted(known_words)
+
+    tables, patterns, targets = MultiPatternMatcher(mistakes, protected=known_sorted).export_tables()
+    protected_count = sum(1 for target in targets if target is None)
+    mistake_keys = sorted(mistakes)
+
+    sections = {
+        "meta": json.dumps(
+            {"sources": sources, "protected_count": protected_count}, separators=(",", ":")
+        ).encode("utf-8"),
+        **{name: tables[name].tobytes() for name in TABLE_NAMES},
+        **_string_sections("patterns", patterns),
+        **_string_sections("targets", ["" if target is None else target for target in targets]),
+        **_string_sections("known_words", known_sorted),
+        **_string_sections("mistake_keys", mistake_keys),
+        **_string_sections("mistake_values", [mistakes[key] for key in mistake_keys]),
+    }
+
+    # セクション表の後ろに各セクションを境界を揃えて並べる
+    body = bytearray(_SECTION.size * len(_SECTIONS))
+    for index, name in enumerate(_SECTIONS):
+        body += bytes(-(_HEADER.size + len(body)) % _ALIGN)
+        _SECTION.pack_into(body, index * _SECTION.size, _HEADER.size + len(body), len(sections[name]))
+        body += sections[name]
+
+    built_at = max(sources.values(), default=0)
+    digest = hashlib.sha256(body).digest()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=output.parent, prefix=".tmp_", suffix=".artifact")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_FORMAT, built_at, digest))
+            f.write(body)
+        os.replace(tmp_path, output)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    LOGGER.info(f"辞書アーティファクト生成: {output} (誤字{len(mistakes)}件, 既知語{len(known_words)}語)")
+    return output
+
+
+def load_dictionary_artifact(path) -> DictionaryArtifact:
+    """
+    アーティファクトを mmap して読み込む（形式・SHA-256の不一致はValueError）
+
+    照合器・既知単語・誤字表はすべて mmap 上の配列をそのまま参照し、構築し直さない。
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"辞書アーティファクトの形式が不正です: {path}") from None
+    view = memoryview(buffer)
+
+    if len(view) < _HEADER.size + _SECTION.size * len(_SECTIONS):
+        raise ValueError(f"辞書アーティファクトの形式が不正です: {path}")
+    magic, fmt, built_at, digest = _HEADER.unpack_from(view, 0)
+    if magic != ARTIFACT_MAGIC or fmt != ARTIFACT_FORMAT:
+        raise ValueError(f"辞書アーティファクトの形式が不正です: {path}")
+    if hashlib.sha256(view[_HEADER.size:]).digest() != digest:
+        raise ValueError(f"辞書アーティファクトのチェックサムが一致しません: {path}")
+
+    sections: Dict[str, memoryview] = {}
+    for index, name in enumerate(_SECTIONS):
+        offset, length = _SECTION.unpack_from(view, _HEADER.size + index * _SECTION.size)
+        if offset + length > len(view):
+            raise ValueError(f"辞書アーティファクトの形式が不正です: {path}")
+        sections[name] = view[offset:offset + length]
+
+    def strings(name: str) -> _StringTable:
+        return _StringTable(sections[f"{name}_offsets"].cast("I"), sections[f"{name}_text"])
+
+    meta = json.loads(bytes(sections["meta"]).decode("utf-8"))
+    tables = {name: sections[name].cast(TABLE_TYPES[name]) for name in TABLE_NAMES}
+    return DictionaryArtifact(
+        mistakes=MappedMistakes(strings("mistake_keys"), strings("mistake_values")),
+        known_words=MappedWordSet(strings("known_words")),
+        matcher=MappedPatternMatcher(tables, strings("patterns"), strings("targets"), meta["protected_count"]),
+        sources={str(k): int(v) for k, v in meta["sources"].items()},
+        built_at=built_at,
+        path=path
+    )
+
+
+def _build_in_memory(dict_dir: Path, sources: Dict[str, int]) -> DictionaryArtifact:
+    """CSVを直接解析（アーティファクトが無い・古い場合、ファイルには書かない）"""
+    mistakes, known_words = _read_sources(dict_dir)
+    known_words = frozenset(known_words)
+    return DictionaryArtifact(
+        mistakes=mistakes,
+        known_words=known_words,
+        matcher=MultiPatternMatcher(mistakes, protected=known_words),
+        sources=sources,
+        built_at=max(sources.values(), default=0)
+    )
+
+
+# プロセス内キャッシュ（辞書ディレクトリ → 読み込み済みアーティファクト）
+_artifacts: Dict[Path, DictionaryArtifact] = {}
+_lock = threading.Lock()
+
+
+def get_dictionary_artifact(dict_dir) -> Optional[DictionaryArtifact]:
+    """
+    最新の辞書を取得（読み込みのみ、ファイルは書かない）
+
+    呼び出しごとに元CSVのmtimeだけを確認し、変わっていなければキャッシュを返す。
+    変わっていれば、同じmtimeで生成されたアーティファクトを読み、無い・古い・壊れている場合はCSVを直接解析する。
+    アーティファクトの生成は辞書保存時（compile_dictionary_artifact）のみ。
+
+    Returns:
+        辞書（辞書ディレクトリが無い・読み込み失敗時はNone）
+    """
+    dict_dir = Path(dict_dir).resolve()
+    if not dict_dir.is_dir():
+        return None
+    path = dict_dir / ARTIFACT_NAME
+
+    with _lock:
+        cached = _artifacts.get(dict_dir)
+        try:
+            sources = _source_mtimes(dict_dir, [*KNOWN_WORD_FILES, MISTAKES_FILE])
+            if cached is not None and cached.sources == sources:
+                return cached
+
+            artifact = None
+            if path.exists():
+                try:
+                    artifact = load_dictionary_artifact(path)
+                except (OSError, ValueError, KeyError) as e:
+                    LOGGER.warning(f"辞書アーティファクトを使用できません [{path}]: {e}")
+                if artifact is not None and artifact.sources != sources:
+                    artifact = None  # CSVが直接編集された（次回の辞書保存で再生成される）
+            if artifact is None:
+                artifact = _build_in_memory(dict_dir, sources)
+
+            _artifacts[dict_dir] = artifact
+            return artifact
+
+        except Exception as e:
+            LOGGER.warning(f"辞書読み込み失敗 [{dict_dir}]: {e}")
+            return cached
@@ -0,0 +1,281 @@
+# new/utils/pattern_matcher.py
+# Aho-Corasick 多パターン照合（最左最長一致・1パス置換）
+
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# 平坦な配列表の名前と array の型コード（goto は CSR 形式: ノードごとの遷移を文字コード順に
+# edge_char / edge_next へ並べ、ノード n の遷移は edge_start[n]〜edge_start[n + 1]）
+TABLE_TYPES = {
+    "edge_start": "I",
+    "edge_char": "I",
+    "edge_next": "I",
+    "fail": "i",
+    "output": "i",  # -1 は出力なし
+    "dict_link": "i",  # -1 はリンクなし
+    "lengths": "I",
+}
+TABLE_NAMES = tuple(TABLE_TYPES)
+
+
+def _select_longest(longest_at: Dict[int, int], lengths: Sequence[int]) -> List[Tuple[int, int, int]]:
+    """開始位置ごとの最長ヒットから、左から貪欲に非重複のヒットを採用"""
+    matches = []
+    cursor = 0
+    for start in sorted(longest_at):
+        if start < cursor:
+            continue
+        pattern_id = longest_at[start]
+        end = start + lengths[pattern_id]
+        matches.append((start, end, pattern_id))
+        cursor = end
+    return matches
+
+
+class PatternMatcher:
+    """照合器の共通インターフェース（find_all / entry から1パス置換を提供）"""
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        raise NotImplementedError
+
+    def entry(self, pattern_id: int) -> Tuple[str, Optional[str]]:
+        raise NotImplementedError
+
+    def replace(self, text: str) -> Tuple[str, List[Dict]]:
+        """
+        全ヒットを1パスで置換
+
+        Returns:
+            (置換後テキスト, 置換箇所のリスト)
+            置換箇所は {"start", "end", "wrong", "correct"}（位置は元テキスト基準）
+        """
+        parts = []
+        edits = []
+        cursor = 0
+        for start, end, pattern_id in self.find_all(text):
+            wrong, target = self.entry(pattern_id)
+            if target is None:
+                continue  # 保護語はそのまま残す
+            parts.append(text[cursor:start])
+            parts.append(target)
+            edits.append({
+                "start": start,
+                "end": end,
+                "wrong": wrong,
+                "correct": target
+            })
+            cursor = end
+
+        if not edits:
+            return text, edits
+        parts.append(text[cursor:])
+        return "".join(parts), edits
+
+
+class MultiPatternMatcher(PatternMatcher):
+    """
+    辞書の全パターンをテキスト1回の走査で検出するAho-Corasickオートマトン
+
+    パターンごとに replace/find を繰り返す方式（辞書サイズ × テキスト長）と異なり、
+    走査コストはテキスト長 + ヒット数に比例する。
+    重なり合うヒットは最左最長（一番左で始まるもの、同位置なら最長）を採用する。
+    """
+
+    def __init__(self, replacements: Mapping[str, str], protected: Iterable[str] = ()):
+        """
+        Args:
+            replacements: 誤り→置換後 の辞書
+            protected: 置換から保護する語（テキスト中でこの語に含まれる部分は置換しない）
+        """
+        # 遷移表・失敗リンク・出力（ノードで終わるパターン番号）・辞書接尾リンク
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [-1]
+        self._dict_link: List[int] = [-1]
+
+        self._patterns: List[str] = []
+        self._lengths: List[int] = []
+        self._targets: List[Optional[str]] = []  # None は保護語（置換しない）
+        self._index: Dict[str, int] = {}
+
+        for word in protected:
+            if word:
+                self._add(word, None)
+        # 保護語と同じ誤りパターンは登録しない（保護語が優先）
+        for wrong, correct in replacements.items():
+            if wrong and wrong not in self._index:
+                self._add(wrong, correct)
+
+        self._build()
+
+    def __len__(self) -> int:
+        return sum(1 for target in self._targets if target is not None)
+
+    def entry(self, pattern_id: int) -> Tuple[str, Optional[str]]:
+        """パターン番号から (パターン, 置換後) を取得（保護語の置換後はNone）"""
+        return self._patterns[pattern_id], self._targets[pattern_id]
+
+    def _add(self, pattern: str, target: Optional[str]) -> None:
+        """トライにパターンを追加"""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(-1)
+                self._dict_link.append(-1)
+            node = next_node
+
+        self._index[pattern] = len(self._patterns)
+        self._output[node] = len(self._patterns)
+        self._patterns.append(pattern)
+        self._lengths.append(len(pattern))
+        self._targets.append(target)
+
+    def _build(self) -> None:
+        """幅優先で失敗リンクと辞書接尾リンクを構築"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[child] = candidate if candidate != child else 0
+
+                suffix = self._fail[child]
+                self._dict_link[child] = suffix if self._output[suffix] >= 0 else self._dict_link[suffix]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        最左最長・非重複のヒットを列挙
+
+        Returns:
+            (開始位置, 終了位置（排他的）, パターン番号) のリスト（位置順）
+        """
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        lengths = self._lengths
+
+        # 開始位置ごとの最長ヒット（1パスの走査で収集）
+        longest_at: Dict[int, int] = {}
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            hit = node if output[node] >= 0 else dict_link[node]
+            while hit >= 0:
+                pattern_id = output[hit]
+                start = position - lengths[pattern_id] + 1
+                best = longest_at.get(start)
+                if best is None or lengths[pattern_id] > lengths[best]:
+                    longest_at[start] = pattern_id
+                hit = dict_link[hit]
+
+        return _select_longest(longest_at, lengths)
+
+    def export_tables(self) -> Tuple[Dict[str, array], List[str], List[Optional[str]]]:
+        """
+        オートマトンを平坦な配列で取得（MappedPatternMatcher でそのまま照合できる形）
+
+        Returns:
+            (TABLE_NAMES ごとの配列, パターン, 置換後（保護語はNone、パターン番号の先頭に並ぶ）)
+        """
+        edge_start, edge_char, edge_next = (array(TABLE_TYPES[name]) for name in TABLE_NAMES[:3])
+        edge_start.append(0)
+        for transitions in self._goto:
+            for char in sorted(transitions):
+                edge_char.append(ord(char))
+                edge_next.append(transitions[char])
+            edge_start.append(len(edge_char))
+
+        tables = {
+            "edge_start": edge_start,
+            "edge_char": edge_char,
+            "edge_next": edge_next,
+            "fail": array(TABLE_TYPES["fail"], self._fail),
+            "output": array(TABLE_TYPES["output"], self._output),
+            "dict_link": array(TABLE_TYPES["dict_link"], self._dict_link),
+            "lengths": array(TABLE_TYPES["lengths"], self._lengths),
+        }
+        return tables, list(self._patterns), list(self._targets)
+
+
+class MappedPatternMatcher(PatternMatcher):
+    """
+    export_tables() の平坦な配列をそのまま照合に使う読み取り専用の照合器
+
+    配列は mmap 上の memoryview でもよく、トライの再構築もコピーもしない。
+    各ノードの遷移は文字コード順に並んでいるので二分探索で引く。
+    """
+
+    def __init__(
+        self,
+        tables: Mapping[str, Sequence[int]],
+        patterns: Sequence[str],
+        targets: Sequence[str],
+        protected_count: int
+    ):
+        """
+        Args:
+            tables: TABLE_NAMES ごとの整数配列
+            patterns: パターン番号 → パターン
+            targets: パターン番号 → 置換後（保護語の分は参照しない）
+            protected_count: 保護語の数（パターン番号 0〜protected_count-1 が保護語）
+        """
+        for name in TABLE_NAMES:
+            setattr(self, f"_{name}", tables[name])
+        self._patterns = patterns
+        self._targets = targets
+        self._protected_count = protected_count
+
+    def __len__(self) -> int:
+        return len(self._patterns) - self._protected_count
+
+    def entry(self, pattern_id: int) -> Tuple[str, Optional[str]]:
+        """パターン番号から (パターン, 置換後) を取得（保護語の置換後はNone）"""
+        target = None if pattern_id < self._protected_count else self._targets[pattern_id]
+        return self._patterns[pattern_id], target
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        最左最長・非重複のヒットを列挙（MultiPatternMatcher.find_all と同じ結果）
+
+        Returns:
+            (開始位置, 終了位置（排他的）, パターン番号) のリスト（位置順）
+        """
+        edge_start, edge_char, edge_next = self._edge_start, self._edge_char, self._edge_next
+        fail, output, dict_link, lengths = self._fail, self._output, self._dict_link, self._lengths
+
+        longest_at: Dict[int, int] = {}
+        node = 0
+        for position, char in enumerate(text):
+            code = ord(char)
+            while True:
+                low, high = edge_start[node], edge_start[node + 1]
+                index = bisect_left(edge_char, code, low, high)
+                if index < high and edge_char[index] == code:
+                    node = edge_next[index]
+                    break
+                if not node:
+                    break
+                node = fail[node]
+
+            hit = node if output[node] >= 0 else dict_link[node]
+            while hit >= 0:
+                pattern_id = output[hit]
+                start = position - lengths[pattern_id] + 1
+                best = longest_at.get(start)
+                if best is None or lengths[pattern_id] > lengths[best]:
+                    longest_at[start] = pattern_id
+                hit = dict_link[hit]
+
+        return _select_longest(longest_at, lengths)
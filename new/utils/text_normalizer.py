@@ -0,0 +1,190 @@
+# new/utils/text_normalizer.py
+# パイプライン共通のテキスト正規化エンジン（事前コンパイル済みの最小限の正規表現パス・ストリーミング対応）
+
+import re
+import unicodedata
+from typing import Callable, Dict, Iterable, Iterator
+
+# 事前コンパイル済みの正規表現
+_BLANK_LINES = re.compile(r'\n\s*\n')  # 非空白文字に挟まれた、改行を2つ以上含む空白領域（最初〜最後の改行）
+_SPACES = re.compile(r' {2,}')
+_NEWLINES_3 = re.compile(r'\n{3,}')
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+
+def _blank_region(region: str, at_line_start: bool, at_text_end: bool) -> str:
+    """
+    空白領域1つに対する re.sub(r'^[\\s\\u3000]+$', '', MULTILINE) の置換結果
+
+    行頭から始まる領域は先頭から、それ以外は最初の改行の次から、
+    テキスト末尾まで続く領域は末尾まで、それ以外は最後の改行の手前までを削除する。
+    """
+    if '\n' not in region:
+        return '' if at_line_start and at_text_end else region
+    start = 0 if at_line_start else region.index('\n') + 1
+    end = len(region) if at_text_end else region.rindex('\n')
+    return region[:start] + region[end:] if end > start else region
+
+
+def _empty_lines(text: str, at_start: bool = True, at_end: bool = True) -> str:
+    """
+    Args:
+        at_start: textがテキスト先頭か（Falseなら直前は非空白文字）
+        at_end: textがテキスト末尾か（Falseなら直後は非空白文字）
+    """
+    if not text:
+        return text
+    body = text.lstrip()
+    if not body:
+        return _blank_region(text, at_start, at_end)
+
+    head = text[:len(text) - len(body)]
+    stripped = body.rstrip()
+    tail = body[len(stripped):]
+
+    # 内側の空白領域は非空白文字に挟まれているため、最初の改行〜最後の改行を改行2つにするだけでよい
+    if '\n' in stripped:
+        stripped = _BLANK_LINES.sub('\n\n', stripped)
+    if head:
+        stripped = _blank_region(head, at_start, False) + stripped
+    if tail:
+        stripped += _blank_region(tail, False, at_end)
+    return stripped
+
+
+def normalize_empty_lines(text: str) -> str:
+    """
+    空白のみの行を削除し、連続空行は最大１行に圧縮する
+
+    re.sub(r'^[\\s\\u3000]+$', '', MULTILINE) → re.sub(r'\\n{3,}', '\\n\\n') と同一の結果を
+    1回の正規表現パスで求める（2段目の圧縮は1段目の結果では常に不要）。
+    """
+    return _empty_lines(text)
+
+
+def normalize_empty_lines_strip(text: str) -> str:
+    """normalize_empty_lines の結果の前後空白を除去"""
+    return _empty_lines(text).strip()
+
+
+def _whitespace(text: str) -> str:
+    text = text.replace('　', ' ').replace('\t', ' ')
+    text = _SPACES.sub(' ', text)
+    if '\n\n\n' in text:
+        text = _NEWLINES_3.sub('\n\n', text)
+    # 行ごとのstrip（空白のみの行は空行として残す）
+    return '\n'.join(map(str.strip, text.split('\n')))
+
+
+def normalize_whitespace(text: str) -> str:
+    """
+    空白文字を正規化（全角スペース・タブ→半角、連続空白を1つに、連続改行を最大2つに、行頭行末・前後の空白を除去）
+    """
+    return _whitespace(text).strip()
+
+
+def collapse_whitespace(text: str) -> str:
+    """連続する空白（改行含む）を1つの半角スペースにして前後を除去"""
+    if not text:
+        return ""
+    return ' '.join(text.split())
+
+
+def _strip_lines(text: str) -> str:
+    """各行の前後空白を除去し空行を削除"""
+    return '\n'.join(filter(None, map(str.strip, text.split('\n'))))
+
+
+def normalize_lines(text: str, nfkc: bool = True) -> str:
+    """Unicode正規化（NFKC）後、各行の前後空白を除去し空行を削除"""
+    if not text:
+        return ""
+    if nfkc:
+        text = unicodedata.normalize("NFKC", text)
+    return _strip_lines(text)
+
+
+def normalize_newlines(text: str) -> str:
+    """改行を \\n に統一し前後の空白を除去"""
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+# ストリーミング用：(断片, テキスト先頭か, テキスト末尾か) → 正規化済み断片
+# 先頭以外の断片は改行を含む空白領域で始まり、直前の断片は非空白文字で終わる
+def _edges(text: str, at_start: bool, at_end: bool) -> str:
+    if at_start:
+        text = text.lstrip()
+    if at_end:
+        text = text.rstrip()
+    return text
+
+
+def _stream_empty_lines_strip(text: str, at_start: bool, at_end: bool) -> str:
+    return _edges(_empty_lines(text, at_start, at_end), at_start, at_end)
+
+
+def _stream_whitespace(text: str, at_start: bool, at_end: bool) -> str:
+    return _edges(_whitespace(text), at_start, at_end)
+
+
+def _stream_collapse(text: str, at_start: bool, at_end: bool) -> str:
+    return _edges(_WHITESPACE_RUN.sub(' ', text), at_start, at_end)
+
+
+def _stream_lines(text: str, at_start: bool, at_end: bool) -> str:
+    lines = _strip_lines(unicodedata.normalize("NFKC", text))
+    # 直前の断片の最終行との区切り改行
+    return '\n' + lines if lines and not at_start else lines
+
+
+def _stream_newlines(text: str, at_start: bool, at_end: bool) -> str:
+    return _edges(text.replace("\r\n", "\n").replace("\r", "\n"), at_start, at_end)
+
+
+STREAM_MODES: Dict[str, Callable[[str, bool, bool], str]] = {
+    "empty_lines": _empty_lines,                    # TextRefiner.normalize_empty_lines
+    "empty_lines_strip": _stream_empty_lines_strip,  # OllamaRefiner.normalize_text
+    "whitespace": _stream_whitespace,                # llm_utils.normalize_whitespace
+    "collapse": _stream_collapse,                    # TextProcessor.clean_text
+    "lines": _stream_lines,                          # FileProcessor._normalize_text
+    "newlines": _stream_newlines,                    # TextChunker._normalize
+}
+
+
+def stream_normalize(chunks: Iterable[str], mode: str = "empty_lines") -> Iterator[str]:
+    """
+    巨大テキストを分割して正規化（出力を連結すると一括正規化と同一の結果）
+
+    各チャンクを受け取るたびに、最後の改行を含む空白領域の直前（非空白文字）までを確定して出力し、
+    残り（空白領域と書きかけの行）は次のチャンクに持ち越す。
+    確定部分は非空白文字で終わるため、空白領域・行・NFKC合成がチャンク境界をまたがない。
+
+    Args:
+        chunks: テキスト断片のイテラブル（ファイルオブジェクト等）
+        mode: 正規化の種類（STREAM_MODES のキー）
+
+    Yields:
+        正規化済みテキスト断片
+    """
+    normalize = STREAM_MODES[mode]
+    pending = ""
+    at_start = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+        newline = pending.rfind('\n', len(pending) - len(chunk))
+        if newline <= 0:
+            continue
+        cut = len(pending[:newline].rstrip())
+        if cut == 0:
+            continue
+        piece = normalize(pending[:cut], at_start, False)
+        pending = pending[cut:]
+        at_start = False
+        if piece:
+            yield piece
+
+    piece = normalize(pending, at_start, True)
+    if piece:
+        yield piece
@@ -0,0 +1,175 @@
+# new/utils/text_segmenter.py
+# 長文LLM整形用のセグメント分割・結合（ページ/段落境界でトークン予算内に分割し、重なり部分を除去して結合）
+
+import re
+import difflib
+import unicodedata
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+# 分割境界（粗い順）：切れ目は各マッチの末尾
+_BOUNDARIES = (
+    re.compile(r'\f|\n(?==== ページ \d+ ===)'),  # ページ（OCR出力のページ見出しの直前・改ページ）
+    re.compile(r'\n[ \t　]*\n\s*'),          # 段落（空行）
+    re.compile(r'\n'),                             # 行
+    re.compile(r'[。．！？!?]|\.\s'),              # 文
+)
+
+_PAGE_HEADER = re.compile(r'=== ページ \d+ ===\s*')
+
+SEGMENT_SEPARATOR = "\n\n"
+
+
+def default_token_counter(text: str) -> int:
+    """トークン数の概算（日本語 1文字 ≈ 1.6トークンで安全側に見積もる）"""
+    return int(len(text) * 1.6)
+
+
+@dataclass
+class TextSegment:
+    """LLMに渡す1区間"""
+    index: int
+    text: str      # 整形対象（先頭に overlap を含む）
+    overlap: str   # 文脈として前区間の末尾から複製した部分（結合時に重複除去）
+    tokens: int
+
+
+def _split_at(text: str, pattern: "re.Pattern") -> List[str]:
+    """切れ目で分割（切れ目の文字は直前の断片に含めるため、連結すると元のテキスト）"""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        if match.end() > start:
+            pieces.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _units(text: str, max_tokens: int, count: Callable[[str], int], level: int = 0) -> List[str]:
+    """予算を超えない単位まで、ページ→段落→行→文→文字数の順に細かく分割"""
+    if count(text) <= max_tokens:
+        return [text]
+    if level >= len(_BOUNDARIES):
+        # 境界が無い長い文は文字数で切る
+        size = max(1, int(len(text) * max_tokens / max(count(text), 1)))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    units = []
+    for piece in _split_at(text, _BOUNDARIES[level]):
+        units.extend(_units(piece, max_tokens, count, level + 1))
+    return units
+
+
+def split_segments(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    count_tokens: Optional[Callable[[str], int]] = None
+) -> List[TextSegment]:
+    """
+    テキストをトークン予算内の区間に分割
+
+    できるだけ粗い境界（ページ・段落）で切り、隣接する単位は予算内で詰め込む。
+    overlap_tokens > 0 の場合、2区間目以降の先頭に前区間末尾の単位を文脈として複製する。
+
+    Args:
+        text: 対象テキスト
+        max_tokens: 1区間の最大トークン数（重なり部分を含む）
+        overlap_tokens: 重なり部分の最大トークン数
+        count_tokens: トークン数の見積もり関数
+
+    Returns:
+        区間のリスト（予算内に収まるテキストは1区間）
+    """
+    count = count_tokens or default_token_counter
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 4))
+    body_budget = max(1, max_tokens - overlap_tokens - (count(SEGMENT_SEPARATOR) if overlap_tokens else 0))
+
+    groups: List[List[str]] = []
+    packed = ""
+    for unit in _units(text, body_budget, count):
+        # 分割されたページの見出し行は前の区間に詰めず、そのページの本文と同じ区間に入れる
+        if groups and count(packed + unit) <= body_budget and not _PAGE_HEADER.fullmatch(unit):
+            groups[-1].append(unit)
+            packed += unit
+        else:
+            groups.append([unit])
+            packed = unit
+
+    segments = []
+    previous: Sequence[str] = ()
+    for group in groups:
+        body = "".join(group).strip()
+        if not body:
+            continue
+        overlap = ""
+        if overlap_tokens and previous:
+            # 前区間の末尾から予算内で遡れるだけの単位（段落が大きければ行・文単位）を文脈として複製
+            tail = []
+            for unit in reversed(_units("".join(previous), overlap_tokens, count)):
+                if count("".join([unit, *tail])) > overlap_tokens:
+                    break
+                tail.insert(0, unit)
+            overlap = "".join(tail).strip()
+            if not _normalize_line(overlap):
+                overlap = ""  # 記号だけの断片は照合できないため文脈にしない
+        segment_text = f"{overlap}{SEGMENT_SEPARATOR}{body}" if overlap else body
+        segments.append(TextSegment(len(segments), segment_text, overlap, count(segment_text)))
+        previous = group
+    return segments
+
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def _normalize_line(line: str) -> str:
+    """比較用の正規化（NFKC・空白と句読点・記号を除去）"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", line))
+
+
+def _similar(a: List[str], b: List[str], threshold: float) -> bool:
+    left, right = "".join(a), "".join(b)
+    if not left or not right:
+        return False
+    return left == right or difflib.SequenceMatcher(None, left, right, autojunk=False).ratio() >= threshold
+
+
+def drop_overlap(previous_output: str, output: str, overlap: str, threshold: float = 0.8) -> str:
+    """
+    区間の整形結果から、前区間と重複する先頭行を除去
+
+    重なり部分の行数を上限に、整形結果の先頭k行が
+    前区間の整形結果の末尾k行、または重なり部分の末尾k行と十分似ている最大のkを除去する。
+    除去するのは重なり部分の長さ程度まで（本文を誤って削らない）。
+    """
+    if not overlap:
+        return output
+    lines = output.split("\n")
+    content = [i for i, line in enumerate(lines) if line.strip()]
+    head = [_normalize_line(lines[i]) for i in content]
+    previous_tail = [_normalize_line(line) for line in previous_output.split("\n") if line.strip()]
+    overlap_lines = [_normalize_line(line) for line in overlap.split("\n") if line.strip()]
+    max_chars = len("".join(overlap_lines)) / threshold
+
+    limit = min(len(overlap_lines), len(head))
+    for k in range(limit, 0, -1):
+        if len("".join(head[:k])) > max_chars:
+            continue
+        if _similar(head[:k], previous_tail[-k:], threshold) or _similar(head[:k], overlap_lines[-k:], threshold):
+            rest = content[k] if k < len(content) else len(lines)
+            return "\n".join(lines[rest:]).lstrip("\n")
+    return output
+
+
+def stitch_segments(segments: Sequence[TextSegment], outputs: Sequence[str], threshold: float = 0.8) -> str:
+    """区間ごとの整形結果を重なりを除去して結合"""
+    stitched: List[str] = []
+    for segment, output in zip(segments, outputs):
+        output = output.strip()
+        if stitched:
+            output = drop_overlap(stitched[-1], output, segment.overlap, threshold)
+        if output:
+            stitched.append(output)
+    return SEGMENT_SEPARATOR.join(stitched)
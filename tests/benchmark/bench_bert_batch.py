@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+BERT補正 バッチ推論ベンチマーク（CPU）
+従来のトークン単位forwardループと BertCorrector のバッチ推論を比較する
+
+使い方:
+    python tests/benchmark/bench_bert_batch.py sample.txt --model tohoku --batch-sizes 8 32 64
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import torch
+
+from app.services.ocr.bert_corrector import BertCorrector
+
+
+def legacy_correct_text(corrector: BertCorrector, text: str, model_key: str) -> str:
+    """従来方式: 1トークンずつマスクしてforward"""
+    tokenizer, model = corrector.load_model(model_key)
+    tokens = tokenizer.tokenize(text)
+    corrected_tokens = tokens.copy()
+    for i in range(len(tokens)):
+        if tokens[i].startswith("[") and tokens[i].endswith("]"):
+            continue
+        masked_tokens = tokens.copy()
+        masked_tokens[i] = "[MASK]"
+        input_tensor = torch.tensor([tokenizer.convert_tokens_to_ids(masked_tokens)])
+        with torch.no_grad():
+            predictions = model(input_tensor).logits
+        predicted_token = tokenizer.convert_ids_to_tokens([int(predictions[0, i].argmax())])[0]
+        if predicted_token != tokens[i]:
+            corrected_tokens[i] = predicted_token
+    return tokenizer.convert_tokens_to_string(corrected_tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BERT補正 バッチ推論ベンチマーク")
+    parser.add_argument("text_file", help="入力テキスト（UTF-8）")
+    parser.add_argument("--model", default="tohoku", help="モデルキー")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--max-chars", type=int, default=400, help="入力の最大文字数（従来方式は長文で非常に遅い）")
+    args = parser.parse_args()
+
+    text = Path(args.text_file).read_text(encoding="utf-8")[:args.max_chars]
+    corrector = BertCorrector(args.model)
+    tokenizer, _ = corrector.load_model()
+    print(f"トークン数: {len(tokenizer.tokenize(text))}  スレッド数: {torch.get_num_threads()}")
+
+    start = time.perf_counter()
+    baseline = legacy_correct_text(corrector, text, args.model)
+    baseline_time = time.perf_counter() - start
+    print(f"トークン単位ループ     : {baseline_time:8.2f}s")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        result = corrector.correct_text(text, batch_size=batch_size, use_suspicion_filter=False)
+        elapsed = time.perf_counter() - start
+        print(
+            f"バッチ推論 (size={batch_size:3d}): {elapsed:8.2f}s "
+            f"(x{baseline_time / elapsed:.2f}, 結果一致: {'OK' if result == baseline else 'NG'})"
+        )
+
+
+if __name__ == "__main__":
+    main()
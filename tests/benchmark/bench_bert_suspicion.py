@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+BERT補正候補の事前選別ベンチマーク（CPU）
+全トークンを推論する場合と SuspicionFilter で選別した場合の
+選別率・処理時間・補正結果を比較する
+
+使い方:
+    python tests/benchmark/bench_bert_suspicion.py clean.txt ocr_noisy.txt --model tohoku
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.services.ocr.bert_corrector import BertCorrector
+from app.services.ocr.suspicion_filter import get_suspicion_filter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BERT補正候補の事前選別ベンチマーク")
+    parser.add_argument("text_files", nargs="+", help="入力テキスト（UTF-8、ファイルごとに計測）")
+    parser.add_argument("--model", default="tohoku", help="モデルキー")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-chars", type=int, default=2000, help="入力の最大文字数")
+    args = parser.parse_args()
+
+    corrector = BertCorrector(args.model)
+    corrector.load_model()
+    suspicion_filter = get_suspicion_filter()
+
+    for text_file in args.text_files:
+        text = Path(text_file).read_text(encoding="utf-8")[:args.max_chars]
+
+        start = time.perf_counter()
+        full = corrector.correct_text(text, batch_size=args.batch_size, use_suspicion_filter=False)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        gated = corrector.correct_text(text, batch_size=args.batch_size, suspicion_filter=suspicion_filter)
+        gated_time = time.perf_counter() - start
+        stats = corrector.last_stats
+
+        print(
+            f"{Path(text_file).name}: 候補 {stats['candidates']}/{stats['tokens']}トークン "
+            f"(選別率 {stats['selectivity']:.1%})  全推論 {full_time:.2f}s → 選別後 {gated_time:.2f}s "
+            f"(x{full_time / max(gated_time, 1e-9):.1f})  結果一致: {'OK' if full == gated else '差分あり'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
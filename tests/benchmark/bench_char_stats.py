@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+文字種ヒストグラム マイクロベンチマーク
+TextScorer / detect_language / estimate_tokens の従来の正規表現パスと
+new.utils.char_stats の1パス集計を同一入力で比較する
+
+使い方:
+    python tests/benchmark/bench_char_stats.py --size 20000 --count 200 --repeat 5
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from new.utils.char_stats import char_stats_batch
+
+
+# 従来実装（TextScorer・llm_utils から比較用にそのまま再現）
+JAPANESE = re.compile(r'[぀-ゟ゠-ヿ一-龯]')
+ALPHANUMERIC = re.compile(r'[a-zA-Z0-9]')
+SPECIAL = re.compile(r'[^\w\s぀-ゟ゠-ヿ一-龯]')
+ENGLISH = re.compile(r'[a-zA-Z]')
+
+
+def legacy_counts(text):
+    """1テキストあたり：言語判定＋トークン推定＋品質スコア（元・整形後の片側分）＋品質分析"""
+    return (
+        len(text),
+        len(JAPANESE.findall(text)),
+        len(ALPHANUMERIC.findall(text)),
+        len(ENGLISH.findall(text)),
+        len(SPECIAL.findall(text)),
+        text.count('。') + text.count('、'),
+        text.count('.') + text.count(','),
+        len(re.findall(r'\s{2,}', text)),
+        len(re.findall(r'\s{5,}', text)),
+        len(text.split()),
+    )
+
+
+def make_texts(size: int, count: int, seed: int = 0) -> list:
+    """日本語・英数字・記号・空白の混在したOCR風テキストを生成"""
+    rng = random.Random(seed)
+    words = ["本契約", "について", "カタカナ", "ＡＢＣ", "Section", "12.5%", "（注）", "■", "、", "。", ".", ","]
+    spaces = [" ", "  ", "\n", "\n\n", "      ", "　", ""]
+    texts = []
+    for _ in range(count):
+        parts = []
+        length = 0
+        while length < size:
+            part = rng.choice(words) + rng.choice(spaces)
+            parts.append(part)
+            length += len(part)
+        texts.append("".join(parts)[:size])
+    return texts
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文字種ヒストグラム マイクロベンチマーク")
+    parser.add_argument("--size", type=int, default=20_000, help="1テキストの文字数")
+    parser.add_argument("--count", type=int, default=200, help="テキスト数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（最良値を表示）")
+    args = parser.parse_args()
+
+    texts = make_texts(args.size, args.count)
+    print(f"入力: {len(texts)}件 x {args.size:,d}文字")
+
+    legacy_time, expected = best_of(lambda: [legacy_counts(t) for t in texts], args.repeat)
+    batch_time, result = best_of(lambda: [tuple(s) for s in char_stats_batch(texts)], args.repeat)
+    same = result == expected
+    print(
+        f"従来（正規表現{len(expected[0]) - 3}パス） {legacy_time * 1000:8.1f}ms  "
+        f"ヒストグラム {batch_time * 1000:8.1f}ms (x{legacy_time / batch_time:.1f})  "
+        f"結果一致: {'OK' if same else 'NG'}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+CorrectionService 1パス補正エンジン ベンチマーク
+従来方式（辞書エントリごとの text.find + 重複チェック + スライス再構築）と
+apply_corrections（1回走査）を同一入力で比較する
+
+使い方:
+    python tests/benchmark/bench_correction_service.py --sizes 10000 100000 1000000 --legacy-limit 100000
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from new.services.ocr_comparison.correction_service import CorrectionService
+
+
+def legacy_apply_corrections(service: CorrectionService, text: str):
+    """従来方式の apply_corrections（比較用にそのまま再現）"""
+    combined_dict = {}
+    for wrong, correct in service.load_correction_dict().items():
+        combined_dict[wrong] = {"correct": correct, "type": "correction"}
+    for fullwidth, halfwidth in service._fullwidth_map.items():
+        combined_dict[fullwidth] = {"correct": halfwidth, "type": "normalization"}
+
+    corrections = []
+    replacements = []
+    for wrong, info in combined_dict.items():
+        start_pos = 0
+        while True:
+            pos = text.find(wrong, start_pos)
+            if pos == -1:
+                break
+            overlap = any(not (pos >= r['end'] or pos + len(wrong) <= r['start'])
+                          for r in replacements)
+            if not overlap:
+                replacements.append({'start': pos, 'end': pos + len(wrong), 'correct': info["correct"]})
+                corrections.append({"wrong": wrong, "correct": info["correct"], "position": pos, "type": info["type"]})
+            start_pos = pos + 1
+
+    start_pos = 0
+    while True:
+        pos = text.find('ー', start_pos)
+        if pos == -1:
+            break
+        prev_char = text[pos - 1] if pos > 0 else ''
+        next_char = text[pos + 1] if pos < len(text) - 1 else ''
+        if service._should_convert_dash(prev_char, next_char):
+            if not any(not (pos >= r['end'] or pos + 1 <= r['start']) for r in replacements):
+                replacements.append({'start': pos, 'end': pos + 1, 'correct': '-'})
+                corrections.append({"wrong": 'ー', "correct": '-', "position": pos, "type": 'normalization'})
+        start_pos = pos + 1
+
+    replacements.sort(key=lambda x: x['start'], reverse=True)
+    result_text = text
+    for repl in replacements:
+        result_text = result_text[:repl['start']] + repl['correct'] + result_text[repl['end']:]
+    return result_text, corrections
+
+
+def make_text(service: CorrectionService, size: int, seed: int = 0) -> str:
+    """誤字・全角英数字・長音記号を含むOCR風テキストを生成"""
+    rng = random.Random(seed)
+    typos = list(service.load_correction_dict()) or ["間題"]
+    fragments = [
+        "本契約は", "甲および乙の", "ＡＢＣ－１２３", "データー", "Ｗｉｎｄｏｗｓ　１０",
+        "サーバーのＩＰ", "Ａーｂ", "１ー２", "について、", "（注）", "\n",
+    ]
+    chunks = []
+    length = 0
+    while length < size:
+        chunk = rng.choice(typos) if rng.random() < 0.1 else rng.choice(fragments)
+        chunks.append(chunk)
+        length += len(chunk)
+    return "".join(chunks)[:size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CorrectionService 補正エンジン ベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="入力文字数")
+    parser.add_argument("--legacy-limit", type=int, default=100_000, help="従来方式を計測する最大文字数")
+    args = parser.parse_args()
+
+    service = CorrectionService()
+    service.apply_corrections("ウォームアップ")  # 辞書読み込み・照合器構築を計測から除く
+    print(f"辞書件数: {len(service.load_correction_dict())}")
+
+    for size in args.sizes:
+        text = make_text(service, size)
+
+        start = time.perf_counter()
+        result, corrections = service.apply_corrections(text)
+        elapsed = time.perf_counter() - start
+        line = f"{size:>9,d}文字  1パス: {elapsed:8.3f}s ({len(corrections):,d}件)"
+
+        if size <= args.legacy_limit:
+            start = time.perf_counter()
+            legacy_result, legacy_corrections = legacy_apply_corrections(service, text)
+            legacy_time = time.perf_counter() - start
+            same = result == legacy_result and sorted(
+                corrections, key=lambda c: c["position"]) == sorted(legacy_corrections, key=lambda c: c["position"])
+            line += f"  従来: {legacy_time:8.3f}s (x{legacy_time / elapsed:.1f}, 結果一致: {'OK' if same else 'NG'})"
+        else:
+            line += "  従来: skip"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
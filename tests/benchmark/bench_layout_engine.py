@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+レイアウト構造化 マイクロベンチマーク
+OCRProcessor の従来実装（全行との比較・x0//100 の段組み）と new.services.ocr.layout を比較する
+
+表の多い帳票ページを rawdict 形式で合成して計測する。--pdf を指定すると
+実際のPDF（PyMuPDFが必要）で従来の "dict" 取得込みの処理時間と比較する。
+
+使い方:
+    python tests/benchmark/bench_layout_engine.py --pages 20 --rows 120 --cols 8
+    python tests/benchmark/bench_layout_engine.py --pdf sample_table.pdf
+"""
+
+import sys
+import time
+import random
+import argparse
+from collections import defaultdict
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from new.services.ocr.layout import LayoutEngine, cells_from_rawdict
+
+
+# 従来実装（OCRProcessor から比較用にそのまま再現）
+def legacy_blocks(page_dict):
+    text_blocks = []
+    for block in page_dict["blocks"]:
+        if block['type'] == 0:
+            block_text = ""
+            for line in block["lines"]:
+                block_text += " ".join(span["text"] for span in line["spans"]) + "\n"
+            text_blocks.append({"text": block_text.strip(), "bbox": block['bbox']})
+    return text_blocks
+
+
+def legacy_cluster_columns(blocks, x_threshold=100):
+    columns = defaultdict(list)
+    for block in blocks:
+        columns[int(block['bbox'][0] // x_threshold)].append(block)
+    return [columns[k] for k in sorted(columns)]
+
+
+def legacy_group_rows_by_y(blocks, y_threshold=15):
+    rows = []
+    for block in sorted(blocks, key=lambda b: b["bbox"][1]):
+        for row in rows:
+            if abs(row[0]["bbox"][1] - block["bbox"][1]) < y_threshold:
+                row.append(block)
+                break
+        else:
+            rows.append([block])
+    return rows
+
+
+def legacy_pairs(rows):
+    structured = []
+    for i in range(len(rows) - 1):
+        label_row = sorted(rows[i], key=lambda b: b["bbox"][0])
+        value_row = sorted(rows[i + 1], key=lambda b: b["bbox"][0])
+        for j in range(min(len(label_row), len(value_row))):
+            structured.append(f"{label_row[j]['text'].strip()}: {value_row[j]['text'].strip()}")
+    return structured
+
+
+def legacy_structure(page_dicts):
+    structured = []
+    for page_dict in page_dicts:
+        for col_blocks in legacy_cluster_columns(legacy_blocks(page_dict)):
+            structured.extend(legacy_pairs(legacy_group_rows_by_y(col_blocks)))
+    return structured
+
+
+def make_table_page(rows: int, cols: int, rng: random.Random) -> dict:
+    """表1枚を敷き詰めたページ（rawdict形式・セルごとに1ブロック、dict形式用の text も付与）"""
+    size = 9.0
+    col_width = 540 / cols
+    blocks = []
+    for r in range(rows):
+        y0 = 40 + r * 12.0 + rng.uniform(-1.0, 1.0)
+        for c in range(cols):
+            text = "見出し%d" % c if r == 0 else "%s%d" % (rng.choice(["金額", "数量", "氏名", "ID"]), rng.randint(0, 9999))
+            x = 30 + c * col_width + rng.uniform(0, 4)
+            chars = []
+            for ch in text:
+                width = size if ord(ch) > 0x2000 else size * 0.55
+                chars.append({"c": ch, "bbox": (x, y0, x + width, y0 + size)})
+                x += width
+            bbox = (chars[0]["bbox"][0], y0, x, y0 + size)
+            span = {"size": size, "bbox": bbox, "chars": chars, "text": text}
+            blocks.append({"type": 0, "bbox": bbox, "lines": [{"dir": (1.0, 0.0), "bbox": bbox, "spans": [span]}]})
+    rng.shuffle(blocks)
+    return {"width": 612.0, "height": 40 + rows * 12.0 + 40, "blocks": blocks}
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def bench_synthetic(args):
+    rng = random.Random(0)
+    pages = [make_table_page(args.rows, args.cols, rng) for _ in range(args.pages)]
+    engine = LayoutEngine()
+    print(f"入力: {args.pages}ページ x {args.rows}行 x {args.cols}列 = {args.pages * args.rows * args.cols:,d}セル")
+
+    legacy_time, legacy_result = best_of(lambda: legacy_structure(pages), args.repeat)
+    engine_time, result = best_of(
+        lambda: [line for page in pages for line in engine.structure_cells(cells_from_rawdict(page), page["width"])],
+        args.repeat
+    )
+    # 正しい対応付け：見出し行と1行目のペアが列数分あるか
+    expected_header = args.cols * args.pages
+    print(f"従来   {legacy_time * 1000:9.1f}ms  見出しペア {sum(l.startswith('見出し') for l in legacy_result):5d}/{expected_header}")
+    print(f"新方式 {engine_time * 1000:9.1f}ms  見出しペア {sum(l.startswith('見出し') for l in result):5d}/{expected_header}"
+          f"  (x{legacy_time / engine_time:.1f})")
+
+
+def bench_pdf(args):
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(args.pdf)
+    engine = LayoutEngine()
+    print(f"入力: {args.pdf} ({len(doc)}ページ)")
+    legacy_time, legacy_result = best_of(
+        lambda: legacy_structure([page.get_text("dict") for page in doc]), args.repeat
+    )
+    engine_time, result = best_of(lambda: engine.structure_document(doc), args.repeat)
+    print(f"従来   {legacy_time * 1000:9.1f}ms  {len(legacy_result)}行")
+    print(f"新方式 {engine_time * 1000:9.1f}ms  {len(result)}行  (x{legacy_time / engine_time:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="レイアウト構造化 マイクロベンチマーク")
+    parser.add_argument("--pdf", help="実PDFで計測（PyMuPDFが必要）")
+    parser.add_argument("--pages", type=int, default=20, help="合成ページ数")
+    parser.add_argument("--rows", type=int, default=120, help="1ページの表の行数")
+    parser.add_argument("--cols", type=int, default=8, help="表の列数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最良値を表示）")
+    args = parser.parse_args()
+
+    if args.pdf:
+        bench_pdf(args)
+    else:
+        bench_synthetic(args)
+
+
+if __name__ == "__main__":
+    main()
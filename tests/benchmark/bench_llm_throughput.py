@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+LLM経路 スループット・テールレイテンシ ベンチマーク
+スタブOllama（tests/ollama_stub.py）または実際のOllamaに対して、同時実行数を変えながら
+整形・チャット・埋め込みの各経路を end-to-end で計測する
+
+  refine     : new.services.llm.ollama_client.OllamaRefiner.refine_text（プロンプト構築・スコア算出込み）
+  refine-app : app.services.llm.refiner.TextRefiner.refine_texts_async（スペルチェック込み）
+  chat       : OllamaClient.stream_chat（TTFT・生成全体）
+  embed      : langchain_community の OllamaEmbeddings.embed_query（embedder.py と同じクラス）
+
+依存モジュールが無い経路は skip と表示して残りを計測する。
+
+使い方:
+    python tests/benchmark/bench_llm_throughput.py --requests 64 --concurrency 1 4 8 16 --latency 0.1 --tokens-per-sec 50
+    python tests/benchmark/bench_llm_throughput.py --scenarios chat --failure-rate 0.05
+    python tests/benchmark/bench_llm_throughput.py --url http://localhost:11434 --model phi4-mini --embed-model nomic-embed-text
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tests.ollama_stub import OllamaStubServer, StubBehavior
+
+SCENARIOS = ("refine", "refine-app", "chat", "embed")
+WORDS = "本契約 について 株式会社 検査 結果 報告 温度 測定 装置 担当者 確認 記録".split()
+
+
+@dataclass
+class Measurement:
+    """1シナリオ・1同時実行数の計測結果"""
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    ttfts: List[float] = field(default_factory=list)
+    tokens: int = 0
+    errors: int = 0
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+def make_texts(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(WORDS) + ("。\n" if rng.random() < 0.1 else "") for _ in range(rng.randint(40, 160)))
+            for _ in range(count)]
+
+
+async def run_concurrently(count: int, concurrency: int, request) -> Measurement:
+    """request(i) を最大 concurrency 件ずつ count 回実行し、各要求の所要時間を集める"""
+    measurement = Measurement()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await request(index, measurement)
+            except Exception:
+                measurement.errors += 1
+                return
+            measurement.latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    measurement.elapsed = time.perf_counter() - start
+    return measurement
+
+
+def build_scenario(name: str, args, texts: List[str], executor: ThreadPoolExecutor):
+    """シナリオ名 → request(i, measurement) を返す（依存が無ければ ImportError）"""
+    if name == "refine":
+        from new.services.llm.ollama_client import OllamaClient, OllamaRefiner
+
+        async def request(index, measurement):
+            # 生成トークン数をリファイナーごとに数えるため要求ごとに作る（セッションは共有）
+            refiner = OllamaRefiner(OllamaClient(base_url=args.url, model=args.model))
+            refiner.cache = None  # 毎回生成させる
+            await refiner.refine_text(texts[index % len(texts)], temperature=0.0)
+            if not refiner.generated_tokens:
+                # refine_text は失敗時も正規化のみの結果を返すため、生成されなかったことで判定
+                raise RuntimeError("整形失敗")
+            measurement.tokens += refiner.generated_tokens
+        return request
+
+    if name == "refine-app":
+        from app.services.llm.refiner import TextRefiner
+
+        refiner = TextRefiner()
+        refiner.ollama_base = args.url
+        refiner.default_model = args.model
+        refiner.cache = None
+
+        async def request(index, measurement):
+            async for _, result in refiner.refine_texts_async([texts[index % len(texts)]], max_concurrency=1, temperature=0.0):
+                if not result[3]:
+                    raise RuntimeError("整形失敗")
+        return request
+
+    if name == "chat":
+        from new.services.llm.ollama_client import OllamaClient
+
+        async def request(index, measurement):
+            client = OllamaClient(base_url=args.url, model=args.model)
+            start = time.perf_counter()
+            first = None
+            async with client.stream_chat([{"role": "user", "content": texts[index % len(texts)]}]) as stream:
+                async for _ in stream:
+                    if first is None:
+                        first = time.perf_counter() - start
+            measurement.ttfts.append(first or 0.0)
+            measurement.tokens += stream.stats.tokens
+        return request
+
+    if name == "embed":
+        from langchain_community.embeddings import OllamaEmbeddings
+
+        embeddings = OllamaEmbeddings(model=args.embed_model, base_url=args.url)
+
+        async def request(index, measurement):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(executor, embeddings.embed_query, texts[index % len(texts)])
+        return request
+
+    raise ValueError(f"不明なシナリオ: {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM経路 スループット・テールレイテンシ ベンチマーク")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), help="計測する経路")
+    parser.add_argument("--requests", type=int, default=64, help="同時実行数ごとの要求数")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16], help="同時実行数")
+    parser.add_argument("--url", default=None, help="実際のOllamaのURL（省略時はスタブを起動）")
+    parser.add_argument("--model", default="stub", help="生成モデル")
+    parser.add_argument("--embed-model", default="nomic-embed-text", help="埋め込みモデル")
+    parser.add_argument("--latency", type=float, default=0.1, help="スタブの最初のトークンまでの秒数")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="スタブの生成速度")
+    parser.add_argument("--response-tokens", type=int, default=32, help="スタブの生成トークン数")
+    parser.add_argument("--embedding-latency", type=float, default=0.01, help="スタブの埋め込み1件あたりの秒数")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="スタブがHTTPエラーを返す割合")
+    args = parser.parse_args()
+
+    # 共有スケジューラ・接続数の上限が計測の上限にならないようにする（import 前に設定）
+    limit = str(max(args.concurrency) + 1)
+    os.environ.setdefault("LLM_SCHEDULER_CONCURRENCY", limit)
+    os.environ.setdefault("OLLAMA_MAX_CONNECTIONS", limit)
+
+    stub = None
+    if args.url is None:
+        stub = OllamaStubServer(StubBehavior(
+            latency=args.latency,
+            tokens_per_sec=args.tokens_per_sec,
+            response_tokens=args.response_tokens,
+            embedding_latency=args.embedding_latency,
+            failure_rate=args.failure_rate,
+        )).start()
+        args.url = stub.url
+        print(f"スタブ: 待ち時間 {args.latency}s, 生成 {args.tokens_per_sec}トークン/秒, "
+              f"{args.response_tokens}トークン, 失敗率 {args.failure_rate}")
+    print(f"接続先: {args.url}  要求数: {args.requests}/同時実行数")
+    print(f"{'経路':<11}{'並列':>5}{'件/秒':>9}{'tok/秒':>9}{'p50':>8}{'p95':>8}{'p99':>8}"
+          f"{'TTFT50':>8}{'TTFT95':>8}{'失敗':>6}")
+
+    texts = make_texts(max(args.requests, 16))
+    executor = ThreadPoolExecutor(max_workers=max(args.concurrency), thread_name_prefix="bench-embed")
+
+    async def scenario(name: str):
+        from new.services.llm.ollama_client import close_ollama_sessions
+        try:
+            request = build_scenario(name, args, texts, executor)
+            try:
+                await request(0, Measurement())  # 接続・プロンプト読み込み等の初期化を計測から除く
+            except ImportError:
+                raise
+            except Exception:
+                pass
+            for concurrency in args.concurrency:
+                result = await run_concurrently(args.requests, concurrency, request)
+                done = len(result.latencies)
+                print(
+                    f"{name:<11}{concurrency:>5}{done / result.elapsed:>9.1f}{result.tokens / result.elapsed:>9.1f}"
+                    f"{percentile(result.latencies, 0.5):>8.3f}{percentile(result.latencies, 0.95):>8.3f}"
+                    f"{percentile(result.latencies, 0.99):>8.3f}"
+                    f"{percentile(result.ttfts, 0.5):>8.3f}{percentile(result.ttfts, 0.95):>8.3f}{result.errors:>6}"
+                )
+        finally:
+            await close_ollama_sessions()
+
+    try:
+        for name in args.scenarios:
+            try:
+                asyncio.run(scenario(name))
+            except ImportError as e:
+                print(f"{name:<11} skip（{e}）")
+    finally:
+        executor.shutdown()
+        if stub is not None:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
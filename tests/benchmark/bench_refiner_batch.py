@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+TextRefiner バッチ整形 スループットベンチマーク
+スタブOllama（tests/ollama_stub.py、1要求あたり固定の待ち時間＋トークン生成速度を再現）に対して、
+1件ずつの逐次整形と refine_texts_async（同時実行数を変えて）を同一入力で比較する
+
+使い方:
+    python tests/benchmark/bench_refiner_batch.py --texts 32 --concurrency 1 2 4 8 --latency 0.05 --tokens-per-sec 200
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from tests.ollama_stub import OllamaStubServer, StubBehavior
+
+WORDS = "本契約 について 株式会社 検査 結果 報告 温度 測定 装置 担当者 確認 記録".split()
+
+
+def make_texts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(WORDS) + ("。\n" if rng.random() < 0.1 else "") for _ in range(rng.randint(40, 120)))
+            for _ in range(count)]
+
+
+def p95(latencies):
+    ordered = sorted(latencies)
+    return ordered[max(0, int(len(ordered) * 0.95) - 1)]
+
+
+async def run_batch(refiner, texts, concurrency):
+    latencies = [0.0] * len(texts)
+    start = time.perf_counter()
+    async for index, result in refiner.refine_texts_async(texts, max_concurrency=concurrency, temperature=0.0):
+        latencies[index] = time.perf_counter() - start
+    return time.perf_counter() - start, latencies
+
+
+async def run_sequential(refiner, texts):
+    """従来の batch_refine_texts と同じく1件ずつ整形（要求の仕方だけ非同期版に揃える）"""
+    latencies = []
+    start = time.perf_counter()
+    for text in texts:
+        async for _ in refiner.refine_texts_async([text], max_concurrency=1, temperature=0.0):
+            pass
+        latencies.append(time.perf_counter() - start)
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TextRefiner バッチ整形 スループットベンチマーク")
+    parser.add_argument("--texts", type=int, default=32, help="テキスト数")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8], help="同時実行数")
+    parser.add_argument("--latency", type=float, default=0.05, help="スタブの1要求あたりの待ち時間（秒）")
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0, help="スタブの生成速度")
+    args = parser.parse_args()
+
+    # 共有スケジューラのバッチ枠が計測の上限にならないようにする（import 前に設定）
+    os.environ.setdefault("LLM_SCHEDULER_CONCURRENCY", str(max(args.concurrency) + 1))
+    os.environ.setdefault("LLM_SCHEDULER_INTERACTIVE_RESERVE", "1")
+
+    from app.services.llm.refiner import TextRefiner
+    from new.services.llm.ollama_client import close_ollama_sessions
+
+    stub = OllamaStubServer(StubBehavior(
+        latency=args.latency, tokens_per_sec=args.tokens_per_sec, response_tokens=48
+    )).start()
+
+    refiner = TextRefiner()
+    refiner.ollama_base = stub.url
+    refiner.default_model = "stub"
+    refiner.cache = None  # 毎回スタブに要求する
+    texts = make_texts(args.texts)
+
+    async def scenario():
+        try:
+            await run_batch(refiner, texts[:2], 2)  # 接続・スペルチェッカーの初期化を計測から除く
+            elapsed, latencies = await run_sequential(refiner, texts)
+            print(f"{'逐次':>8}: {elapsed:7.2f}s  {len(texts) / elapsed:6.1f}件/秒  p95 {p95(latencies):6.2f}s")
+            baseline = elapsed
+            for concurrency in args.concurrency:
+                stub.reset()
+                elapsed, latencies = await run_batch(refiner, texts, concurrency)
+                print(
+                    f"{f'並列{concurrency}':>8}: {elapsed:7.2f}s  {len(texts) / elapsed:6.1f}件/秒  "
+                    f"p95 {p95(latencies):6.2f}s  "
+                    f"(x{baseline / elapsed:.1f}, 最大同時要求 {stub.max_active})"
+                )
+        finally:
+            await close_ollama_sessions()
+
+    print(f"テキスト {len(texts)}件, 待ち時間 {args.latency}s, 生成 {args.tokens_per_sec}トークン/秒")
+    asyncio.run(scenario())
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
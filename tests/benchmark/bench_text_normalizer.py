@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+テキスト正規化エンジン マイクロベンチマーク
+各パイプライン段の従来実装と new.utils.text_normalizer を同一入力で比較する
+
+使い方:
+    python tests/benchmark/bench_text_normalizer.py --size 1000000 --repeat 5
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+import unicodedata
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from new.utils import text_normalizer as tn
+
+
+# 従来実装（各サービスから比較用にそのまま再現）
+def legacy_empty_lines(text):
+    text = re.sub(r'^[\s　]+$', '', text, flags=re.MULTILINE)
+    return re.sub(r'\n{3,}', '\n\n', text)
+
+
+def legacy_empty_lines_strip(text):
+    return legacy_empty_lines(text).strip()
+
+
+def legacy_whitespace(text):
+    text = text.replace('　', ' ').replace('\t', ' ')
+    text = re.sub(r' {2,}', ' ', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return '\n'.join(line.strip() for line in text.split('\n')).strip()
+
+
+def legacy_collapse(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\s*\n', '\n', text)
+    return text.strip()
+
+
+def legacy_lines(text):
+    normalized = unicodedata.normalize("NFKC", text)
+    return '\n'.join(line.strip() for line in normalized.split('\n') if line.strip())
+
+
+CASES = [
+    ("TextRefiner.normalize_empty_lines", "empty_lines", legacy_empty_lines, tn.normalize_empty_lines),
+    ("OllamaRefiner.normalize_text", "empty_lines_strip", legacy_empty_lines_strip, tn.normalize_empty_lines_strip),
+    ("llm_utils.normalize_whitespace", "whitespace", legacy_whitespace, tn.normalize_whitespace),
+    ("TextProcessor.clean_text", "collapse", legacy_collapse, tn.collapse_whitespace),
+    ("FileProcessor._normalize_text", "lines", legacy_lines, tn.normalize_lines),
+]
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    """空白行・全角空白・タブ・インデントを含むOCR風テキストを生成"""
+    rng = random.Random(seed)
+    lines = []
+    length = 0
+    while length < size:
+        kind = rng.random()
+        if kind < 0.2:
+            line = rng.choice(["", " ", "　", "\t ", "   "])
+        else:
+            words = ["本契約", "ＡＢＣ", "株式会社", "Section", "12.5%", "について", "ｶﾀｶﾅ"]
+            line = rng.choice(["", "  ", "　"]) + rng.choice([" ", "  ", "\t", "　"]).join(
+                rng.choice(words) for _ in range(rng.randint(1, 8))
+            ) + rng.choice(["", " ", "　"])
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+def best_of(func, text, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="テキスト正規化エンジン マイクロベンチマーク")
+    parser.add_argument("--size", type=int, default=1_000_000, help="入力文字数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（最良値を表示）")
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024, help="ストリーミング時のチャンク文字数")
+    args = parser.parse_args()
+
+    text = make_text(args.size)
+    chunks = [text[i:i + args.chunk_size] for i in range(0, len(text), args.chunk_size)]
+    print(f"入力: {len(text):,d}文字 ({text.count(chr(10)):,d}行)")
+
+    for name, mode, legacy, fused in CASES:
+        legacy_time, expected = best_of(legacy, text, args.repeat)
+        fused_time, result = best_of(fused, text, args.repeat)
+        stream_time, streamed = best_of(lambda t: "".join(tn.stream_normalize(chunks, mode)), text, args.repeat)
+        same = result == expected and streamed == expected
+        print(
+            f"{name:36s} 従来 {legacy_time * 1000:8.1f}ms  統合 {fused_time * 1000:8.1f}ms "
+            f"(x{legacy_time / fused_time:.1f})  ストリーミング {stream_time * 1000:8.1f}ms  "
+            f"結果一致: {'OK' if same else 'NG'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
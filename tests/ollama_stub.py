@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Ollama互換スタブサーバ（テスト・ベンチマーク用）
+/api/version・/api/tags・/api/generate・/api/chat・/api/embeddings・/api/embed を
+標準ライブラリだけで実装し、応答は入力から決定的に生成する。
+待ち時間・生成速度・失敗（HTTPエラー・ストリーム途中の切断）を設定で再現できる。
+
+使い方（単体起動、アプリの OLLAMA_BASE_URL をこのURLに向ける）:
+    python tests/ollama_stub.py --port 11435 --latency 0.2 --tokens-per-sec 30
+
+テスト・ベンチマークからの利用:
+    with OllamaStubServer(StubBehavior(latency=0.05)) as stub:
+        client = OllamaClient(base_url=stub.url, model="stub")
+"""
+
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Sequence, Tuple
+
+
+@dataclass
+class StubBehavior:
+    """スタブの応答設定（実行中に書き換えると次の要求から反映）"""
+    latency: float = 0.0                    # 要求受付から最初のトークンまで（プロンプト処理）の秒数
+    tokens_per_sec: float = 0.0             # 生成速度（0 はトークン間の待ちなし）
+    response_tokens: int = 32               # 生成するトークン数の上限（options.num_predict があれば小さい方）
+    reply: Optional[Sequence[str]] = None   # 固定応答のトークン列（None はプロンプト末尾を2文字ずつ返す）
+    embedding_dim: int = 768
+    embedding_latency: float = 0.0          # 埋め込み1件あたりの秒数
+    failure_rate: float = 0.0               # 生成・埋め込み要求のうちHTTPエラーを返す割合
+    failure_status: int = 500
+    disconnect_rate: float = 0.0            # 生成ストリームを途中で切断する割合
+    fail_marker: Optional[str] = None       # この文字列を含むプロンプトの生成要求はHTTPエラー
+    slow_marker: Optional[str] = None       # この文字列を含むプロンプトは最初のトークンまで slow_latency 秒余分に待つ
+    slow_latency: float = 0.0
+    models: Tuple[str, ...] = ("stub:latest", "nomic-embed-text:latest")
+    version: str = "0.0.0-stub"
+    seed: int = 0                           # 失敗・切断の抽選用
+
+
+def _prompt_text(body) -> str:
+    """生成要求のプロンプト（chat はメッセージを連結）"""
+    if "messages" in body:
+        return "\n".join(m.get("content", "") for m in body.get("messages") or [])
+    return body.get("prompt", "")
+
+
+def _tokens(text: str, limit: int) -> List[str]:
+    """プロンプト末尾を2文字ずつのトークンにする（整形の応答が入力に似るように）"""
+    tail = text[-limit * 2:] if limit > 0 else ""
+    return [tail[i:i + 2] for i in range(0, len(tail), 2)] or ["。"]
+
+
+def embedding_for(text: str, dim: int) -> List[float]:
+    """テキストから決定的に作る単位ベクトル（同じ入力には同じベクトル）"""
+    values = []
+    counter = 0
+    while len(values) < dim:
+        digest = hashlib.sha256(f"{counter}:{text}".encode("utf-8")).digest()
+        values.extend((byte - 127.5) / 127.5 for byte in digest)
+        counter += 1
+    values = values[:dim]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stub: "OllamaStubServer"
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # クライアントが待機中の接続を閉じた
+
+    # ──── 共通 ────
+
+    def _json(self, status: int, payload) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _known_model(self, model: str) -> bool:
+        models = self.stub.behavior.models
+        return model in models or f"{model}:latest" in models
+
+    # ──── GET ────
+
+    def do_GET(self):
+        self.stub._record(self.path)
+        behavior = self.stub.behavior
+        if self.path == "/api/version":
+            self._json(200, {"version": behavior.version})
+        elif self.path == "/api/tags":
+            self._json(200, {"models": [{"name": name, "model": name} for name in behavior.models]})
+        else:
+            self._json(404, {"error": "not found"})
+
+    # ──── POST ────
+
+    def do_POST(self):
+        self.stub._record(self.path)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path not in ("/api/generate", "/api/chat", "/api/embeddings", "/api/embed"):
+            self._json(404, {"error": "not found"})
+            return
+        if not self._known_model(body.get("model", "")):
+            self._json(404, {"error": f"model '{body.get('model')}' not found, try pulling it first"})
+            return
+
+        fail, disconnect = self.stub._draw(_prompt_text(body) if self.path in ("/api/generate", "/api/chat") else "")
+        if fail:
+            self._json(self.stub.behavior.failure_status, {"error": "injected failure"})
+            return
+
+        with self.stub._active():
+            if self.path in ("/api/embeddings", "/api/embed"):
+                self._embed(body)
+            else:
+                self._generate(body, disconnect)
+
+    def _embed(self, body) -> None:
+        behavior = self.stub.behavior
+        if self.path == "/api/embed":
+            inputs = body.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+            time.sleep(behavior.embedding_latency * len(inputs))
+            self._json(200, {"model": body["model"], "embeddings": [embedding_for(t, behavior.embedding_dim) for t in inputs]})
+        else:
+            time.sleep(behavior.embedding_latency)
+            self._json(200, {"embedding": embedding_for(body.get("prompt", ""), behavior.embedding_dim)})
+
+    def _generate(self, body, disconnect: bool) -> None:
+        behavior = self.stub.behavior
+        chat = self.path == "/api/chat"
+        if chat:
+            messages = body.get("messages") or [{}]
+            prompt = "\n".join(m.get("content", "") for m in messages)
+            source = messages[-1].get("content", "")
+        else:
+            prompt = source = body.get("prompt", "")
+        limit = behavior.response_tokens
+        num_predict = (body.get("options") or {}).get("num_predict")
+        if num_predict and num_predict > 0:
+            limit = min(limit, num_predict)
+        tokens = list(behavior.reply) if behavior.reply is not None else _tokens(source, limit)
+        prompt_tokens = len(_tokens(prompt, len(prompt)))
+
+        def message(text: str, done: bool, **extra) -> bytes:
+            value = {"role": "assistant", "content": text} if chat else text
+            payload = {"model": body["model"], "message" if chat else "response": value, "done": done, **extra}
+            return json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+
+        start = time.perf_counter()
+        interval = 1.0 / behavior.tokens_per_sec if behavior.tokens_per_sec > 0 else 0.0
+        stats = {
+            "done_reason": "stop",
+            "eval_count": len(tokens),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(behavior.latency * 1e9),
+            "eval_duration": int(len(tokens) * interval * 1e9),
+        }
+
+        latency = behavior.latency
+        if behavior.slow_marker is not None and behavior.slow_marker in prompt:
+            latency += behavior.slow_latency
+
+        if body.get("stream", True) is False:
+            time.sleep(latency + interval * len(tokens))
+            stats["total_duration"] = int((time.perf_counter() - start) * 1e9)
+            self._json(200, json.loads(message("".join(tokens), True, **stats)))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            time.sleep(latency)
+            for index, token in enumerate(tokens):
+                if interval:
+                    time.sleep(interval)
+                if disconnect and index >= len(tokens) // 2:
+                    # 応答途中で接続を切る（チャンク終端を送らない）
+                    self.close_connection = True
+                    self.stub._record("disconnect")
+                    return
+                self._chunk(message(token, False))
+            stats["total_duration"] = int((time.perf_counter() - start) * 1e9)
+            self._chunk(message("", True, **stats))
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.stub.disconnected.set()
+
+
+class OllamaStubServer:
+    """
+    別スレッドで動くOllama互換スタブ
+
+    port=0 で空きポートを使う。counts（パス別の要求数）・max_active（生成・埋め込みの最大同時処理数）で
+    クライアント側の並列度・確認回数を検証できる。
+    """
+
+    def __init__(self, behavior: Optional[StubBehavior] = None, host: str = "127.0.0.1", port: int = 0):
+        self.behavior = behavior or StubBehavior()
+        self.disconnected = threading.Event()   # クライアント側から切断された
+        self.counts: Counter = Counter()
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(self.behavior.seed)
+        handler = type("StubHandler", (_StubHandler,), {"stub": self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStubServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="ollama-stub", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "OllamaStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        """計数をクリア（抽選の乱数列も最初から）"""
+        with self._lock:
+            self.counts.clear()
+            self.max_active = self.active
+            self._random = random.Random(self.behavior.seed)
+        self.disconnected.clear()
+
+    def requests(self, *paths: str) -> int:
+        """指定パス（省略時は全パス）の要求数"""
+        with self._lock:
+            if not paths:
+                return sum(count for path, count in self.counts.items() if path.startswith("/"))
+            return sum(self.counts[path] for path in paths)
+
+    # ──── ハンドラから呼ぶ ────
+
+    def _record(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def _draw(self, prompt: str = "") -> Tuple[bool, bool]:
+        """(HTTPエラーにするか, 途中で切断するか)"""
+        behavior = self.behavior
+        with self._lock:
+            fail = behavior.failure_rate > 0 and self._random.random() < behavior.failure_rate
+            fail = fail or bool(behavior.fail_marker and behavior.fail_marker in prompt)
+            disconnect = behavior.disconnect_rate > 0 and self._random.random() < behavior.disconnect_rate
+            if fail:
+                self.counts["failure"] += 1
+        return fail, disconnect
+
+    @contextmanager
+    def _active(self):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ollama互換スタブサーバ")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.0, help="最初のトークンまでの秒数")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="生成速度（0 は待ちなし）")
+    parser.add_argument("--response-tokens", type=int, default=32, help="生成トークン数の上限")
+    parser.add_argument("--embedding-latency", type=float, default=0.0, help="埋め込み1件あたりの秒数")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="HTTPエラーを返す割合")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="ストリームを途中で切る割合")
+    parser.add_argument("--models", nargs="+", default=list(StubBehavior.models), help="提供するモデル名")
+    args = parser.parse_args()
+
+    behavior = StubBehavior(
+        latency=args.latency,
+        tokens_per_sec=args.tokens_per_sec,
+        response_tokens=args.response_tokens,
+        embedding_latency=args.embedding_latency,
+        failure_rate=args.failure_rate,
+        disconnect_rate=args.disconnect_rate,
+        models=tuple(args.models),
+    )
+    stub = OllamaStubServer(behavior, args.host, args.port)
+    print(f"Ollamaスタブ起動: {stub.url} (モデル: {', '.join(behavior.models)})")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
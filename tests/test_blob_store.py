@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+BLOB格納先単体テスト
+コンテンツアドレスでの格納・重複排除・チェックサム照合・範囲読み出し・Range ヘッダー解釈の確認
+"""
+
+import io
+import os
+import hashlib
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.services.blob_store import (
+    LocalBlobStore, BlobChecksumError, BlobNotFoundError,
+    get_blob_store, get_blob_store_for_ref, parse_range_header
+)
+
+
+class TestLocalBlobStore(unittest.TestCase):
+    """ローカル格納先単体テスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = LocalBlobStore(self.temp_dir.name)
+        self.data = bytes(range(256)) * 1000
+        self.checksum = hashlib.sha256(self.data).hexdigest()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_put_is_content_addressed(self):
+        """参照はチェックサムで決まり、同じ内容を何度入れても本体は1つ"""
+        ref = self.store.put(self.data, self.checksum)
+        self.assertEqual(ref, f"local:{self.checksum}")
+        self.assertEqual(self.store.put(io.BytesIO(self.data)), ref)
+
+        path = self.store.local_path(ref)
+        self.assertEqual(path, Path(self.temp_dir.name) / self.checksum[:2] / self.checksum[2:4] / self.checksum)
+        self.assertEqual(self.store.read(ref), self.data)
+        self.assertEqual(self.store.size(ref), len(self.data))
+        # 書きかけの一時ファイルが残っていない
+        files = [name for _, _, names in os.walk(self.temp_dir.name) for name in names]
+        self.assertEqual(files, [self.checksum])
+
+    def test_put_from_path(self):
+        """ファイルパスから読みながら格納"""
+        source = Path(self.temp_dir.name) / "upload.pdf"
+        source.write_bytes(self.data)
+        self.assertEqual(self.store.put(str(source), self.checksum), f"local:{self.checksum}")
+
+    def test_checksum_mismatch_is_rejected(self):
+        """指定チェックサムと内容が違えば格納しない"""
+        wrong = hashlib.sha256(b"other").hexdigest()
+        with self.assertRaises(BlobChecksumError):
+            self.store.put(self.data, wrong)
+        self.assertFalse(self.store.exists(f"local:{wrong}"))
+        self.assertFalse(self.store.exists(f"local:{self.checksum}"))
+        with self.assertRaises(ValueError):
+            self.store.put(self.data, "not-a-checksum")
+
+    def test_range_and_chunks(self):
+        """範囲読み出し・チャンク単位の読み出し・mmap が全体読み出しと一致"""
+        ref = self.store.put(self.data)
+        self.assertEqual(self.store.read_range(ref, 1000, 1999), self.data[1000:2000])
+        self.assertEqual(self.store.read_range(ref, len(self.data) - 10, len(self.data) + 100), self.data[-10:])
+
+        chunks = list(self.store.iter_chunks(ref, 10, 100_009, chunk_size=4096))
+        self.assertTrue(all(len(chunk) <= 4096 for chunk in chunks))
+        self.assertEqual(b"".join(chunks), self.data[10:100_010])
+        self.assertEqual(b"".join(self.store.iter_chunks(ref)), self.data)
+
+        with self.store.mmap(ref) as mapped:
+            self.assertEqual(mapped[:16], self.data[:16])
+            self.assertEqual(len(mapped), len(self.data))
+
+    def test_missing_and_foreign_refs(self):
+        """無い本体は BlobNotFoundError、他の格納先の参照は ValueError"""
+        ref = self.store.put(self.data)
+        self.assertTrue(self.store.delete(ref))
+        self.assertFalse(self.store.delete(ref))
+        self.assertIsNone(self.store.local_path(ref))
+        with self.assertRaises(BlobNotFoundError):
+            self.store.read(ref)
+        with self.assertRaises(ValueError):
+            self.store.read(f"s3:{self.checksum}")
+
+    def test_get_blob_store(self):
+        """database は None、格納先はディレクトリごとに共有、参照の接頭辞から格納先を引ける"""
+        self.assertIsNone(get_blob_store("database", self.temp_dir.name))
+        store = get_blob_store("local", self.temp_dir.name)
+        self.assertIs(get_blob_store("local", self.temp_dir.name), store)
+        self.assertIs(get_blob_store_for_ref(f"local:{self.checksum}", self.temp_dir.name), store)
+        with self.assertRaises(ValueError):
+            get_blob_store("unknown", self.temp_dir.name)
+
+
+class TestParseRangeHeader(unittest.TestCase):
+    """Range ヘッダー解釈単体テスト"""
+
+    def test_ranges(self):
+        self.assertEqual(parse_range_header("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range_header("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range_header("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range_header("bytes=500-5000", 1000), (500, 999))
+        self.assertEqual(parse_range_header("bytes=-5000", 1000), (0, 999))
+
+    def test_whole_body(self):
+        """ヘッダー無し・解釈できない形式は全体"""
+        self.assertIsNone(parse_range_header(None, 1000))
+        self.assertIsNone(parse_range_header("bytes=0-1,5-6", 1000))
+        self.assertIsNone(parse_range_header("items=0-1", 1000))
+
+    def test_unsatisfiable(self):
+        for value in ("bytes=1000-", "bytes=10-5", "bytes=-0"):
+            with self.assertRaises(ValueError):
+                parse_range_header(value, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
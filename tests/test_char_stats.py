@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+文字種ヒストグラム単体テスト
+従来の正規表現による集計との一致を確認
+"""
+
+import re
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.utils import char_stats as cs
+
+
+def legacy_stats(text):
+    """TextScorer・llm_utils の従来の集計"""
+    return cs.CharStats(
+        length=len(text),
+        japanese=len(re.findall(r'[぀-ゟ゠-ヿ一-龯]', text)),
+        alphanumeric=len(re.findall(r'[a-zA-Z0-9]', text)),
+        latin=len(re.findall(r'[a-zA-Z]', text)),
+        special=len(re.findall(r'[^\w\s぀-ゟ゠-ヿ一-龯]', text)),
+        ja_punctuation=text.count('。') + text.count('、'),
+        en_punctuation=text.count('.') + text.count(','),
+        space_runs=len(re.findall(r'\s{2,}', text)),
+        long_space_runs=len(re.findall(r'\s{5,}', text)),
+        words=len(text.split())
+    )
+
+
+ALPHABET = ['a', 'Z', '7', '_', 'あ', 'ア', '漢', '〇', '。', '、', '.', ',', '■', '!', 'é', '٣',
+            '𠮷', ' ', ' ', '\n', '\t', '　', '\x1c', ' ', '\ud800']
+
+
+class TestCharStats(unittest.TestCase):
+    """文字種ヒストグラム単体テスト"""
+
+    def test_classify_matches_regex(self):
+        """コードポイント表（BMP全体）が正規表現の文字クラスと一致"""
+        special = re.compile(r'[^\w\s぀-ゟ゠-ヿ一-龯]')
+        for code in range(0x10000):
+            ch = chr(code)
+            flags = cs._classify(ch)
+            self.assertEqual(bool(flags & cs.SPECIAL), bool(special.match(ch)), hex(code))
+            self.assertEqual(bool(flags & cs.SPACE), bool(re.match(r'\s', ch)), hex(code))
+
+    def test_matches_legacy(self):
+        """ランダム入力で従来の集計と一致（numpy があれば両方の経路）"""
+        rng = random.Random(0)
+        computes = [cs._compute_counter] + ([cs._compute_numpy] if cs.np is not None else [])
+        for _ in range(2000):
+            text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 40)))
+            expected = legacy_stats(text)
+            for compute in computes:
+                self.assertEqual(compute(text), expected, f"{compute.__name__}: {text!r}")
+
+    def test_batch(self):
+        """一括集計は単体集計と同順・同値"""
+        texts = ["本日は晴天なり。", "", "Hello,  world.", "本日は晴天なり。"]
+        self.assertEqual(cs.char_stats_batch(texts), [cs.char_stats(t) for t in texts])
+        self.assertEqual(cs.char_stats_batch(texts)[1], cs.EMPTY_STATS)
+
+    def test_lone_surrogates(self):
+        """孤立サロゲートを含む長文も集計でき、Counter 経路と一致"""
+        text = ("本日は晴天なり。\ud83d " * 300) + "\udc00"
+        self.assertGreaterEqual(len(text), cs.NUMPY_MIN_LENGTH)
+        self.assertEqual(cs.char_stats(text), cs._compute_counter(text))
+        self.assertEqual(cs.char_stats(text).length, len(text))
+
+    def test_cache_holds_digests_only(self):
+        """キャッシュは件数上限を守り、本文ではなくダイジェストを保持する"""
+        texts = [f"文書{i} " * 100 for i in range(cs.CACHE_SIZE + 10)]
+        for text in texts:
+            cs.char_stats(text)
+        self.assertLessEqual(len(cs._cache), cs.CACHE_SIZE)
+        self.assertTrue(all(isinstance(key, bytes) and len(key) == 16 for key in cs._cache))
+        self.assertIs(cs.char_stats(texts[-1]), cs.char_stats(texts[-1]))
+        self.assertEqual(cs.char_stats(texts[0]), legacy_stats(texts[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
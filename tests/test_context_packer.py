@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+RAGコンテキスト詰め込み単体テスト
+重なりチャンクの結合・重複除外・トークン予算の厳守の確認
+"""
+
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.utils.context_packer import ContextChunk, merge_adjacent, pack_context
+from new.utils.text_segmenter import default_token_counter
+
+WORDS = "本契約 について 株式会社 検査 結果 報告 温度 測定 装置 担当者 確認 記録".split()
+
+
+def _overlapping_chunks(text, size, overlap):
+    """TextChunker と同じく、2件目以降の先頭に前チャンク末尾 overlap 文字を複製"""
+    bodies = [text[i:i + size - overlap] for i in range(0, len(text), size - overlap)]
+    chunks = [bodies[0]]
+    for body in bodies[1:]:
+        chunks.append(chunks[-1][-overlap:] + body)
+    return chunks
+
+
+class TestContextPacker(unittest.TestCase):
+    """RAGコンテキスト詰め込み単体テスト"""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.text = "".join(rng.choice(WORDS) + ("。" if rng.random() < 0.2 else "") for _ in range(400))
+
+    def test_overlapping_chunks_restore_original(self):
+        """重なりチャンクは元のテキストに戻り、重なり分だけトークンが減る"""
+        pieces = _overlapping_chunks(self.text, 200, 40)
+        chunks = [ContextChunk(p, 0.5, "a.pdf", "f1", i) for i, p in enumerate(pieces)]
+        random.Random(1).shuffle(chunks)
+
+        passages = merge_adjacent(chunks)
+        self.assertEqual(len(passages), 1)
+        self.assertEqual(passages[0].text, self.text)
+
+        packed = pack_context(chunks, 100000)
+        self.assertEqual(packed.merged, len(pieces) - 1)
+        self.assertGreater(packed.saved_tokens, 0)
+        self.assertEqual(packed.tokens, default_token_counter(packed.text))
+
+    def test_non_adjacent_chunks_stay_separate(self):
+        """離れたチャンクは結合せず、スコア順に並ぶ"""
+        pieces = _overlapping_chunks(self.text, 200, 40)
+        chunks = [
+            ContextChunk(pieces[0], 0.3, "a.pdf", "f1", 0),
+            ContextChunk(pieces[5], 0.9, "a.pdf", "f1", 5),
+        ]
+        packed = pack_context(chunks, 100000)
+        self.assertEqual(len(packed.passages), 2)
+        self.assertEqual(packed.passages[0].chunk_indices, [5])
+        self.assertTrue(packed.text.startswith("[文書1] a.pdf\n"))
+
+    def test_near_duplicates_dropped(self):
+        """別ファイルのほぼ同一の文章は高スコアの1件だけ残す"""
+        body = self.text[:300]
+        chunks = [
+            ContextChunk(body, 0.8, "a.pdf", "f1", 0),
+            ContextChunk(body.replace("。", "．") + " ", 0.7, "b.pdf", "f2", 3),
+            ContextChunk(self.text[-300:], 0.6, "c.pdf", "f3", 0),
+        ]
+        packed = pack_context(chunks, 100000)
+        self.assertEqual(packed.duplicates, 1)
+        self.assertEqual([p.label for p in packed.passages], ["a.pdf", "c.pdf"])
+
+    def test_budget_is_never_exceeded(self):
+        """どの予算でも連結後のトークン数は予算以下（入らない文章は切り詰め・除外）"""
+        rng = random.Random(3)
+        pieces = _overlapping_chunks(self.text, 150, 30)
+        chunks = [ContextChunk(p, rng.random(), f"{i % 3}.pdf", f"f{i % 3}", i) for i, p in enumerate(pieces)]
+        for budget in (0, 10, 50, 200, 333, 800, 5000):
+            packed = pack_context(chunks, budget)
+            self.assertLessEqual(packed.tokens, budget)
+            self.assertEqual(packed.tokens, default_token_counter(packed.text))
+            if budget >= 200:
+                self.assertTrue(packed.passages)
+
+    def test_custom_counter(self):
+        """トークン数の見積もり関数を差し替えられる"""
+        words = lambda text: len(text.split())
+        chunks = [ContextChunk(" ".join(["word"] * 50), 1.0, "x", "f", 0)]
+        packed = pack_context(chunks, 40, count_tokens=words)
+        self.assertLessEqual(packed.tokens, 40)
+        self.assertEqual(packed.truncated, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+DB接続プール単体テスト
+接続の使い回し・上限での待機・貸し出し時の生死確認・返却時のロールバックの確認
+"""
+
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise ConnectionError("server closed the connection unexpectedly")
+        self.conn.queries.append(query)
+
+    def fetchone(self):
+        return (1,)
+
+
+class FakeConnection:
+    """psycopg2 の接続と同じ closed・cursor・rollback・close を持つ"""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.rollbacks = 0
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise ConnectionError("connection lost")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool(unittest.TestCase):
+    """DB接続プール単体テスト"""
+
+    def setUp(self):
+        self.connections = []
+
+    def connect(self):
+        conn = FakeConnection()
+        self.connections.append(conn)
+        return conn
+
+    def test_connections_are_reused(self):
+        """返却した接続を次の貸し出しで使い回し、返却時にロールバックする"""
+        pool = ConnectionPool(self.connect, min_size=1, max_size=4)
+        for _ in range(20):
+            with pool.connection() as conn:
+                self.assertIs(conn, self.connections[0])
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(self.connections[0].rollbacks, 20)
+        self.assertEqual(pool.status()["in_use"], 0)
+
+    def test_waits_for_release_then_times_out(self):
+        """上限に達すると返却を待ち、返却されなければ PoolTimeout"""
+        pool = ConnectionPool(self.connect, min_size=0, max_size=2, timeout=0.2)
+        first, second = pool.getconn(), pool.getconn()
+
+        start = time.perf_counter()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+
+        threading.Timer(0.05, pool.putconn, args=(first,)).start()
+        self.assertIs(pool.getconn(), first)
+        self.assertEqual(len(self.connections), 2)
+        pool.putconn(second)
+
+    def test_dead_connections_are_replaced(self):
+        """切断済み・生死確認に失敗した接続は捨てて作り直す"""
+        pool = ConnectionPool(self.connect, min_size=2, max_size=2, health_check_interval=0.0)
+        self.connections[0].closed = 1
+        self.connections[1].broken = True
+
+        with pool.connection() as conn:
+            self.assertIs(conn, self.connections[2])
+            self.assertEqual(conn.queries, [])  # 作ったばかりの接続は確認しない
+        with pool.connection() as conn:
+            self.assertIs(conn, self.connections[2])
+            self.assertEqual(conn.queries, ["SELECT 1"])
+        status = pool.status()
+        self.assertEqual(status["discarded"], 2)
+        self.assertEqual(status["size"], 1)
+
+    def test_broken_connection_discarded_on_return(self):
+        """ロールバックできない接続は返却時に捨て、枠を空ける"""
+        pool = ConnectionPool(self.connect, min_size=0, max_size=1, timeout=0.1)
+        conn = pool.getconn()
+        conn.broken = True
+        pool.putconn(conn)
+        self.assertTrue(conn.closed)
+        self.assertIsNot(pool.getconn(), conn)
+
+    def test_concurrent_checkout_never_exceeds_max(self):
+        """多数のスレッドから借りても同時に貸し出す本数は max_size 以下"""
+        pool = ConnectionPool(self.connect, min_size=1, max_size=3, timeout=5.0)
+        lock = threading.Lock()
+        active = peak = 0
+
+        def worker():
+            nonlocal active, peak
+            for _ in range(10):
+                with pool.connection():
+                    with lock:
+                        active += 1
+                        peak = max(peak, active)
+                    time.sleep(0.001)
+                    with lock:
+                        active -= 1
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(peak, 3)
+        self.assertLessEqual(len(self.connections), 3)
+        self.assertEqual(pool.status()["in_use"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+辞書アーティファクト単体テスト
+生成・mmap読み込み・改ざん検知・更新検知（読み込み側はファイルを書かない）の確認
+"""
+
+import os
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.utils import dictionary_artifact
+from new.utils.dictionary_artifact import (
+    ARTIFACT_NAME, compile_dictionary_artifact, get_dictionary_artifact, load_dictionary_artifact
+)
+from new.utils.pattern_matcher import MappedPatternMatcher
+
+
+class TestDictionaryArtifact(unittest.TestCase):
+    """辞書アーティファクト単体テスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dict_dir = Path(self.tmp.name)
+        (self.dict_dir / "known_words_common.csv").write_text("人口\n", encoding="utf-8")
+        (self.dict_dir / "ocr_word_mistakes.csv").write_text("誤字,正字\n口,ロ\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compile_and_load(self):
+        """コンパイル済み照合器と既知単語が復元される"""
+        path = compile_dictionary_artifact(self.dict_dir)
+        artifact = load_dictionary_artifact(path)
+        self.assertEqual(artifact.mistakes, {"口": "ロ"})
+        self.assertIn("人口", artifact.known_words)
+        self.assertEqual(artifact.matcher.replace("人口とカ口リー")[0], "人口とカロリー")
+
+    def test_load_uses_tables_in_place(self):
+        """読み込みでは照合器を構築せず、mmap 上の配列で照合・検索する"""
+        (self.dict_dir / "known_words_custom.csv").write_text("航宇\nカロリー\n", encoding="utf-8")
+        (self.dict_dir / "ocr_word_mistakes.csv").write_text("誤字,正字\n口,ロ\n航宇,X\n間題,問題\n", encoding="utf-8")
+        path = compile_dictionary_artifact(self.dict_dir)
+
+        with mock.patch.object(dictionary_artifact, "MultiPatternMatcher", side_effect=AssertionError):
+            artifact = load_dictionary_artifact(path)
+        self.assertIsInstance(artifact.matcher, MappedPatternMatcher)
+        self.assertEqual(
+            artifact.matcher.replace("人口の間題、航宇、カ口リー")[0], "人口の問題、航宇、カロリー"
+        )
+        self.assertEqual(len(artifact.matcher), 2)
+        self.assertEqual(set(artifact.known_words), {"人口", "航宇", "カロリー"})
+        self.assertNotIn("人", artifact.known_words)
+        self.assertEqual(artifact.mistakes, {"口": "ロ", "航宇": "X", "間題": "問題"})
+        self.assertIsNone(artifact.mistakes.get("問題"))
+
+    def test_tampered_artifact_is_rejected(self):
+        """本体のSHA-256が一致しないアーティファクトは読み込まない"""
+        path = compile_dictionary_artifact(self.dict_dir)
+        data = bytearray(path.read_bytes())
+        data[-2] ^= 0x01
+        path.write_bytes(bytes(data))
+        with self.assertRaises(ValueError):
+            load_dictionary_artifact(path)
+
+        # 読み込み側はCSVから直接解析して続行する
+        artifact = get_dictionary_artifact(self.dict_dir)
+        self.assertIsNone(artifact.path)
+        self.assertEqual(artifact.mistakes, {"口": "ロ"})
+
+    def test_reader_does_not_write(self):
+        """未生成・古い場合もファイルは書かず、CSVから直接解析する"""
+        first = get_dictionary_artifact(self.dict_dir)
+        self.assertFalse((self.dict_dir / ARTIFACT_NAME).exists())
+        self.assertIsNone(first.path)
+        self.assertEqual(first.matcher.replace("人口とカ口リー")[0], "人口とカロリー")
+        self.assertIs(get_dictionary_artifact(self.dict_dir), first)
+
+        # 辞書保存時の生成後は同じ内容なのでキャッシュのまま
+        compile_dictionary_artifact(self.dict_dir)
+        self.assertIs(get_dictionary_artifact(self.dict_dir), first)
+
+    def test_reload_on_update(self):
+        """CSV更新・再生成を検知して読み直す"""
+        compile_dictionary_artifact(self.dict_dir)
+        first = get_dictionary_artifact(self.dict_dir)
+        self.assertIsNotNone(first.path)
+        self.assertIs(get_dictionary_artifact(self.dict_dir), first)
+
+        # CSVの直接編集（mtimeを進めて確実に検知させる）→ 古いアーティファクトは使わずCSVを解析
+        mistakes = self.dict_dir / "ocr_word_mistakes.csv"
+        mistakes.write_text("誤字,正字\n口,ロ\n巾,中\n", encoding="utf-8")
+        stat = mistakes.stat()
+        os.utime(mistakes, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        second = get_dictionary_artifact(self.dict_dir)
+        self.assertIsNot(second, first)
+        self.assertIsNone(second.path)
+        self.assertEqual(second.mistakes, {"口": "ロ", "巾": "中"})
+
+        # 再生成後も内容は同じ
+        compile_dictionary_artifact(self.dict_dir)
+        self.assertEqual(get_dictionary_artifact(self.dict_dir).mistakes, {"口": "ロ", "巾": "中"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+EasyOCRページ横断バッチ認識 単体テスト
+幅順に並べて認識した結果が元のページ・ボックス順に戻ることの確認
+"""
+
+import types
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.services.ocr.engines.easyocr import RECOGNIZER_HEIGHT, readtext_batched
+
+
+class FakeCrop:
+    """切り出し画像の代わり（shape だけを持つ）"""
+
+    def __init__(self, width):
+        self.shape = (RECOGNIZER_HEIGHT, width)
+
+
+class FakeReader:
+    """ページ画像名ごとに (ボックス名, 幅) の検出結果を返す"""
+
+    character = "abc"
+    lang_char = "abc"
+    recognizer = converter = device = None
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def detect(self, img, **options):
+        return [self.pages[img]], [[]]
+
+
+class TestReadtextBatched(unittest.TestCase):
+    """ページ横断バッチ認識単体テスト"""
+
+    def setUp(self):
+        self.batches = []
+
+        def get_image_list(horizontal_list, free_list, img_cv_grey, model_height):
+            return [(name, FakeCrop(width)) for name, width in horizontal_list], 0
+
+        def get_text(character, height, width, recognizer, converter, image_list, *args):
+            # 実物と同様に入力順で (box, text, confidence) を返す
+            self.batches.append([crop.shape[1] for _, crop in image_list])
+            return [(box, f"text-{box}", 0.5) for box, _ in image_list]
+
+        modules = {
+            "easyocr": types.ModuleType("easyocr"),
+            "easyocr.utils": types.SimpleNamespace(
+                reformat_input=lambda image: (image, image), get_image_list=get_image_list
+            ),
+            "easyocr.recognition": types.SimpleNamespace(get_text=get_text),
+        }
+        patcher = mock.patch.dict(sys.modules, modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_return_to_page_and_box_order(self):
+        """幅順にバッチ化して認識し、結果はページ順・ページ内の検出順で返す"""
+        reader = FakeReader({
+            "page1": [("a", 300), ("b", 50), ("c", 200)],
+            "page2": [("d", 100), ("e", 400)],
+        })
+        pages = readtext_batched(reader, ["page1", "page2"], batch_size=2)
+
+        self.assertEqual(self.batches, [[50, 100], [200, 300], [400]])
+        self.assertEqual(
+            [[text for _, text, _ in page] for page in pages],
+            [["text-a", "text-b", "text-c"], ["text-d", "text-e"]]
+        )
+        self.assertEqual([box for box, _, _ in pages[0]], ["a", "b", "c"])
+        self.assertIsInstance(pages[1][0][2], float)
+
+    def test_page_without_regions(self):
+        """検出領域が無いページは空のリスト"""
+        reader = FakeReader({"blank": [], "page": [("a", 120)]})
+        pages = readtext_batched(reader, ["blank", "page"], batch_size=8)
+        self.assertEqual(pages, [[], [("a", "text-a", 0.5)]])
+
+
+if __name__ == "__main__":
+    unittest.main()
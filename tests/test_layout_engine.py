@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+レイアウト構造化エンジン単体テスト
+rawdictからのセル分割・行グループ化・段組み判定の確認
+"""
+
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.services.ocr.layout import (
+    LayoutEngine, assign_columns, cells_from_rawdict, column_intervals, group_rows
+)
+
+
+def _span(text, x, y, size=10.0):
+    """等幅（全角=size・半角=size/2）で文字を並べたrawdictスパン"""
+    chars = []
+    for ch in text:
+        width = size if ord(ch) > 0x2000 else size / 2
+        chars.append({"c": ch, "bbox": (x, y, x + width, y + size)})
+        x += width
+    return {"size": size, "bbox": (chars[0]["bbox"][0], y, x, y + size), "chars": chars}
+
+
+def _page(*lines, width=600.0):
+    """1行1ブロックのrawdictページ（lines は行ごとのスパンのリスト）"""
+    blocks = []
+    for spans in lines:
+        bbox = (spans[0]["bbox"][0], spans[0]["bbox"][1], spans[-1]["bbox"][2], spans[-1]["bbox"][3])
+        blocks.append({"type": 0, "bbox": bbox, "lines": [{"dir": (1.0, 0.0), "bbox": bbox, "spans": list(spans)}]})
+    return {"width": width, "blocks": blocks}
+
+
+def _cell(text, x0, y0, x1=None):
+    return {"text": text, "bbox": (x0, y0, x1 if x1 is not None else x0 + 40, y0 + 10)}
+
+
+class TestLayoutEngine(unittest.TestCase):
+    """レイアウト構造化エンジン単体テスト"""
+
+    def test_cells_split_on_wide_gap(self):
+        """1スパン内の大きな空白でセルを分割し、全角1文字分の空白は分割しない"""
+        page = _page([_span("氏名　　　山田　太郎", 50, 100)], [_span("住所", 50, 120), _span("東京都", 75, 120)])
+        texts = [cell["text"] for cell in cells_from_rawdict(page)]
+        self.assertEqual(texts, ["氏名", "山田　太郎", "住所 東京都"])
+
+    def test_group_rows_matches_legacy(self):
+        """行グループ化は従来の全行比較と同一の結果"""
+        def legacy(blocks, y_threshold=15):
+            rows = []
+            for block in sorted(blocks, key=lambda b: b["bbox"][1]):
+                for row in rows:
+                    if abs(row[0]["bbox"][1] - block["bbox"][1]) < y_threshold:
+                        row.append(block)
+                        break
+                else:
+                    rows.append([block])
+            return rows
+
+        rng = random.Random(0)
+        for _ in range(300):
+            cells = [_cell(str(i), rng.uniform(0, 500), rng.choice([rng.uniform(0, 300), rng.randint(0, 30) * 10.0]))
+                     for i in range(rng.randint(0, 60))]
+            self.assertEqual(group_rows(cells), legacy(cells))
+
+    def test_columns_by_interval(self):
+        """段組みは空きで判定し、ページ幅の見出しは左の段組みに入る"""
+        cells = [
+            _cell("見出し", 40, 20, 560),
+            _cell("左1", 40, 50), _cell("左2", 85, 70, 150),
+            _cell("右1", 320, 50), _cell("右2", 330, 70),
+        ]
+        intervals = column_intervals(cells, page_width=600)
+        self.assertEqual(intervals, [(40, 150), (320, 370)])
+        columns = assign_columns(cells, intervals)
+        self.assertEqual([[c["text"] for c in column] for column in columns],
+                         [["見出し", "左1", "左2"], ["右1", "右2"]])
+
+    def test_structure_form(self):
+        """ラベル行と値行を列ごとに対応付け"""
+        page = _page(
+            [_span("氏名", 50, 100), _span("年齢", 300, 100)],
+            [_span("山田", 50, 120), _span("42", 300, 120)],
+        )
+        engine = LayoutEngine()
+        self.assertEqual(engine.structure_cells(cells_from_rawdict(page), page["width"]), ["氏名: 山田", "年齢: 42"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+LLM応答キャッシュ単体テスト
+キー生成・決定性判定・永続化・LRU削除の確認
+"""
+
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from new.services.llm.response_cache import LLMResponseCache, cache_key, is_deterministic
+    CACHE_AVAILABLE = True
+except ImportError:
+    CACHE_AVAILABLE = False
+
+
+@unittest.skipUnless(CACHE_AVAILABLE, "設定モジュールが必要")
+class TestLLMResponseCache(unittest.TestCase):
+    """LLM応答キャッシュ単体テスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "cache.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_and_determinism(self):
+        """キーはパラメータ順に依存せず、生成に影響しないパラメータは無視する"""
+        key = cache_key("phi4-mini", "prompt", {"temperature": 0, "num_predict": 1024})
+        self.assertEqual(key, cache_key("phi4-mini", "prompt", {"num_predict": 1024, "temperature": 0, "min_length": 5}))
+        self.assertNotEqual(key, cache_key("gemma:7b", "prompt", {"temperature": 0, "num_predict": 1024}))
+        self.assertNotEqual(key, cache_key("phi4-mini", "prompt", {"temperature": 0, "num_predict": 512}))
+
+        self.assertTrue(is_deterministic({"temperature": 0.0}))
+        self.assertTrue(is_deterministic({"temperature": 0.7, "seed": 42}))
+        self.assertFalse(is_deterministic({"temperature": 0.7}))
+        self.assertFalse(is_deterministic({}))
+
+    def test_persistent_across_instances(self):
+        """保存した応答は別インスタンス（別プロセス相当）からも読める"""
+        cache = LLMResponseCache(self.path)
+        cache.put("k", "stub", "整形結果", 3.5)
+        cache.close()
+
+        reopened = LLMResponseCache(self.path)
+        self.assertEqual(reopened.get("k"), ("整形結果", 3.5))
+        self.assertIsNone(reopened.get("missing"))
+        reopened.close()
+
+    def test_lru_eviction(self):
+        """容量上限を超えると最終参照が古いエントリから削除する"""
+        cache = LLMResponseCache(self.path, max_bytes=300)
+        for name in "abc":
+            cache.put(name, "stub", name * 100, 1.0)
+        cache.get("a")  # a を最近参照にする
+        cache.put("d", "stub", "d" * 100, 1.0)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertLessEqual(cache.stats()["bytes"], 300)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+LLMスケジューラ単体テスト
+優先レーンの順序・バッチ枠の上限・スレッドからの利用・中断の確認
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from new.services.llm.scheduler import BATCH, INTERACTIVE, LLMScheduler
+    SCHEDULER_AVAILABLE = True
+except ImportError:
+    SCHEDULER_AVAILABLE = False
+
+
+@unittest.skipUnless(SCHEDULER_AVAILABLE, "設定モジュールが必要")
+class TestLLMScheduler(unittest.TestCase):
+    """LLMスケジューラ単体テスト"""
+
+    def test_interactive_overtakes_queued_batch(self):
+        """枠が空くと、後から並んだ対話要求が待機中のバッチ要求より先に実行される"""
+        scheduler = LLMScheduler(default_limit=1, interactive_reserve=0)
+        order = []
+
+        async def request(name, lane, hold=0.0):
+            async with scheduler.slot("m", lane):
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        async def scenario():
+            first = asyncio.ensure_future(request("batch-1", BATCH, hold=0.1))
+            await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(request("batch-2", BATCH))
+            await asyncio.sleep(0.01)
+            chat = asyncio.ensure_future(request("chat", INTERACTIVE))
+            await asyncio.sleep(0.01)
+            snapshot = scheduler.snapshot()["m"]
+            await asyncio.gather(first, second, chat)
+            return snapshot
+
+        snapshot = asyncio.run(scenario())
+        self.assertEqual(order, ["batch-1", "chat", "batch-2"])
+        self.assertEqual((snapshot[BATCH]["queued"], snapshot[INTERACTIVE]["queued"]), (1, 1))
+        final = scheduler.snapshot()["m"]
+        self.assertEqual(final[BATCH]["deferred"], 1)
+        self.assertEqual(final[BATCH]["admitted"] + final[INTERACTIVE]["admitted"], 3)
+        self.assertGreater(final[INTERACTIVE]["max_wait"], 0.0)
+
+    def test_batch_leaves_reserved_slot(self):
+        """バッチは予約枠を使わず、対話要求はバッチ処理中でも待たずに実行される"""
+        scheduler = LLMScheduler(default_limit=2, interactive_reserve=1)
+        running = []
+        max_batch = [0]
+        lock = threading.Lock()
+
+        def batch_job():
+            with scheduler.slot_sync("m", BATCH):
+                with lock:
+                    running.append(1)
+                    max_batch[0] = max(max_batch[0], len(running))
+                time.sleep(0.05)
+                with lock:
+                    running.pop()
+
+        threads = [threading.Thread(target=batch_job) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.01)
+
+        async def chat():
+            start = time.monotonic()
+            async with scheduler.slot("m", INTERACTIVE):
+                return time.monotonic() - start
+
+        wait = asyncio.run(chat())
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max_batch[0], 1)
+        self.assertLess(wait, 0.04)
+        self.assertEqual(scheduler.snapshot()["m"][BATCH]["admitted"], 3)
+
+    def test_abort_while_queued(self):
+        """待機中に中断フラグが立つと InterruptedError になり、待ち行列から外れる"""
+        scheduler = LLMScheduler(default_limit=1)
+        abort_flag = {'flag': False}
+
+        async def scenario():
+            async with scheduler.slot("m", INTERACTIVE):
+                waiting = asyncio.ensure_future(self._enter(scheduler, abort_flag))
+                await asyncio.sleep(0.05)
+                abort_flag['flag'] = True
+                with self.assertRaises(InterruptedError):
+                    await waiting
+
+        asyncio.run(scenario())
+        snapshot = scheduler.snapshot()["m"]
+        self.assertEqual((snapshot[BATCH]["queued"], snapshot[BATCH]["running"]), (0, 0))
+        self.assertEqual(snapshot[INTERACTIVE]["running"], 0)
+
+    @staticmethod
+    async def _enter(scheduler, abort_flag):
+        async with scheduler.slot("m", BATCH, abort_flag):
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+OCRオーケストレーター一括処理 単体テスト
+画像化メモリ予算の待機・キャンセル、大きいファイルからの投入順の確認
+"""
+
+import asyncio
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.ocr import ocr_orchestrator
+from app.services.ocr.ocr_orchestrator import OCROrchestrator, RenderMemoryBudget
+
+
+class TestRenderMemoryBudget(unittest.TestCase):
+    """画像化メモリ予算単体テスト"""
+
+    def test_waiters_proceed_as_budget_is_released(self):
+        """上限を超える2件は先の解放を待ってから1件ずつ進む"""
+        async def scenario():
+            budget = RenderMemoryBudget(100)
+            await budget.acquire(80)
+            order = []
+
+            async def waiter(name, nbytes):
+                await budget.acquire(nbytes)
+                order.append(name)
+
+            first = asyncio.create_task(waiter("a", 60))
+            second = asyncio.create_task(waiter("b", 60))
+            await asyncio.sleep(0.01)
+            self.assertEqual(order, [])
+
+            await budget.release(80)
+            await asyncio.sleep(0.01)
+            self.assertEqual(len(order), 1)  # 60 + 60 は上限超過のため1件だけ
+            self.assertEqual(budget.in_use, 60)
+
+            await budget.release(60)
+            await asyncio.gather(first, second)
+            self.assertEqual(sorted(order), ["a", "b"])
+            self.assertEqual(budget.in_use, 60)
+
+        asyncio.run(scenario())
+
+    def test_oversized_request_runs_alone(self):
+        """単独で上限を超える要求も、他に使用中が無ければ通す"""
+        async def scenario():
+            budget = RenderMemoryBudget(100)
+            await budget.acquire(500)
+            self.assertEqual(budget.in_use, 500)
+
+        asyncio.run(scenario())
+
+    def test_cancelled_waiter_takes_nothing(self):
+        """待機中にキャンセルされた要求は予算を消費しない"""
+        async def scenario():
+            budget = RenderMemoryBudget(100)
+            await budget.acquire(90)
+            waiter = asyncio.create_task(budget.acquire(50))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            self.assertEqual(budget.in_use, 90)
+
+            await budget.release(90)
+            self.assertEqual(budget.in_use, 0)
+            await asyncio.wait_for(budget.acquire(100), timeout=1.0)
+
+        asyncio.run(scenario())
+
+
+class FakeFileHandler:
+    def prepare_ocr_data(self, file_id):
+        return {"status": "success", "blob_data": b"", "filename": f"{file_id}.pdf"}
+
+
+class TestBatchOrder(unittest.TestCase):
+    """一括処理の投入順"""
+
+    def setUp(self):
+        self.orchestrator = OCROrchestrator.__new__(OCROrchestrator)
+        self.orchestrator.file_handler = FakeFileHandler()
+        self.orchestrator.get_engine_parameters = lambda engine_name: {"dpi": 200}
+        self.started = []
+
+        def run_ocr(file_id, file_data, engine_name, engine_params, enable_spell_correction):
+            self.started.append(file_id)
+            return {"status": "success", "text": file_id}
+
+        self.orchestrator._run_ocr_sync = run_ocr
+
+    def run_batch(self, file_ids, sizes, memory_limit_mb=1024):
+        with mock.patch.object(ocr_orchestrator, "get_file_sizes", return_value=sizes), \
+                mock.patch.object(ocr_orchestrator, "estimate_render_bytes", return_value=1024):
+            return asyncio.run(self.orchestrator._batch_process_files_concurrent(
+                file_ids, engine_name="EasyOCR", enable_spell_correction=False,
+                max_concurrency=1, memory_limit_mb=memory_limit_mb
+            ))
+
+    def test_largest_first_and_results_in_input_order(self):
+        """大きいファイルから処理し（サイズ不明は末尾）、結果は入力順で返す"""
+        file_ids = ["small", "unknown", "large", "medium"]
+        results = self.run_batch(file_ids, {"small": 10, "large": 1000, "medium": 100})
+        self.assertEqual(self.started, ["large", "medium", "small", "unknown"])
+        self.assertEqual([r["text"] for r in results], file_ids)
+        for result in results:
+            self.assertIn("memory_wait", result)
+            self.assertGreaterEqual(result["processing_time"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
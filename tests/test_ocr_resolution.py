@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+適応解像度プランナー単体テスト
+連結成分による文字高さ推定とDPI選択の確認
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.services.ocr.resolution import AdaptiveResolutionPlanner, PageResolution, ResolutionPlan
+
+
+def _draw_page(width, height, glyph_height, glyph_width=6, rows=10, cols=20):
+    """白地に黒矩形の「文字」を格子状に並べたグレースケール画像"""
+    pixels = bytearray(b"\xff" * width * height)
+    for r in range(rows):
+        for c in range(cols):
+            y0 = 20 + r * (glyph_height * 2)
+            x0 = 10 + c * (glyph_width * 2)
+            for y in range(y0, y0 + glyph_height):
+                start = y * width + x0
+                pixels[start:start + glyph_width] = b"\x00" * glyph_width
+    return bytes(pixels)
+
+
+class TestAdaptiveResolutionPlanner(unittest.TestCase):
+    """適応解像度プランナー単体テスト"""
+
+    def setUp(self):
+        self.planner = AdaptiveResolutionPlanner(target_x_height=20, probe_dpi=72, min_dpi=150, max_dpi=600)
+
+    def test_component_heights(self):
+        """連結成分の数と高さ"""
+        samples = _draw_page(300, 400, glyph_height=8, rows=3, cols=4)
+        components = self.planner.component_heights(samples, 300, 400)
+        self.assertEqual(len(components), 12)
+        self.assertTrue(all(h == 8 and w == 6 for h, w in components))
+
+    def test_diagonal_pixels_are_connected(self):
+        """8連結（斜め隣接）で1成分になる"""
+        width, height = 4, 4
+        pixels = bytearray(b"\xff" * width * height)
+        for i in range(4):
+            pixels[i * width + i] = 0
+        components = self.planner.component_heights(bytes(pixels), width, height)
+        self.assertEqual(components, [(4, 4)])
+
+    def test_rules_are_ignored(self):
+        """罫線は文字高さ推定から除外される"""
+        width, height = 300, 400
+        pixels = bytearray(_draw_page(width, height, glyph_height=10, rows=3, cols=4))
+        for y in (350, 351):
+            pixels[y * width:(y + 1) * width] = b"\x00" * width
+        self.assertEqual(self.planner.estimate_text_height(bytes(pixels), width, height), 10.0)
+
+    def test_choose_dpi(self):
+        """目標文字高さに届く最小DPI（範囲内に丸め）"""
+        self.assertEqual(self.planner.choose_dpi(10.0, 300), 150)  # 大きな文字は下限
+        self.assertEqual(self.planner.choose_dpi(4.0, 300), 375)
+        self.assertEqual(self.planner.choose_dpi(1.0, 300), 600)   # 極小文字は上限
+        self.assertEqual(self.planner.choose_dpi(None, 300), 300)  # 推定不可は基準DPI
+
+    def test_floor_follows_low_base_dpi(self):
+        """基準DPIが下限より低い（zoom_factor=2.0 → 144dpi）場合は基準DPIまで下げられ、削減量が負にならない"""
+        base_dpi = int(72 * 2.0)
+        self.assertEqual(self.planner.choose_dpi(20.0, base_dpi), base_dpi)
+        self.assertEqual(self.planner.choose_dpi(40.0, base_dpi), base_dpi)
+        self.assertEqual(self.planner.choose_dpi(4.0, base_dpi), 375)
+
+        plan = ResolutionPlan(base_dpi=base_dpi, target_x_height=20)
+        for index, height in enumerate((20.0, 40.0)):
+            dpi = self.planner.choose_dpi(height, base_dpi)
+            plan.pages.append(PageResolution(index, dpi, base_dpi, height, dpi * dpi, base_dpi * base_dpi))
+        self.assertGreaterEqual(plan.summary()["pixel_savings"], 0.0)
+
+    def test_plan_summary(self):
+        """画素数削減の集計"""
+        plan = ResolutionPlan(base_dpi=300, target_x_height=20)
+        plan.pages.append(PageResolution(0, 150, 300, 20.0, 100, 400))
+        summary = plan.summary(processing_time=1.0)
+        self.assertEqual(summary["pixel_savings"], 0.75)
+        self.assertEqual(summary["estimated_base_time"], 4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Ollamaクライアント単体テスト
+ローカルのスタブHTTPサーバに対するストリーミング・中断・計測の確認
+"""
+
+import tempfile
+import time
+import asyncio
+import contextlib
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.ollama_stub import OllamaStubServer, StubBehavior
+
+try:
+    from new.services.llm.ollama_client import (
+        OllamaClient, OllamaModelNotFoundError, OllamaRefiner, close_ollama_sessions
+    )
+    from new.services.llm.health import OllamaHealthMonitor
+    from new.services.llm.scheduler import get_llm_scheduler
+    from new.services.llm.response_cache import LLMResponseCache
+    from new.utils.text_segmenter import split_segments
+    CLIENT_AVAILABLE = True
+except ImportError:
+    CLIENT_AVAILABLE = False
+
+try:
+    from app.services.llm import refiner as app_refiner
+    REFINER_AVAILABLE = CLIENT_AVAILABLE
+except ImportError:
+    REFINER_AVAILABLE = False
+
+
+REPLY = ("整形", "済み", "テキスト")
+
+
+@unittest.skipUnless(CLIENT_AVAILABLE, "aiohttp・設定モジュールが必要")
+class TestOllamaClient(unittest.TestCase):
+    """Ollamaクライアント単体テスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = OllamaStubServer().start()
+        cls.base_url = cls.stub.url
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+
+    def setUp(self):
+        self.stub.behavior = StubBehavior(reply=REPLY)
+        self.stub.reset()
+
+    @property
+    def generations(self):
+        return self.stub.requests("/api/generate", "/api/chat")
+
+    @property
+    def probes(self):
+        return self.stub.requests("/api/version", "/api/tags")
+
+    def run_async(self, coro):
+        async def wrapper():
+            try:
+                return await coro
+            finally:
+                await close_ollama_sessions()
+        return asyncio.run(wrapper())
+
+    def test_stream_generate_and_stats(self):
+        """トークンが順に届き、TTFT・トークン数・速度が記録される"""
+        self.stub.behavior.tokens_per_sec = 100.0
+
+        async def scenario():
+            client = OllamaClient(base_url=self.base_url, model="stub")
+            async with client.stream_generate("prompt") as stream:
+                pieces = [piece async for piece in stream]
+            return pieces, stream.stats
+
+        pieces, stats = self.run_async(scenario())
+        self.assertEqual(pieces, ["整形", "済み", "テキスト"])
+        self.assertEqual(stats.tokens, 3)
+        self.assertEqual(stats.prompt_tokens, 3)  # スタブは2文字を1トークンと数える
+        self.assertAlmostEqual(stats.tokens_per_sec, 100.0, delta=1.0)
+        self.assertIsNotNone(stats.ttft)
+        self.assertEqual(stats.done_reason, "stop")
+
+    def test_chat_and_shared_session(self):
+        """/api/chat の応答を連結し、クライアント間でセッションを共有する"""
+        async def scenario():
+            first = OllamaClient(base_url=self.base_url, model="stub")
+            second = OllamaClient(base_url=self.base_url, model="stub")
+            text = "".join([p async for p in first.stream_chat([{"role": "user", "content": "hi"}])])
+            generated = await second.generate_text("prompt")
+            return text, generated, first.session is second.session
+
+        text, generated, shared = self.run_async(scenario())
+        self.assertEqual(text, "整形済みテキスト")
+        self.assertEqual(generated, "整形済みテキスト")
+        self.assertTrue(shared)
+
+    def test_abort_disconnects(self):
+        """中断フラグでトークン待ちの途中でも切断し InterruptedError"""
+        self.stub.behavior.tokens_per_sec = 2.0
+        abort_flag = {"flag": False}
+
+        async def scenario():
+            client = OllamaClient(base_url=self.base_url, model="stub")
+            asyncio.get_running_loop().call_later(0.7, abort_flag.update, {"flag": True})
+            start = time.perf_counter()
+            stream = client.stream_generate("prompt", abort_flag=abort_flag)
+            with self.assertRaises(InterruptedError):
+                async with stream:
+                    async for _ in stream:
+                        pass
+            return time.perf_counter() - start, stream.stats
+
+        elapsed, stats = self.run_async(scenario())
+        self.assertLess(elapsed, 1.4)
+        self.assertTrue(stats.aborted)
+        self.assertTrue(self.stub.disconnected.wait(2.0))
+
+    def test_stats_per_call_on_shared_client(self):
+        """1つのクライアントで同時に生成しても、計測値は呼び出しごとに分かれる"""
+        self.stub.behavior = StubBehavior(tokens_per_sec=50.0)
+
+        async def scenario():
+            client = OllamaClient(base_url=self.base_url, model="stub")
+            return await asyncio.gather(
+                client.generate_text_with_stats("短いプロンプト", generation_params={"num_predict": 2}),
+                client.generate_text_with_stats("長めのプロンプト" * 4, generation_params={"num_predict": 8}),
+            )
+
+        (_, short), (_, long) = self.run_async(scenario())
+        self.assertEqual((short.tokens, long.tokens), (2, 8))
+        self.assertIsNot(short, long)
+
+    def test_early_exit_releases_slot(self):
+        """途中で読むのをやめても async with を抜ければ実行枠を返す"""
+        self.stub.behavior = StubBehavior(reply=REPLY, tokens_per_sec=5.0, models=("stub-early:latest",))
+
+        async def scenario():
+            client = OllamaClient(base_url=self.base_url, model="stub-early")
+            async with client.stream_generate("prompt") as stream:
+                async for _ in stream:
+                    break
+            return get_llm_scheduler().snapshot()["stub-early"]
+
+        lanes = self.run_async(scenario())
+        self.assertEqual(lanes["interactive"]["running"], 0)
+        self.assertTrue(self.stub.disconnected.wait(2.0))
+
+    def test_segments_bounded_concurrency(self):
+        """区間整形は同時実行数の上限を守り、区間ごとにスコアを記録する"""
+        self.stub.behavior.tokens_per_sec = 10.0
+        text = "\n\n".join(f"段落{i}。" * 20 for i in range(6))
+        segments = split_segments(text, max_tokens=200)
+
+        async def scenario():
+            refiner = OllamaRefiner(OllamaClient(base_url=self.base_url, model="stub"))
+            refined, score = await refiner._refine_segments(segments, None, "ja", max_concurrency=2)
+            return refiner, refined, score
+
+        refiner, refined, score = self.run_async(scenario())
+        self.assertGreater(len(segments), 2)
+        self.assertEqual(self.stub.max_active, 2)
+        self.assertEqual(len(refiner.last_segments), len(segments))
+        self.assertEqual(refined.count("整形済みテキスト"), len(segments))
+        self.assertGreaterEqual(score, 0.0)
+
+    def test_refine_text_response_cache(self):
+        """決定的な設定では2回目の整形がキャッシュから返り、非決定的な設定では毎回生成する"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMResponseCache(Path(tmp) / "cache.sqlite3")
+
+            async def scenario(**params):
+                refiner = OllamaRefiner(OllamaClient(base_url=self.base_url, model="stub"), cache=cache)
+                for _ in range(2):
+                    refined, _, _ = await refiner.refine_text("対象テキスト", **params)
+                return refined, refiner.cache_stats
+
+            refined, stats = self.run_async(scenario(temperature=0.0))
+            self.assertEqual(refined, "整形済みテキスト")
+            self.assertEqual((stats.hits, stats.misses, self.generations), (1, 1, 1))
+
+            _, stats = self.run_async(scenario(temperature=0.7))
+            self.assertEqual((stats.hits, stats.bypassed, self.generations), (0, 2, 3))
+            cache.close()
+
+    def test_health_monitor_cached(self):
+        """確認結果は期限内なら再利用し、失敗の記録で即座に利用不可になり、成功後に再確認する"""
+        async def scenario():
+            monitor = OllamaHealthMonitor(self.base_url, ttl=60.0)
+            results = [await monitor.is_available("stub") for _ in range(3)]
+            results.append(await monitor.is_available("other"))
+            probes_before = self.probes
+            monitor.record_failure("ConnectionError")
+            results.append(await monitor.is_available("stub"))
+            probes_after_failure = self.probes
+            monitor.record_success()
+            results.append(await monitor.is_available("stub"))
+            return results, probes_before, probes_after_failure
+
+        results, probes_before, probes_after_failure = self.run_async(scenario())
+        self.assertEqual(results, [True, True, True, False, False, True])
+        self.assertEqual(probes_before, 2)  # /api/version・/api/tags を1回ずつ
+        self.assertEqual(probes_after_failure, 2)
+        self.assertEqual(self.probes, 4)
+
+    def test_injected_failures(self):
+        """HTTPエラー・ストリーム途中の切断は例外になり、死活監視に失敗として記録される"""
+        async def scenario():
+            client = OllamaClient(base_url=self.base_url, model="stub")
+            await client.health.probe()
+            errors = []
+            for behavior in (StubBehavior(failure_rate=1.0), StubBehavior(disconnect_rate=1.0)):
+                self.stub.behavior = behavior
+                client.health.record_success()
+                try:
+                    await client.generate_text("途中で切れる応答のためのプロンプト")
+                except Exception as e:
+                    errors.append(type(e).__name__)
+            return errors, client.health.state
+
+        errors, state = self.run_async(scenario())
+        self.assertEqual(errors[0], "RuntimeError")
+        self.assertEqual(len(errors), 2)
+        self.assertFalse(state.healthy)
+        self.assertEqual(self.stub.requests("failure"), 1)
+        self.assertEqual(self.stub.requests("disconnect"), 1)
+
+    def test_model_not_found(self):
+        """404は OllamaModelNotFoundError"""
+        async def scenario():
+            client = OllamaClient(base_url=self.base_url, model="missing")
+            await client.generate_text("prompt")
+
+        with self.assertRaises(OllamaModelNotFoundError):
+            self.run_async(scenario())
+
+
+class FakeSpellChecker:
+    def correct_text(self, text):
+        return text
+
+
+@unittest.skipUnless(REFINER_AVAILABLE, "アプリ側の整形サービス（LangChain等）が必要")
+class TestRefineTextsAsync(unittest.TestCase):
+    """TextRefiner.refine_texts_async（共有クライアントでの並列整形）単体テスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = OllamaStubServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+
+    def setUp(self):
+        self.stub.behavior = StubBehavior(response_tokens=4)
+        self.stub.reset()
+        with mock.patch.object(app_refiner, "get_spell_checker", return_value=FakeSpellChecker()):
+            self.refiner = app_refiner.TextRefiner()
+        self.refiner.ollama_base = self.stub.url
+        self.refiner.default_model = "stub"
+        self.refiner.cache = None
+
+    def collect(self, texts, **kwargs):
+        async def scenario():
+            try:
+                return [item async for item in self.refiner.refine_texts_async(texts, **kwargs)]
+            finally:
+                await close_ollama_sessions()
+        return asyncio.run(scenario())
+
+    def test_completion_order_with_original_index(self):
+        """完了した順に返し、添字は元のテキストを指す"""
+        self.stub.behavior.slow_marker = "遅い"
+        self.stub.behavior.slow_latency = 0.5
+        texts = ["遅いテキストです。", "速いテキストです。"]
+        results = self.collect(texts, max_concurrency=2)
+        self.assertEqual([index for index, _ in results], [1, 0])
+        for index, (refined, lang, score, prompt) in results:
+            self.assertIn(texts[index], prompt)
+            self.assertEqual(lang, "ja")
+            self.assertGreater(score, 0.0)
+
+    def test_concurrency_bounded(self):
+        """同時に整形するテキスト数は max_concurrency を超えない"""
+        self.stub.behavior.tokens_per_sec = 20.0
+        texts = [f"テキスト{i}です。" for i in range(5)]
+        for max_concurrency in (1, 2):
+            self.stub.reset()
+            results = self.collect(texts, max_concurrency=max_concurrency)
+            self.assertEqual(sorted(index for index, _ in results), list(range(5)))
+            self.assertEqual(self.stub.max_active, max_concurrency)
+
+    def test_failed_text_returns_original(self):
+        """失敗したテキストは元のテキストをスコア 0 で返し、残りは続ける"""
+        self.stub.behavior.fail_marker = "失敗"
+        texts = ["失敗するテキスト。", "成功するテキスト。"]
+        results = dict(self.collect(texts, max_concurrency=2))
+        self.assertEqual(results[0], (texts[0], "ja", 0.0, ""))
+        self.assertGreater(results[1][2], 0.0)
+
+    def test_abort_cancels_in_flight(self):
+        """中断フラグで実行中の生成を切断して InterruptedError"""
+        self.stub.behavior.tokens_per_sec = 2.0
+        abort_flag = {"flag": False}
+
+        async def scenario():
+            asyncio.get_running_loop().call_later(0.5, abort_flag.update, {"flag": True})
+            start = time.perf_counter()
+            try:
+                with self.assertRaises(InterruptedError):
+                    async for _ in self.refiner.refine_texts_async(
+                        ["テキスト一。", "テキスト二。"], abort_flag=abort_flag, max_concurrency=2
+                    ):
+                        pass
+                return time.perf_counter() - start
+            finally:
+                await close_ollama_sessions()
+
+        self.assertLess(asyncio.run(scenario()), 1.5)
+        self.assertTrue(self.stub.disconnected.wait(2.0))
+
+    def test_break_cancels_remaining(self):
+        """反復を途中でやめると未完了の生成を取り消し、実行枠を返す"""
+        self.stub.behavior.slow_marker = "遅い"
+        self.stub.behavior.slow_latency = 0.3
+        self.stub.behavior.tokens_per_sec = 2.0
+
+        async def scenario():
+            try:
+                results = self.refiner.refine_texts_async(["遅いテキスト。", "速いテキスト。"], max_concurrency=2)
+                async with contextlib.aclosing(results):
+                    async for index, _ in results:
+                        break
+                return index, get_llm_scheduler().snapshot()["stub"]["batch"]
+            finally:
+                await close_ollama_sessions()
+
+        first, batch = asyncio.run(scenario())
+        self.assertEqual(first, 1)
+        self.assertEqual(batch["running"], 0)
+        self.assertTrue(self.stub.disconnected.wait(2.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+多パターン照合器単体テスト
+最左最長一致・保護語・置換位置の確認
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.utils.pattern_matcher import MappedPatternMatcher, MultiPatternMatcher
+
+
+class TestMultiPatternMatcher(unittest.TestCase):
+    """多パターン照合器単体テスト"""
+
+    def test_leftmost_longest(self):
+        """同じ開始位置では最長、重なりでは最左を採用"""
+        matcher = MultiPatternMatcher({"契約": "X", "契約所": "契約書", "約所": "Y"})
+        text, edits = matcher.replace("本契約所の")
+        self.assertEqual(text, "本契約書の")
+        self.assertEqual(edits, [{"start": 1, "end": 4, "wrong": "契約所", "correct": "契約書"}])
+
+    def test_overlapping_suffix_patterns(self):
+        """失敗リンク経由の一致（接尾辞パターン）も検出"""
+        matcher = MultiPatternMatcher({"he": "HE", "she": "SHE", "hers": "HERS"})
+        self.assertEqual(matcher.replace("ushers")[0], "uSHErs")
+        self.assertEqual(matcher.replace("hers")[0], "HERS")
+
+    def test_protected_words(self):
+        """既知単語は誤字パターンから除外され、出現箇所も置換されない"""
+        matcher = MultiPatternMatcher({"口": "ロ", "航宇": "X"}, protected=["人口", "航宇"])
+        text, edits = matcher.replace("人口とカ口リー、航宇")
+        self.assertEqual(text, "人口とカロリー、航宇")
+        self.assertEqual([(e["start"], e["wrong"]) for e in edits], [(4, "口")])
+        self.assertEqual(len(matcher), 1)
+
+    def test_no_hits_returns_same_text(self):
+        """ヒットなしは元テキストをそのまま返す"""
+        matcher = MultiPatternMatcher({"間題": "問題"})
+        text = "問題ありません"
+        result, edits = matcher.replace(text)
+        self.assertIs(result, text)
+        self.assertEqual(edits, [])
+
+    def test_exported_tables_match(self):
+        """平坦な配列表から照合しても元の照合器と同じ結果"""
+        matcher = MultiPatternMatcher({"口": "ロ", "he": "HE", "she": "SHE", "hers": "HERS"}, protected=["人口"])
+        tables, patterns, targets = matcher.export_tables()
+        mapped = MappedPatternMatcher(tables, patterns, targets, protected_count=1)
+        for text in ("人口とカ口リー", "ushers", "hers he", ""):
+            self.assertEqual(mapped.find_all(text), matcher.find_all(text))
+            self.assertEqual(mapped.replace(text), matcher.replace(text))
+        self.assertEqual(len(mapped), 4)
+        self.assertEqual(mapped.entry(0), ("人口", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+プロンプトレジストリ単体テスト
+差し込み・セクション解析・ファイル更新時の再読み込みの確認
+"""
+
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from new.services.llm.prompt_registry import CompiledPrompt, PromptRegistry
+    from new.services.llm.prompt_loader import PromptLoader, parse_language_sections
+    REGISTRY_AVAILABLE = True
+except ImportError:
+    REGISTRY_AVAILABLE = False
+
+PROMPT_FILE = """# コメント
+ja:
+原文は次の通り
+{TEXT}
+JSON例: {"key": 1}
+en:
+Text: {TEXT} / {CONTEXT}
+"""
+
+
+@unittest.skipUnless(REGISTRY_AVAILABLE, "設定モジュールが必要")
+class TestPromptRegistry(unittest.TestCase):
+    """プロンプトレジストリ単体テスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "refine.txt"
+        self.path.write_text(PROMPT_FILE, encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_matches_replace(self):
+        """差し込み結果は文字列置換と同一で、渡さない差し込み名・波括弧はそのまま残す"""
+        template = "前{TEXT}中{TEXT}後 {\"a\": {b}} {CONTEXT}"
+        compiled = CompiledPrompt(template)
+        text = "本文{TEXT}"
+        self.assertEqual(compiled.render(TEXT=text), template.replace("{TEXT}", text))
+        self.assertEqual(compiled.fields, {"TEXT", "CONTEXT"})
+        self.assertEqual(compiled.render(), template)
+
+    def test_sections_match_loader(self):
+        """全言語セクションの一括解析は従来の言語別抽出と同一"""
+        registry = PromptRegistry()
+        sections = registry.sections(self.path, parse_language_sections)
+        self.assertEqual(set(sections), {"ja", "en"})
+        self.assertEqual(sections["ja"].source, '原文は次の通り\n{TEXT}\nJSON例: {"key": 1}')
+        self.assertEqual(sections["en"].render(TEXT="x", CONTEXT="y"), "Text: x / y")
+        self.assertIsNone(registry.get(Path(self.tmp.name) / "missing.txt", parse_language_sections, "ja"))
+
+    def test_hot_reload(self):
+        """ファイルが更新されると次の確認で再読み込みする"""
+        registry = PromptRegistry(check_interval=0.0)
+        self.assertEqual(registry.get(self.path, parse_language_sections, "en").render(TEXT="x", CONTEXT="y"),
+                         "Text: x / y")
+        self.path.write_text("en:\nUpdated {TEXT}\n", encoding="utf-8")
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(registry.get(self.path, parse_language_sections, "en").render(TEXT="x"), "Updated x")
+        self.assertIsNone(registry.get(self.path, parse_language_sections, "ja"))
+
+    def test_loader_fallback(self):
+        """言語セクションが無い場合はフォールバックのテンプレートに差し込む"""
+        self.path.rename(Path(self.tmp.name) / "refine_prompt_advanced.txt")
+        loader = PromptLoader(self.tmp.name)
+        self.assertEqual(loader.render("refine_prompt_advanced", "en", TEXT="x", CONTEXT="y"), "Text: x / y")
+        self.assertIn("本文", loader.render("refine_prompt_advanced", "fr", TEXT="本文"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+BERT補正候補の事前選別 単体テスト
+トークンと元テキストの対応付け・疑わしい範囲の抽出・マスク対象トークンの選別の確認
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.ocr.suspicion_filter import SuspicionFilter, align_tokens
+
+
+class FakeSpellChecker:
+    """MeCab未知語の代わりに指定語の位置を返す"""
+
+    def __init__(self, unknown_words=(), mistakes=None):
+        self.unknown_words = unknown_words
+        self.mistakes = mistakes or {}
+
+    def unknown_word_spans(self, text):
+        spans = []
+        for word in self.unknown_words:
+            start = text.find(word)
+            while start >= 0:
+                spans.append((start, start + len(word)))
+                start = text.find(word, start + len(word))
+        return sorted(spans)
+
+    def unknown_word_spans_batch(self, texts):
+        return [self.unknown_word_spans(text) for text in texts]
+
+    def load_kanji_mistakes(self, csv_path):
+        return self.mistakes
+
+
+class TestAlignTokens(unittest.TestCase):
+    """トークンと元テキストの対応付け"""
+
+    def test_subwords(self):
+        """## 付きサブワードも続きの位置に対応付ける"""
+        text = "東京都の検査結果"
+        self.assertEqual(
+            align_tokens(["東京", "##都", "の", "検査", "結果"], text),
+            [(0, 2), (2, 3), (3, 4), (4, 6), (6, 8)]
+        )
+
+    def test_nfkc_maps_back_to_original(self):
+        """全角英数字（NFKC で半角になる）も元テキストの位置に戻す"""
+        text = "型番ＡＢ１２です"
+        self.assertEqual(align_tokens(["型番", "AB", "##12", "です"], text), [(0, 2), (2, 4), (4, 6), (6, 8)])
+
+    def test_case_insensitive_keeps_offsets(self):
+        """大文字小文字の違いは無視し、lower() で長さが変わる文字があっても位置がずれない"""
+        # "İ".lower() は2文字になるため、lower() したテキストで探すと以降の位置がずれる
+        text = "İstanbul PDF file"
+        spans = align_tokens(["istanbul", "pdf", "file"], text)
+        self.assertEqual(spans[1], (9, 12))
+        self.assertEqual(spans[2], (13, 17))
+        self.assertEqual(text[spans[1][0]:spans[1][1]], "PDF")
+
+    def test_unknown_tokens(self):
+        """対応付けできないトークンは None で、以降の対応付けは続ける"""
+        self.assertEqual(align_tokens(["検査", "[UNK]", "結果"], "検査★結果"), [(0, 2), None, (3, 5)])
+
+
+class TestFindSpans(unittest.TestCase):
+    """疑わしい範囲の抽出"""
+
+    def test_signals_are_merged(self):
+        """未知語・誤認識しやすい文字・低信頼度行を位置順に統合"""
+        suspicion_filter = SuspicionFilter(FakeSpellChecker(unknown_words=["検杏"]), confusion_chars={"未"})
+        text = "検杏結果は未定\n温度は正常"
+        spans = suspicion_filter.find_spans(text, [("検杏結果は未定", 0.95), ("温度は正常", 0.3)])
+        self.assertEqual(spans, [(0, 2), (5, 6), (8, 13)])
+
+    def test_clean_text_has_no_spans(self):
+        suspicion_filter = SuspicionFilter(FakeSpellChecker(), confusion_chars={"未"})
+        self.assertEqual(suspicion_filter.find_spans("検査結果は正常", [("検査結果は正常", 0.99)]), [])
+
+    def test_confusion_chars_from_mistakes(self):
+        """同じ長さの対は異なる文字だけ、長さが違う対は誤り側の全文字"""
+        chars = SuspicionFilter.confusion_chars_from_mistakes({"検杏": "検査", "ロ一ド": "ロード", "ｶﾞ": "ガ"})
+        self.assertEqual(chars, {"杏", "査", "一", "ー", "ｶ", "ﾞ"})
+
+    def test_batch_matches_single(self):
+        suspicion_filter = SuspicionFilter(FakeSpellChecker(unknown_words=["検杏"]), confusion_chars={"未"})
+        texts = ["検杏結果", "未定です", "正常"]
+        self.assertEqual(suspicion_filter.find_spans_batch(texts), [suspicion_filter.find_spans(t) for t in texts])
+
+
+class TestSelectTokens(unittest.TestCase):
+    """マスク対象トークンの選別"""
+
+    def test_selects_overlapping_and_unaligned(self):
+        """範囲に重なるトークンと対応付けできないトークンだけを選ぶ"""
+        text = "検杏結果は[正常]"
+        tokens = ["検", "##杏", "結果", "は", "[UNK]", "正常"]
+        self.assertEqual(SuspicionFilter.select_tokens(tokens, text, [(1, 2)]), {1, 4})
+        self.assertEqual(SuspicionFilter.select_tokens(tokens, text, [(0, 3)]), {0, 1, 2, 4})
+
+    def test_no_spans(self):
+        self.assertEqual(SuspicionFilter.select_tokens(["検査", "結果"], "検査結果", []), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tesseractインプロセスバックエンド単体テスト
+バックエンドの解決・subprocess へのフォールバック・スレッドごとのハンドル再利用の確認
+"""
+
+import subprocess
+import tempfile
+import threading
+import types
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.services.ocr.engines import tesseract
+from new.services.ocr.engines.tesseract import TesseractEngine, get_thread_api, release_thread_apis
+
+
+class FakeAPI:
+    """PyTessBaseAPI の代わり（生成・終了を記録）"""
+
+    created = []
+
+    def __init__(self, lang, oem):
+        self.key = (lang, oem)
+        self.thread = threading.current_thread().name
+        self.images = 0
+        self.ended = False
+        FakeAPI.created.append(self)
+
+    def SetPageSegMode(self, psm):
+        pass
+
+    def Clear(self):
+        pass
+
+    def SetImageBytes(self, samples, width, height, n, stride):
+        self.images += 1
+
+    def SetSourceResolution(self, dpi):
+        pass
+
+    def SetImageFile(self, path):
+        self.images += 1
+
+    def GetUTF8Text(self):
+        return f"page{self.images}\n"
+
+    def MeanTextConf(self):
+        return 90
+
+    def End(self):
+        self.ended = True
+
+
+class FailingAPI:
+    def __init__(self, lang, oem):
+        raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+
+class FakePixmap:
+    samples = b""
+    width = height = stride = 1
+    n = 1
+
+
+class TestTesseractBackend(unittest.TestCase):
+    """Tesseractインプロセスバックエンド単体テスト"""
+
+    def setUp(self):
+        FakeAPI.created = []
+        self.engine = TesseractEngine()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image = Path(self.temp_dir.name) / "page.png"
+        self.image.write_bytes(b"png")
+        self.pdf = Path(self.temp_dir.name) / "doc.pdf"
+        self.pdf.write_bytes(b"%PDF")
+
+    def tearDown(self):
+        release_thread_apis()
+        self.temp_dir.cleanup()
+
+    def use_tesserocr(self, api_class):
+        patcher = mock.patch.dict(sys.modules, {"tesserocr": types.SimpleNamespace(PyTessBaseAPI=api_class)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_subprocess(self):
+        completed = subprocess.CompletedProcess([], 0, stdout="cli text\n", stderr="")
+        patcher = mock.patch.object(tesseract.subprocess, "run", return_value=completed)
+        run = patcher.start()
+        self.addCleanup(patcher.stop)
+        return run
+
+    def test_resolve_backend(self):
+        """auto・api は tesserocr があれば api、subprocess 指定は常に subprocess"""
+        self.use_tesserocr(FakeAPI)
+        self.assertEqual(self.engine._resolve_backend("auto"), "api")
+        self.assertEqual(self.engine._resolve_backend("api"), "api")
+        self.assertEqual(self.engine._resolve_backend("subprocess"), "subprocess")
+
+    def test_resolve_backend_without_tesserocr(self):
+        """tesserocr が無ければ auto・api とも subprocess"""
+        with mock.patch.dict(sys.modules, {"tesserocr": None}):
+            self.assertEqual(self.engine._resolve_backend("auto"), "subprocess")
+            self.assertEqual(self.engine._resolve_backend("api"), "subprocess")
+
+    def test_missing_tesserocr_uses_subprocess(self):
+        run = self.fake_subprocess()
+        with mock.patch.dict(sys.modules, {"tesserocr": None}):
+            result = self.engine.process_file(str(self.image), backend="api")
+        self.assertTrue(result.success)
+        self.assertEqual(result.text, "cli text")
+        self.assertEqual(run.call_count, 1)
+
+    def test_init_failure_falls_back_to_subprocess(self):
+        """ハンドルの初期化に失敗したら subprocess で処理する"""
+        self.use_tesserocr(FailingAPI)
+        run = self.fake_subprocess()
+        result = self.engine.process_file(str(self.image), backend="auto")
+        self.assertTrue(result.success)
+        self.assertEqual(result.text, "cli text")
+        self.assertEqual(run.call_args[0][0][0], "tesseract")
+
+    def test_api_handle_reused_across_pages(self):
+        """同じスレッドでは全ページ・後続ファイルで1つのハンドルを使い回す"""
+        self.use_tesserocr(FakeAPI)
+        run = self.fake_subprocess()
+
+        def process_pdf_pages(file_path, recognize_page, base_dpi, planner=None):
+            texts = [recognize_page(FakePixmap(), base_dpi) for _ in range(3)]
+            return {"text": "\n\n".join(texts), "page_count": len(texts), "resolution": None}
+
+        with mock.patch.object(self.engine, "process_pdf_pages", side_effect=process_pdf_pages):
+            first = self.engine.process_file(str(self.pdf), language="jpn", oem=1)
+            second = self.engine.process_file(str(self.pdf), language="jpn", oem=1)
+
+        self.assertEqual(run.call_count, 0)
+        self.assertEqual(len(FakeAPI.created), 1)
+        self.assertEqual(FakeAPI.created[0].key, ("jpn", 1))
+        self.assertEqual(FakeAPI.created[0].images, 6)
+        self.assertEqual((first.page_count, first.metadata["backend"]), (3, "api"))
+        self.assertEqual(first.text, "page1\n\npage2\n\npage3")
+        self.assertEqual(second.confidence, 0.9)
+
+    def test_one_handle_per_thread(self):
+        """スレッドごとに別のハンドルを作り、スレッド終了・解放で End() する"""
+        self.use_tesserocr(FakeAPI)
+        handles = {}
+
+        def worker(name):
+            handles[name] = (get_thread_api("jpn", 3), get_thread_api("jpn", 3))
+
+        threads = [threading.Thread(target=worker, args=(f"t{i}",)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(FakeAPI.created), 2)
+        for first, second in handles.values():
+            self.assertIs(first, second)
+        self.assertIsNot(handles["t0"][0], handles["t1"][0])
+        self.assertTrue(all(api.ended for api in FakeAPI.created))
+
+        main_api = get_thread_api("jpn", 3)
+        release_thread_apis()
+        self.assertTrue(main_api.ended)
+        self.assertIsNot(get_thread_api("jpn", 3), main_api)
+
+
+if __name__ == "__main__":
+    unittest.main()
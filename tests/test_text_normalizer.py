@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+テキスト正規化エンジン単体テスト
+従来実装との結果一致・ストリーミング版の一致を確認
+"""
+
+import re
+import random
+import unittest
+import sys
+import unicodedata
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.utils import text_normalizer as tn
+
+
+def legacy_empty_lines(text):
+    text = re.sub(r'^[\s　]+$', '', text, flags=re.MULTILINE)
+    return re.sub(r'\n{3,}', '\n\n', text)
+
+
+def legacy_whitespace(text):
+    text = re.sub(r' {2,}', ' ', text.replace('　', ' ').replace('\t', ' '))
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return '\n'.join(line.strip() for line in text.split('\n')).strip()
+
+
+def legacy_lines(text):
+    normalized = unicodedata.normalize("NFKC", text)
+    return '\n'.join(line.strip() for line in normalized.split('\n') if line.strip())
+
+
+CASES = {
+    "empty_lines": (legacy_empty_lines, tn.normalize_empty_lines),
+    "empty_lines_strip": (lambda t: legacy_empty_lines(t).strip(), tn.normalize_empty_lines_strip),
+    "whitespace": (legacy_whitespace, tn.normalize_whitespace),
+    "collapse": (lambda t: re.sub(r'\s+', ' ', t).strip(), tn.collapse_whitespace),
+    "lines": (legacy_lines, tn.normalize_lines),
+    "newlines": (lambda t: t.replace("\r\n", "\n").replace("\r", "\n").strip(), tn.normalize_newlines),
+}
+
+ALPHABET = ['a', 'あ', 'ｶ', 'ﾞ', 'Ａ', ' ', ' ', '\t', '\n', '\n', '\n', '\r', '　', '\x0b', ' ']
+
+
+class TestTextNormalizer(unittest.TestCase):
+    """テキスト正規化エンジン単体テスト"""
+
+    def test_matches_legacy(self):
+        """ランダム入力で従来実装と同一の結果"""
+        rng = random.Random(0)
+        for _ in range(3000):
+            text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 20)))
+            for mode, (legacy, fused) in CASES.items():
+                self.assertEqual(fused(text), legacy(text), f"{mode}: {text!r}")
+
+    def test_stream_matches_batch(self):
+        """任意の位置で分割しても連結結果は一括正規化と同一"""
+        rng = random.Random(1)
+        for _ in range(1000):
+            text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 40)))
+            cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, 4)))
+            chunks = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+            for mode, (legacy, _) in CASES.items():
+                self.assertEqual("".join(tn.stream_normalize(chunks, mode)), legacy(text), f"{mode}: {chunks!r}")
+
+    def test_empty_lines_examples(self):
+        """空白のみの行の削除と連続空行の圧縮"""
+        self.assertEqual(tn.normalize_empty_lines("a\n  \n　\n\nb\n \n"), "a\n\nb\n")
+        self.assertEqual(tn.normalize_empty_lines(" \n\nx"), "\nx")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+長文セグメント分割単体テスト
+予算内への分割・ページ見出しの扱い・重なり除去結合の確認
+"""
+
+import re
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# パス設定
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from new.utils.text_segmenter import drop_overlap, split_segments, stitch_segments
+
+WORDS = "本契約 について 株式会社 検査 結果 報告 温度 測定 装置 担当者 確認 記録".split()
+
+
+def _document(rng):
+    """ページ見出し・段落・行を含むOCR風テキスト"""
+    pages = []
+    for page in range(1, rng.randint(2, 6)):
+        paragraphs = [
+            "\n".join("".join(rng.choice(WORDS) for _ in range(rng.randint(2, 30))) + "。"
+                      for _ in range(rng.randint(1, 4)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        pages.append(f"=== ページ {page} ===\n" + "\n\n".join(paragraphs))
+    return "\n".join(pages)
+
+
+def _squash(text):
+    return re.sub(r"\s+", "", text)
+
+
+class TestTextSegmenter(unittest.TestCase):
+    """長文セグメント分割単体テスト"""
+
+    def test_short_text_single_segment(self):
+        """予算内のテキストは1区間のまま"""
+        segments = split_segments("短いテキスト。", max_tokens=100, overlap_tokens=20)
+        self.assertEqual([s.text for s in segments], ["短いテキスト。"])
+
+    def test_budget_and_roundtrip(self):
+        """全区間が予算内で、恒等変換の結果を結合すると元のテキストに戻る"""
+        rng = random.Random(0)
+        for _ in range(200):
+            text = _document(rng)
+            for max_tokens, overlap in ((100, 20), (300, 60), (80, 0)):
+                segments = split_segments(text, max_tokens, overlap)
+                self.assertTrue(all(s.tokens <= max_tokens for s in segments))
+                stitched = stitch_segments(segments, [s.text for s in segments])
+                self.assertEqual(_squash(stitched), _squash(text))
+
+    def test_page_header_starts_segment(self):
+        """分割されたページの見出し行は前の区間の末尾に残らない"""
+        text = "=== ページ 1 ===\n" + "あ" * 40 + "\n=== ページ 2 ===\n" + "い" * 40 + "\n\n" + "う" * 40
+        segments = split_segments(text, max_tokens=100)
+        self.assertTrue(all(not s.text.rstrip().endswith("===") for s in segments))
+
+    def test_drop_overlap_tolerates_rewording(self):
+        """整形で句読点が変わった重なり行も除去し、本文は残す"""
+        output = "本契約について確認した．\n次の段落です。"
+        self.assertEqual(drop_overlap("前の段落。\n本契約について確認した。", output, "本契約について確認した。"),
+                         "次の段落です。")
+        self.assertEqual(drop_overlap("前の段落。", "全く別の内容。", "本契約について確認した。"), "全く別の内容。")
+
+
+if __name__ == "__main__":
+    unittest.main()